@@ -21,7 +21,7 @@ from btclib.b32 import check_witness
 from btclib.base58 import b58decode, b58encode
 from btclib.exceptions import BTClibValueError
 from btclib.hashes import hash160_from_key
-from btclib.network import NETWORKS, network_from_key_value
+from btclib.network import NETWORKS, PREFIXES
 from btclib.script.script import serialize
 from btclib.to_prv_key import PrvKey, prv_keyinfo_from_prv_key
 from btclib.to_pub_key import Key
@@ -71,12 +71,10 @@ def h160_from_address(b58addr: String) -> Tuple[bytes, bytes, str, bool]:
     payload = b58decode(b58addr, 21)
     prefix = payload[:1]
 
-    for script_type, is_script_hash in zip(("p2pkh", "p2sh"), (False, True)):
-        # with pytohn>=3.8 use walrus operator
-        # if network := network_from_key_value(script_type, prefix):
-        network = network_from_key_value(script_type, prefix)
-        if network:
-            return prefix, payload[1:], network, is_script_hash
+    info = PREFIXES.get(prefix)
+    if info is not None and info[2] in ("p2pkh", "p2sh"):
+        network, _, script_type = info
+        return prefix, payload[1:], network, script_type == "p2sh"
 
     err_msg = f"invalid base58 address prefix: 0x{prefix.hex()}"
     raise BTClibValueError(err_msg)
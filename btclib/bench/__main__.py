@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2020-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Command line entry point for the btclib benchmarks.
+
+    python -m btclib.bench ecc -o new.json
+    python -m btclib.bench compare old.json new.json
+
+The compare command exits with status 1 if any regression is found.
+"""
+
+import argparse
+import importlib
+import sys
+from typing import List, Optional
+
+from btclib.bench import bench
+
+SUITES = ("ecc", "keys")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+
+    parser = argparse.ArgumentParser(prog="python -m btclib.bench")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for suite in SUITES:
+        sub = subparsers.add_parser(suite, help=f"run the {suite} suite")
+        sub.add_argument("-o", "--output", help="json file to save results to")
+        sub.add_argument("-r", "--repeat", type=int, default=5)
+        sub.add_argument("-n", "--number", type=int, default=None)
+        sub.add_argument("-k", "--pattern", help="regex selecting cases by name")
+
+    sub = subparsers.add_parser("compare", help="compare two json results")
+    sub.add_argument("old")
+    sub.add_argument("new")
+    sub.add_argument("-t", "--threshold", type=float, default=bench.THRESHOLD)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        old, new = bench.load(args.old), bench.load(args.new)
+        comparisons, regressions = bench.compare(old, new, args.threshold)
+        print(bench.format_comparisons(comparisons))
+        if regressions:
+            print(f"\n{len(regressions)} regression(s):")
+            print(bench.format_comparisons(regressions))
+            return 1
+        return 0
+
+    module = importlib.import_module(f"btclib.bench.{args.command}")
+    report = bench.run_suite(
+        args.command, module.cases(), args.repeat, args.number, args.pattern
+    )
+    print(bench.format_report(report))
+    if args.output:
+        bench.save(report, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2020-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Benchmark harness.
+
+A benchmark suite is a module providing a cases() function
+that returns a dict of named zero-argument callables:
+all inputs are generated deterministically at suite set-up,
+so that results are reproducible and comparable between commits.
+
+Each case is timed with timeit: the number of calls per run
+is calibrated with timeit autorange, unless explicitly provided;
+the best (min) and median time per call are reported in seconds.
+
+The same callables can also be fed to pytest-benchmark,
+e.g. benchmark(cases()["ssa.verify"]).
+"""
+
+import datetime
+import json
+import platform
+import re
+import statistics
+import timeit
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import btclib
+from btclib.exceptions import BTClibValueError
+
+Case = Callable[[], Any]
+Cases = Dict[str, Case]
+
+# relative slowdown flagged as regression by compare
+THRESHOLD = 0.1
+
+
+def metadata() -> Dict[str, str]:
+    "Return the environment description stored along with results."
+
+    return {
+        "btclib": btclib.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+
+
+def run_cases(
+    cases: Cases,
+    repeat: int = 5,
+    number: Optional[int] = None,
+    pattern: Optional[str] = None,
+) -> Dict[str, Dict[str, Any]]:
+    "Time the selected cases, returning per-call timings in seconds."
+
+    if repeat < 1:
+        raise BTClibValueError(f"invalid repeat: {repeat}")
+    if number is not None and number < 1:
+        raise BTClibValueError(f"invalid number: {number}")
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, case in cases.items():
+        if pattern is not None and not re.search(pattern, name):
+            continue
+        timer = timeit.Timer(case)
+        n = timer.autorange()[0] if number is None else number
+        per_call = [t / n for t in timer.repeat(repeat, n)]
+        results[name] = {
+            "number": n,
+            "repeat": repeat,
+            "min": min(per_call),
+            "median": statistics.median(per_call),
+        }
+    return results
+
+
+def run_suite(
+    suite: str,
+    cases: Cases,
+    repeat: int = 5,
+    number: Optional[int] = None,
+    pattern: Optional[str] = None,
+) -> Dict[str, Any]:
+    "Return the json-serializable benchmark report of a suite."
+
+    return {
+        "suite": suite,
+        "metadata": metadata(),
+        "results": run_cases(cases, repeat, number, pattern),
+    }
+
+
+def save(report: Dict[str, Any], filename: str) -> None:
+    with open(filename, "w") as file_:
+        json.dump(report, file_, indent=4)
+
+
+def load(filename: str) -> Dict[str, Any]:
+    with open(filename, "r") as file_:
+        return json.load(file_)
+
+
+Comparison = Tuple[str, float, float, float]
+
+
+def compare(
+    old: Dict[str, Any], new: Dict[str, Any], threshold: float = THRESHOLD
+) -> Tuple[List[Comparison], List[Comparison]]:
+    """Compare two benchmark reports.
+
+    Return all (name, old_min, new_min, new_min/old_min) comparisons
+    for the cases in both reports, and the regressions among them,
+    i.e. those slower than (1 + threshold) times the old timing.
+    """
+
+    if threshold < 0:
+        raise BTClibValueError(f"negative threshold: {threshold}")
+
+    comparisons: List[Comparison] = []
+    for name, new_result in new["results"].items():
+        if name not in old["results"]:
+            continue
+        old_min = old["results"][name]["min"]
+        new_min = new_result["min"]
+        comparisons.append((name, old_min, new_min, new_min / old_min))
+    regressions = [c for c in comparisons if c[3] > 1 + threshold]
+    return comparisons, regressions
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [f"{'case':<48} {'min (us)':>12} {'median (us)':>12}"]
+    for name, result in report["results"].items():
+        min_ = result["min"] * 1e6
+        median = result["median"] * 1e6
+        lines.append(f"{name:<48} {min_:>12.1f} {median:>12.1f}")
+    return "\n".join(lines)
+
+
+def format_comparisons(comparisons: List[Comparison]) -> str:
+    lines = [f"{'case':<48} {'old (us)':>12} {'new (us)':>12} {'ratio':>7}"]
+    for name, old_min, new_min, ratio in comparisons:
+        old_us = old_min * 1e6
+        new_us = new_min * 1e6
+        lines.append(f"{name:<48} {old_us:>12.1f} {new_us:>12.1f} {ratio:>7.2f}")
+    return "\n".join(lines)
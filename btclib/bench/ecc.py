@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2020-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Benchmark suite for the elliptic curve layer.
+
+It covers:
+
+- scalar multiplication, per algorithm and curve
+- double and multi scalar multiplication at several sizes
+- dsa, ssa, and bms sign and verify
+- ssa batch verification at several sizes
+- public and private key parsing
+
+Note that mult_fixed_window_cached is timed with a warm cache.
+"""
+
+import hashlib
+from typing import Callable, Dict, List
+
+from btclib.alias import JacPoint
+from btclib.bench.bench import Cases
+from btclib.bip32 import bip32
+from btclib.ecc import bms, dsa, ssa
+from btclib.ecc.curve import CURVES, Curve, secp256k1
+from btclib.ecc.curve_group import (
+    _double_mult,
+    _multi_mult,
+    mult_base_3,
+    mult_fixed_window,
+    mult_fixed_window_cached,
+    mult_jac,
+    mult_mont_ladder,
+)
+from btclib.ecc.curve_group_2 import (
+    mult_endomorphism_secp256k1,
+    mult_sliding_window,
+    mult_w_NAF,
+)
+from btclib.ecc.sec_point import bytes_from_point
+from btclib.to_prv_key import int_from_prv_key
+from btclib.to_pub_key import point_from_key
+
+CURVE_NAMES = ("secp256k1", "secp256r1", "secp384r1")
+MULT_ALGORITHMS: Dict[str, Callable[..., JacPoint]] = {
+    "mult_jac": mult_jac,
+    "mult_mont_ladder": mult_mont_ladder,
+    "mult_base_3": mult_base_3,
+    "mult_fixed_window": mult_fixed_window,
+    "mult_fixed_window_cached": mult_fixed_window_cached,
+    "mult_sliding_window": mult_sliding_window,
+    "mult_w_NAF": mult_w_NAF,
+}
+MULTI_MULT_SIZES = (2, 8, 32, 128)
+BATCH_SIZES = (4, 16, 64)
+
+
+def scalar(i: int, ec: Curve = secp256k1) -> int:
+    "Return a deterministic scalar in [1, n-1]."
+
+    h = hashlib.sha512(f"btclib bench {i}".encode()).digest()
+    return 1 + int.from_bytes(h, "big") % (ec.n - 1)
+
+
+def point(i: int, ec: Curve = secp256k1) -> JacPoint:
+    "Return a deterministic Jacobian curve point."
+
+    return mult_jac(scalar(i, ec), ec.GJ, ec)
+
+
+def _mult_case(
+    f: Callable[..., JacPoint], m: int, QJ: JacPoint, ec: Curve
+) -> Callable[[], JacPoint]:
+    return lambda: f(m, QJ, ec)
+
+
+def _double_mult_case(
+    u: int, HJ: JacPoint, v: int, QJ: JacPoint, ec: Curve
+) -> Callable[[], JacPoint]:
+    return lambda: _double_mult(u, HJ, v, QJ, ec)
+
+
+def _multi_mult_case(
+    scalars: List[int], points: List[JacPoint], ec: Curve
+) -> Callable[[], JacPoint]:
+    return lambda: _multi_mult(scalars, points, ec)
+
+
+def _batch_case(msgs: List[bytes], x_Qs: List[int], sigs: List[ssa.Sig]) -> Callable:
+    return lambda: ssa.assert_batch_as_valid_(msgs, x_Qs, sigs)
+
+
+def cases() -> Cases:
+    result: Cases = {}
+
+    for ec_name in CURVE_NAMES:
+        ec = CURVES[ec_name]
+        m = scalar(0, ec)
+        QJ = point(1, ec)
+        for alg_name, f in MULT_ALGORITHMS.items():
+            result[f"{alg_name}[{ec_name}]"] = _mult_case(f, m, QJ, ec)
+        u, HJ = scalar(2, ec), point(3, ec)
+        result[f"_double_mult[{ec_name}]"] = _double_mult_case(u, HJ, m, QJ, ec)
+    ec = secp256k1
+    result["mult_endomorphism_secp256k1[secp256k1]"] = _mult_case(
+        mult_endomorphism_secp256k1, scalar(0), point(1), ec
+    )
+
+    for size in MULTI_MULT_SIZES:
+        scalars = [scalar(i) for i in range(size)]
+        points = [point(size + i) for i in range(size)]
+        result[f"_multi_mult[{size}]"] = _multi_mult_case(scalars, points, ec)
+
+    msg = "btclib benchmark message".encode()
+    msg_hash = hashlib.sha256(msg).digest()
+    q = scalar(42)
+
+    dsa_sig = dsa.sign_(msg_hash, q)
+    Q = dsa.gen_keys(q)[1]
+    result["dsa.sign"] = lambda: dsa.sign_(msg_hash, q)
+    result["dsa.verify"] = lambda: dsa.assert_as_valid_(msg_hash, Q, dsa_sig)
+
+    ssa_sig = ssa.sign_(msg_hash, q)
+    x_Q = ssa.gen_keys(q)[1]
+    result["ssa.sign"] = lambda: ssa.sign_(msg_hash, q)
+    result["ssa.verify"] = lambda: ssa.assert_as_valid_(msg_hash, x_Q, ssa_sig)
+
+    wif, address = bms.gen_keys(q)
+    bms_sig = bms.sign(msg, wif)
+    result["bms.sign"] = lambda: bms.sign(msg, wif)
+    result["bms.verify"] = lambda: bms.assert_as_valid(msg, address, bms_sig)
+
+    for size in BATCH_SIZES:
+        msgs = [hashlib.sha256(i.to_bytes(4, "big")).digest() for i in range(size)]
+        prv_keys = [scalar(1000 + i) for i in range(size)]
+        x_Qs = [ssa.gen_keys(q)[1] for q in prv_keys]
+        sigs = [ssa.sign_(m, q) for m, q in zip(msgs, prv_keys)]
+        result[f"ssa.batch_verify[{size}]"] = _batch_case(msgs, x_Qs, sigs)
+
+    xprv = bip32.rootxprv_from_seed(hashlib.sha256(msg).digest())
+    xpub = bip32.xpub_from_xprv(xprv)
+    compressed = bytes_from_point(Q)
+    uncompressed = bytes_from_point(Q, compressed=False)
+    result["point_from_key[compressed hex]"] = lambda: point_from_key(compressed.hex())
+    result["point_from_key[uncompressed]"] = lambda: point_from_key(uncompressed)
+    result["point_from_key[xpub]"] = lambda: point_from_key(xpub)
+    result["point_from_key[tuple]"] = lambda: point_from_key(Q)
+    result["int_from_prv_key[wif]"] = lambda: int_from_prv_key(wif)
+    result["int_from_prv_key[xprv]"] = lambda: int_from_prv_key(xprv)
+    result["int_from_prv_key[bytes]"] = lambda: int_from_prv_key(q.to_bytes(32, "big"))
+
+    return result
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2020-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Benchmark suite for the key conversion functions.
+
+Each key conversion function is timed for all the supported key formats:
+
+- private keys: int, bytes, hex-string, WIF, and BIP32 xprv
+- public keys: tuple, compressed and uncompressed SEC
+  (both bytes and hex-string), and BIP32 xpub
+
+Note that the base58 BIP32 key decoding is timed with a warm cache.
+"""
+
+import hashlib
+from typing import Any, Callable, Dict
+
+from btclib.b58 import wif_from_prv_key
+from btclib.bench.bench import Cases
+from btclib.bip32 import bip32
+from btclib.ecc.curve import mult
+from btclib.ecc.sec_point import bytes_from_point
+from btclib.key_format import key_format
+from btclib.to_prv_key import int_from_prv_key, prv_keyinfo_from_prv_key
+from btclib.to_pub_key import point_from_key, pub_keyinfo_from_key
+
+PRV_FUNCTIONS: Dict[str, Callable[[Any], Any]] = {
+    "key_format": key_format,
+    "int_from_prv_key": int_from_prv_key,
+    "prv_keyinfo_from_prv_key": prv_keyinfo_from_prv_key,
+    "point_from_key": point_from_key,
+    "pub_keyinfo_from_key": pub_keyinfo_from_key,
+}
+PUB_FUNCTIONS: Dict[str, Callable[[Any], Any]] = {
+    "key_format": key_format,
+    "point_from_key": point_from_key,
+    "pub_keyinfo_from_key": pub_keyinfo_from_key,
+}
+
+
+def prv_keys() -> Dict[str, Any]:
+    "Return a deterministic private key in all the supported formats."
+
+    seed = hashlib.sha256(b"btclib bench keys").digest()
+    xprv = bip32.rootxprv_from_seed(seed)
+    q = int.from_bytes(bip32.BIP32KeyData.b58decode(xprv).key[1:], "big")
+    return {
+        "int": q,
+        "bytes": q.to_bytes(32, "big"),
+        "hex": q.to_bytes(32, "big").hex(),
+        "wif": wif_from_prv_key(q),
+        "xprv": xprv,
+    }
+
+
+def pub_keys() -> Dict[str, Any]:
+    "Return a deterministic public key in all the supported formats."
+
+    keys = prv_keys()
+    Q = mult(keys["int"])
+    compressed = bytes_from_point(Q)
+    uncompressed = bytes_from_point(Q, compressed=False)
+    return {
+        "tuple": Q,
+        "compressed": compressed,
+        "compressed hex": compressed.hex(),
+        "uncompressed": uncompressed,
+        "uncompressed hex": uncompressed.hex(),
+        "xpub": bip32.xpub_from_xprv(keys["xprv"]),
+    }
+
+
+def _case(f: Callable[[Any], Any], key: Any) -> Callable[[], Any]:
+    return lambda: f(key)
+
+
+def cases() -> Cases:
+    result: Cases = {}
+
+    for functions, keys in ((PRV_FUNCTIONS, prv_keys()), (PUB_FUNCTIONS, pub_keys())):
+        for f_name, f in functions.items():
+            for key_name, key in keys.items():
+                result[f"{f_name}[{key_name}]"] = _case(f, key)
+
+    return result
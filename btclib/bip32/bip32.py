@@ -33,17 +33,22 @@ A BIP32 extended key is 78 bytes:
 """
 
 import copy
+import functools
 import hmac
+import struct
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import List, Optional, Tuple, Type, TypeVar, Union
+from typing import Dict, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 
 from btclib import base58
 from btclib.alias import INF, BinaryData, Octets, Point, String
 from btclib.bip32.der_path import BIP32DerPath, indexes_from_bip32_path
 from btclib.ecc.curve import mult, secp256k1
+from btclib.ecc.curve_group import mult_fixed_window_cached
 from btclib.ecc.sec_point import bytes_from_point, point_from_octets
 from btclib.exceptions import BTClibValueError
-from btclib.network import NETWORKS, XPRV_VERSIONS_ALL, XPUB_VERSIONS_ALL
+from btclib.network import NETWORKS, PREFIXES, XPRV_VERSIONS_ALL, XPUB_VERSIONS_ALL
 from btclib.utils import bytes_from_octets, bytesio_from_binarydata, hash160, hex_string
 
 ec = secp256k1
@@ -57,6 +62,8 @@ _KEY_SIZE: List[Tuple[str, int]] = [
     ("key", 33),
 ]
 _REQUIRED_LENGHT = 78
+# fixed layout of the 78 bytes serialization
+_XKEY_STRUCT = struct.Struct(">4sB4sI32s33s")
 
 
 @dataclass
@@ -119,7 +126,10 @@ class BIP32KeyData:
             if self.index != 0:
                 raise BTClibValueError(f"zero depth with non-zero index: {self.index}")
 
-        if self.version in XPRV_VERSIONS_ALL:
+        # single lookup of the key kind ('xprv' or 'xpub')
+        info = PREFIXES.get(self.version)
+        kind = None if info is None else info[1]
+        if kind == "xprv":
             if self.key[0] != 0:
                 raise BTClibValueError(
                     f"invalid private key prefix: 0x{self.key[:1].hex()}"
@@ -127,7 +137,7 @@ class BIP32KeyData:
             q = int.from_bytes(self.key[1:], byteorder="big", signed=False)
             if not 0 < q < ec.n:
                 raise BTClibValueError(f"invalid private key not in 1..n-1: {hex(q)}")
-        elif self.version in XPUB_VERSIONS_ALL:
+        elif kind == "xpub":
             if self.key[0] not in (2, 3):
                 err_msg = f"invalid public key prefix not in (0x02, 0x03): 0x{self.key[:1].hex()}"
                 raise BTClibValueError(err_msg)
@@ -165,7 +175,24 @@ class BIP32KeyData:
     def parse(
         cls: Type[_BIP32KeyData], xkey_bin: BinaryData, check_validity: bool = True
     ) -> _BIP32KeyData:
-        "Return a BIP32KeyData by parsing 73 bytes from binary data."
+        "Return a BIP32KeyData by parsing 78 bytes from binary data."
+
+        if (
+            isinstance(xkey_bin, (bytes, bytearray, memoryview))
+            and len(xkey_bin) >= _REQUIRED_LENGHT
+        ):
+            # fixed layout unpacking, without any stream or slice copy
+            fields = _XKEY_STRUCT.unpack_from(memoryview(xkey_bin))
+            version, depth, parent_fingerprint, index, chain_code, key = fields
+            return cls(
+                version,
+                depth,
+                parent_fingerprint,
+                index,
+                chain_code,
+                key,
+                check_validity,
+            )
 
         stream = bytesio_from_binarydata(xkey_bin)
         xkey_bin = stream.read(_REQUIRED_LENGHT)
@@ -192,12 +219,47 @@ class BIP32KeyData:
 
         if isinstance(address, str):
             address = address.strip()
+        elif isinstance(address, (bytearray, memoryview)):
+            # hashable, as required by the decoding cache
+            address = bytes(address)
+
+        if check_validity:
+            # validated extended keys are cached as immutable tuples
+            fields = _b58decode_valid_xkey(address)
+            version, depth, parent_fingerprint, index, chain_code, key = fields
+            return cls(
+                version, depth, parent_fingerprint, index, chain_code, key, False
+            )
 
         xkey_bin = base58.b58decode(address)
         # pylance cannot grok the following line
         return cls.parse(xkey_bin, check_validity)  # type: ignore
 
 
+_XKeyFields = Tuple[bytes, int, bytes, int, bytes, bytes]
+
+
+@functools.lru_cache(maxsize=1024)
+def _b58decode_valid_xkey(address: String) -> _XKeyFields:
+    """Return the fields of a validated base58 encoded extended key.
+
+    This least recently used cache avoids the repeated
+    base58 decoding, checksum verification, and validation
+    (including public key decompression) of the same extended keys.
+    """
+
+    xkey_bin = base58.b58decode(address)
+    xkey = BIP32KeyData.parse(xkey_bin)
+    return (
+        xkey.version,
+        xkey.depth,
+        xkey.parent_fingerprint,
+        xkey.index,
+        xkey.chain_code,
+        xkey.key,
+    )
+
+
 def _rootxprv_from_seed(
     seed: Octets, version: Octets = NETWORKS["mainnet"].bip32_prv
 ) -> BIP32KeyData:
@@ -279,7 +341,8 @@ class _ExtendedBIP32KeyData(BIP32KeyData):
     # extensions used to cache intermediate results
     # in multi-level derivation: do not rely on them elsewhere
     prv_key_int: int  # non-zero for private key only
-    pub_key_point: Point  # non-Infinity for public key only
+    # non-Infinity for public key, lazily computed for private key
+    pub_key_point: Point
 
     def __init__(
         self,
@@ -306,12 +369,148 @@ class _ExtendedBIP32KeyData(BIP32KeyData):
             self.assert_valid()
 
 
+class _TrieNode:
+    __slots__ = ("xkey", "children", "parent", "key")
+
+    def __init__(
+        self,
+        xkey: _ExtendedBIP32KeyData,
+        parent: Optional["_TrieNode"],
+        key: Union[int, bytes],
+    ) -> None:
+        self.xkey = xkey
+        self.children: Dict[int, "_TrieNode"] = {}
+        self.parent = parent
+        # index in the parent node, root_id for the root node
+        self.key = key
+
+
+class _DerivationCache:
+    """Bounded LRU cache of derived intermediate extended keys.
+
+    Keys are stored in a trie for each root key, with nodes
+    identified by the derivation path prefix from the root key.
+    A node is always used more recently than its children,
+    so that only leaves are evicted.
+    A zero maxsize disables the cache.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self._roots: Dict[bytes, _TrieNode] = {}
+        self._lru: "OrderedDict[int, _TrieNode]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._roots.clear()
+            self._lru.clear()
+
+    def resize(self, maxsize: int) -> None:
+        if maxsize < 0:
+            raise BTClibValueError(f"invalid cache size: {maxsize}")
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def _evict(self) -> None:
+        while len(self._lru) > self.maxsize:
+            _, node = self._lru.popitem(last=False)
+            if node.parent is None:
+                del self._roots[node.key]  # type: ignore
+            else:
+                del node.parent.children[node.key]  # type: ignore
+
+    def _touch(self, node: Optional[_TrieNode]) -> None:
+        # from the leaf up to the root, i.e. parents are more recent
+        while node is not None:
+            self._lru.move_to_end(id(node))
+            node = node.parent
+
+    def get(
+        self, root_id: bytes, indexes: Sequence[int]
+    ) -> Tuple[int, Optional[_ExtendedBIP32KeyData]]:
+        "Return the longest cached prefix length of indexes and its xkey."
+
+        with self._lock:
+            node = self._roots.get(root_id)
+            if node is None:
+                return 0, None
+            depth = 0
+            for index in indexes:
+                child = node.children.get(index)
+                if child is None:
+                    break
+                node = child
+                depth += 1
+            self._touch(node)
+            return depth, copy.copy(node.xkey)
+
+    def put(
+        self, root_id: bytes, indexes: Sequence[int], xkey: _ExtendedBIP32KeyData
+    ) -> None:
+        "Store the xkey derived from the root key along indexes."
+
+        if self.maxsize == 0:
+            return
+        xkey = copy.copy(xkey)
+        with self._lock:
+            self._put(root_id, indexes, xkey)
+
+    def _put(
+        self, root_id: bytes, indexes: Sequence[int], xkey: _ExtendedBIP32KeyData
+    ) -> None:
+        if not indexes:
+            node = self._roots.get(root_id)
+            if node is None:
+                node = self._roots[root_id] = _TrieNode(xkey, None, root_id)
+                self._lru[id(node)] = node
+        else:
+            parent = self._roots.get(root_id)
+            for index in indexes[:-1]:
+                if parent is None:
+                    break
+                parent = parent.children.get(index)
+            if parent is None:  # missing (i.e. evicted) parent
+                return
+            node = parent.children.get(indexes[-1])
+            if node is None:
+                node = _TrieNode(xkey, parent, indexes[-1])
+                parent.children[indexes[-1]] = node
+                self._lru[id(node)] = node
+        node.xkey = xkey
+        self._touch(node)
+
+        self._evict()
+
+
+_derivation_cache = _DerivationCache()
+
+
+def clear_derivation_cache() -> None:
+    "Clear the cache of the intermediate keys of derive."
+    _derivation_cache.clear()
+
+
+def set_derivation_cache_size(maxsize: int) -> None:
+    """Set the maximum number of intermediate keys cached by derive.
+
+    The cache stores private keys too: zero disables it.
+    """
+    _derivation_cache.resize(maxsize)
+
+
 def __ckd(xkey: _ExtendedBIP32KeyData, index: int) -> None:
 
     xkey.depth += 1
     xkey.index = index
     if xkey.key[0] == 0:  # private key
-        Q_bytes = bytes_from_point(mult(xkey.prv_key_int))
+        if xkey.pub_key_point == INF:  # not computed yet
+            xkey.pub_key_point = mult(xkey.prv_key_int)
+        Q_bytes = bytes_from_point(xkey.pub_key_point)
         xkey.parent_fingerprint = hash160(Q_bytes)[:4]
         if xkey.is_hardened():  # hardened derivation
             hmac_ = hmac.new(
@@ -362,16 +561,30 @@ def _derive(
         err_msg = f"final depth greater than 255: {final_depth}"
         raise BTClibValueError(err_msg)
 
-    xkey = _ExtendedBIP32KeyData(
-        version=xkey.version,
-        depth=xkey.depth,
-        parent_fingerprint=xkey.parent_fingerprint,
-        index=xkey.index,
-        chain_code=xkey.chain_code,
-        key=xkey.key,
-    )
-    for index in indexes:
-        __ckd(xkey, index)
+    # intermediate keys are cached, identified by the
+    # derivation path prefix from the starting (root) key
+    version = xkey.version
+    root_id = xkey.serialize(check_validity=False)
+    n, cached_xkey = _derivation_cache.get(root_id, indexes[:-1])
+    if cached_xkey is None:
+        xkey = _ExtendedBIP32KeyData(
+            version=xkey.version,
+            depth=xkey.depth,
+            parent_fingerprint=xkey.parent_fingerprint,
+            index=xkey.index,
+            chain_code=xkey.chain_code,
+            key=xkey.key,
+        )
+    else:
+        xkey = cached_xkey
+        xkey.version = version
+    for i in range(n, len(indexes)):
+        if cached_xkey is None or i > n:
+            # the parent public key is cached too
+            if xkey.key[0] == 0 and xkey.pub_key_point == INF:
+                xkey.pub_key_point = mult(xkey.prv_key_int)
+            _derivation_cache.put(root_id, indexes[:i], xkey)
+        __ckd(xkey, indexes[i])
 
     if forced_version:
         if xkey.version in XPRV_VERSIONS_ALL:
@@ -434,6 +647,64 @@ def derive_from_account(
     return xkey.b58encode()
 
 
+def derive_children(
+    xkey: BIP32Key, start: int, count: int, der_path: BIP32DerPath = ""
+) -> List[Tuple[bytes, bytes]]:
+    """Return (pub_key, chain_code) of count consecutive normal children.
+
+    The parent key is derived from xkey along der_path only once,
+    then its children at indexes start, start+1, ..., start+count-1
+    are computed in bulk: the child public keys are obtained adding
+    the cached multiples of G (8-bit window) to the parent point
+    in Jacobian coordinates, with a single batched normalization.
+
+    Each child has the same compressed public key and chain code
+    of derive(xkey, der_path + "/index"), but no extended key
+    is serialized nor base58 encoded.
+    """
+
+    if count < 0:
+        raise BTClibValueError(f"negative count: {count}")
+    if start < 0 or start + count > 0x80000000:
+        err_msg = f"invalid normal derivation index range: {start}, {count}"
+        raise BTClibValueError(err_msg)
+
+    parent = _derive(xkey, der_path)
+    if parent.depth == 255:
+        raise BTClibValueError("final depth greater than 255: 256")
+    if parent.key[0] == 0:  # private key
+        P = mult(int.from_bytes(parent.key[1:], byteorder="big", signed=False))
+        parent_pub_key = bytes_from_point(P)
+    else:  # public key
+        P = point_from_octets(parent.key, ec)
+        parent_pub_key = parent.key
+    PJ = P[0], P[1], 1
+
+    chain_codes: List[bytes] = []
+    QJs = []
+    for index in range(start, start + count):
+        hmac_ = hmac.new(
+            parent.chain_code,
+            parent_pub_key + index.to_bytes(4, byteorder="big", signed=False),
+            "sha512",
+        ).digest()
+        chain_codes.append(hmac_[32:])
+        offset = int.from_bytes(hmac_[:32], byteorder="big", signed=False) % ec.n
+        # the wider window pays off its larger one-off precomputation in bulk
+        QJs.append(ec.add_jac(PJ, mult_fixed_window_cached(offset, ec.GJ, ec, 8)))
+
+    children: List[Tuple[bytes, bytes]] = []
+    for Q, chain_code in zip(ec.batch_aff_from_jac(QJs), chain_codes):
+        # edge case that cannot be reproduced in the test suite
+        if Q[1] == 0:
+            err_msg = "no bytes representation for infinity point"  # pragma: no cover
+            raise BTClibValueError(err_msg)  # pragma: no cover
+        pub_key = b"\x03" if Q[1] & 1 else b"\x02"
+        pub_key += Q[0].to_bytes(ec.p_size, byteorder="big", signed=False)
+        children.append((pub_key, chain_code))
+    return children
+
+
 def crack_prv_key(parent_xpub: BIP32Key, child_xprv: BIP32Key) -> str:
 
     if isinstance(parent_xpub, BIP32KeyData):
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Gap-limit wallet discovery.
+
+When restoring a BIP44/49/84 account, the children of each branch
+(e.g. 0 for receive and 1 for change addresses) are derived
+until gap_limit consecutive unused children are found,
+as per BIP44 "address gap limit".
+
+Here children are derived in bulk chunks and their script_pub_keys
+are built as raw bytes, without any base58/bech32 address encoding,
+to be checked against a container of observed script_pub_keys,
+e.g. a set or a BloomFilter.
+Branches can be scanned in parallel by a pool of worker processes.
+"""
+
+import hashlib
+import math
+from functools import partial
+from typing import Container, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from btclib.bip32.bip32 import BIP32Key, BIP32KeyData, derive_children
+from btclib.exceptions import BTClibValueError
+from btclib.network import PREFIXES
+from btclib.utils import _map_chunks, hash160
+
+SCRIPT_TYPES = ("p2pkh", "p2wpkh_p2sh", "p2wpkh")
+
+
+def script_type_from_xkey(xkey: BIP32Key) -> str:
+    "Return the script type (p2pkh, p2wpkh_p2sh, p2wpkh) of the xkey version."
+
+    if not isinstance(xkey, BIP32KeyData):
+        xkey = BIP32KeyData.b58decode(xkey)
+
+    info = PREFIXES.get(xkey.version)
+    if info is not None and info[2] in SCRIPT_TYPES:
+        return info[2]
+    raise BTClibValueError(f"no script type for xkey version: {xkey.version.hex()}")
+
+
+def script_pub_key_from_pub_key(pub_key: bytes, script_type: str) -> bytes:
+    "Return the raw script_pub_key bytes of a compressed public key."
+
+    h160 = hash160(pub_key)
+    if script_type == "p2wpkh":
+        # [OP_0, pub_key_hash]
+        return b"\x00\x14" + h160
+    if script_type == "p2pkh":
+        # [OP_DUP, OP_HASH160, pub_key_hash, OP_EQUALVERIFY, OP_CHECKSIG]
+        return b"\x76\xa9\x14" + h160 + b"\x88\xac"
+    if script_type == "p2wpkh_p2sh":
+        # [OP_HASH160, redeem_script_hash, OP_EQUAL]
+        return b"\xa9\x14" + hash160(b"\x00\x14" + h160) + b"\x87"
+    raise BTClibValueError(f"unknown script type: {script_type}")
+
+
+class BloomFilter:
+    """Bloom filter of bytes items.
+
+    A compact probabilistic set representation, with no false negatives
+    and false positives at the provided rate for the expected number
+    of items: a positive match must be double checked if needed.
+    """
+
+    def __init__(
+        self,
+        items: Iterable[bytes] = (),
+        n_items: int = 1000,
+        false_positive_rate: float = 0.0001,
+    ) -> None:
+
+        if n_items < 1:
+            raise BTClibValueError(f"invalid number of items: {n_items}")
+        if not 0 < false_positive_rate < 1:
+            err_msg = f"invalid false positive rate: {false_positive_rate}"
+            raise BTClibValueError(err_msg)
+
+        ln2 = math.log(2)
+        n_bits = math.ceil(-n_items * math.log(false_positive_rate) / ln2 / ln2)
+        self.n_bits = max(8, n_bits)
+        self.n_hashes = max(1, round(self.n_bits / n_items * ln2))
+        self.bits = bytearray((self.n_bits + 7) // 8)
+        for item in items:
+            self.add(item)
+
+    def _bit_indexes(self, item: bytes) -> List[int]:
+        # Kirsch-Mitzenmacher double hashing
+        digest = hashlib.sha256(item).digest()
+        h1 = int.from_bytes(digest[:8], byteorder="little", signed=False)
+        h2 = int.from_bytes(digest[8:16], byteorder="little", signed=False)
+        return [(h1 + i * h2) % self.n_bits for i in range(self.n_hashes)]
+
+    def add(self, item: bytes) -> None:
+        for i in self._bit_indexes(item):
+            self.bits[i >> 3] |= 1 << (i & 7)
+
+    def __contains__(self, item: object) -> bool:
+        if not isinstance(item, bytes):
+            return False
+        return all(self.bits[i >> 3] & (1 << (i & 7)) for i in self._bit_indexes(item))
+
+
+def _discover_branch(
+    xkey: BIP32Key,
+    branch: int,
+    script_pub_keys: Container[bytes],
+    gap_limit: int,
+    script_type: str,
+    chunk_size: int,
+) -> List[Tuple[int, bytes]]:
+
+    used: List[Tuple[int, bytes]] = []
+    # first index after the last used one
+    first_unused = 0
+    start = 0
+    while start - first_unused < gap_limit and start < 0x80000000:
+        count = min(chunk_size, 0x80000000 - start)
+        children = derive_children(xkey, start, count, f"m/{branch}")
+        for index, (pub_key, _) in enumerate(children, start):
+            if index - first_unused >= gap_limit:
+                break
+            script_pub_key = script_pub_key_from_pub_key(pub_key, script_type)
+            if script_pub_key in script_pub_keys:
+                used.append((index, script_pub_key))
+                first_unused = index + 1
+        start += count
+    return used
+
+
+def _discover_branches(
+    branches: Sequence[int],
+    xkey: BIP32Key,
+    script_pub_keys: Container[bytes],
+    gap_limit: int,
+    script_type: str,
+    chunk_size: int,
+) -> List[List[Tuple[int, bytes]]]:
+    return [
+        _discover_branch(
+            xkey, branch, script_pub_keys, gap_limit, script_type, chunk_size
+        )
+        for branch in branches
+    ]
+
+
+def discover(
+    xkey: BIP32Key,
+    script_pub_keys: Container[bytes],
+    branches: Sequence[int] = (0, 1),
+    gap_limit: int = 20,
+    script_type: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    processes: Optional[int] = None,
+) -> Dict[int, List[Tuple[int, bytes]]]:
+    """Return the used (index, script_pub_key) children of each branch.
+
+    The children of each branch of the xkey account extended key
+    are scanned until gap_limit consecutive children are found
+    whose script_pub_key is not in script_pub_keys.
+
+    If not provided, the script type is inferred from the xkey version.
+    Children are derived in chunks of chunk_size (default: gap_limit).
+    If processes is larger than one, branches are scanned
+    in parallel by a pool of worker processes.
+    """
+
+    if gap_limit < 1:
+        raise BTClibValueError(f"invalid gap limit: {gap_limit}")
+    if script_type is None:
+        script_type = script_type_from_xkey(xkey)
+    elif script_type not in SCRIPT_TYPES:
+        raise BTClibValueError(f"unknown script type: {script_type}")
+    chunk_size = chunk_size or gap_limit
+    if chunk_size < 1:
+        raise BTClibValueError(f"invalid chunk size: {chunk_size}")
+    for branch in branches:
+        if not 0 <= branch < 0x80000000:
+            raise BTClibValueError(f"invalid branch: {branch}")
+
+    func = partial(
+        _discover_branches,
+        xkey=xkey,
+        script_pub_keys=script_pub_keys,
+        gap_limit=gap_limit,
+        script_type=script_type,
+        chunk_size=chunk_size,
+    )
+    results = _map_chunks(func, branches, processes)
+    return dict(zip(branches, results))
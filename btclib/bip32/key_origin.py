@@ -10,20 +10,38 @@
 
 """BIP32 key origin.
 
+A key origin is the (master fingerprint, derivation path) pair
+identifying a key derived from a BIP32 master key,
+as used in Psbt hd_key_paths and output script descriptors.
 """
 
+import copy
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Type, TypeVar
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
 from btclib.alias import Octets
+from btclib.bip32.bip32 import BIP32Key, BIP32KeyData, _derive
 from btclib.bip32.der_path import (
     BIP32DerPath,
     bytes_from_bip32_path,
     indexes_from_bip32_path,
     str_from_bip32_path,
 )
+from btclib.ecc.curve import mult
+from btclib.ecc.sec_point import bytes_from_point
 from btclib.exceptions import BTClibValueError
-from btclib.utils import bytes_from_octets
+from btclib.utils import bytes_from_octets, hash160
 
 _BIP32KeyOrigin = TypeVar("_BIP32KeyOrigin", bound="BIP32KeyOrigin")
 
@@ -174,3 +192,102 @@ def decode_from_bip32_derivs(
     "Return the dataclass element from its json representation."
 
     return dict(sorted([_decode_from_bip32_deriv(item) for item in bip32_derivs]))
+
+
+# (master fingerprint, master index, der_path)
+_CacheKey = Tuple[bytes, int, Tuple[int, ...]]
+_DerivedKey = Tuple[BIP32KeyData, bytes]
+
+
+def _pub_key_from_xkey(xkey: BIP32KeyData) -> bytes:
+
+    if xkey.key[0] == 0:  # private key
+        prv_key = int.from_bytes(xkey.key[1:], byteorder="big", signed=False)
+        return bytes_from_point(mult(prv_key))
+    return xkey.key
+
+
+class KeyOriginIndex:
+    """Index of master keys by fingerprint, with a cache of derived keys.
+
+    It matches the (pub_key, BIP32KeyOrigin) entries of hd_key_paths
+    against the indexed master keys: the derived key is returned
+    if its public key is the expected one.
+
+    Derived keys are cached by (fingerprint, der_path) in a bounded
+    LRU cache, so that the same derivation is shared among
+    the inputs and outputs of a Psbt and among different Psbts;
+    the returned keys are copies of the cached ones.
+    """
+
+    def __init__(self, xkeys: Iterable[BIP32Key] = (), maxsize: int = 4096) -> None:
+
+        self.maxsize = maxsize
+        self._masters: Dict[bytes, List[BIP32KeyData]] = {}
+        self._cache: "OrderedDict[_CacheKey, Optional[_DerivedKey]]" = OrderedDict()
+        for xkey in xkeys:
+            self.add(xkey)
+
+    def __len__(self) -> int:
+        return sum(len(masters) for masters in self._masters.values())
+
+    def __contains__(self, fingerprint: object) -> bool:
+        return fingerprint in self._masters
+
+    def add(self, xkey: BIP32Key) -> bytes:
+        "Add a master key to the index, returning its fingerprint."
+
+        # a copy, not to be affected by changes to the caller's key
+        if isinstance(xkey, BIP32KeyData):
+            xkey = copy.copy(xkey)
+        else:
+            xkey = BIP32KeyData.b58decode(xkey)
+        fingerprint = hash160(_pub_key_from_xkey(xkey))[:4]
+        self._masters.setdefault(fingerprint, []).append(xkey)
+        return fingerprint
+
+    def _derive(self, cache_key: _CacheKey) -> Optional[_DerivedKey]:
+
+        if cache_key in self._cache:
+            self._cache.move_to_end(cache_key)
+            return self._cache[cache_key]
+
+        fingerprint, i, der_path = cache_key
+        try:
+            xkey = _derive(self._masters[fingerprint][i], der_path)
+        except BTClibValueError:  # e.g. hardened derivation from public key
+            result = None
+        else:
+            result = xkey, _pub_key_from_xkey(xkey)
+
+        self._cache[cache_key] = result
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return result
+
+    def key(self, pub_key: bytes, key_origin: BIP32KeyOrigin) -> Optional[BIP32KeyData]:
+        "Return the derived key matching pub_key and its origin, if any."
+
+        if len(pub_key) == 65:  # uncompressed
+            pub_key = bytes([2 + (pub_key[-1] & 1)]) + pub_key[1:33]
+        fingerprint = key_origin.master_fingerprint
+        der_path = tuple(key_origin.der_path)
+        for i in range(len(self._masters.get(fingerprint, ()))):
+            derived = self._derive((fingerprint, i, der_path))
+            if derived is not None and derived[1] == pub_key:
+                # a copy, as changes to it must not corrupt the cache
+                return copy.copy(derived[0])
+        return None
+
+    def keys(
+        self, hd_key_paths: Mapping[bytes, BIP32KeyOrigin]
+    ) -> Dict[bytes, BIP32KeyData]:
+        "Return the derived keys of the hd_key_paths matching the index."
+
+        result: Dict[bytes, BIP32KeyData] = {}
+        for pub_key, key_origin in hd_key_paths.items():
+            if key_origin.master_fingerprint in self._masters:
+                xkey = self.key(pub_key, key_origin)
+                if xkey is not None:
+                    result[pub_key] = xkey
+        return result
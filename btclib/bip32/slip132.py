@@ -12,12 +12,19 @@
 
 https://github.com/satoshilabs/slips/blob/master/slip-0132.md
 """
-from typing import Any, Callable, List
+from typing import Any, Callable, Dict
 
 from btclib import b32, b58
 from btclib.bip32.bip32 import BIP32Key, BIP32KeyData, xpub_from_xprv
 from btclib.exceptions import BTClibValueError
-from btclib.network import network_from_key_value
+from btclib.network import PREFIXES
+
+# script type to address function
+_ADDRESS_FUNCTIONS: Dict[str, Callable[[Any, str], str]] = {
+    "p2pkh": b58.p2pkh,
+    "p2wpkh": b32.p2wpkh,
+    "p2wpkh_p2sh": b58.p2wpkh_p2sh,
+}
 
 
 def address_from_xkey(xkey: BIP32Key) -> str:
@@ -49,21 +56,8 @@ def address_from_xpub(xpub: BIP32Key) -> str:
         err_msg = f"not a public key: {xpub.b58encode()}"
         raise BTClibValueError(err_msg)
 
-    function_list: List[Callable[[Any, str], str]] = [
-        b58.p2pkh,
-        b32.p2wpkh,
-        b58.p2wpkh_p2sh,
-    ]
-    version_list: List[str] = [
-        "bip32_pub",
-        "slip132_p2wpkh_pub",
-        "slip132_p2wpkh_p2sh_pub",
-    ]
-    for version, function in zip(version_list, function_list):
-        # with pytohn>=3.8 use walrus operator
-        # if network := network_from_key_value(version, xpub.version):
-        network = network_from_key_value(version, xpub.version)
-        if network:
-            return function(xpub, network)
-    err_msg = f"unknown xpub version: {xpub.version.hex()}"  # pragma: no cover
-    raise BTClibValueError(err_msg)  # pragma: no cover
+    network, _, script_type = PREFIXES.get(xpub.version, ("", "", None))
+    if script_type is None or script_type not in _ADDRESS_FUNCTIONS:
+        err_msg = f"unknown xpub version: {xpub.version.hex()}"  # pragma: no cover
+        raise BTClibValueError(err_msg)  # pragma: no cover
+    return _ADDRESS_FUNCTIONS[script_type](xpub, network)
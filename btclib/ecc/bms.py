@@ -134,20 +134,23 @@ https://github.com/bitcoin/bips/blob/master/bip-0137.mediawiki
 import base64
 import secrets
 from dataclasses import InitVar, dataclass
+from functools import partial
 from hashlib import sha256
-from typing import Optional, Tuple, Type, TypeVar, Union
+from typing import Dict, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 
-from btclib.alias import BinaryData, Octets, String
+from btclib.alias import BinaryData, Octets, Point, String
 from btclib.b32 import p2wpkh, witness_from_address
 from btclib.b58 import h160_from_address, p2pkh, p2wpkh_p2sh, wif_from_prv_key
 from btclib.ecc import dsa
 from btclib.ecc.curve import mult, secp256k1
+from btclib.ecc.curve_group import _double_mult
+from btclib.ecc.number_theory import batch_mod_inv
 from btclib.ecc.sec_point import bytes_from_point
 from btclib.exceptions import BTClibValueError
-from btclib.hashes import magic_message
-from btclib.network import NETWORKS
+from btclib.hashes import challenge_, magic_message, reduce_to_hlen
+from btclib.network import NETWORKS, PREFIXES
 from btclib.to_prv_key import PrvKey, prv_keyinfo_from_prv_key
-from btclib.utils import bytesio_from_binarydata, hash160
+from btclib.utils import _map_chunks, bytesio_from_binarydata, hash160
 
 _REQUIRED_LENGHT = 65
 
@@ -262,25 +265,21 @@ def gen_keys(
 def sign(msg: Octets, prv_key: PrvKey, addr: Optional[String] = None) -> Sig:
     """Generate address-based compact signature for the provided message."""
 
-    # first sign the message
+    # first sign the message, also getting the key_id
     magic_msg = magic_message(msg)
     q, network, compressed = prv_keyinfo_from_prv_key(prv_key)
-    dsa_sig = dsa.sign(magic_msg, q)
-
-    # now calculate the key_id
-    # TODO do the match in Jacobian coordinates avoiding mod_inv
-    pub_keys = dsa.recover_pub_keys(magic_msg, dsa_sig)
-    Q = mult(q)
     # key_id is in [0, 3]
     # first two bits in rf are reserved for it
-    key_id = pub_keys.index(Q)
-    pub_key = bytes_from_point(Q, compressed=compressed)
+    dsa_sig, key_id = dsa.sign_recoverable(magic_msg, q)
 
     if isinstance(addr, str):
         addr = addr.strip()
     elif isinstance(addr, bytes):
         addr = addr.decode("ascii")
 
+    # the public key is needed only to match the address
+    pub_key = b"" if addr is None else bytes_from_point(mult(q), compressed=compressed)
+
     # finally, calculate the recovery flag
     if addr is None or addr == p2pkh(pub_key, network, compressed):
         rf = key_id + 27
@@ -297,6 +296,62 @@ def sign(msg: Octets, prv_key: PrvKey, addr: Optional[String] = None) -> Sig:
     return Sig(rf, dsa_sig)
 
 
+def _decode_address(addr: String) -> Tuple[bytes, bool, bool]:
+    """Return (h160, is_script_hash, is_b58) from a base58/bech32 address.
+
+    The address format is sniffed from its human readable part,
+    so that only the matching decoding is attempted.
+    """
+
+    if isinstance(addr, bytes):
+        addr = addr.decode("ascii")
+    addr = addr.strip()
+    # the bech32 separator is the last '1' character
+    hrp = addr.rpartition("1")[0].lower()
+    if hrp and hrp in PREFIXES:
+        _, h160, _, is_script_hash = witness_from_address(addr)
+        return h160, is_script_hash, False
+    _, h160, _, is_script_hash = h160_from_address(addr)
+    return h160, is_script_hash, True
+
+
+def _assert_rf_matches_address(rf: int, is_b58: bool, addr: String) -> None:
+    # necessary (not sufficient) condition, checked before key recovery
+
+    if is_b58:
+        if rf < 39:  # P2PKH or P2WPKH-P2SH
+            return
+        err_msg = f"invalid recovery flag: {rf} (base58 address {addr!r})"
+    else:
+        if rf > 38 or 30 < rf < 35:  # P2WPKH
+            return
+        err_msg = f"invalid recovery flag: {rf} (bech32 address {addr!r})"
+    raise BTClibValueError(err_msg)
+
+
+def _assert_pub_key_matches_address(
+    Q: Point, rf: int, h160: bytes, is_script_hash: bool, is_b58: bool, addr: String
+) -> None:
+
+    _assert_rf_matches_address(rf, is_b58, addr)
+    compressed = rf >= 31
+    # signature is valid only if the provided address is matched
+    pub_key = bytes_from_point(Q, compressed=compressed)
+    if not is_b58:  # P2WPKH
+        if hash160(pub_key) != h160:
+            raise BTClibValueError(f"wrong p2wpkh address: {addr!r}")
+    elif is_script_hash and rf > 30:  # P2WPKH-P2SH
+        script_pk = b"\x00\x14" + hash160(pub_key)
+        if hash160(script_pk) != h160:
+            raise BTClibValueError(f"wrong p2wpkh-p2sh address: {addr!r}")
+    elif rf < 35:  # P2PKH
+        if hash160(pub_key) != h160:
+            raise BTClibValueError(f"wrong p2pkh address: {addr!r}")
+    else:
+        err_msg = f"invalid recovery flag: {rf} (base58 address {addr!r})"
+        raise BTClibValueError(err_msg)
+
+
 def assert_as_valid(
     msg: Octets, addr: String, sig: Union[Sig, String], lower_s: bool = True
 ) -> None:
@@ -318,34 +373,8 @@ def assert_as_valid(
     magic_msg = magic_message(msg)
     Q = dsa.recover_pub_key(key_id, magic_msg, sig.dsa_sig, lower_s, sha256)
 
-    try:
-        _, h160, _, is_script_hash = h160_from_address(addr)
-        is_b58 = True
-    except BTClibValueError:
-        _, h160, _, is_script_hash = witness_from_address(addr)
-        is_b58 = False
-
-    compressed = sig.rf >= 31
-    # signature is valid only if the provided address is matched
-    pub_key = bytes_from_point(Q, compressed=compressed)
-    if is_b58:
-        if is_script_hash and 30 < sig.rf < 39:  # P2WPKH-P2SH
-            script_pk = b"\x00\x14" + hash160(pub_key)
-            if hash160(script_pk) != h160:
-                raise BTClibValueError(f"wrong p2wpkh-p2sh address: {addr!r}")
-        elif sig.rf < 35:  # P2PKH
-            if hash160(pub_key) != h160:
-                raise BTClibValueError(f"wrong p2pkh address: {addr!r}")
-        else:
-            err_msg = f"invalid recovery flag: {sig.rf} (base58 address {addr!r})"
-            raise BTClibValueError(err_msg)
-    else:
-        if sig.rf > 38 or 30 < sig.rf < 35:  # P2WPKH
-            if hash160(pub_key) != h160:
-                raise BTClibValueError(f"wrong p2wpkh address: {addr!r}")
-        else:
-            err_msg = f"invalid recovery flag: {sig.rf} (bech32 address {addr!r})"
-            raise BTClibValueError(err_msg)
+    h160, is_script_hash, is_b58 = _decode_address(addr)
+    _assert_pub_key_matches_address(Q, sig.rf, h160, is_script_hash, is_b58, addr)
 
 
 def verify(
@@ -361,3 +390,105 @@ def verify(
         return False
     else:
         return True
+
+
+def _verify_many(
+    args: Sequence[Tuple[int, String, Optional[bytes]]], lower_s: bool
+) -> List[bool]:
+
+    ec = secp256k1
+    results = [False] * len(args)
+    # (index, rf, address data, challenge, r, s, K)
+    items: List[Tuple[int, int, Tuple[bytes, bool, bool], int, int, int, Point]] = []
+    for i, (c, addr, sig_bin) in enumerate(args):
+        # all kind of Exceptions are catched because
+        # invalid items must be reported as False
+        try:
+            if sig_bin is None:
+                continue
+            sig = Sig.parse(sig_bin)
+            address_data = _decode_address(addr)
+            _assert_rf_matches_address(sig.rf, address_data[2], addr)
+            r, s = sig.dsa_sig.r, sig.dsa_sig.s
+            if lower_s and s > ec.n / 2:
+                continue
+            # see dsa._recover_pub_key_
+            key_id = sig.rf - 27 & 0b11
+            x_K = (r + (key_id >> 1) * ec.n) % ec.p
+            # r = x_K % n is all what the verification of
+            # the recovered public key would check
+            if x_K % ec.n != r:
+                continue
+            y_even = ec.y_even(x_K)
+            K = x_K, ec.p - y_even if key_id & 0b01 else y_even
+        except Exception:  # pylint: disable=broad-except
+            continue
+        items.append((i, sig.rf, address_data, c, r, s, K))
+
+    # Q = r^-1 (s*K - c*G)
+    r_invs = batch_mod_inv([item[4] for item in items], ec.n)
+    QJs = [
+        _double_mult(r_1 * s % ec.n, (*K, 1), -r_1 * c % ec.n, ec.GJ, ec)
+        for (_, _, _, c, _, s, K), r_1 in zip(items, r_invs)
+    ]
+    for (i, rf, address_data, *_), QJ, Q in zip(items, QJs, ec.batch_aff_from_jac(QJs)):
+        if QJ[2] == 0:
+            continue
+        try:
+            _assert_pub_key_matches_address(Q, rf, *address_data, args[i][1])
+        except Exception:  # pylint: disable=broad-except
+            continue
+        results[i] = True
+    return results
+
+
+def verify_many(
+    msgs: Sequence[Octets],
+    addrs: Sequence[String],
+    sigs: Sequence[Union[Sig, String]],
+    lower_s: bool = True,
+    processes: Optional[int] = None,
+) -> List[bool]:
+    """Verify many address-based compact signatures.
+
+    Return the list of verify results for the (msg, addr, sig) items,
+    e.g. for proof-of-reserves audits.
+    Magic message hashes are computed once for identical messages,
+    the address format is sniffed instead of tentatively decoded,
+    and public key recovery avoids the redundant signature verification,
+    with batched modular inversions and affine normalizations.
+    If processes is larger than one, items are split in chunks
+    verified in parallel by a pool of worker processes.
+    """
+
+    if not len(msgs) == len(addrs) == len(sigs):
+        err_msg = "mismatch between number of messages, addresses, and signatures: "
+        err_msg += f"{len(msgs)}, {len(addrs)}, {len(sigs)}"
+        raise BTClibValueError(err_msg)
+
+    # identical messages share the same challenge
+    challenges: Dict[Octets, int] = {}
+    challenge_list: List[int] = []
+    sig_list: List[Optional[bytes]] = []
+    for msg, sig in zip(msgs, sigs):
+        # all kind of Exceptions are catched because
+        # invalid items must be reported as False
+        try:
+            if not isinstance(msg, (str, bytes)):
+                msg = bytes(msg)
+            if msg not in challenges:
+                msg_hash = reduce_to_hlen(magic_message(msg), sha256)
+                challenges[msg] = challenge_(msg_hash, secp256k1, sha256)
+            c = challenges[msg]
+            # signatures are serialized, as the secp256k1 curve
+            # identity would not survive the inter-process pickling
+            if not isinstance(sig, Sig):
+                sig = Sig.b64decode(sig)
+            sig_bin: Optional[bytes] = sig.serialize()
+        except Exception:  # pylint: disable=broad-except
+            c, sig_bin = 0, None
+        challenge_list.append(c)
+        sig_list.append(sig_bin)
+
+    args = list(zip(challenge_list, addrs, sig_list))
+    return _map_chunks(partial(_verify_many, lower_s=lower_s), args, processes)
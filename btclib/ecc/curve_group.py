@@ -22,7 +22,7 @@ from math import ceil
 from typing import List, Sequence, Tuple
 
 from btclib.alias import INF, INFJ, Integer, JacPoint, Point
-from btclib.ecc.number_theory import legendre_symbol, mod_inv, mod_sqrt
+from btclib.ecc.number_theory import batch_mod_inv, legendre_symbol, mod_inv, mod_sqrt
 from btclib.exceptions import BTClibTypeError, BTClibValueError
 from btclib.utils import hex_string, int_from_integer
 
@@ -159,6 +159,28 @@ class CurveGroup:
         y = Q[1] * mod_inv(Z2 * Q[2], self.p)
         return x % self.p, y % self.p
 
+    def batch_aff_from_jac(self, QJs: Sequence[JacPoint]) -> List[Point]:
+        """Return the affine representation of all the Jacobian points.
+
+        A single mod_inv is performed (Montgomery's trick),
+        instead of the two mod_inv per point of aff_from_jac.
+        The input points are assumed to be on curve.
+        """
+
+        Zs = [QJ[2] for QJ in QJs if QJ[2] != 0]
+        Z_invs = iter(batch_mod_inv(Zs, self.p))
+        result: List[Point] = []
+        for QJ in QJs:
+            if QJ[2] == 0:  # Infinity point in Jacobian coordinates
+                result.append(INF)
+                continue
+            Z_inv = next(Z_invs)
+            Z2_inv = Z_inv * Z_inv
+            x = QJ[0] * Z2_inv % self.p
+            y = QJ[1] * Z2_inv * Z_inv % self.p
+            result.append((x, y))
+        return result
+
     def x_aff_from_jac(self, Q: JacPoint) -> int:
         # point is assumed to be on curve
         if Q[2] == 0:  # Infinity point in Jacobian coordinates
@@ -517,7 +539,10 @@ def cached_multiples_fixwind(
 ) -> List[List[JacPoint]]:
     """Made to precompute values for mult_fixed_window_cached.
     Do not use it for other functions.
-    Made to be used for w=4, do not use w.
+    Made to be used for w=4 (w=8 for bulk multiplications).
+
+    The cached points are normalized to Z=1:
+    their smaller coordinates make the additions faster.
     """
 
     T = []
@@ -528,7 +553,10 @@ def cached_multiples_fixwind(
             sublist.append(ec.double_jac(sublist[(j - 1) // 2]))
             sublist.append(ec.add_jac(sublist[-1], K))
         K = ec.double_jac(sublist[2 ** (w - 1)])
-        T.append(sublist)
+        affine = ec.batch_aff_from_jac(sublist)
+        T.append(
+            [QJ if QJ[2] == 0 else (x, y, 1) for QJ, (x, y) in zip(sublist, affine)]
+        )
 
     return T
 
@@ -11,14 +11,31 @@
 """CurveGroup explorer functions.
 
 These functions are meant to explore low-cardinality CurveGroup,
-for didactical (and fun) reason only.
+for didactical (and fun) reason and to generate test curves.
+
+Point enumeration is inherently linear in p,
+while group and point orders are computed with the
+baby-step/giant-step algorithm (Shanks, Mestre) in O(p^(1/4)):
+curves with p up to about 2^40 are handled in seconds.
 """
 
-from typing import List
+import random
+from math import gcd
+from typing import Dict, List, Optional, Tuple
+
+from btclib.alias import INF, JacPoint, Point
+from btclib.ecc.curve import Curve, CurveGroup
+from btclib.ecc.curve_group import _mult, jac_from_aff
+from btclib.ecc.number_theory import factorize, is_probable_prime, legendre_symbol
+from btclib.exceptions import BTClibRuntimeError, BTClibValueError
+from btclib.utils import hex_string
 
-from btclib.alias import INF, Point
-from btclib.ecc.curve import CurveGroup
-from btclib.exceptions import BTClibValueError
+# below this threshold group orders are computed by enumeration
+_BSGS_THRESHOLD = 1000
+# maximum number of candidate group orders to be tested at once
+_MAX_CANDIDATES = 64
+# above this threshold baby-step/giant-step becomes impractical
+_BSGS_MAX_P = 2 ** 64
 
 
 def find_all_points(ec: CurveGroup) -> List[Point]:
@@ -33,10 +50,10 @@ def find_all_points(ec: CurveGroup) -> List[Point]:
 
     points: List[Point] = [INF]
     for x in range(ec.p):
-        try:
-            y = ec.y(x)
-        except BTClibValueError:
+        # skip the x-coordinates without y (no Exception raised)
+        if legendre_symbol(ec._y2(x), ec.p) == -1:  # pylint: disable=protected-access
             continue
+        y = ec.y(x)
 
         points.append((x, y))
         if y != 0:
@@ -55,9 +72,223 @@ def find_subgroup_points(ec: CurveGroup, G: Point) -> List[Point]:
         err_msg = f"p is too big to count all subgroup points: {ec.p}"
         raise BTClibValueError(err_msg)
 
-    points: List[Point] = [G]
-    while points[-1] != INF:
-        Q = ec.add(points[-1], G)
-        points.append(Q)
+    ec.require_on_curve(G)
+    GJ = jac_from_aff(G)
+    points: List[JacPoint] = [GJ]
+    while points[-1][2] != 0:
+        points.append(ec.add_jac(points[-1], GJ))
 
-    return points
+    return ec.batch_aff_from_jac(points)
+
+
+def _isqrt(n: int) -> int:
+    "Return the integer square root of n (math.isqrt requires python 3.8)."
+
+    if n < 2:
+        return n
+    x = 1 << ((n.bit_length() + 1) // 2)
+    while True:
+        y = (x + n // x) // 2
+        if y >= x:
+            return x
+        x = y
+
+
+def hasse_interval(p: int) -> Tuple[int, int]:
+    "Return the (inclusive) Hasse interval bounds for the group order."
+
+    delta = _isqrt(4 * p)
+    return p + 1 - delta, p + 1 + delta
+
+
+def _random_point(ec: CurveGroup, rng: random.Random) -> Point:
+    "Return a random point (not INF) of the curve group."
+
+    while True:
+        x = rng.randrange(ec.p)
+        y2 = ec._y2(x)  # pylint: disable=protected-access
+        if y2 == 0 or legendre_symbol(y2, ec.p) == -1:
+            continue
+        y = ec.y(x)
+        return (x, y) if rng.getrandbits(1) else (x, ec.p - y)
+
+
+def _bsgs_multiple(ec: CurveGroup, Q: Point, lo: int, hi: int) -> int:
+    """Return a positive multiple m of the order of Q.
+
+    Baby-step/giant-step search of m in [lo, hi] so that m*Q = INF,
+    using the x-coordinate only (Q, -Q) trick.
+    Jacobian coordinates are used, with batched normalization.
+    A smaller multiple is returned as soon as it is found.
+    """
+
+    if ec.p > _BSGS_MAX_P:
+        err_msg = f"p is too big for baby-step/giant-step: {hex_string(ec.p)}"
+        raise BTClibValueError(err_msg)
+
+    QJ = jac_from_aff(Q)
+    s = _isqrt((hi - lo) // 2) + 1
+
+    # baby steps: j*Q for j in 1..s
+    baby_jac: List[JacPoint] = [QJ]
+    for _ in range(s - 1):
+        baby_jac.append(ec.add_jac(baby_jac[-1], QJ))
+    baby: Dict[int, Tuple[int, int]] = {}
+    baby_aff = ec.batch_aff_from_jac(baby_jac)
+    # Z is checked, as (x, 0) is a valid 2-torsion point in general
+    for j, (TJ, (x, y)) in enumerate(zip(baby_jac, baby_aff), 1):
+        if TJ[2] == 0:  # j*Q = INF
+            return j
+        if x in baby:  # j*Q = ± k*Q
+            k, y_k = baby[x]
+            return j - k if y == y_k else j + k
+        baby[x] = j, y
+
+    # giant steps: c*Q for c = lo + s, lo + s + (2s+1), ...
+    # each one covering [c - s, c + s]
+    stride = 2 * s + 1
+    SJ = _mult(stride, QJ, ec)
+    c = lo + s
+    GJ = _mult(c, QJ, ec)
+    while c - s <= hi:
+        giant_jac: List[JacPoint] = []
+        for _ in range(s):
+            giant_jac.append(GJ)
+            GJ = ec.add_jac(GJ, SJ)
+        giant_aff = ec.batch_aff_from_jac(giant_jac)
+        for i, (TJ, (x, y)) in enumerate(zip(giant_jac, giant_aff)):
+            c_i = c + i * stride
+            if TJ[2] == 0:  # c_i*Q = INF
+                return c_i
+            if x in baby:
+                j, y_j = baby[x]
+                # c_i*Q = j*Q or c_i*Q = -j*Q
+                return c_i - j if y == y_j else c_i + j
+        c += s * stride
+
+    raise BTClibRuntimeError("no multiple of the point order found")
+
+
+def _order_from_multiple(ec: CurveGroup, Q: Point, m: int) -> int:
+    "Return the order of Q, given a positive multiple m of it."
+
+    QJ = jac_from_aff(Q)
+    for q in factorize(m):
+        while m % q == 0 and _mult(m // q, QJ, ec)[2] == 0:
+            m //= q
+    return m
+
+
+def point_order(ec: CurveGroup, Q: Point) -> int:
+    "Return the order of the point Q."
+
+    ec.require_on_curve(Q)
+    if Q == INF:
+        return 1
+    if Q[1] == 0:
+        # a 2-torsion point, if x is a root of the curve equation;
+        # any other (x, 0) is taken as INF, like in the rest of btclib
+        return 2 if ec._y2(Q[0]) == 0 else 1  # pylint: disable=protected-access
+    lo, hi = hasse_interval(ec.p)
+    return _order_from_multiple(ec, Q, _bsgs_multiple(ec, Q, lo, hi))
+
+
+def _lcm(a: int, b: int) -> int:
+    return a * b // gcd(a, b)
+
+
+def _group_order(ec: CurveGroup, rng: random.Random) -> int:
+
+    if ec.p < _BSGS_THRESHOLD:
+        return len(find_all_points(ec))
+
+    # Mestre's approach: the orders of points on the curve and on
+    # its quadratic twist single out the curve group order N
+    # (the twist having 2p + 2 - N points)
+    d = 2
+    while legendre_symbol(d, ec.p) != -1:
+        d += 1
+    a, b = ec._a, ec._b  # pylint: disable=protected-access
+    twist = CurveGroup(ec.p, a * d * d % ec.p, b * d * d * d % ec.p)
+
+    lo, hi = hasse_interval(ec.p)
+    lcm, lcm_twist = 1, 1
+    for _ in range(100):
+        for curve in (ec, twist):
+            Q = _random_point(curve, rng)
+            order = _order_from_multiple(curve, Q, _bsgs_multiple(curve, Q, lo, hi))
+            if curve is ec:
+                lcm = _lcm(lcm, order)
+            else:
+                lcm_twist = _lcm(lcm_twist, order)
+
+        # candidates are enumerated as multiples of the largest lcm
+        step = max(lcm, lcm_twist)
+        first = -(-lo // step) * step
+        if (hi - first) // step >= _MAX_CANDIDATES:
+            continue
+        candidates = [
+            N if step == lcm else 2 * ec.p + 2 - N for N in range(first, hi + 1, step)
+        ]
+        candidates = [
+            N
+            for N in candidates
+            if N % lcm == 0 and (2 * ec.p + 2 - N) % lcm_twist == 0
+        ]
+        if len(candidates) == 1:
+            return candidates[0]
+
+    raise BTClibRuntimeError("group order not found")  # pragma: no cover
+
+
+def group_order(ec: CurveGroup) -> int:
+    "Return the number of points of the curve group, INF included."
+
+    return _group_order(ec, random.Random())  # nosec
+
+
+def subgroup_params(ec: CurveGroup, G: Point) -> Tuple[int, int]:
+    "Return order and cofactor of the G-generated subgroup."
+
+    n = point_order(ec, G)
+    return n, group_order(ec) // n
+
+
+def generate_curve(
+    bits: int, max_cofactor: int = 1, seed: Optional[int] = None
+) -> Curve:
+    """Return a random Curve with a bits-long field prime p.
+
+    The group order is n*h, with n prime and cofactor h <= max_cofactor.
+    The generation is reproducible if a seed is provided.
+    """
+
+    if not 8 <= bits <= 64:
+        raise BTClibValueError(f"invalid number of bits: {bits}")
+    if max_cofactor < 1:
+        raise BTClibValueError(f"invalid max cofactor: {max_cofactor}")
+
+    rng = random.Random(seed)  # nosec
+    while True:
+        p = rng.getrandbits(bits) | (1 << (bits - 1)) | 1
+        if not is_probable_prime(p):
+            continue
+        a, b = rng.randrange(p), rng.randrange(p)
+        try:
+            ec = CurveGroup(p, a, b)
+        except BTClibValueError:  # zero discriminant
+            continue
+        N = _group_order(ec, rng)
+        for h in range(1, max_cofactor + 1):
+            n, r = divmod(N, h)
+            if r == 0 and is_probable_prime(n):
+                break
+        else:
+            continue
+        G: Point = INF
+        while G[1] == 0:
+            G = ec.aff_from_jac(_mult(h, jac_from_aff(_random_point(ec, rng)), ec))
+        try:
+            return Curve(p, a, b, G, n, h)
+        except (BTClibValueError, UserWarning):  # e.g. anomalous or weak curve
+            continue
@@ -19,13 +19,21 @@ The two entities must agree on the elliptic curve and key derivation
 function to use.
 """
 
+from functools import partial
 from hashlib import sha256
 from math import ceil
-from typing import Optional
+from typing import List, Optional, Sequence
 
-from btclib.alias import HashF, Point
+from btclib.alias import INFJ, HashF, JacPoint, Point
 from btclib.ecc.curve import Curve, mult, secp256k1
+from btclib.ecc.curve_group import jac_from_aff
+from btclib.ecc.curve_group_2 import wNAF_of_m
+from btclib.ecc.number_theory import batch_mod_inv
 from btclib.exceptions import BTClibRuntimeError, BTClibValueError
+from btclib.utils import _map_chunks, int_from_integer
+
+# window size of the wNAF recoding of the private key shared across peers
+_W = 5
 
 
 def ansi_x9_63_kdf(
@@ -38,19 +46,28 @@ def ansi_x9_63_kdf(
 
     http://www.secg.org/sec1-v2.pdf, section 3.6.1
     """
+    return _kdf(z, size, hf, _kdf_suffixes(size, hf, shared_info))
+
+
+def _kdf_suffixes(size: int, hf: HashF, shared_info: Optional[bytes]) -> List[bytes]:
+    "Return the (counter + shared_info) hash input suffixes of the KDF."
+
     hf_size = hf().digest_size
     max_size = hf_size * (2 ** 32 - 1)
     if size > max_size:
         raise BTClibValueError(f"cannot derive a key larger than {max_size} bytes")
+    shared_info = b"" if shared_info is None else shared_info
+    return [
+        counter.to_bytes(4, byteorder="big", signed=False) + shared_info
+        for counter in range(1, ceil(size / hf_size) + 1)
+    ]
+
+
+def _kdf(z: bytes, size: int, hf: HashF, suffixes: List[bytes]) -> bytes:
     K_temp = []
-    for counter in range(1, ceil(size / hf_size) + 1):
+    for suffix in suffixes:
         h = hf()
-        hash_input = (
-            z
-            + counter.to_bytes(4, byteorder="big", signed=False)
-            + (b"" if shared_info is None else shared_info)
-        )
-        h.update(hash_input)
+        h.update(z + suffix)
         K_temp.append(h.digest())
     return b"".join(K_temp)[:size]
 
@@ -76,3 +93,87 @@ def diffie_hellman(
     shared_secret_field_element = shared_secret_point[0]
     z = shared_secret_field_element.to_bytes(ec.p_size, byteorder="big", signed=False)
     return ansi_x9_63_kdf(z, size, hf, shared_info)
+
+
+def _shared_secret_x_coordinates(
+    dU: int, peers: Sequence[Point], ec: Curve
+) -> List[int]:
+    """Return the x-coordinates of the dU*QV shared secret points.
+
+    The wNAF recoding of dU is computed once and reused
+    for all peers; the Jacobian results are then normalized
+    with a single (batched) modular inversion.
+    """
+
+    m = int_from_integer(dU) % ec.n
+    M = wNAF_of_m(m, _W)
+
+    RJs: List[JacPoint] = []
+    for QV in peers:
+        ec.require_on_curve(QV)
+        QJ = jac_from_aff(QV)
+        # odd multiples {Q, 3Q, 5Q, ...}, as -kQ is computed on the fly
+        Q2 = ec.double_jac(QJ)
+        T = [QJ]
+        for _ in range(1, 2 ** (_W - 2)):
+            T.append(ec.add_jac(T[-1], Q2))
+        R = INFJ
+        for d in reversed(M):
+            R = ec.double_jac(R)
+            if d > 0:
+                R = ec.add_jac(R, T[(d - 1) // 2])
+            elif d < 0:
+                R = ec.add_jac(R, ec.negate_jac(T[(-d - 1) // 2]))
+        # edge case that cannot be reproduced in the test suite
+        if R[2] == 0:
+            err_msg = "invalid (INF) key"  # pragma: no cover
+            raise BTClibRuntimeError(err_msg)  # pragma: no cover
+        RJs.append(R)
+
+    # only the x-coordinates are needed: x = X / Z^2
+    Z2_invs = batch_mod_inv([R[2] * R[2] % ec.p for R in RJs], ec.p)
+    return [R[0] * Z2_inv % ec.p for R, Z2_inv in zip(RJs, Z2_invs)]
+
+
+def _diffie_hellman_many(
+    peers: Sequence[Point],
+    dU: int,
+    size: int,
+    shared_info: Optional[bytes],
+    ec: Curve,
+    hf: HashF,
+) -> List[bytes]:
+    suffixes = _kdf_suffixes(size, hf, shared_info)
+    return [
+        _kdf(x.to_bytes(ec.p_size, byteorder="big", signed=False), size, hf, suffixes)
+        for x in _shared_secret_x_coordinates(dU, peers, ec)
+    ]
+
+
+def diffie_hellman_many(
+    dU: int,
+    peers: Sequence[Point],
+    size: int,
+    shared_info: Optional[bytes] = None,
+    ec: Curve = secp256k1,
+    hf: HashF = sha256,
+    processes: Optional[int] = None,
+) -> List[bytes]:
+    """Diffie-Hellman key agreement between dU and many peers.
+
+    Return the same keying data as diffie_hellman for each peer
+    public key, sharing the scalar recoding, the point normalization,
+    and the KDF setup across peers.
+    If processes is larger than one, peers are split in chunks
+    processed in parallel by a pool of worker processes.
+    """
+
+    func = partial(
+        _diffie_hellman_many,
+        dU=dU,
+        size=size,
+        shared_info=shared_info,
+        ec=ec,
+        hf=hf,
+    )
+    return _map_chunks(func, peers, processes)
@@ -51,7 +51,9 @@ def gen_keys(
     return q, Q
 
 
-def _sign_(c: int, q: int, nonce: int, lower_s: bool, ec: Curve) -> Sig:
+def _sign_recoverable_(
+    c: int, q: int, nonce: int, lower_s: bool, ec: Curve
+) -> Tuple[Sig, int]:
     # Private function for testing purposes: it allows to explore all
     # possible value of the challenge c (for low-cardinality curves).
     # It assume that c is in [0, n-1], while q and nonce are in [1, n-1]
@@ -60,8 +62,11 @@ def _sign_(c: int, q: int, nonce: int, lower_s: bool, ec: Curve) -> Sig:
 
     KJ = _mult(nonce, ec.GJ, ec)  # 1
 
-    # affine x_K-coordinate of K (field element)
-    x_K = (KJ[0] * mod_inv(KJ[2] * KJ[2], ec.p)) % ec.p
+    # affine coordinates of K (field elements), with a single inversion
+    Z_inv = mod_inv(KJ[2], ec.p)
+    Z2_inv = Z_inv * Z_inv
+    x_K = KJ[0] * Z2_inv % ec.p
+    y_K = KJ[1] * Z2_inv * Z_inv % ec.p
     # mod n makes it a scalar
     r = x_K % ec.n  # 2, 3
     if r == 0:  # r≠0 required as it multiplies the public key
@@ -71,24 +76,45 @@ def _sign_(c: int, q: int, nonce: int, lower_s: bool, ec: Curve) -> Sig:
     if s == 0:  # s≠0 required as verify will need the inverse of s
         raise BTClibRuntimeError("failed to sign: s = 0")
 
+    # the recovery id identifies K among the candidates of public key
+    # recovery: the first bit is the y_K parity,
+    # the other bits are the j in x_K = r + j*n
+    key_id = (x_K // ec.n) << 1 | y_K & 1
+
     # bitcoin canonical 'low-s' encoding for ECDSA signatures
     # it removes signature malleability as cause of transaction malleability
     # see https://github.com/bitcoin/bitcoin/pull/6769
     if lower_s and s > ec.n / 2:
         s = ec.n - s  # s = - s % ec.n
+        # -s corresponds to -K, i.e. to the opposite y_K parity
+        key_id ^= 1
 
-    return Sig(r, s, ec)
+    return Sig(r, s, ec), key_id
 
 
-def sign_(
+def _sign_(c: int, q: int, nonce: int, lower_s: bool, ec: Curve) -> Sig:
+    # Private function for testing purposes: it allows to explore all
+    # possible value of the challenge c (for low-cardinality curves).
+    # It assume that c is in [0, n-1], while q and nonce are in [1, n-1]
+
+    return _sign_recoverable_(c, q, nonce, lower_s, ec)[0]
+
+
+def sign_recoverable_(
     msg_hash: Octets,
     prv_key: PrvKey,
     nonce: Optional[PrvKey] = None,
     lower_s: bool = True,
     ec: Curve = secp256k1,
     hf: HashF = sha256,
-) -> Sig:
-    """Sign a hf_len bytes message according to ECDSA signature algorithm.
+) -> Tuple[Sig, int]:
+    """Sign a hf_len bytes message, also returning the recovery id.
+
+    The recovery id (key_id) is known when signing,
+    from the y-coordinate parity of the nonce point K and
+    from x_K being larger than n:
+    it allows to recover the public key from the signature
+    without trying all the candidate keys.
 
     If the deterministic nonce is not provided,
     the RFC6979 specification is used.
@@ -112,7 +138,38 @@ def sign_(
         nonce = int_from_prv_key(nonce, ec)
 
     # second part delegated to helper function
-    return _sign_(c, q, nonce, lower_s, ec)
+    return _sign_recoverable_(c, q, nonce, lower_s, ec)
+
+
+def sign_recoverable(
+    msg: Octets,
+    prv_key: PrvKey,
+    nonce: Optional[PrvKey] = None,
+    lower_s: bool = True,
+    ec: Curve = secp256k1,
+    hf: HashF = sha256,
+) -> Tuple[Sig, int]:
+    "ECDSA signature with canonical low-s preference and recovery id."
+
+    msg_hash = reduce_to_hlen(msg, hf)
+    return sign_recoverable_(msg_hash, prv_key, nonce, lower_s, ec, hf)
+
+
+def sign_(
+    msg_hash: Octets,
+    prv_key: PrvKey,
+    nonce: Optional[PrvKey] = None,
+    lower_s: bool = True,
+    ec: Curve = secp256k1,
+    hf: HashF = sha256,
+) -> Sig:
+    """Sign a hf_len bytes message according to ECDSA signature algorithm.
+
+    If the deterministic nonce is not provided,
+    the RFC6979 specification is used.
+    """
+
+    return sign_recoverable_(msg_hash, prv_key, nonce, lower_s, ec, hf)[0]
 
 
 def sign(
@@ -336,7 +393,7 @@ def _recover_pub_key_(
     # r = K[0] % ec.n
     # if ec.n < K[0] < ec.p (likely when cofactor ec.cofactor > 1)
     # then both x_K=r and x_K=r+ec.n must be tested
-    j = key_id & 0b110  # allow for key_id in [0, 7]
+    j = (key_id & 0b110) >> 1  # allow for key_id in [0, 7]
     x_K = (r + j * ec.n) % ec.p  # 1.1
 
     # even root first for Bitcoin Core compatibility
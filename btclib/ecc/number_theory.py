@@ -21,7 +21,8 @@ with the following modifications:
 * added extensive unit test
 """
 
-from typing import Tuple
+from math import gcd
+from typing import Dict, List, Sequence, Tuple
 
 from btclib.exceptions import BTClibValueError
 from btclib.utils import hex_string
@@ -60,6 +61,29 @@ def mod_inv(a: int, m: int) -> int:
     raise BTClibValueError(err_msg)
 
 
+def batch_mod_inv(values: Sequence[int], m: int) -> List[int]:
+    """Return the inverses (mod m) of all the input values.
+
+    Montgomery's trick is used: a single mod_inv is performed,
+    at the cost of three modular multiplications per value.
+    """
+
+    prefix_products: List[int] = []
+    acc = 1
+    for a in values:
+        prefix_products.append(acc)
+        acc = acc * a % m
+
+    # raise BTClibValueError if any of the values has no inverse
+    acc_inv = mod_inv(acc, m)
+
+    inverses = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        inverses[i] = acc_inv * prefix_products[i] % m
+        acc_inv = acc_inv * values[i] % m
+    return inverses
+
+
 def legendre_symbol(a: int, p: int) -> int:
     """Compute the Legendre symbol a|p using Euler's criterion.
 
@@ -162,3 +186,81 @@ def tonelli(a: int, p: int) -> int:
                 break
 
     return r
+
+
+# deterministic Miller-Rabin witnesses for n < 3_317_044_064_679_887_385_961_981
+_MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+
+def is_probable_prime(n: int) -> bool:
+    """Return True if n is prime according to the Miller-Rabin test.
+
+    The test is deterministic for n < 3.3 * 10^24,
+    probabilistic (with negligible error) above.
+    """
+
+    if n < 2:
+        return False
+    for q in _MILLER_RABIN_BASES:
+        if n % q == 0:
+            return n == q
+
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d >>= 1
+        s += 1
+    for a in _MILLER_RABIN_BASES:
+        x = pow(a, d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def _pollard_rho(n: int) -> int:
+    "Return a non-trivial factor of the composite odd number n."
+
+    c = 1
+    while True:
+        x = y = 2
+        d = 1
+        while d == 1:
+            x = (x * x + c) % n
+            y = (y * y + c) % n
+            y = (y * y + c) % n
+            d = gcd(x - y, n)
+        if d != n:
+            return d
+        c += 1
+
+
+def factorize(n: int) -> Dict[int, int]:
+    """Return the prime factorization of n as {prime: exponent}.
+
+    Trial division by small primes is followed by Pollard's rho:
+    it is meant for the (at most) 128-bit numbers of toy curves.
+    """
+
+    if n < 1:
+        raise BTClibValueError(f"not a positive integer: {n}")
+
+    factors: Dict[int, int] = {}
+    for q in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41):
+        while n % q == 0:
+            factors[q] = factors.get(q, 0) + 1
+            n //= q
+
+    composites = [n] if n > 1 else []
+    while composites:
+        n = composites.pop()
+        if is_probable_prime(n):
+            factors[n] = factors.get(n, 0) + 1
+        else:
+            d = _pollard_rho(n)
+            composites.extend((d, n // d))
+    return factors
@@ -31,19 +31,29 @@ the verifier will check that
     W.x = (R+eG).x
 
 with e = hash(R||commit_hash)) and W.x being known from the signature.
+
+Batch verification of many commitments is also available:
+the W = R+eG tweaked points are computed using the cached
+fixed-base multiples of G and are never normalized one by one.
 """
 
+import secrets
+from functools import partial
 from hashlib import sha256
-from typing import Optional, Tuple
+from typing import Any, List, Optional, Sequence, Tuple
 
-from btclib.alias import HashF, Octets, Point
+from btclib.alias import HashF, JacPoint, Octets, Point
 from btclib.ecc import dsa, ssa
 from btclib.ecc.curve import Curve, mult, secp256k1
+from btclib.ecc.curve_group import _mult, _multi_mult, mult_fixed_window_cached
+from btclib.ecc.number_theory import batch_mod_inv
 from btclib.ecc.rfc6979 import rfc6979_
 from btclib.ecc.sec_point import bytes_from_point
-from btclib.hashes import reduce_to_hlen
+from btclib.exceptions import BTClibRuntimeError, BTClibValueError
+from btclib.hashes import challenge_, reduce_to_hlen
 from btclib.to_prv_key import PrvKey, int_from_prv_key
-from btclib.utils import bytes_from_octets, int_from_bits
+from btclib.to_pub_key import point_from_key
+from btclib.utils import _map_chunks, bytes_from_octets, int_from_bits
 
 
 def _tweak(commit_hash: Octets, R: Point, ec: Curve, hf: HashF) -> int:
@@ -209,3 +219,260 @@ def ssa_verify_commit(
     commit_hash = reduce_to_hlen(commit, hf)
     msg_hash = reduce_to_hlen(msg, hf)
     return ssa_verify_commit_(commit_hash, receipt, msg_hash, pub_key, sig, hf)
+
+
+def _check_batch_size(
+    commit_hashes: Sequence[Octets],
+    receipts: Sequence[Point],
+    m_hashes: Sequence[Octets],
+    keys: Sequence[Any],
+    sigs: Sequence[Any],
+) -> Curve:
+    "Check the batch size consistency and return the common curve."
+
+    batch_size = len(sigs)
+    if batch_size == 0:
+        raise BTClibValueError("no signatures provided")
+    for name, seq in (
+        ("commitments", commit_hashes),
+        ("receipts", receipts),
+        ("messages", m_hashes),
+        ("keys", keys),
+    ):
+        if len(seq) != batch_size:
+            err_msg = f"mismatch between number of signatures ({batch_size}) "
+            err_msg += f"and number of {name} ({len(seq)})"
+            raise BTClibValueError(err_msg)
+
+    ec = sigs[0].ec
+    if any(sig.ec != ec for sig in sigs):
+        raise BTClibValueError("not the same curve for all signatures")
+    return ec
+
+
+def _tweaked_jac(commit_hash: Octets, R: Point, ec: Curve, hf: HashF) -> JacPoint:
+    "Return W = R+eG in Jacobian coordinates, using the cached G multiples."
+
+    ec.require_on_curve(R)
+    tweak = _tweak(commit_hash, R, ec, hf)
+    return ec.add_jac((R[0], R[1], 1), mult_fixed_window_cached(tweak, ec.GJ, ec))
+
+
+def _x_jac_mod_n_equals(r: int, QJ: JacPoint, ec: Curve) -> bool:
+    "Return True if r equals the affine x-coordinate of QJ mod n."
+
+    # no mod_inv: x = X/Z^2 equals r + k*n for some k if X = (r + k*n)*Z^2
+    Z2 = QJ[2] * QJ[2] % ec.p
+    if Z2 == 0:
+        return False
+    x = r
+    while x < ec.p:
+        if QJ[0] % ec.p == x * Z2 % ec.p:
+            return True
+        x += ec.n
+    return False
+
+
+def _dsa_assert_batch_as_valid_commit_(
+    args: Tuple[
+        Sequence[Octets],
+        Sequence[Point],
+        Sequence[Octets],
+        Sequence[dsa.Key],
+        Sequence[dsa.Sig],
+        bool,
+        HashF,
+    ]
+) -> None:
+    commit_hashes, receipts, m_hashes, keys, sigs, lower_s, hf = args
+    ec = _check_batch_size(commit_hashes, receipts, m_hashes, keys, sigs)
+
+    for sig in sigs:
+        sig.assert_valid()
+        if lower_s and sig.s > ec.n / 2:
+            raise BTClibValueError("not a low s")
+    ws = batch_mod_inv([sig.s for sig in sigs], ec.n)
+
+    for commit_hash, R, msg_hash, key, sig, w in zip(
+        commit_hashes, receipts, m_hashes, keys, sigs, ws
+    ):
+        c = challenge_(msg_hash, ec, hf)
+        Q = point_from_key(key, ec)
+        # K = u*G + v*Q, with u*G from the cached G multiples
+        KJ = ec.add_jac(
+            mult_fixed_window_cached(c * w % ec.n, ec.GJ, ec),
+            _mult(sig.r * w % ec.n, (Q[0], Q[1], 1), ec),
+        )
+        if not _x_jac_mod_n_equals(sig.r, KJ, ec):
+            raise BTClibRuntimeError("signature verification failed")
+        WJ = _tweaked_jac(commit_hash, R, ec, hf)
+        if not _x_jac_mod_n_equals(sig.r, WJ, ec):
+            raise BTClibRuntimeError("commitment verification failed")
+
+
+def _dsa_batch_verify_commit_(
+    items: Sequence[Tuple[Octets, Point, Octets, dsa.Key, dsa.Sig]],
+    lower_s: bool,
+    hf: HashF,
+) -> List[bool]:
+    "Return the (single) batch verification result of the items."
+
+    commit_hashes, receipts, m_hashes, keys, sigs = zip(*items)
+    # all kind of Exceptions are catched because
+    # verify must always return a bool
+    try:
+        _dsa_assert_batch_as_valid_commit_(
+            (commit_hashes, receipts, m_hashes, keys, sigs, lower_s, hf)
+        )
+    except Exception:  # pylint: disable=broad-except
+        return [False]
+    return [True]
+
+
+def dsa_batch_verify_commit_(
+    commit_hashes: Sequence[Octets],
+    receipts: Sequence[Point],
+    m_hashes: Sequence[Octets],
+    keys: Sequence[dsa.Key],
+    sigs: Sequence[dsa.Sig],
+    lower_s: bool = True,
+    hf: HashF = sha256,
+    processes: Optional[int] = None,
+) -> bool:
+    """Open many commitments associated to EC DSA signatures.
+
+    Return True only if all commitments and signatures are valid.
+    The modular inversions of the s values are batched and
+    the cached multiples of G are shared among all items.
+    If processes is larger than one, items are split in chunks
+    verified in parallel by a pool of worker processes.
+    """
+
+    # all kind of Exceptions are catched because
+    # verify must always return a bool
+    try:
+        _check_batch_size(commit_hashes, receipts, m_hashes, keys, sigs)
+    except Exception:  # pylint: disable=broad-except
+        return False
+
+    items = list(zip(commit_hashes, receipts, m_hashes, keys, sigs))
+    func = partial(_dsa_batch_verify_commit_, lower_s=lower_s, hf=hf)
+    return all(_map_chunks(func, items, processes))
+
+
+def dsa_batch_verify_commit(
+    commits: Sequence[Octets],
+    receipts: Sequence[Point],
+    msgs: Sequence[Octets],
+    keys: Sequence[dsa.Key],
+    sigs: Sequence[dsa.Sig],
+    lower_s: bool = True,
+    hf: HashF = sha256,
+    processes: Optional[int] = None,
+) -> bool:
+    "Open many commitments associated to EC DSA signatures."
+
+    commit_hashes = [reduce_to_hlen(commit, hf) for commit in commits]
+    m_hashes = [reduce_to_hlen(msg, hf) for msg in msgs]
+    return dsa_batch_verify_commit_(
+        commit_hashes, receipts, m_hashes, keys, sigs, lower_s, hf, processes
+    )
+
+
+def _ssa_assert_batch_as_valid_commit_(
+    commit_hashes: Sequence[Octets],
+    receipts: Sequence[Point],
+    m_hashes: Sequence[Octets],
+    pub_keys: Sequence[ssa.BIP340PubKey],
+    sigs: Sequence[ssa.Sig],
+    hf: HashF,
+) -> None:
+    ec = _check_batch_size(commit_hashes, receipts, m_hashes, pub_keys, sigs)
+
+    for sig in sigs:
+        sig.assert_valid()
+    WJs = [_tweaked_jac(c_h, R, ec, hf) for c_h, R in zip(commit_hashes, receipts)]
+    # edge case that cannot be reproduced in the test suite
+    if any(WJ[2] == 0 for WJ in WJs):
+        err_msg = "invalid (INF) tweaked point"  # pragma: no cover
+        raise BTClibRuntimeError(err_msg)  # pragma: no cover
+
+    t = 0
+    scalars: List[int] = []
+    points: List[JacPoint] = []
+    for i, (msg_hash, Q, sig, W) in enumerate(
+        zip(m_hashes, pub_keys, sigs, ec.batch_aff_from_jac(WJs))
+    ):
+        # the commitment check: W.x = r
+        if W[0] != sig.r:
+            raise BTClibRuntimeError("commitment verification failed")
+        # the signature nonce point K is W or -W, the one with even y:
+        # no square root is needed to lift r to K
+        KJ = W[0], W[1] if W[1] % 2 == 0 else ec.p - W[1], 1
+
+        msg_hash = bytes_from_octets(msg_hash, hf().digest_size)
+        x_Q, y_Q = ssa.point_from_bip340pub_key(Q, ec)
+        c = ssa.challenge_(msg_hash, x_Q, sig.r, ec, hf)
+
+        # rand in [1, n-1], see ssa.assert_batch_as_valid_
+        rand = 1 if i == 0 else 1 + secrets.randbelow(ec.n - 1)
+        scalars.append(rand)
+        points.append(KJ)
+        scalars.append(rand * c % ec.n)
+        points.append((x_Q, y_Q, 1))
+        t += rand * sig.s
+
+    TJ = mult_fixed_window_cached(t % ec.n, ec.GJ, ec)
+    RHSJ = _multi_mult(scalars, points, ec)
+
+    # return T == RHS, checked in Jacobian coordinates
+    RHSZ2 = RHSJ[2] * RHSJ[2]
+    TZ2 = TJ[2] * TJ[2]
+    if (TJ[0] * RHSZ2 % ec.p != RHSJ[0] * TZ2 % ec.p) or (
+        TJ[1] * RHSZ2 * RHSJ[2] % ec.p != RHSJ[1] * TZ2 * TJ[2] % ec.p
+    ):
+        raise BTClibRuntimeError("signature verification failed")
+
+
+def ssa_batch_verify_commit_(
+    commit_hashes: Sequence[Octets],
+    receipts: Sequence[Point],
+    m_hashes: Sequence[Octets],
+    pub_keys: Sequence[ssa.BIP340PubKey],
+    sigs: Sequence[ssa.Sig],
+    hf: HashF = sha256,
+) -> bool:
+    """Open many commitments associated to EC SSA signatures.
+
+    Return True only if all commitments and signatures are valid.
+    The tweaked points W = R+eG, normalized with a single modular inversion,
+    provide the signature nonce points of the batch multi-scalar equation.
+    """
+
+    # all kind of Exceptions are catched because
+    # verify must always return a bool
+    try:
+        _ssa_assert_batch_as_valid_commit_(
+            commit_hashes, receipts, m_hashes, pub_keys, sigs, hf
+        )
+    except Exception:  # pylint: disable=broad-except
+        return False
+
+    return True
+
+
+def ssa_batch_verify_commit(
+    commits: Sequence[Octets],
+    receipts: Sequence[Point],
+    msgs: Sequence[Octets],
+    pub_keys: Sequence[ssa.BIP340PubKey],
+    sigs: Sequence[ssa.Sig],
+    hf: HashF = sha256,
+) -> bool:
+    "Open many commitments associated to EC SSA signatures."
+
+    commit_hashes = [reduce_to_hlen(commit, hf) for commit in commits]
+    m_hashes = [reduce_to_hlen(msg, hf) for msg in msgs]
+    return ssa_batch_verify_commit_(
+        commit_hashes, receipts, m_hashes, pub_keys, sigs, hf
+    )
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Opt-in instrumentation counters for field and group operations.
+
+    with ecc_stats() as s:
+        bms.verify(msg, addr, sig)
+    print(s.to_dict())
+
+While the context is active, the CurveGroup point operations
+(add_jac, double_jac, add_aff, double_aff), the number_theory
+field operations (mod_inv, batch_mod_inv, mod_sqrt), and the scalar multiplication
+algorithms are temporarily replaced by counting wrappers.
+Each operation is counted per type and per calling algorithm,
+i.e. the innermost scalar multiplication algorithm being executed
+(TOP_LEVEL if none).
+
+The original functions are restored on exit:
+when the context is not active there is no overhead at all,
+not even a branch in the hot path.
+
+Only btclib modules already imported when entering the context
+are instrumented; the instrumentation is not thread-safe
+and cannot be nested.
+"""
+
+import contextlib
+import functools
+import sys
+from collections import Counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from btclib.ecc import curve_group, curve_group_2, number_theory
+from btclib.ecc.curve_group import CurveGroup
+from btclib.exceptions import BTClibRuntimeError
+
+TOP_LEVEL = "<top-level>"
+
+GROUP_OPS = ("add_jac", "double_jac", "add_aff", "double_aff")
+FIELD_OPS = ("mod_inv", "batch_mod_inv", "mod_sqrt")
+MULT_ALGORITHMS: Tuple[Tuple[Any, str], ...] = (
+    (curve_group, "mult_recursive_aff"),
+    (curve_group, "mult_recursive_jac"),
+    (curve_group, "mult_aff"),
+    (curve_group, "mult_jac"),
+    (curve_group, "mult_mont_ladder"),
+    (curve_group, "mult_base_3"),
+    (curve_group, "mult_fixed_window"),
+    (curve_group, "mult_fixed_window_cached"),
+    (curve_group, "_double_mult"),
+    (curve_group, "_multi_mult"),
+    (curve_group_2, "mult_sliding_window"),
+    (curve_group_2, "mult_w_NAF"),
+    (curve_group_2, "mult_endomorphism_secp256k1"),
+)
+
+
+class EccStats:
+    "Operation counters, per operation type and per calling algorithm."
+
+    def __init__(self) -> None:
+        self.counts: Dict[str, Counter] = {}
+        self._algorithms: List[str] = [TOP_LEVEL]
+
+    def _count(self, op: str) -> None:
+        caller = self._algorithms[-1]
+        if caller not in self.counts:
+            self.counts[caller] = Counter()
+        self.counts[caller][op] += 1
+
+    def total(self, op: Optional[str] = None) -> int:
+        "Return the number of op operations (all operations if None)."
+        if op is None:
+            return sum(sum(c.values()) for c in self.counts.values())
+        return sum(c[op] for c in self.counts.values())
+
+    def ops(self) -> Dict[str, int]:
+        "Return the operation counts aggregated over all algorithms."
+        result: Counter = Counter()
+        for c in self.counts.values():
+            result.update(c)
+        return dict(result)
+
+    def reset(self) -> None:
+        self.counts = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        "Return a json-serializable dict of the collected counters."
+        return {
+            "ops": self.ops(),
+            "by_algorithm": {alg: dict(c) for alg, c in self.counts.items()},
+        }
+
+
+def _counting_op(f: Callable, op: str, stats: EccStats) -> Callable:
+    @functools.wraps(f)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        stats._count(op)  # pylint: disable=protected-access
+        return f(*args, **kwargs)
+
+    return wrapper
+
+
+def _counting_algorithm(f: Callable, op: str, stats: EccStats) -> Callable:
+    # pylint: disable=protected-access
+    @functools.wraps(f)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        # recursive algorithms are counted once
+        if stats._algorithms[-1] == op:
+            return f(*args, **kwargs)
+        stats._count(op)
+        stats._algorithms.append(op)
+        try:
+            return f(*args, **kwargs)
+        finally:
+            stats._algorithms.pop()
+
+    return wrapper
+
+
+_active: List[EccStats] = []
+
+
+@contextlib.contextmanager
+def ecc_stats() -> Iterator[EccStats]:
+    "Context manager collecting field and group operation counters."
+
+    if _active:
+        raise BTClibRuntimeError("ecc_stats is already active")
+
+    stats = EccStats()
+
+    # function replacements: {id(original): (original, wrapper)}
+    functions: Dict[int, Tuple[Callable, Callable]] = {}
+    for op in FIELD_OPS:
+        f = getattr(number_theory, op)
+        functions[id(f)] = f, _counting_op(f, op, stats)
+    for module, op in MULT_ALGORITHMS:
+        f = getattr(module, op)
+        functions[id(f)] = f, _counting_algorithm(f, op, stats)
+
+    # module attributes bound to the originals, e.g. the
+    # 'from btclib.ecc.number_theory import mod_inv' imported names
+    # or the '_mult = mult_fixed_window' alias
+    patched_attrs: List[Tuple[Any, str, Callable]] = []
+    for name, module in list(sys.modules.items()):
+        if not (name == "btclib" or name.startswith("btclib.")) or module is None:
+            continue
+        for attr, value in list(vars(module).items()):
+            if callable(value) and id(value) in functions:
+                original, wrapper = functions[id(value)]
+                if value is original:
+                    patched_attrs.append((module, attr, original))
+                    setattr(module, attr, wrapper)
+
+    patched_methods: List[Tuple[str, Callable]] = []
+    for op in GROUP_OPS:
+        method = CurveGroup.__dict__[op]
+        patched_methods.append((op, method))
+        setattr(CurveGroup, op, _counting_op(method, op, stats))
+
+    _active.append(stats)
+    try:
+        yield stats
+    finally:
+        _active.pop()
+        for op, method in patched_methods:
+            setattr(CurveGroup, op, method)
+        for module, attr, original in patched_attrs:
+            setattr(module, attr, original)
@@ -12,8 +12,9 @@
 
 """
 
+import functools
 import hashlib
-from typing import Optional, Tuple
+from typing import Any, Optional, Tuple
 
 from btclib.alias import HashF, Octets
 from btclib.ecc.curve import Curve, secp256k1
@@ -79,7 +80,8 @@ def challenge_(
     return c
 
 
-def tagged_hash(tag: bytes, m: bytes, hf: HashF = hashlib.sha256) -> bytes:
+@functools.lru_cache()
+def _tagged_midstate(tag: bytes, hf: HashF) -> Any:
 
     h1 = hf()
     h1.update(tag)
@@ -87,8 +89,21 @@ def tagged_hash(tag: bytes, m: bytes, hf: HashF = hashlib.sha256) -> bytes:
 
     h2 = hf()
     h2.update(tag_hash + tag_hash)
+    return h2
+
+
+def tagged_hasher(tag: bytes, hf: HashF = hashlib.sha256) -> Any:
+    """Return a hash object already fed with the tag prefix.
+
+    The midstate after the hash(tag) || hash(tag) prefix
+    is computed once per tag and then copied.
+    """
 
-    # it could be sped up by storing the above midstate
+    return _tagged_midstate(tag, hf).copy()
 
-    h2.update(m)
-    return h2.digest()
+
+def tagged_hash(tag: bytes, m: bytes, hf: HashF = hashlib.sha256) -> bytes:
+
+    h = tagged_hasher(tag, hf)
+    h.update(m)
+    return h.digest()
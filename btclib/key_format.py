@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Single-pass key format detection.
+
+The format of a key is sniffed by type, length, prefix, and alphabet,
+without any decoding attempt, so that the key conversion functions
+can dispatch straight to the right parser:
+failed decodings and their exceptions are avoided for valid keys.
+
+The detected format is a guess, not a validation:
+the selected parser still performs all the checks.
+None is returned for unrecognized inputs, that are then handled
+by the conversion functions with their usual trial-and-error approach.
+"""
+
+import string
+from typing import Any, Optional
+
+from btclib.base58 import _ALPHABET
+from btclib.bip32.bip32 import BIP32KeyData
+from btclib.ecc.curve import Curve, secp256k1
+
+INT = "int"
+POINT = "point"
+PRV_OCTETS = "prv_octets"
+SEC = "sec"
+WIF = "wif"
+XPRV = "xprv"
+XPUB = "xpub"
+
+PRV_FORMATS = (INT, PRV_OCTETS, WIF, XPRV)
+PUB_FORMATS = (POINT, SEC, XPUB)
+
+_HEX_DIGITS = frozenset(string.hexdigits)
+_B58_DIGITS = frozenset(_ALPHABET.decode("ascii"))
+_B58_BYTES = frozenset(_ALPHABET)
+# all the BIP32/SLIP132 extended key versions
+# are base58 encoded in 111 characters,
+# starting with 'xprv', 'zpub', 'tprv', etc.
+_XKEY_B58_SIZE = 111
+
+
+def _octets_format(size: int, prefix: int, ec: Curve) -> Optional[str]:
+
+    if size == ec.p_size + 1 and prefix in (2, 3):
+        return SEC
+    if size == 2 * ec.p_size + 1 and prefix == 4:
+        return SEC
+    if size == ec.n_size:
+        return PRV_OCTETS
+    return None
+
+
+def _b58_format(key: bytes) -> str:
+
+    if len(key) == _XKEY_B58_SIZE:
+        return XPRV if key[1:4] == b"prv" else XPUB
+    return WIF
+
+
+def key_format(key: Any, ec: Curve = secp256k1) -> Optional[str]:
+    """Return the sniffed format of a public or private key.
+
+    It is one of INT, POINT, PRV_OCTETS, SEC, WIF, XPRV, and XPUB,
+    or None if the key format is not recognized.
+    """
+
+    if isinstance(key, int):
+        return INT
+    if isinstance(key, tuple):
+        return POINT
+    if isinstance(key, BIP32KeyData):
+        return XPRV if key.key[:1] == b"\x00" else XPUB
+
+    if isinstance(key, str):
+        key = key.strip()
+        if len(key) % 2 == 0 and _HEX_DIGITS.issuperset(key):
+            prefix = int(key[:2], 16) if key else -1
+            return _octets_format(len(key) // 2, prefix, ec)
+        if _B58_DIGITS.issuperset(key):
+            return _b58_format(key.encode("ascii"))
+        return None
+
+    if isinstance(key, (bytes, bytearray, memoryview)):
+        key = bytes(key)
+        result = _octets_format(len(key), key[0] if key else -1, ec)
+        if result is None and key and _B58_BYTES.issuperset(key):
+            return _b58_format(key)
+        return result
+
+    return None
@@ -12,7 +12,7 @@
 
 
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from os import path
 from typing import Any, Dict, List, Mapping, Optional, Tuple, Type, TypeVar, Union
 
@@ -221,6 +221,69 @@ for net in ("mainnet", "testnet", "regtest"):
         NETWORKS[net] = Network.from_dict(json.load(f))
 
 
+# (Network field, key kind, script type):
+# the script type is None if not determined by the prefix
+_PREFIX_FIELDS: List[Tuple[str, str, Optional[str]]] = [
+    ("wif", "wif", None),
+    ("p2pkh", "address", "p2pkh"),
+    ("p2sh", "address", "p2sh"),
+    ("hrp", "address", None),
+    ("bip32_prv", "xprv", "p2pkh"),
+    ("bip32_pub", "xpub", "p2pkh"),
+    ("slip132_p2wpkh_prv", "xprv", "p2wpkh"),
+    ("slip132_p2wpkh_pub", "xpub", "p2wpkh"),
+    ("slip132_p2wpkh_p2sh_prv", "xprv", "p2wpkh_p2sh"),
+    ("slip132_p2wpkh_p2sh_pub", "xpub", "p2wpkh_p2sh"),
+    ("slip132_p2wsh_prv", "xprv", "p2wsh"),
+    ("slip132_p2wsh_pub", "xpub", "p2wsh"),
+    ("slip132_p2wsh_p2sh_prv", "xprv", "p2wsh_p2sh"),
+    ("slip132_p2wsh_p2sh_pub", "xpub", "p2wsh_p2sh"),
+]
+
+PrefixInfo = Tuple[str, str, Optional[str]]
+
+# (Network field, value) to network
+_NETWORK_FROM_KEY_VALUE: Dict[Tuple[str, Any], str] = {}
+_NETWORK_FIELDS = tuple(field.name for field in fields(Network))
+for net in NETWORKS:
+    for key in _NETWORK_FIELDS:
+        _NETWORK_FROM_KEY_VALUE.setdefault((key, getattr(NETWORKS[net], key)), net)
+
+
+def _prefixes(networks: Mapping[str, Network]) -> Dict[Union[bytes, str], PrefixInfo]:
+    "Return the reverse map of the prefixes of the networks."
+
+    prefixes: Dict[Union[bytes, str], PrefixInfo] = {}
+    for net, network in networks.items():
+        for key, kind, script_type in _PREFIX_FIELDS:
+            value = getattr(network, key)
+            info = prefixes.setdefault(value, (net, kind, script_type))
+            # the only allowed collisions are the regtest prefixes
+            # equal to the same testnet prefixes
+            if info != (net, kind, script_type) and (
+                (info[0], net) != ("testnet", "regtest")
+                or getattr(networks["testnet"], key) != value
+            ):
+                err_msg = f"colliding {net} {key} prefix: {value!r} "
+                err_msg += f"already used by {info}"
+                raise BTClibValueError(err_msg)
+    return prefixes
+
+
+# reverse map from WIF/address prefix, bech32 hrp, or xkey version
+# to (network, key kind, script type), e.g.
+# PREFIXES[bytes.fromhex("04b24746")] == ("mainnet", "xpub", "p2wpkh")
+#
+# Warning: 'regtest' shares most prefixes with 'testnet',
+# which is the network returned for them
+PREFIXES = _prefixes(NETWORKS)
+
+
+def _hashable(value: Any) -> Any:
+    "Return bytes for a bytes-like value, the value itself otherwise."
+    return bytes(value) if isinstance(value, (bytearray, memoryview)) else value
+
+
 def network_from_key_value(key: str, prefix: Union[str, bytes, Curve]) -> Optional[str]:
     """Return network string from (key, value) pair.
 
@@ -229,47 +292,43 @@ def network_from_key_value(key: str, prefix: Union[str, bytes, Curve]) -> Option
     WIF/Base58Address/BIP32xkey
     because the two networks share the same prefixes.
     """
-    for network in NETWORKS:
-        if getattr(NETWORKS[network], key) == prefix:
-            return network
-    return None
+    if key not in _NETWORK_FIELDS:
+        raise BTClibValueError(f"unknown network key: {key}")
+    return _NETWORK_FROM_KEY_VALUE.get((key, _hashable(prefix)))
+
+
+_XPUB_VERSIONS = {
+    net: (
+        NETWORKS[net].bip32_pub,
+        NETWORKS[net].slip132_p2wsh_p2sh_pub,
+        NETWORKS[net].slip132_p2wpkh_p2sh_pub,
+        NETWORKS[net].slip132_p2wpkh_pub,
+        NETWORKS[net].slip132_p2wsh_pub,
+    )
+    for net in NETWORKS
+}
+_XPRV_VERSIONS = {
+    net: (
+        NETWORKS[net].bip32_prv,
+        NETWORKS[net].slip132_p2wsh_p2sh_prv,
+        NETWORKS[net].slip132_p2wpkh_p2sh_prv,
+        NETWORKS[net].slip132_p2wpkh_prv,
+        NETWORKS[net].slip132_p2wsh_prv,
+    )
+    for net in NETWORKS
+}
 
 
 def xpubversions_from_network(network: str = "mainnet") -> List[bytes]:
-    network = network.strip().lower()
-    return [
-        NETWORKS[network].bip32_pub,
-        NETWORKS[network].slip132_p2wsh_p2sh_pub,
-        NETWORKS[network].slip132_p2wpkh_p2sh_pub,
-        NETWORKS[network].slip132_p2wpkh_pub,
-        NETWORKS[network].slip132_p2wsh_pub,
-    ]
+    return list(_XPUB_VERSIONS[network.strip().lower()])
 
 
 def xprvversions_from_network(network: str = "mainnet") -> List[bytes]:
-    network = network.strip().lower()
-    return [
-        NETWORKS[network].bip32_prv,
-        NETWORKS[network].slip132_p2wsh_p2sh_prv,
-        NETWORKS[network].slip132_p2wpkh_p2sh_prv,
-        NETWORKS[network].slip132_p2wpkh_prv,
-        NETWORKS[network].slip132_p2wsh_prv,
-    ]
-
-
-XPRV_VERSIONS_ALL = (
-    xprvversions_from_network("mainnet") + xprvversions_from_network("testnet") * 2
-)
-XPUB_VERSIONS_ALL = (
-    xpubversions_from_network("mainnet") + xpubversions_from_network("testnet") * 2
-)
-n_versions = len(xprvversions_from_network("mainnet"))
-_NETWORKS = list(NETWORKS.keys())
-_REPEATED_NETWORKS = (
-    [_NETWORKS[0]] * n_versions
-    + [_NETWORKS[1]] * n_versions
-    + [_NETWORKS[2]] * n_versions
-)
+    return list(_XPRV_VERSIONS[network.strip().lower()])
+
+
+XPRV_VERSIONS_ALL = [version for net in NETWORKS for version in _XPRV_VERSIONS[net]]
+XPUB_VERSIONS_ALL = [version for net in NETWORKS for version in _XPUB_VERSIONS[net]]
 
 
 def network_from_xkeyversion(xkeyversion: bytes) -> str:
@@ -279,12 +338,12 @@ def network_from_xkeyversion(xkeyversion: bytes) -> str:
     a problem as long as it is used for WIF/Base58Address/BIP32Key
     because the two networks share the same prefixes.
     """
-    try:
-        index = XPRV_VERSIONS_ALL.index(xkeyversion)
-    except ValueError:
-        index = XPUB_VERSIONS_ALL.index(xkeyversion)
-
-    return _REPEATED_NETWORKS[index]
+    xkeyversion = bytes(xkeyversion)
+    info = PREFIXES.get(xkeyversion)
+    if info is None or info[1] not in ("xprv", "xpub"):
+        err_msg = f"unknown extended key version: 0x{xkeyversion.hex()}"
+        raise BTClibValueError(err_msg)
+    return info[0]
 
 
 def curve_from_xkeyversion(xkeyversion: bytes) -> Curve:
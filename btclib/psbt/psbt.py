@@ -31,7 +31,8 @@ from typing import (
 
 from btclib import var_int
 from btclib.alias import Octets, String
-from btclib.bip32.key_origin import decode_hd_key_paths
+from btclib.bip32.bip32 import BIP32KeyData
+from btclib.bip32.key_origin import KeyOriginIndex, decode_hd_key_paths
 from btclib.exceptions import BTClibValueError
 from btclib.psbt.psbt_in import (
     BIP32KeyOrigin,
@@ -506,3 +507,54 @@ def extract_tx(psbt: Psbt, check_validity: bool = True) -> Tx:
     if check_validity:
         tx.assert_valid()
     return tx
+
+
+def signing_keys(
+    psbt: Psbt, key_index: KeyOriginIndex
+) -> Dict[int, Dict[bytes, BIP32KeyData]]:
+    """Return the private keys that can sign each Psbt input.
+
+    The result maps the index of each signable input
+    to its (pub_key, derived private key) hd_key_paths entries
+    matching the key index master private keys.
+    Finalized inputs and keys with a partial signature are skipped.
+
+    Derivations are cached by the key index,
+    so that they are shared among inputs, outputs, and Psbts.
+    """
+
+    result: Dict[int, Dict[bytes, BIP32KeyData]] = {}
+    for i, psbt_in in enumerate(psbt.inputs):
+        if psbt_in.final_script_sig or psbt_in.final_script_witness.stack:
+            continue
+        hd_key_paths = {
+            pub_key: key_origin
+            for pub_key, key_origin in psbt_in.hd_key_paths.items()
+            if pub_key not in psbt_in.partial_sigs
+        }
+        keys = {
+            pub_key: xkey
+            for pub_key, xkey in key_index.keys(hd_key_paths).items()
+            if xkey.key[0] == 0
+        }
+        if keys:
+            result[i] = keys
+    return result
+
+
+def owned_outputs(
+    psbt: Psbt, key_index: KeyOriginIndex
+) -> Dict[int, Dict[bytes, BIP32KeyData]]:
+    """Return the derived keys of each Psbt output owned by the key index.
+
+    The result maps the index of each output (e.g. a change output)
+    to its (pub_key, derived key) hd_key_paths entries
+    matching the key index master keys.
+    """
+
+    result: Dict[int, Dict[bytes, BIP32KeyData]] = {}
+    for i, psbt_out in enumerate(psbt.outputs):
+        keys = key_index.keys(psbt_out.hd_key_paths)
+        if keys:
+            result[i] = keys
+    return result
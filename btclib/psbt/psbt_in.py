@@ -156,7 +156,7 @@ class PsbtIn:
         witness_script: Octets = b"",
         hd_key_paths: Optional[Mapping[Octets, BIP32KeyOrigin]] = None,
         final_script_sig: Octets = b"",
-        final_script_witness: Witness = Witness(),
+        final_script_witness: Optional[Witness] = None,
         unknown: Optional[Mapping[Octets, Octets]] = None,
         check_validity: bool = True,
     ) -> None:
@@ -172,7 +172,9 @@ class PsbtIn:
         self.witness_script = bytes_from_octets(witness_script)
         self.hd_key_paths = decode_hd_key_paths(hd_key_paths)
         self.final_script_sig = bytes_from_octets(final_script_sig)
-        self.final_script_witness = final_script_witness
+        self.final_script_witness = (
+            Witness() if final_script_witness is None else final_script_witness
+        )
         self.unknown = dict(sorted(decode_dict_bytes_bytes(unknown).items()))
 
         if check_validity:
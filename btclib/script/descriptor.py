@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Output script descriptors.
+
+An output script descriptor (BIP380) is a string describing
+a set of script_pub_keys, e.g.
+
+- wpkh([d34db33f/84h/0h/0h]xpub.../0/*)
+- sh(multi(2,02...,03...))
+- addr(bc1q...)
+
+Supported script expressions are pk, pkh, wpkh, sh, wsh,
+multi, sortedmulti, addr, and raw;
+combo and taproot (tr, rawtr) are not supported.
+
+Key expressions are hex-string SEC public keys, WIF private keys,
+and BIP32 extended keys followed by an optional derivation path,
+possibly ending with an unhardened (/*) or hardened (/*h)
+wildcard for ranged descriptors.
+Each key can be prefixed by its [fingerprint/path] key origin.
+
+The script_pub_keys of a range of indexes are built as raw bytes;
+the child public keys of an unhardened wildcard are derived in bulk
+(see bip32.derive_children) and cached in the descriptor,
+so that expanding overlapping ranges does not derive them again;
+the cache is a bounded LRU of cache_size keys for each ranged key.
+
+https://github.com/bitcoin/bips/blob/master/bip-0380.mediawiki
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from btclib import var_bytes
+from btclib.bip32.bip32 import BIP32KeyData, _derive, derive_children
+from btclib.bip32.der_path import int_from_index_str
+from btclib.bip32.key_origin import BIP32KeyOrigin, HdKeyPaths
+from btclib.ecc.curve import mult
+from btclib.ecc.sec_point import bytes_from_point, point_from_octets
+from btclib.exceptions import BTClibValueError
+from btclib.key_format import SEC, WIF, XPRV, XPUB, key_format
+from btclib.script.script_pub_key import ScriptPubKey, address
+from btclib.to_pub_key import pub_keyinfo_from_key
+from btclib.utils import hash160, sha256
+
+_INPUT_CHARSET = (
+    "0123456789()[],'/*abcdefgh@:$%{}"
+    "IJKLMNOPQRSTUVWXYZ&+-.;<=>?!^_|~"
+    'ijklmnopqrstuvwxyzABCDEFGH`#"\\ '
+)
+_CHECKSUM_CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+_GENERATOR = (0xF5DEE51989, 0xA9FDCA3312, 0x1BAB10E32D, 0x3706B1677A, 0x644D626FFD)
+
+
+def _polymod(symbols: Sequence[int]) -> int:
+
+    chk = 1
+    for value in symbols:
+        top = chk >> 35
+        chk = (chk & 0x7FFFFFFFF) << 5 ^ value
+        for i in range(5):
+            chk ^= _GENERATOR[i] if ((top >> i) & 1) else 0
+    return chk
+
+
+def checksum(desc: str) -> str:
+    "Return the 8-character checksum of a descriptor."
+
+    symbols: List[int] = []
+    groups: List[int] = []
+    for c in desc:
+        v = _INPUT_CHARSET.find(c)
+        if v == -1:
+            raise BTClibValueError(f"invalid descriptor character: {c!r}")
+        symbols.append(v & 31)
+        groups.append(v >> 5)
+        if len(groups) == 3:
+            symbols.append(groups[0] * 9 + groups[1] * 3 + groups[2])
+            groups = []
+    if len(groups) == 1:
+        symbols.append(groups[0])
+    elif len(groups) == 2:
+        symbols.append(groups[0] * 3 + groups[1])
+
+    chk = _polymod(symbols + [0] * 8) ^ 1
+    return "".join(_CHECKSUM_CHARSET[(chk >> (5 * (7 - i))) & 31] for i in range(8))
+
+
+class _KeyExpression:
+    "Key expression, possibly ranged, with its key origin."
+
+    def __init__(self, expr: str) -> None:
+
+        self.expr = expr
+        self.origin: Optional[BIP32KeyOrigin] = None
+        if expr.startswith("["):
+            end = expr.find("]")
+            if end == -1:
+                raise BTClibValueError(f"invalid key origin: {expr}")
+            self.origin = BIP32KeyOrigin.from_description(expr[1:end])
+            expr = expr[end + 1 :]
+
+        self.xkey: Optional[BIP32KeyData] = None
+        self.der_path: List[int] = []
+        # 0 for no wildcard, else the index offset (0x80000000 if hardened)
+        self.wildcard: Optional[int] = None
+        # bounded LRU cache of the derived public keys
+        self.cache_size = 10_000
+        self._cache: "OrderedDict[int, bytes]" = OrderedDict()
+        # parent of the unhardened ranged keys, derived only once
+        self._parent: Optional[BIP32KeyData] = None
+
+        key, *steps = expr.split("/")
+        fmt = key_format(key)
+        if fmt in (XPRV, XPUB):
+            self.xkey = BIP32KeyData.b58decode(key)
+            if steps and steps[-1] in ("*", "*'", "*h", "*H"):
+                self.wildcard = 0x80000000 if steps.pop() != "*" else 0
+            self.der_path = [int_from_index_str(step) for step in steps]
+            if self.wildcard is None:
+                self.pub_key = self._derived_pub_key(self.der_path)
+            else:
+                self.pub_key = b""
+        elif steps:
+            raise BTClibValueError(f"invalid derivation of non-BIP32 key: {expr}")
+        elif fmt == SEC:
+            self.pub_key = bytes.fromhex(key)
+            point_from_octets(self.pub_key)
+        elif fmt == WIF:
+            self.pub_key = pub_keyinfo_from_key(key)[0]
+        else:
+            raise BTClibValueError(f"invalid key expression: {expr}")
+
+    @property
+    def is_ranged(self) -> bool:
+        return self.wildcard is not None
+
+    @property
+    def is_compressed(self) -> bool:
+        return self.is_ranged or len(self.pub_key) == 33
+
+    def _derived_pub_key(self, indexes: List[int]) -> bytes:
+
+        assert self.xkey is not None
+        xkey = _derive(self.xkey, indexes)
+        if xkey.key[0] == 0:  # private key
+            prv_key = int.from_bytes(xkey.key[1:], byteorder="big", signed=False)
+            return bytes_from_point(mult(prv_key))
+        return xkey.key
+
+    def pub_keys(self, start: int, count: int) -> List[bytes]:
+        "Return the public keys at indexes start, ..., start+count-1."
+
+        if self.wildcard is None:
+            return [self.pub_key] * count
+
+        stop = start + count
+        pub_keys: Dict[int, bytes] = {}
+        for i in range(start, stop):
+            pub_key = self._cache.get(i)
+            if pub_key is not None:
+                self._cache.move_to_end(i)
+                pub_keys[i] = pub_key
+        missing = [i for i in range(start, stop) if i not in pub_keys]
+        if missing:
+            first, last = missing[0], missing[-1] + 1
+            if self.wildcard:
+                for i in missing:
+                    der_path = self.der_path + [self.wildcard + i]
+                    pub_keys[i] = self._derived_pub_key(der_path)
+            else:
+                if self._parent is None:
+                    assert self.xkey is not None
+                    self._parent = _derive(self.xkey, self.der_path)
+                children = derive_children(self._parent, first, last - first)
+                for i, (pub_key, _) in enumerate(children, first):
+                    pub_keys[i] = pub_key
+            for i in missing:
+                self._cache[i] = pub_keys[i]
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return [pub_keys[i] for i in range(start, stop)]
+
+    def key_origin(self, index: int) -> Optional[BIP32KeyOrigin]:
+        "Return the key origin of the public key at index, if any."
+
+        der_path = list(self.der_path)
+        if self.wildcard is not None:
+            der_path.append(self.wildcard + index)
+        if self.origin is not None:
+            fingerprint = self.origin.master_fingerprint
+            der_path = list(self.origin.der_path) + der_path
+        elif self.xkey is not None:
+            xkey = self.xkey
+            if xkey.key[0] == 0:
+                prv_key = int.from_bytes(xkey.key[1:], byteorder="big", signed=False)
+                fingerprint = hash160(bytes_from_point(mult(prv_key)))[:4]
+            else:
+                fingerprint = hash160(xkey.key)[:4]
+        else:
+            return None
+        return BIP32KeyOrigin(fingerprint, der_path)
+
+
+def _split_args(args: str) -> List[str]:
+    "Split a comma separated argument list at the top nesting level."
+
+    result: List[str] = []
+    depth = 0
+    start = 0
+    for i, c in enumerate(args):
+        if c in "([":
+            depth += 1
+        elif c in ")]":
+            depth -= 1
+        elif c == "," and depth == 0:
+            result.append(args[start:i])
+            start = i + 1
+    result.append(args[start:])
+    return result
+
+
+# allowed inner script expressions for each context
+_TOP = ("pk", "pkh", "wpkh", "sh", "wsh", "multi", "sortedmulti", "addr", "raw")
+_SH = ("pk", "pkh", "wpkh", "wsh", "multi", "sortedmulti")
+_WSH = ("pk", "pkh", "multi", "sortedmulti")
+
+
+class _ScriptExpression:
+    "Script expression, possibly nested, evaluated as raw script bytes."
+
+    def __init__(self, expr: str, allowed: Tuple[str, ...], segwit: bool) -> None:
+
+        name, par, args = expr.partition("(")
+        if not par or not args.endswith(")"):
+            raise BTClibValueError(f"invalid script expression: {expr}")
+        if name not in allowed:
+            raise BTClibValueError(f"invalid script expression context: {name}")
+        self.name = name
+        args = args[:-1]
+
+        self.keys: List[_KeyExpression] = []
+        self.sub: Optional[_ScriptExpression] = None
+        self.threshold = 0
+        self.script = b""
+        if name in ("pk", "pkh", "wpkh"):
+            self.keys = [_KeyExpression(args)]
+        elif name == "sh":
+            self.sub = _ScriptExpression(args, _SH, False)
+        elif name == "wsh":
+            self.sub = _ScriptExpression(args, _WSH, True)
+        elif name in ("multi", "sortedmulti"):
+            threshold, *keys = _split_args(args)
+            if not 0 < len(keys) < 17:
+                raise BTClibValueError(f"invalid n in m-of-n: {len(keys)}")
+            if not threshold.isdigit() or not 0 < int(threshold) <= len(keys):
+                err_msg = f"invalid m in m-of-n: {threshold}-of-{len(keys)}"
+                raise BTClibValueError(err_msg)
+            self.threshold = int(threshold)
+            self.keys = [_KeyExpression(key) for key in keys]
+        elif name == "addr":
+            self.script = ScriptPubKey.from_address(args).script
+        else:  # raw
+            self.script = bytes.fromhex(args)
+
+        if (segwit or name == "wpkh") and not all(k.is_compressed for k in self.keys):
+            raise BTClibValueError(f"uncompressed key in segwit context: {expr}")
+
+    @property
+    def is_ranged(self) -> bool:
+        if self.sub is not None:
+            return self.sub.is_ranged
+        return any(key.is_ranged for key in self.keys)
+
+    def all_keys(self) -> List[_KeyExpression]:
+        return self.keys if self.sub is None else self.sub.all_keys()
+
+    def scripts(self, start: int, count: int) -> List[bytes]:
+        "Return the scripts at indexes start, ..., start+count-1."
+
+        # sourcery skip: switch
+        if self.name in ("addr", "raw"):
+            return [self.script] * count
+        if self.sub is not None:
+            scripts = self.sub.scripts(start, count)
+            if self.name == "sh":
+                # [OP_HASH160, redeem_script_hash, OP_EQUAL]
+                return [b"\xa9\x14" + hash160(s) + b"\x87" for s in scripts]
+            # [OP_0, witness_script_hash]
+            return [b"\x00\x20" + sha256(s) for s in scripts]
+
+        if self.name in ("multi", "sortedmulti"):
+            m = bytes([0x50 + self.threshold])
+            n_and_op = bytes([0x50 + len(self.keys), 0xAE])
+            results = []
+            columns = [key.pub_keys(start, count) for key in self.keys]
+            for row in zip(*columns):
+                # BIP67 lexicographic sorting
+                row_keys = sorted(row) if self.name == "sortedmulti" else row
+                keys = b"".join(var_bytes.serialize(k) for k in row_keys)
+                results.append(m + keys + n_and_op)
+            return results
+
+        pub_keys = self.keys[0].pub_keys(start, count)
+        if self.name == "pk":
+            # [pub_key, OP_CHECKSIG]
+            return [var_bytes.serialize(k) + b"\xac" for k in pub_keys]
+        if self.name == "pkh":
+            # [OP_DUP, OP_HASH160, pub_key_hash, OP_EQUALVERIFY, OP_CHECKSIG]
+            return [b"\x76\xa9\x14" + hash160(k) + b"\x88\xac" for k in pub_keys]
+        # wpkh: [OP_0, pub_key_hash]
+        return [b"\x00\x14" + hash160(k) for k in pub_keys]
+
+
+class Descriptor:
+    """Output script descriptor.
+
+    The optional #checksum suffix is verified, if present.
+    Up to cache_size derived public keys are cached
+    for each ranged key, zero disabling the cache.
+    """
+
+    def __init__(self, desc: str, cache_size: int = 10_000) -> None:
+
+        if cache_size < 0:
+            raise BTClibValueError(f"invalid cache size: {cache_size}")
+
+        desc = desc.strip()
+        desc, sep, chk = desc.partition("#")
+        if sep and chk != checksum(desc):
+            raise BTClibValueError(f"invalid descriptor checksum: {chk}")
+        # also check the character set
+        self.checksum = checksum(desc)
+        self.desc = desc
+        self._root = _ScriptExpression(desc, _TOP, False)
+        for key in self._root.all_keys():
+            key.cache_size = cache_size
+
+    def __str__(self) -> str:
+        return f"{self.desc}#{self.checksum}"
+
+    @property
+    def is_ranged(self) -> bool:
+        return self._root.is_ranged
+
+    def _assert_valid_range(self, start: int, count: int) -> None:
+
+        if count < 0:
+            raise BTClibValueError(f"negative count: {count}")
+        if start < 0 or start + count > 0x80000000:
+            raise BTClibValueError(f"invalid index range: {start}, {count}")
+        if start and not self.is_ranged:
+            raise BTClibValueError(f"index for non-ranged descriptor: {start}")
+
+    def script_pub_keys(self, start: int = 0, count: int = 1) -> List[bytes]:
+        "Return the script_pub_keys at indexes start, ..., start+count-1."
+
+        self._assert_valid_range(start, count)
+        return self._root.scripts(start, count)
+
+    def script_pub_key(self, index: int = 0) -> bytes:
+        "Return the script_pub_key at index."
+
+        return self.script_pub_keys(index, 1)[0]
+
+    def address(self, index: int = 0, network: str = "mainnet") -> str:
+        "Return the address of the script_pub_key at index."
+
+        return address(self.script_pub_key(index), network)
+
+    def hd_key_paths(self, index: int = 0) -> HdKeyPaths:
+        "Return the key origins of the BIP32 public keys used at index."
+
+        self._assert_valid_range(index, 1)
+        result: HdKeyPaths = {}
+        for key in self._root.all_keys():
+            key_origin = key.key_origin(index)
+            if key_origin is not None:
+                result[key.pub_keys(index, 1)[0]] = key_origin
+        return result
@@ -0,0 +1,947 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2020-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Bitcoin Script interpreter.
+
+eval_script executes a script on a stack of byte strings,
+raising BTClibValueError if the execution fails;
+signature and timelock op codes require the transaction context
+of a TxChecker.
+
+verify_input verifies a transaction input against the utxo it spends:
+script_sig and script_pub_key, p2sh (BIP16), segwit v0 (BIP141, BIP143),
+and taproot key and script paths (BIP341, BIP342).
+The consensus rules of the active soft-forks are enforced
+(e.g. BIP65 and BIP112 timelocks, BIP66 strict DER signatures,
+BIP147 null dummy), but not the standardness (policy) ones.
+
+Signature verifications are memoized by a bounded SigCache
+keyed by (sign_hash, pub_key, sig): re-validating a transaction,
+e.g. at block time after mempool acceptance, or the many
+pub_key/sig attempts of OP_CHECKMULTISIG do not repeat
+the elliptic curve work.
+
+https://github.com/bitcoin/bitcoin/blob/master/src/script/interpreter.cpp
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from btclib import var_bytes, var_int
+from btclib.alias import Octets
+from btclib.ecc import dsa, ssa
+from btclib.ecc.curve import mult, secp256k1
+from btclib.exceptions import BTClibValueError
+from btclib.hashes import tagged_hash
+from btclib.script.op_codes import (
+    OP_CODE_NAMES,
+    OP_CODES,
+    decode_num,
+    encode_num,
+    op_pushdata,
+)
+from btclib.script.script_pub_key import ScriptPubKey, is_p2sh
+from btclib.tx import sign_hash
+from btclib.tx.tx import Tx
+from btclib.tx.tx_out import TxOut
+from btclib.utils import bytes_from_octets, hash160, hash256, sha256
+
+LEGACY = "legacy"
+WITNESS_V0 = "witness_v0"
+TAPSCRIPT = "tapscript"
+
+MAX_SCRIPT_SIZE = 10_000
+MAX_ELEMENT_SIZE = 520
+MAX_OPS = 201
+MAX_STACK_SIZE = 1_000
+MAX_PUB_KEYS = 20
+# BIP342 signature operations budget
+SIGOPS_BUDGET_BASE = 50
+SIGOPS_BUDGET_COST = 50
+
+TAPSCRIPT_LEAF_VERSION = 0xC0
+
+_OP = {name: op_code[0] for name, op_code in OP_CODES.items()}
+
+# fail even if not executed
+_DISABLED = {0x65, 0x66, *range(0x7E, 0x82), *range(0x83, 0x87)}
+_DISABLED |= {0x8D, 0x8E, *range(0x95, 0x9A)}
+
+# BIP342 OP_SUCCESSx
+_OP_SUCCESS = {0x50, 0x62, 0x7E, 0x7F, 0x80, 0x81, 0x83, 0x84, 0x85, 0x86}
+_OP_SUCCESS |= {0x89, 0x8A, 0x8D, 0x8E, *range(0x95, 0x9A), *range(0xBB, 0xFF)}
+
+_VERIFY_OPS = {
+    _OP[name]
+    for name in (
+        "OP_EQUALVERIFY",
+        "OP_NUMEQUALVERIFY",
+        "OP_CHECKSIGVERIFY",
+        "OP_CHECKMULTISIGVERIFY",
+    )
+}
+
+# op codes requiring the TxChecker
+_CHECKER_OPS = {
+    _OP[name]
+    for name in (
+        "OP_CHECKLOCKTIMEVERIFY",
+        "OP_CHECKSEQUENCEVERIFY",
+        "OP_CHECKSIG",
+        "OP_CHECKSIGVERIFY",
+        "OP_CHECKMULTISIG",
+        "OP_CHECKMULTISIGVERIFY",
+        "OP_CHECKSIGADD",
+    )
+}
+
+Stack = List[bytes]
+# op code handler, operating on stack and alt-stack
+_Handler = Callable[[Stack, Stack], None]
+# op code -> (minimum stack depth, handler)
+_HANDLERS: Dict[int, Tuple[int, _Handler]] = {}
+
+
+def _op(name: str, depth: int) -> Callable[[_Handler], _Handler]:
+    "Register the handler of the op code, requiring depth stack elements."
+
+    def register(handler: _Handler) -> _Handler:
+        _HANDLERS[_OP[name]] = depth, handler
+        return handler
+
+    return register
+
+
+def _as_bool(data: bytes) -> bool:
+    "Return the boolean value of a stack element; negative zero is False."
+
+    for i, byte in enumerate(data):
+        if byte:
+            return not (i == len(data) - 1 and byte == 0x80)
+    return False
+
+
+def _num(data: bytes, max_size: int = 4) -> int:
+    "Return the number of a stack element, at most max_size bytes long."
+
+    if len(data) > max_size:
+        raise BTClibValueError(f"script number overflow: {len(data)} bytes")
+    return decode_num(data)
+
+
+def _ops(script: bytes) -> Iterator[Tuple[int, Optional[bytes], int]]:
+    "Yield op code, pushed data (if any), and position after each op."
+
+    pos = 0
+    while pos < len(script):
+        op_code = script[pos]
+        pos += 1
+        data = None
+        if op_code <= _OP["OP_PUSHDATA4"]:
+            size = op_code
+            if op_code >= _OP["OP_PUSHDATA1"]:
+                n_bytes = 1 << (op_code - _OP["OP_PUSHDATA1"])
+                if pos + n_bytes > len(script):
+                    raise BTClibValueError("invalid push")
+                size = int.from_bytes(script[pos : pos + n_bytes], "little")
+                pos += n_bytes
+            if pos + size > len(script):
+                raise BTClibValueError("invalid push")
+            data = script[pos : pos + size]
+            pos += size
+        yield op_code, data, pos
+
+
+def is_push_only(script: Octets) -> bool:
+    script = bytes_from_octets(script)
+    return all(op_code <= _OP["OP_16"] for op_code, _, _ in _ops(script))
+
+
+def _legacy_script_code(script: bytes, sigs: Sequence[bytes]) -> bytes:
+    """Return the legacy script code, without signatures and OP_CODESEPARATOR.
+
+    The signatures are deleted (FindAndDelete) only if pushed canonically.
+    """
+
+    patterns = {op_pushdata(sig) for sig in sigs}
+    chunks: List[bytes] = []
+    start = 0
+    try:
+        for op_code, _, pos in _ops(script):
+            chunk = script[start:pos]
+            if op_code != _OP["OP_CODESEPARATOR"] and chunk not in patterns:
+                chunks.append(chunk)
+            start = pos
+    except BTClibValueError:
+        # not executed invalid push
+        chunks.append(script[start:])
+    return b"".join(chunks)
+
+
+def _is_valid_signature_encoding(sig: bytes) -> bool:
+    "Return True if the signature (with sign_hash type) is strict DER (BIP66)."
+
+    # [0x30] [size] [0x02] [r-size] [r] [0x02] [s-size] [s] [sign_hash type]
+    if not 9 <= len(sig) <= 73 or sig[0] != 0x30 or sig[1] != len(sig) - 3:
+        return False
+    r_size = sig[3]
+    if 5 + r_size >= len(sig):
+        return False
+    s_size = sig[5 + r_size]
+    if r_size + s_size + 7 != len(sig):
+        return False
+    for start, size in ((2, r_size), (4 + r_size, s_size)):
+        if sig[start] != 0x02 or size == 0 or sig[start + 2] & 0x80:
+            return False
+        # no null bytes at the start, unless needed for a positive scalar
+        if size > 1 and sig[start + 2] == 0 and not sig[start + 3] & 0x80:
+            return False
+    return True
+
+
+def _verify_ecdsa(msg_hash: bytes, pub_key: bytes, sig: bytes) -> bool:
+    # consensus does not require low s
+    return dsa.verify_(msg_hash, pub_key, sig, lower_s=False)
+
+
+class SigCache:
+    """Bounded least recently used cache of signature verifications.
+
+    Results, valid or not, are keyed by (sign_hash, pub_key, sig):
+    ECDSA SEC public keys are 33 or 65 bytes, BIP340 ones are 32 bytes,
+    so the two key spaces do not overlap.
+    """
+
+    def __init__(self, max_size: int = 100_000) -> None:
+
+        if max_size < 1:
+            raise BTClibValueError(f"invalid signature cache size: {max_size}")
+        self.max_size = max_size
+        self._results: "OrderedDict[Tuple[bytes, bytes, bytes], bool]"
+        self._results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def clear(self) -> None:
+        self._results.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _verify(
+        self,
+        verify: Callable[[bytes, bytes, bytes], bool],
+        key: Tuple[bytes, bytes, bytes],
+    ) -> bool:
+
+        result = self._results.get(key)
+        if result is not None:
+            self.hits += 1
+            self._results.move_to_end(key)
+            return result
+        self.misses += 1
+        result = verify(*key)
+        self._results[key] = result
+        if len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+        return result
+
+    def verify_ecdsa(self, msg_hash: bytes, pub_key: bytes, sig: bytes) -> bool:
+        "Verify the DER ECDSA signature (without sign_hash type byte)."
+
+        if len(pub_key) not in (33, 65):
+            return False
+        return self._verify(_verify_ecdsa, (msg_hash, pub_key, sig))
+
+    def verify_bip340(self, msg_hash: bytes, x_Q: bytes, sig: bytes) -> bool:
+        "Verify the 64 bytes BIP340 signature."
+
+        if len(x_Q) != 32:
+            return False
+        return self._verify(ssa.verify_, (msg_hash, x_Q, sig))
+
+
+class TxChecker:
+    """Transaction context of the scripts of a transaction input.
+
+    utxos are the outputs spent by all the transaction inputs,
+    as required by taproot sign_hashes.
+    The optional SighashCache must be shared only among TxCheckers
+    of the same transaction and the same utxos sequence object;
+    the optional SigCache can be shared among any TxCheckers.
+    """
+
+    def __init__(
+        self,
+        tx: Tx,
+        vin_i: int,
+        utxos: Sequence[TxOut],
+        sig_cache: Optional[SigCache] = None,
+        cache: Optional[sign_hash.SighashCache] = None,
+    ) -> None:
+
+        if len(utxos) != len(tx.vin):
+            err_msg = "mismatched number of utxos and tx inputs: "
+            err_msg += f"{len(utxos)} vs {len(tx.vin)}"
+            raise BTClibValueError(err_msg)
+        self.tx = tx
+        self.vin_i = vin_i
+        self.utxos = utxos
+        self.sig_cache = sig_cache
+        self.cache = sign_hash.SighashCache(tx) if cache is None else cache
+        # taproot execution data
+        self.annex = b""
+        self.tapleaf_hash = b""
+        self.sigops_budget = 0
+
+    def check_ecdsa(
+        self, sig: bytes, pub_key: bytes, script_code: bytes, sig_version: str
+    ) -> bool:
+        "Return True if the ECDSA signature (with sign_hash type) is valid."
+
+        if not sig:
+            return False
+        hash_type = sig[-1]
+        der_sig = sig[:-1]
+        # BIP66: invalid encodings fail the script, not only the check;
+        # out of range r or s are valid encodings of invalid signatures
+        if not _is_valid_signature_encoding(sig):
+            raise BTClibValueError("invalid DER signature")
+        if sig_version == LEGACY:
+            msg_hash = sign_hash.legacy(
+                script_code, self.tx, self.vin_i, hash_type, self.cache
+            )
+        else:
+            amount = self.utxos[self.vin_i].value
+            msg_hash = sign_hash.segwit_v0(
+                script_code, self.tx, self.vin_i, hash_type, amount, self.cache
+            )
+        if self.sig_cache is None:
+            return len(pub_key) in (33, 65) and _verify_ecdsa(
+                msg_hash, pub_key, der_sig
+            )
+        return self.sig_cache.verify_ecdsa(msg_hash, pub_key, der_sig)
+
+    def check_schnorr(
+        self, sig: bytes, x_Q: bytes, codesep_pos: int = 0xFFFFFFFF
+    ) -> bool:
+        """Return True if the BIP340 signature (with sign_hash type) is valid.
+
+        It is a BIP342 script path signature if tapleaf_hash is set,
+        a BIP341 key path one otherwise.
+        """
+
+        if len(sig) == 64:
+            hash_type = sign_hash.DEFAULT
+        elif len(sig) == 65 and sig[64] != sign_hash.DEFAULT:
+            hash_type = sig[64]
+        else:
+            raise BTClibValueError(f"invalid schnorr signature size: {len(sig)}")
+        ext_flag = 1 if self.tapleaf_hash else 0
+        msg_hash = sign_hash.taproot(
+            self.tx,
+            self.vin_i,
+            self.utxos,
+            hash_type,
+            ext_flag,
+            self.annex,
+            self.tapleaf_hash,
+            codesep_pos,
+            self.cache,
+        )
+        if self.sig_cache is None:
+            return ssa.verify_(msg_hash, x_Q, sig[:64])
+        return self.sig_cache.verify_bip340(msg_hash, x_Q, sig[:64])
+
+    def check_lock_time(self, lock_time: int) -> None:
+        "BIP65 OP_CHECKLOCKTIMEVERIFY."
+
+        if lock_time < 0:
+            raise BTClibValueError(f"negative lock time: {lock_time}")
+        tx_lock_time = self.tx.lock_time
+        # block height vs timestamp
+        if (lock_time < 500_000_000) != (tx_lock_time < 500_000_000):
+            raise BTClibValueError("lock time type mismatch")
+        if lock_time > tx_lock_time:
+            raise BTClibValueError(f"unsatisfied lock time: {lock_time}")
+        if self.tx.vin[self.vin_i].sequence == 0xFFFFFFFF:
+            raise BTClibValueError("final input sequence")
+
+    def check_sequence(self, sequence: int) -> None:
+        "BIP112 OP_CHECKSEQUENCEVERIFY."
+
+        if sequence < 0:
+            raise BTClibValueError(f"negative sequence: {sequence}")
+        # disable flag: no relative lock time
+        if sequence & (1 << 31):
+            return
+        if self.tx.version < 2:
+            raise BTClibValueError(f"invalid tx version: {self.tx.version}")
+        tx_sequence = self.tx.vin[self.vin_i].sequence
+        if tx_sequence & (1 << 31):
+            raise BTClibValueError("disabled input relative lock time")
+        # type flag and value
+        mask = (1 << 22) | 0xFFFF
+        sequence &= mask
+        tx_sequence &= mask
+        if (sequence < 1 << 22) != (tx_sequence < 1 << 22):
+            raise BTClibValueError("relative lock time type mismatch")
+        if sequence > tx_sequence:
+            raise BTClibValueError(f"unsatisfied relative lock time: {sequence}")
+
+
+# stack op codes
+
+
+@_op("OP_TOALTSTACK", 1)
+def _to_alt_stack(stack: Stack, alt_stack: Stack) -> None:
+    alt_stack.append(stack.pop())
+
+
+@_op("OP_FROMALTSTACK", 0)
+def _from_alt_stack(stack: Stack, alt_stack: Stack) -> None:
+    if not alt_stack:
+        raise BTClibValueError("empty alt-stack")
+    stack.append(alt_stack.pop())
+
+
+@_op("OP_2DROP", 2)
+def _2drop(stack: Stack, _: Stack) -> None:
+    del stack[-2:]
+
+
+@_op("OP_2DUP", 2)
+def _2dup(stack: Stack, _: Stack) -> None:
+    stack.extend(stack[-2:])
+
+
+@_op("OP_3DUP", 3)
+def _3dup(stack: Stack, _: Stack) -> None:
+    stack.extend(stack[-3:])
+
+
+@_op("OP_2OVER", 4)
+def _2over(stack: Stack, _: Stack) -> None:
+    stack.extend(stack[-4:-2])
+
+
+@_op("OP_2ROT", 6)
+def _2rot(stack: Stack, _: Stack) -> None:
+    items = stack[-6:-4]
+    del stack[-6:-4]
+    stack.extend(items)
+
+
+@_op("OP_2SWAP", 4)
+def _2swap(stack: Stack, _: Stack) -> None:
+    stack[-4:] = stack[-2:] + stack[-4:-2]
+
+
+@_op("OP_IFDUP", 1)
+def _ifdup(stack: Stack, _: Stack) -> None:
+    if _as_bool(stack[-1]):
+        stack.append(stack[-1])
+
+
+@_op("OP_DEPTH", 0)
+def _depth(stack: Stack, _: Stack) -> None:
+    stack.append(encode_num(len(stack)))
+
+
+@_op("OP_DROP", 1)
+def _drop(stack: Stack, _: Stack) -> None:
+    stack.pop()
+
+
+@_op("OP_DUP", 1)
+def _dup(stack: Stack, _: Stack) -> None:
+    stack.append(stack[-1])
+
+
+@_op("OP_NIP", 2)
+def _nip(stack: Stack, _: Stack) -> None:
+    del stack[-2]
+
+
+@_op("OP_OVER", 2)
+def _over(stack: Stack, _: Stack) -> None:
+    stack.append(stack[-2])
+
+
+def _pick_index(stack: Stack) -> int:
+    n = _num(stack.pop())
+    if not 0 <= n < len(stack):
+        raise BTClibValueError(f"invalid stack index: {n}")
+    return len(stack) - 1 - n
+
+
+@_op("OP_PICK", 2)
+def _pick(stack: Stack, _: Stack) -> None:
+    stack.append(stack[_pick_index(stack)])
+
+
+@_op("OP_ROLL", 2)
+def _roll(stack: Stack, _: Stack) -> None:
+    stack.append(stack.pop(_pick_index(stack)))
+
+
+@_op("OP_ROT", 3)
+def _rot(stack: Stack, _: Stack) -> None:
+    stack.append(stack.pop(-3))
+
+
+@_op("OP_SWAP", 2)
+def _swap(stack: Stack, _: Stack) -> None:
+    stack[-2], stack[-1] = stack[-1], stack[-2]
+
+
+@_op("OP_TUCK", 2)
+def _tuck(stack: Stack, _: Stack) -> None:
+    stack.insert(-2, stack[-1])
+
+
+@_op("OP_SIZE", 1)
+def _size(stack: Stack, _: Stack) -> None:
+    stack.append(encode_num(len(stack[-1])))
+
+
+# bitwise logic op codes
+
+
+@_op("OP_EQUAL", 2)
+@_op("OP_EQUALVERIFY", 2)
+def _equal(stack: Stack, _: Stack) -> None:
+    stack.append(b"\x01" if stack.pop() == stack.pop() else b"")
+
+
+# arithmetic op codes
+
+_UNARY: Dict[str, Callable[[int], int]] = {
+    "OP_1ADD": lambda a: a + 1,
+    "OP_1SUB": lambda a: a - 1,
+    "OP_NEGATE": lambda a: -a,
+    "OP_ABS": abs,
+    "OP_NOT": lambda a: int(a == 0),
+    "OP_0NOTEQUAL": lambda a: int(a != 0),
+}
+
+_BINARY: Dict[str, Callable[[int, int], int]] = {
+    "OP_ADD": lambda a, b: a + b,
+    "OP_SUB": lambda a, b: a - b,
+    "OP_BOOLAND": lambda a, b: int(a != 0 and b != 0),
+    "OP_BOOLOR": lambda a, b: int(a != 0 or b != 0),
+    "OP_NUMEQUAL": lambda a, b: int(a == b),
+    "OP_NUMEQUALVERIFY": lambda a, b: int(a == b),
+    "OP_NUMNOTEQUAL": lambda a, b: int(a != b),
+    "OP_LESSTHAN": lambda a, b: int(a < b),
+    "OP_GREATERTHAN": lambda a, b: int(a > b),
+    "OP_LESSTHANOREQUAL": lambda a, b: int(a <= b),
+    "OP_GREATERTHANOREQUAL": lambda a, b: int(a >= b),
+    "OP_MIN": min,
+    "OP_MAX": max,
+}
+
+for _name, _unary in _UNARY.items():
+
+    @_op(_name, 1)
+    def _unary_op(stack: Stack, _: Stack, func: Callable[[int], int] = _unary) -> None:
+        stack.append(encode_num(func(_num(stack.pop()))))
+
+
+for _name, _binary in _BINARY.items():
+
+    @_op(_name, 2)
+    def _binary_op(
+        stack: Stack, _: Stack, func: Callable[[int, int], int] = _binary
+    ) -> None:
+        b = _num(stack.pop())
+        stack.append(encode_num(func(_num(stack.pop()), b)))
+
+
+@_op("OP_WITHIN", 3)
+def _within(stack: Stack, _: Stack) -> None:
+    max_ = _num(stack.pop())
+    min_ = _num(stack.pop())
+    stack.append(b"\x01" if min_ <= _num(stack.pop()) < max_ else b"")
+
+
+# crypto op codes
+
+_HASHES: Dict[str, Callable[[bytes], bytes]] = {
+    "OP_RIPEMD160": lambda data: hashlib.new("ripemd160", data).digest(),
+    "OP_SHA1": lambda data: hashlib.sha1(data).digest(),  # nosec
+    "OP_SHA256": sha256,
+    "OP_HASH160": hash160,
+    "OP_HASH256": hash256,
+}
+
+for _name, _hash in _HASHES.items():
+
+    @_op(_name, 1)
+    def _hash_op(
+        stack: Stack, _: Stack, func: Callable[[bytes], bytes] = _hash
+    ) -> None:
+        stack.append(func(stack.pop()))
+
+
+# upgradable no-op op codes
+for _name in ("OP_NOP", "OP_NOP1", *(f"OP_NOP{i}" for i in range(4, 11))):
+
+    @_op(_name, 0)
+    def _nop(stack: Stack, _: Stack) -> None:
+        pass
+
+
+def _check_multisig(
+    stack: Stack, script_code: bytes, checker: TxChecker, sig_version: str
+) -> bool:
+    "Pop the OP_CHECKMULTISIG arguments and return the result."
+
+    n_keys = _num(stack[-1])
+    if not 0 <= n_keys <= MAX_PUB_KEYS or len(stack) < n_keys + 2:
+        raise BTClibValueError(f"invalid number of public keys: {n_keys}")
+    n_sigs = _num(stack[-2 - n_keys])
+    if not 0 <= n_sigs <= n_keys or len(stack) < n_keys + n_sigs + 3:
+        raise BTClibValueError(f"invalid number of signatures: {n_sigs}")
+    # as in Bitcoin Core, starting from the last pub_key and signature
+    pub_keys = stack[-2 : -2 - n_keys : -1]
+    sigs = stack[-3 - n_keys : -3 - n_keys - n_sigs : -1]
+    # BIP147: the extra element consumed because of an off-by-one bug
+    if stack[-3 - n_keys - n_sigs]:
+        raise BTClibValueError("non-null dummy element")
+    del stack[-3 - n_keys - n_sigs :]
+
+    if sig_version == LEGACY:
+        script_code = _legacy_script_code(script_code, sigs)
+    k = 0
+    for i, sig in enumerate(sigs):
+        while n_sigs - i <= n_keys - k:
+            k += 1
+            if checker.check_ecdsa(sig, pub_keys[k - 1], script_code, sig_version):
+                break
+        else:
+            return False
+    return True
+
+
+def _check_tapscript_sig(
+    sig: bytes, pub_key: bytes, checker: TxChecker, codesep_pos: int
+) -> bool:
+    "BIP342 signature check: return False only for empty signatures."
+
+    if sig:
+        checker.sigops_budget -= SIGOPS_BUDGET_COST
+        if checker.sigops_budget < 0:
+            raise BTClibValueError("sigops budget exceeded")
+    if not pub_key:
+        raise BTClibValueError("empty public key")
+    # other public key types are reserved for upgrades
+    if len(pub_key) == 32 and sig:
+        if not checker.check_schnorr(sig, pub_key, codesep_pos):
+            raise BTClibValueError("invalid schnorr signature")
+    return bool(sig)
+
+
+def eval_script(  # pylint: disable=too-many-branches,too-many-statements
+    script: Octets,
+    stack: Stack,
+    checker: Optional[TxChecker] = None,
+    sig_version: str = LEGACY,
+) -> None:
+    """Execute the script on the stack, that is modified in place.
+
+    BTClibValueError is raised if the execution fails.
+    sig_version (LEGACY, WITNESS_V0, or TAPSCRIPT) selects
+    the signature and limits rules; the TxChecker is required
+    by signature and timelock op codes.
+    """
+
+    script = bytes_from_octets(script)
+    if sig_version != TAPSCRIPT and len(script) > MAX_SCRIPT_SIZE:
+        raise BTClibValueError(f"script size limit exceeded: {len(script)}")
+
+    alt_stack: Stack = []
+    # executed branches of the nested conditionals
+    conditions: List[bool] = []
+    n_ops = 0
+    # position after the last executed OP_CODESEPARATOR:
+    # byte offset, or op code index for tapscript
+    codesep = 0
+    codesep_pos = 0xFFFFFFFF
+    for op_index, (op_code, data, pos) in enumerate(_ops(script)):
+        executing = False not in conditions
+
+        if data is not None:
+            if len(data) > MAX_ELEMENT_SIZE:
+                raise BTClibValueError(f"push size limit exceeded: {len(data)}")
+            if executing:
+                stack.append(data)
+                if len(stack) + len(alt_stack) > MAX_STACK_SIZE:
+                    raise BTClibValueError("stack size limit exceeded")
+            continue
+
+        if sig_version != TAPSCRIPT and op_code > _OP["OP_16"]:
+            n_ops += 1
+            if n_ops > MAX_OPS:
+                raise BTClibValueError("op count limit exceeded")
+        if op_code in _DISABLED:
+            raise BTClibValueError(f"disabled op code: {hex(op_code)}")
+
+        if op_code in (_OP["OP_IF"], _OP["OP_NOTIF"]):
+            condition = False
+            if executing:
+                if not stack:
+                    raise BTClibValueError("unbalanced conditional")
+                top = stack.pop()
+                # BIP342 minimal if
+                if sig_version == TAPSCRIPT and top not in (b"", b"\x01"):
+                    raise BTClibValueError("non-minimal conditional argument")
+                condition = _as_bool(top) != (op_code == _OP["OP_NOTIF"])
+            conditions.append(condition)
+        elif op_code in (_OP["OP_ELSE"], _OP["OP_ENDIF"]):
+            if not conditions:
+                raise BTClibValueError("unbalanced conditional")
+            if op_code == _OP["OP_ELSE"]:
+                conditions[-1] = not conditions[-1]
+            else:
+                conditions.pop()
+        elif not executing:
+            continue
+        elif _OP["OP_1NEGATE"] == op_code or _OP["OP_1"] <= op_code <= _OP["OP_16"]:
+            stack.append(encode_num(op_code - _OP["OP_RESERVED"]))
+        elif op_code == _OP["OP_VERIFY"]:
+            if not stack or not _as_bool(stack.pop()):
+                raise BTClibValueError("OP_VERIFY failed")
+        elif op_code == _OP["OP_RETURN"]:
+            raise BTClibValueError("OP_RETURN executed")
+        elif op_code == _OP["OP_CODESEPARATOR"]:
+            codesep = pos
+            codesep_pos = op_index
+        elif op_code in _HANDLERS:
+            depth, handler = _HANDLERS[op_code]
+            if len(stack) < depth:
+                raise BTClibValueError(f"not enough stack elements: {len(stack)}")
+            handler(stack, alt_stack)
+        elif op_code not in _CHECKER_OPS or (
+            op_code == _OP["OP_CHECKSIGADD"] and sig_version != TAPSCRIPT
+        ):
+            err_msg = f"invalid op code: {OP_CODE_NAMES.get(op_code, hex(op_code))}"
+            raise BTClibValueError(err_msg)
+        elif checker is None:
+            raise BTClibValueError("missing transaction context")
+        elif op_code == _OP["OP_CHECKLOCKTIMEVERIFY"]:
+            if not stack:
+                raise BTClibValueError("empty stack")
+            checker.check_lock_time(_num(stack[-1], 5))
+        elif op_code == _OP["OP_CHECKSEQUENCEVERIFY"]:
+            if not stack:
+                raise BTClibValueError("empty stack")
+            checker.check_sequence(_num(stack[-1], 5))
+        elif op_code in (_OP["OP_CHECKSIG"], _OP["OP_CHECKSIGVERIFY"]):
+            if len(stack) < 2:
+                raise BTClibValueError(f"not enough stack elements: {len(stack)}")
+            pub_key = stack.pop()
+            sig = stack.pop()
+            if sig_version == TAPSCRIPT:
+                valid = _check_tapscript_sig(sig, pub_key, checker, codesep_pos)
+            else:
+                script_code = script[codesep:]
+                if sig_version == LEGACY:
+                    script_code = _legacy_script_code(script_code, [sig])
+                valid = checker.check_ecdsa(sig, pub_key, script_code, sig_version)
+            stack.append(b"\x01" if valid else b"")
+        elif op_code in (_OP["OP_CHECKMULTISIG"], _OP["OP_CHECKMULTISIGVERIFY"]):
+            if sig_version == TAPSCRIPT:
+                raise BTClibValueError("OP_CHECKMULTISIG disabled in tapscript")
+            if not stack:
+                raise BTClibValueError("empty stack")
+            n_ops += max(0, _num(stack[-1]))
+            if n_ops > MAX_OPS:
+                raise BTClibValueError("op count limit exceeded")
+            valid = _check_multisig(stack, script[codesep:], checker, sig_version)
+            stack.append(b"\x01" if valid else b"")
+        else:  # OP_CHECKSIGADD
+            if len(stack) < 3:
+                raise BTClibValueError(f"not enough stack elements: {len(stack)}")
+            pub_key = stack.pop()
+            n = _num(stack.pop())
+            sig = stack.pop()
+            valid = _check_tapscript_sig(sig, pub_key, checker, codesep_pos)
+            stack.append(encode_num(n + valid))
+
+        if op_code in _VERIFY_OPS and not _as_bool(stack.pop()):
+            raise BTClibValueError(f"{OP_CODE_NAMES[op_code]} failed")
+        if len(stack) + len(alt_stack) > MAX_STACK_SIZE:
+            raise BTClibValueError("stack size limit exceeded")
+
+    if conditions:
+        raise BTClibValueError("unbalanced conditional")
+
+
+def _assert_true(stack: Stack, clean_stack: bool = False) -> None:
+
+    if not stack or not _as_bool(stack[-1]):
+        raise BTClibValueError("script evaluated to false")
+    if clean_stack and len(stack) != 1:
+        raise BTClibValueError(f"unclean stack: {len(stack)} elements")
+
+
+def _witness_program(script: bytes) -> Optional[Tuple[int, bytes]]:
+    "Return the witness version and program, if any."
+
+    if not 4 <= len(script) <= 42 or script[1] + 2 != len(script):
+        return None
+    if script[0] == 0:
+        return 0, script[2:]
+    if _OP["OP_1"] <= script[0] <= _OP["OP_16"]:
+        return script[0] - _OP["OP_RESERVED"], script[2:]
+    return None
+
+
+def _assert_taproot_commitment(control: bytes, x_Q: bytes, tapleaf_hash: bytes) -> None:
+    "Assert that the control block commits to the leaf in the output key."
+
+    internal_key = control[1:33]
+    try:
+        P = ssa.point_from_bip340pub_key(internal_key)
+    except BTClibValueError as e:
+        raise BTClibValueError("invalid taproot internal key") from e
+    k = tapleaf_hash
+    for i in range(33, len(control), 32):
+        node = control[i : i + 32]
+        k = tagged_hash(b"TapBranch", k + node if k < node else node + k)
+    t = int.from_bytes(tagged_hash(b"TapTweak", internal_key + k), "big")
+    if t >= secp256k1.n:
+        raise BTClibValueError("invalid taproot tweak")
+    Q = secp256k1.add(P, mult(t))
+    if Q[0] != int.from_bytes(x_Q, "big") or Q[1] % 2 != control[0] & 1:
+        raise BTClibValueError("invalid taproot commitment")
+
+
+def _verify_taproot(x_Q: bytes, witness: Stack, checker: TxChecker) -> None:
+
+    stack = list(witness)
+    if not stack:
+        raise BTClibValueError("empty taproot witness")
+    if len(stack) > 1 and stack[-1][:1] == b"\x50":
+        checker.annex = stack.pop()
+
+    # key path
+    if len(stack) == 1:
+        if not checker.check_schnorr(stack[0], x_Q):
+            raise BTClibValueError("invalid taproot key path signature")
+        return
+
+    # script path
+    control = stack.pop()
+    script = stack.pop()
+    n_nodes, remainder = divmod(len(control) - 33, 32)
+    if len(control) < 33 or remainder or n_nodes > 128:
+        raise BTClibValueError(f"invalid control block size: {len(control)}")
+    leaf_version = control[0] & 0xFE
+    preimage = bytes([leaf_version]) + var_bytes.serialize(script)
+    tapleaf_hash = tagged_hash(b"TapLeaf", preimage)
+    _assert_taproot_commitment(control, x_Q, tapleaf_hash)
+    # other leaf versions are reserved for upgrades
+    if leaf_version != TAPSCRIPT_LEAF_VERSION:
+        return
+    for op_code, data, _ in _ops(script):
+        if data is None and op_code in _OP_SUCCESS:
+            return
+
+    checker.tapleaf_hash = tapleaf_hash
+    witness_size = len(var_int.serialize(len(witness)))
+    witness_size += sum(len(var_bytes.serialize(item)) for item in witness)
+    checker.sigops_budget = SIGOPS_BUDGET_BASE + witness_size
+    if any(len(item) > MAX_ELEMENT_SIZE for item in stack):
+        raise BTClibValueError("witness element size limit exceeded")
+    eval_script(script, stack, checker, TAPSCRIPT)
+    _assert_true(stack, clean_stack=True)
+
+
+def _verify_witness(
+    version: int, program: bytes, witness: Stack, checker: TxChecker, p2sh: bool
+) -> None:
+
+    if version == 0:
+        if len(program) == 20:
+            if len(witness) != 2:
+                raise BTClibValueError(f"invalid p2wpkh witness: {len(witness)}")
+            script = ScriptPubKey.from_type_and_payload("p2pkh", program).script
+            stack = list(witness)
+        elif len(program) == 32:
+            if not witness:
+                raise BTClibValueError("empty p2wsh witness")
+            script = witness[-1]
+            if sha256(script) != program:
+                raise BTClibValueError("witness script hash mismatch")
+            stack = witness[:-1]
+        else:
+            raise BTClibValueError(f"invalid witness program size: {len(program)}")
+        if any(len(item) > MAX_ELEMENT_SIZE for item in stack):
+            raise BTClibValueError("witness element size limit exceeded")
+        eval_script(script, stack, checker, WITNESS_V0)
+        _assert_true(stack, clean_stack=True)
+    elif version == 1 and len(program) == 32 and not p2sh:
+        _verify_taproot(program, witness, checker)
+    # other witness versions and programs are reserved for upgrades
+
+
+def verify_input(
+    tx: Tx,
+    vin_i: int,
+    utxos: Sequence[TxOut],
+    sig_cache: Optional[SigCache] = None,
+    cache: Optional[sign_hash.SighashCache] = None,
+) -> None:
+    """Verify the tx input against the utxo it spends.
+
+    utxos are the outputs spent by all the tx inputs.
+    BTClibValueError is raised if the input is invalid.
+    """
+
+    checker = TxChecker(tx, vin_i, utxos, sig_cache, cache)
+    tx_in = tx.vin[vin_i]
+    script_sig = tx_in.script_sig
+    script_pub_key = utxos[vin_i].script_pub_key.script
+    witness = tx_in.script_witness.stack
+
+    stack: Stack = []
+    eval_script(script_sig, stack, checker)
+    p2sh_stack = stack.copy()
+    eval_script(script_pub_key, stack, checker)
+    _assert_true(stack)
+
+    witness_program = _witness_program(script_pub_key)
+    if witness_program:
+        if script_sig:
+            raise BTClibValueError("non-empty script_sig for native witness")
+        _verify_witness(*witness_program, witness, checker, p2sh=False)
+        return
+
+    if is_p2sh(script_pub_key):
+        if not is_push_only(script_sig):
+            raise BTClibValueError("non-push-only p2sh script_sig")
+        stack = p2sh_stack
+        redeem_script = stack.pop()
+        eval_script(redeem_script, stack, checker)
+        _assert_true(stack)
+        witness_program = _witness_program(redeem_script)
+        if witness_program:
+            if script_sig != op_pushdata(redeem_script):
+                raise BTClibValueError("malleated p2sh-wrapped witness script_sig")
+            _verify_witness(*witness_program, witness, checker, p2sh=True)
+            return
+
+    if witness:
+        raise BTClibValueError("unexpected witness")
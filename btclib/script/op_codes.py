@@ -115,6 +115,8 @@ OP_CODES = {
     "OP_CHECKSIGVERIFY": b"\xad",
     "OP_CHECKMULTISIG": b"\xae",
     "OP_CHECKMULTISIGVERIFY": b"\xaf",
+    # BIP342 tapscript only
+    "OP_CHECKSIGADD": b"\xba",
     # Locktime
     "OP_NOP2": b"\xb1",
     "OP_CHECKLOCKTIMEVERIFY": b"\xb1",
@@ -228,6 +230,7 @@ OP_CODE_NAMES = {
     183: "OP_NOP8",
     184: "OP_NOP9",
     185: "OP_NOP10",
+    186: "OP_CHECKSIGADD",
 }
 
 
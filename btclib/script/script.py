@@ -31,7 +31,7 @@ from btclib.script.op_codes import (
     op_pushdata,
     op_str,
 )
-from btclib.utils import bytes_from_octets, bytesio_from_binarydata
+from btclib.utils import _Tracked, bytes_from_octets, bytesio_from_binarydata
 
 Command = Union[int, str, bytes]
 
@@ -91,7 +91,7 @@ def parse(stream: BinaryData) -> List[Command]:
 
 
 @dataclass
-class Script:
+class Script(_Tracked):
     # Bitcoin script expressed as List[Command]
     # e.g. [OP_HASH160, script_h160, OP_EQUAL]
     # or Octets of its byte-encoded representation
@@ -110,7 +110,7 @@ class Script:
 
     def __init__(self, script: Octets = b"", check_validity: bool = True) -> None:
 
-        self.script = bytes_from_octets(script)
+        object.__setattr__(self, "script", bytes_from_octets(script))
         if check_validity:
             self.assert_valid()
 
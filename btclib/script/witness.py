@@ -15,13 +15,13 @@ from typing import Dict, List, Mapping, Optional, Sequence, Type, TypeVar
 
 from btclib import var_bytes, var_int
 from btclib.alias import BinaryData, Octets
-from btclib.utils import bytes_from_octets, bytesio_from_binarydata
+from btclib.utils import _track, _Tracked, bytes_from_octets, bytesio_from_binarydata
 
 _Witness = TypeVar("_Witness", bound="Witness")
 
 
 @dataclass
-class Witness:
+class Witness(_Tracked):
     stack: List[bytes]
 
     def __init__(
@@ -29,7 +29,8 @@ class Witness:
     ) -> None:
 
         # https://docs.python.org/3/tutorial/controlflow.html#default-argument-values
-        self.stack = [bytes_from_octets(element) for element in stack] if stack else []
+        stack_ = [bytes_from_octets(element) for element in stack] if stack else []
+        object.__setattr__(self, "stack", _track(stack_, self))
 
         if check_validity:
             self.assert_valid()
@@ -17,6 +17,7 @@ from btclib.base58 import b58decode
 from btclib.bip32.bip32 import BIP32Key, BIP32KeyData
 from btclib.ecc.curve import Curve, secp256k1
 from btclib.exceptions import BTClibValueError
+from btclib.key_format import PRV_OCTETS, WIF, XPRV, key_format
 from btclib.network import (
     NETWORKS,
     network_from_key_value,
@@ -59,16 +60,18 @@ def int_from_prv_key(prv_key: PrvKey, ec: Curve = secp256k1) -> int:
             raise BTClibValueError(f"ec / network ({network}) mismatch")
         return q
     else:
-        try:
-            q, network, _ = _prv_keyinfo_from_xprvwif(prv_key)
-        except ValueError:
-            pass
-        else:
-            # q has been validated on the xprv/wif network
-            ec2 = NETWORKS[network].curve
-            if ec != ec2:
-                raise BTClibValueError(f"ec / network ({network}) mismatch")
-            return q
+        # octets are not tentatively decoded as WIF/BIP32
+        if key_format(prv_key, ec) != PRV_OCTETS:
+            try:
+                q, network, _ = _prv_keyinfo_from_xprvwif(prv_key)
+            except ValueError:
+                pass
+            else:
+                # q has been validated on the xprv/wif network
+                ec2 = NETWORKS[network].curve
+                if ec != ec2:
+                    raise BTClibValueError(f"ec / network ({network}) mismatch")
+                return q
 
         # it must be octets
         try:
@@ -175,11 +178,15 @@ def _prv_keyinfo_from_xprvwif(
     """
 
     if not isinstance(xprvwif, BIP32KeyData):
-        try:
+        fmt = key_format(xprvwif)
+        if fmt == WIF:
             return _prv_keyinfo_from_wif(xprvwif, network, compressed)
-        # FIXME: except the NotPrvKeyError only, let InvalidPrvKey go through
-        except BTClibValueError:
-            pass
+        if fmt != XPRV:
+            try:
+                return _prv_keyinfo_from_wif(xprvwif, network, compressed)
+            # FIXME: except the NotPrvKeyError only, let InvalidPrvKey go through
+            except BTClibValueError:
+                pass
 
     return _prv_keyinfo_from_xprv(xprvwif, network, compressed)
 
@@ -197,11 +204,13 @@ def prv_keyinfo_from_prv_key(
     elif isinstance(prv_key, BIP32KeyData):
         return _prv_keyinfo_from_xprv(prv_key, network, compressed)
     else:
-        try:
-            return _prv_keyinfo_from_xprvwif(prv_key, network, compressed)
-        # FIXME: except the NotPrvKeyError only, let InvalidPrvKey go through
-        except ValueError:
-            pass
+        # octets are not tentatively decoded as WIF/BIP32
+        if key_format(prv_key, ec) != PRV_OCTETS:
+            try:
+                return _prv_keyinfo_from_xprvwif(prv_key, network, compressed)
+            # FIXME: except the NotPrvKeyError only, let InvalidPrvKey go through
+            except ValueError:
+                pass
 
         # it must be octets
         try:
@@ -10,13 +10,15 @@
 
 "Functions for conversions between different public key formats."
 
+import functools
 from typing import Optional, Tuple, Union
 
-from btclib.alias import Point
+from btclib.alias import Point, String
 from btclib.bip32.bip32 import BIP32Key, BIP32KeyData
 from btclib.ecc.curve import Curve, mult, secp256k1
 from btclib.ecc.sec_point import bytes_from_point, point_from_octets
 from btclib.exceptions import BTClibValueError
+from btclib.key_format import PRV_FORMATS, PUB_FORMATS, SEC, XPUB, key_format
 from btclib.network import (
     NETWORKS,
     curve_from_xkeyversion,
@@ -40,8 +42,23 @@ def _point_from_xpub(xpub: BIP32Key, ec: Curve) -> Point:
 
     if isinstance(xpub, BIP32KeyData):
         xpub.assert_valid()
-    else:
-        xpub = BIP32KeyData.b58decode(xpub)
+        return _point_from_valid_xpub(xpub, ec)
+
+    if isinstance(xpub, str):
+        xpub = xpub.strip()
+    elif isinstance(xpub, (bytearray, memoryview)):
+        # hashable, as required by the cache
+        xpub = bytes(xpub)
+    return _point_from_b58_xpub(xpub, ec)
+
+
+@functools.lru_cache(maxsize=1024)
+def _point_from_b58_xpub(xpub: String, ec: Curve) -> Point:
+    # least recently used cache of the xpub point decompression
+    return _point_from_valid_xpub(BIP32KeyData.b58decode(xpub), ec)
+
+
+def _point_from_valid_xpub(xpub: BIP32KeyData, ec: Curve) -> Point:
 
     if xpub.key[0] in (2, 3):
         ec2 = curve_from_xkeyversion(xpub.version)
@@ -66,14 +83,17 @@ def point_from_key(key: Key, ec: Curve = secp256k1) -> Point:
     if isinstance(key, int):
         q, _, _ = prv_keyinfo_from_prv_key(key)
         return mult(q, ec.G, ec)
-    try:
-        q, net, _ = prv_keyinfo_from_prv_key(key)
-    except BTClibValueError:
-        pass
-    else:
-        if ec != NETWORKS[net].curve:
-            raise BTClibValueError("Curve mismatch")
-        return mult(q, ec.G, ec)
+    fmt = key_format(key, ec)
+    # public keys are not tentatively parsed as private keys
+    if fmt not in PUB_FORMATS:
+        try:
+            q, net, _ = prv_keyinfo_from_prv_key(key)
+        except BTClibValueError:
+            pass
+        else:
+            if ec != NETWORKS[net].curve:
+                raise BTClibValueError("Curve mismatch")
+            return mult(q, ec.G, ec)
 
     return point_from_pub_key(key, ec)
 
@@ -87,10 +107,15 @@ def point_from_pub_key(pub_key: PubKey, ec: Curve = secp256k1) -> Point:
         raise BTClibValueError(f"not a valid public key: {pub_key}")
     if isinstance(pub_key, BIP32KeyData):
         return _point_from_xpub(pub_key, ec)
-    try:
+    fmt = key_format(pub_key, ec)
+    if fmt == XPUB:
         return _point_from_xpub(pub_key, ec)
-    except (TypeError, BTClibValueError):
-        pass
+    # SEC octets are not tentatively decoded as BIP32 keys
+    if fmt != SEC:
+        try:
+            return _point_from_xpub(pub_key, ec)
+        except (TypeError, BTClibValueError):
+            pass
 
     # it must be octets
     try:
@@ -155,10 +180,14 @@ def pub_keyinfo_from_key(
         return pub_keyinfo_from_pub_key(key, network, compressed)
     if isinstance(key, int):
         return pub_keyinfo_from_prv_key(key, network, compressed)
-    try:
-        return pub_keyinfo_from_pub_key(key, network, compressed)
-    except BTClibValueError:
-        pass
+    ec = NETWORKS["mainnet" if network is None else network].curve
+    fmt = key_format(key, ec)
+    # private keys are not tentatively parsed as public keys
+    if fmt not in PRV_FORMATS:
+        try:
+            return pub_keyinfo_from_pub_key(key, network, compressed)
+        except BTClibValueError:
+            pass
 
     # it must be a prv_key
     try:
@@ -187,10 +216,15 @@ def pub_keyinfo_from_pub_key(
         return bytes_from_point(pub_key, ec, compr), net
     if isinstance(pub_key, BIP32KeyData):
         return _pub_keyinfo_from_xpub(pub_key, network, compressed)
-    try:
+    fmt = key_format(pub_key, ec)
+    if fmt == XPUB:
         return _pub_keyinfo_from_xpub(pub_key, network, compressed)
-    except (TypeError, BTClibValueError):
-        pass
+    # SEC octets are not tentatively decoded as BIP32 keys
+    if fmt != SEC:
+        try:
+            return _pub_keyinfo_from_xpub(pub_key, network, compressed)
+        except (TypeError, BTClibValueError):
+            pass
 
     # it must be octets
     try:
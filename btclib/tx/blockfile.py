@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2020-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Reader of Bitcoin Core blocks/blk*.dat block files.
+
+Each block is stored in a blk file after an 8 bytes frame:
+the network magic bytes and the 4 bytes little endian block size.
+Block files are preallocated, so they can end with zero padding.
+
+Since Bitcoin Core v28 block files are obfuscated
+by XOR with the 8 bytes key stored in blocks/xor.dat.
+
+Block files are memory-mapped, never read into Python bytes:
+the index of block offsets is built scanning the frames only,
+and blocks are parsed on demand, either as Block
+or as lazy zero-copy TxView (if not obfuscated).
+
+Blocks can be indexed as block hash -> (file name, offset)
+and different files can be processed in parallel
+by a pool of worker processes.
+"""
+
+import json
+import mmap
+import os
+from functools import partial
+from glob import glob
+from os import path
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from btclib import var_int
+from btclib.exceptions import BTClibValueError
+from btclib.network import NETWORKS
+from btclib.tx.block_header import BlockHeader
+from btclib.tx.blocks import Block
+from btclib.tx.tx_view import TxView
+from btclib.utils import _map_chunks, hash256
+
+_T = TypeVar("_T")
+
+BlockIndex = Dict[bytes, Tuple[str, int]]
+
+
+def read_xor_key(blocks_dir: str) -> bytes:
+    "Return the obfuscation key of the blocks directory, if any."
+
+    filename = path.join(blocks_dir, "xor.dat")
+    if not path.isfile(filename):
+        return b""
+    with open(filename, "rb") as file_:
+        return file_.read()
+
+
+def _xor(data: Union[bytes, memoryview], xor_key: bytes, offset: int) -> bytes:
+    "Return the XOR of data, at offset of the file, with the repeated key."
+
+    size = len(data)
+    shift = offset % len(xor_key)
+    key = xor_key[shift:] + xor_key[:shift]
+    key *= size // len(key) + 1
+    data_int = int.from_bytes(data, "little")
+    key_int = int.from_bytes(key[:size], "little")
+    return (data_int ^ key_int).to_bytes(size, "little")
+
+
+class BlockFile:
+    """Memory-mapped Bitcoin Core blk*.dat block file.
+
+    Blocks are addressed by the offset of their data in the file,
+    i.e. after the magic bytes and size frame.
+
+    If not obfuscated, block data are memoryviews of the mapping:
+    they, and the TxViews using them, must be released
+    before closing the BlockFile.
+    """
+
+    def __init__(
+        self, filename: str, network: str = "mainnet", xor_key: bytes = b""
+    ) -> None:
+
+        self.filename = filename
+        # magic bytes are stored reversed
+        self.magic = NETWORKS[network].magic_bytes[::-1]
+        # an all zero key is no obfuscation
+        self.xor_key = xor_key if any(xor_key) else b""
+        with open(filename, "rb") as file_:
+            file_.seek(0, 2)
+            self.size = file_.tell()
+            # an empty file cannot be mapped
+            self._mmap = (
+                mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ)
+                if self.size
+                else None
+            )
+        self._offsets: Optional[List[int]] = None
+
+    def __enter__(self) -> "BlockFile":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _read(
+        self, offset: int, size: int, deobfuscate: bool = True
+    ) -> Union[bytes, memoryview]:
+        if self._mmap is None:
+            raise BTClibValueError(f"closed or empty block file: {self.filename}")
+        data = memoryview(self._mmap)[offset : offset + size]
+        if deobfuscate and self.xor_key:
+            return _xor(data, self.xor_key, offset)
+        return data
+
+    def _frame(self, offset: int) -> Tuple[bytes, int]:
+        "Return the magic bytes and size of the frame at offset."
+
+        frame = bytes(self._read(offset, 8))
+        return frame[:4], int.from_bytes(frame[4:], "little")
+
+    @property
+    def offsets(self) -> List[int]:
+        "Return the offsets of the blocks, scanning the frames only."
+
+        if self._offsets is None:
+            offsets = []
+            offset = 0
+            while offset + 8 <= self.size:
+                magic, size = self._frame(offset)
+                if magic != self.magic:
+                    # zero padding after the last block:
+                    # preallocated by Bitcoin Core, it is not obfuscated
+                    if self._read(offset, 4, deobfuscate=False) == b"\x00" * 4:
+                        break
+                    err_msg = f"invalid magic bytes at offset {offset}: {magic.hex()}"
+                    raise BTClibValueError(err_msg)
+                offset += 8
+                if offset + size > self.size:
+                    raise BTClibValueError(f"truncated block at offset {offset}")
+                offsets.append(offset)
+                offset += size
+            self._offsets = offsets
+        return self._offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def block_data(self, offset: int) -> Union[bytes, memoryview]:
+        "Return the serialized block at offset."
+
+        magic, size = self._frame(offset - 8)
+        if magic != self.magic:
+            raise BTClibValueError(f"invalid block offset: {offset}")
+        return self._read(offset, size)
+
+    def block_hash(self, offset: int) -> bytes:
+        "Return the hash of the block at offset, without parsing it."
+        return hash256(bytes(self._read(offset, 80)))[::-1]
+
+    def header(self, offset: int) -> BlockHeader:
+        return BlockHeader.parse(bytes(self._read(offset, 80)))
+
+    def block(self, offset: int, check_validity: bool = True) -> Block:
+        return Block.parse(bytes(self.block_data(offset)), check_validity)
+
+    def tx_views(self, offset: int) -> Iterator[TxView]:
+        "Yield the lazy views of the transactions of the block at offset."
+
+        data = self.block_data(offset)
+        n, pos = var_int.parse(bytes(data[80:89])), 80
+        pos += len(var_int.serialize(n))
+        for _ in range(n):
+            tx_view = TxView(data, pos)
+            pos = tx_view.end
+            yield tx_view
+
+    def blocks(self, check_validity: bool = True) -> Iterator[Block]:
+        for offset in self.offsets:
+            yield self.block(offset, check_validity)
+
+
+def block_files(blocks_dir: str) -> List[str]:
+    "Return the sorted file names of the blk*.dat files in blocks_dir."
+    return sorted(glob(path.join(blocks_dir, "blk[0-9]*.dat")))
+
+
+def _map_block_files(
+    filenames: Sequence[str],
+    func: Callable[[BlockFile], _T],
+    network: str,
+    xor_key: bytes,
+) -> List[_T]:
+    results: List[_T] = []
+    for filename in filenames:
+        with BlockFile(filename, network, xor_key) as block_file:
+            results.append(func(block_file))
+    return results
+
+
+def map_block_files(
+    func: Callable[[BlockFile], _T],
+    filenames: Sequence[str],
+    network: str = "mainnet",
+    xor_key: bytes = b"",
+    processes: Optional[int] = None,
+) -> List[_T]:
+    """Return the results of func applied to each BlockFile.
+
+    If processes is larger than one, files are processed
+    in parallel by a pool of worker processes:
+    func must then be a module level function.
+    """
+
+    map_func = partial(_map_block_files, func=func, network=network, xor_key=xor_key)
+    return _map_chunks(map_func, filenames, processes)
+
+
+def _block_hashes(block_file: BlockFile) -> List[Tuple[bytes, int]]:
+    "Return the (hash, offset) of the blocks of the BlockFile."
+    return [(block_file.block_hash(i), i) for i in block_file.offsets]
+
+
+def _file_state(filename: str) -> List[int]:
+    # block files are preallocated: the size alone does not change
+    stat = os.stat(filename)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def build_index(
+    blocks_dir: str,
+    network: str = "mainnet",
+    index_filename: Optional[str] = None,
+    processes: Optional[int] = None,
+) -> BlockIndex:
+    """Return the block hash -> (file name, offset) index of blocks_dir.
+
+    If index_filename is provided, the index is persisted there
+    as json, together with the size and modification time of each file:
+    at the next call only new or modified files are scanned,
+    and the blocks of deleted (e.g. pruned) files are dropped.
+    """
+
+    indexed: Dict[str, List[int]] = {}
+    index: BlockIndex = {}
+    if index_filename is not None and path.isfile(index_filename):
+        with open(index_filename, "r") as file_:
+            dict_ = json.load(file_)
+        indexed = dict_["files"]
+        for block_hash, (name, offset) in dict_["blocks"].items():
+            index[bytes.fromhex(block_hash)] = name, offset
+
+    # the state before the scan, as files could be modified meanwhile
+    states = {filename: _file_state(filename) for filename in block_files(blocks_dir)}
+    filenames = [
+        filename
+        for filename, state in states.items()
+        if indexed.get(path.basename(filename)) != state
+    ]
+    # deleted (e.g. pruned) files and files to be scanned again
+    current = {path.basename(filename) for filename in states}
+    stale = set(indexed) - current
+    stale.update(path.basename(filename) for filename in filenames)
+    if stale:
+        for name in stale:
+            indexed.pop(name, None)
+        index = {k: v for k, v in index.items() if v[0] not in stale}
+    xor_key = read_xor_key(blocks_dir)
+    results = map_block_files(_block_hashes, filenames, network, xor_key, processes)
+    for filename, block_hashes in zip(filenames, results):
+        name = path.basename(filename)
+        indexed[name] = states[filename]
+        for block_hash, offset in block_hashes:
+            index[block_hash] = name, offset
+
+    if index_filename is not None and (filenames or stale):
+        dict_ = {
+            "files": indexed,
+            "blocks": {k.hex(): list(v) for k, v in index.items()},
+        }
+        with open(index_filename, "w") as file_:
+            json.dump(dict_, file_)
+    return index
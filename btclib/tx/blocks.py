@@ -11,20 +11,42 @@
 """Block dataclass.
 
 Dataclass encapsulating BlockHeader and List[Tx].
+
+Block.iter_parse streams a block, yielding its header and then
+its transactions one at a time, with an optional incremental
+verification of the merkle root.
 """
 
 import sys
 from dataclasses import dataclass
 from math import ceil
-from typing import Any, Dict, List, Mapping, Optional, Sequence, Type, TypeVar
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
 from btclib import var_bytes, var_int
 from btclib.alias import BinaryData
 from btclib.exceptions import BTClibValueError
 from btclib.script.script import decode_num
 from btclib.tx.block_header import BlockHeader
+from btclib.tx.merkle import (
+    _assert_valid_witness_commitment,
+    _MerkleRoot,
+    assert_valid_witness_commitment,
+)
 from btclib.tx.tx import Tx
-from btclib.utils import bytesio_from_binarydata, hash256, merkle_root
+from btclib.utils import bytesio_from_binarydata, hash256
 
 # python 3.6
 if sys.version_info.minor == 6:  # pragma: no cover
@@ -37,6 +59,14 @@ _HF = hash256
 _Block = TypeVar("_Block", bound="Block")
 
 
+def _assert_valid_merkle_root(header: BlockHeader, merkle_root_: bytes) -> None:
+    merkle_root_ = merkle_root_[::-1]
+    if merkle_root_ != header.merkle_root:
+        err_msg = f"invalid merkle root: {header.merkle_root.hex()}"
+        err_msg += f" instead of: {merkle_root_.hex()}"
+        raise BTClibValueError(err_msg)
+
+
 @dataclass
 class Block:
     header: BlockHeader
@@ -117,15 +147,15 @@ class Block:
         return any(tx.is_segwit() for tx in self.transactions)
 
     def assert_valid_merkle_root(self) -> None:
-        data = [
-            tx.serialize(include_witness=False, check_validity=False)
-            for tx in self.transactions
-        ]
-        merkle_root_ = merkle_root(data, _HF)[::-1]
-        if merkle_root_ != self.header.merkle_root:
-            err_msg = f"invalid merkle root: {self.header.merkle_root.hex()}"
-            err_msg += f" instead of: {merkle_root_.hex()}"
-            raise BTClibValueError(err_msg)
+        # the cached tx ids, as the leaves are the hash256 of the transactions
+        merkle_root_ = _MerkleRoot()
+        for tx in self.transactions:
+            merkle_root_.add(tx.id[::-1])
+        _assert_valid_merkle_root(self.header, merkle_root_.root())
+
+    def assert_valid_witness_commitment(self) -> None:
+        "Assert the BIP141 coinbase commitment to the witness data."
+        assert_valid_witness_commitment(self.transactions)
 
     def assert_valid(self) -> None:
 
@@ -134,10 +164,11 @@ class Block:
         if not self.transactions[0].is_coinbase():
             raise BTClibValueError("first transaction is not a coinbase")
 
-        for transaction in self.transactions[1:]:
+        for transaction in self.transactions:
             transaction.assert_valid()
 
         self.assert_valid_merkle_root()
+        self.assert_valid_witness_commitment()
 
     def serialize(
         self, include_witness: bool = True, check_validity: bool = True
@@ -156,8 +187,55 @@ class Block:
         "Return a Block by parsing binary data."
 
         stream = bytesio_from_binarydata(data)
-        header = BlockHeader.parse(stream)
+        # validated once, as a whole block
+        header = BlockHeader.parse(stream, False)
         n = var_int.parse(stream)
-        transactions = [Tx.parse(stream) for _ in range(n)]
+        transactions = [Tx.parse(stream, False) for _ in range(n)]
 
         return cls(header, transactions, check_validity)
+
+    @staticmethod
+    def iter_parse(
+        data: Union[BinaryData, BinaryIO],
+        check_validity: bool = True,
+        check_merkle_root: bool = True,
+    ) -> Iterator[Union[BlockHeader, Tx]]:
+        """Yield the BlockHeader and then the Txs parsed from binary data.
+
+        Transactions are parsed only when requested,
+        so that memory usage is limited to the current transaction
+        if data is a stream (e.g. a file).
+        The merkle root and the witness merkle root are computed
+        incrementally: if check_merkle_root, after the last transaction
+        the former is checked against the header,
+        the latter against the coinbase witness commitment
+        (if there is witness data), as in Block.assert_valid.
+        """
+
+        # a file stream is read as it is, like a BytesIO
+        stream = bytesio_from_binarydata(cast(BinaryData, data))
+        header = BlockHeader.parse(stream, check_validity)
+        yield header
+
+        n = var_int.parse(stream)
+        merkle_root_ = _MerkleRoot()
+        witness_merkle_root = _MerkleRoot()
+        coinbase: Optional[Tx] = None
+        has_witness = False
+        for i in range(n):
+            tx = Tx.parse(stream, check_validity)
+            if i == 0:
+                if check_validity and not tx.is_coinbase():
+                    raise BTClibValueError("first transaction is not a coinbase")
+                coinbase = tx
+            if check_merkle_root:
+                merkle_root_.add(tx.id[::-1])
+                # the coinbase wtxid is zero
+                witness_merkle_root.add(tx.hash[::-1] if i else b"\x00" * 32)
+                has_witness |= tx.is_segwit()
+            yield tx
+        if check_merkle_root:
+            _assert_valid_merkle_root(header, merkle_root_.root())
+            if has_witness:
+                assert coinbase is not None
+                _assert_valid_witness_commitment(coinbase, witness_merkle_root.root())
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2020-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Bitcoin merkle trees of transactions.
+
+The leaves are the hash256 digests of the transactions,
+i.e. the (cached) tx.id in internal byte order (tx.id[::-1]),
+and the last node of odd levels is paired with itself.
+
+MerkleTree stores all the tree levels: appending or replacing a leaf
+only recomputes its O(log n) path to the root;
+merkle branches (inclusion proofs) are generated and verified.
+
+PartialMerkleTree is the BIP37 (merkleblock) partial merkle tree.
+
+The BIP141 witness commitment of the coinbase is the hash256
+of the witness merkle root and of the coinbase witness reserved value.
+
+https://github.com/bitcoin/bips/blob/master/bip-0037.mediawiki
+https://github.com/bitcoin/bips/blob/master/bip-0141.mediawiki
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple, Type, TypeVar
+
+from btclib import var_bytes, var_int
+from btclib.alias import BinaryData
+from btclib.exceptions import BTClibValueError
+from btclib.tx.tx import Tx
+from btclib.utils import bytesio_from_binarydata, hash256
+
+_HF = hash256
+
+# OP_RETURN, 36 bytes push, commitment header
+WITNESS_COMMITMENT_HEADER = bytes.fromhex("6a24aa21a9ed")
+
+_PartialMerkleTree = TypeVar("_PartialMerkleTree", bound="PartialMerkleTree")
+
+
+def _parent(nodes: Sequence[bytes], i: int) -> bytes:
+    "Return the parent of the i-th pair of nodes."
+
+    left = nodes[2 * i]
+    # odd level: pair the last node with itself
+    right = nodes[2 * i + 1] if 2 * i + 1 < len(nodes) else left
+    return _HF(left + right)
+
+
+class _MerkleRoot:
+    """Incremental merkle root of a stream of leaf hashes.
+
+    Only one pending hash per tree level is stored,
+    with the Bitcoin rule of duplicating the last hash of odd levels.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self._inner: List[bytes] = []
+
+    def add(self, leaf: bytes) -> None:
+        # the pending hashes are the set bits of count
+        level = 0
+        while self.count & (1 << level):
+            leaf = _HF(self._inner[level] + leaf)
+            level += 1
+        if level == len(self._inner):
+            self._inner.append(leaf)
+        else:
+            self._inner[level] = leaf
+        self.count += 1
+
+    def root(self) -> bytes:
+        if not self.count:
+            raise BTClibValueError("no merkle tree leaves")
+        count = self.count
+        level = 0
+        while not count & (1 << level):
+            level += 1
+        hash_ = self._inner[level]
+        while count != 1 << level:
+            # odd level: pair the hash with itself
+            hash_ = _HF(hash_ + hash_)
+            count += 1 << level
+            level += 1
+            while not count & (1 << level):
+                hash_ = _HF(self._inner[level] + hash_)
+                level += 1
+        return hash_
+
+
+def merkle_root(leaves: Iterable[bytes]) -> bytes:
+    "Return the merkle root of the leaves, storing only O(log n) hashes."
+
+    merkle_root_ = _MerkleRoot()
+    for leaf in leaves:
+        merkle_root_.add(leaf)
+    return merkle_root_.root()
+
+
+class MerkleTree:
+    """Merkle tree supporting leaf updates and inclusion proofs.
+
+    levels[0] are the leaves, levels[-1] is the root only.
+    """
+
+    def __init__(self, leaves: Iterable[bytes] = ()) -> None:
+
+        self.levels: List[List[bytes]] = [list(leaves)]
+        while len(self.levels[-1]) > 1:
+            nodes = self.levels[-1]
+            n_parents = (len(nodes) + 1) // 2
+            self.levels.append([_parent(nodes, i) for i in range(n_parents)])
+
+    @classmethod
+    def from_txs(cls, txs: Iterable[Tx]) -> "MerkleTree":
+        return cls(tx.id[::-1] for tx in txs)
+
+    def __len__(self) -> int:
+        return len(self.levels[0])
+
+    @property
+    def leaves(self) -> List[bytes]:
+        return self.levels[0]
+
+    @property
+    def root(self) -> bytes:
+        if not self.levels[0]:
+            raise BTClibValueError("no merkle tree leaves")
+        return self.levels[-1][0]
+
+    def _update(self, i: int) -> None:
+        "Recompute the path from the i-th leaf to the root."
+
+        level = 0
+        while len(self.levels[level]) > 1:
+            i //= 2
+            parent = _parent(self.levels[level], i)
+            if level + 1 == len(self.levels):
+                self.levels.append([])
+            parents = self.levels[level + 1]
+            if i == len(parents):
+                parents.append(parent)
+            else:
+                parents[i] = parent
+            level += 1
+
+    def append(self, leaf: bytes) -> None:
+        self.levels[0].append(leaf)
+        self._update(len(self.levels[0]) - 1)
+
+    def replace(self, i: int, leaf: bytes) -> None:
+        i = range(len(self))[i]
+        self.levels[0][i] = leaf
+        self._update(i)
+
+    def proof(self, i: int) -> List[bytes]:
+        "Return the merkle branch of the i-th leaf, from the bottom up."
+
+        i = range(len(self))[i]
+        branch = []
+        for nodes in self.levels[:-1]:
+            sibling = i ^ 1
+            branch.append(nodes[sibling] if sibling < len(nodes) else nodes[i])
+            i //= 2
+        return branch
+
+
+def root_from_proof(leaf: bytes, i: int, proof: Sequence[bytes]) -> bytes:
+    "Return the merkle root from the i-th leaf and its merkle branch."
+
+    if not 0 <= i < 1 << len(proof):
+        raise BTClibValueError(f"invalid leaf index: {i}")
+    hash_ = leaf
+    for node in proof:
+        hash_ = _HF(node + hash_) if i & 1 else _HF(hash_ + node)
+        i >>= 1
+    return hash_
+
+
+def verify_proof(leaf: bytes, i: int, proof: Sequence[bytes], root: bytes) -> bool:
+    "Return True if the merkle branch proves the inclusion of the leaf."
+
+    try:
+        return root_from_proof(leaf, i, proof) == root
+    except BTClibValueError:
+        return False
+
+
+def _width(n_leaves: int, height: int) -> int:
+    "Return the number of nodes at height of a tree with n_leaves."
+    return (n_leaves + (1 << height) - 1) >> height
+
+
+def _tree_height(n_leaves: int) -> int:
+    height = 0
+    while _width(n_leaves, height) > 1:
+        height += 1
+    return height
+
+
+@dataclass
+class PartialMerkleTree:
+    """BIP37 partial merkle tree.
+
+    It proves the inclusion of the matched leaves
+    in a tree of n_leaves, with the depth-first hashes
+    of the pruned subtrees and one flag bit per traversed node.
+    """
+
+    n_leaves: int
+    hashes: List[bytes]
+    flags: List[bool]
+
+    def __init__(
+        self,
+        n_leaves: int = 0,
+        hashes: Optional[Sequence[bytes]] = None,
+        flags: Optional[Sequence[bool]] = None,
+        check_validity: bool = True,
+    ) -> None:
+
+        self.n_leaves = n_leaves
+        # https://docs.python.org/3/tutorial/controlflow.html#default-argument-values
+        self.hashes = list(hashes) if hashes else []
+        self.flags = list(flags) if flags else []
+
+        if check_validity:
+            self.assert_valid()
+
+    @classmethod
+    def from_tree(
+        cls: Type[_PartialMerkleTree], tree: MerkleTree, matches: Sequence[bool]
+    ) -> _PartialMerkleTree:
+        "Return the partial merkle tree of the matched leaves of the tree."
+
+        if len(matches) != len(tree):
+            err_msg = "mismatched number of matches and leaves: "
+            err_msg += f"{len(matches)} vs {len(tree)}"
+            raise BTClibValueError(err_msg)
+        hashes: List[bytes] = []
+        flags: List[bool] = []
+
+        def build(height: int, pos: int) -> None:
+            # is this node the parent of at least one matched leaf?
+            parent_of_match = any(matches[pos << height : (pos + 1) << height])
+            flags.append(parent_of_match)
+            if height == 0 or not parent_of_match:
+                hashes.append(tree.levels[height][pos])
+            else:
+                build(height - 1, pos * 2)
+                if pos * 2 + 1 < _width(len(tree), height - 1):
+                    build(height - 1, pos * 2 + 1)
+
+        build(_tree_height(len(tree)), 0)
+        return cls(len(tree), hashes, flags)
+
+    def extract(self) -> Tuple[bytes, List[Tuple[int, bytes]]]:
+        "Return the merkle root and the matched (index, leaf) pairs."
+
+        self.assert_valid()
+        matches: List[Tuple[int, bytes]] = []
+        # number of flags and hashes used
+        used = [0, 0]
+
+        def traverse(height: int, pos: int) -> bytes:
+            if used[0] == len(self.flags):
+                raise BTClibValueError("not enough partial merkle tree flags")
+            flag = self.flags[used[0]]
+            used[0] += 1
+            if height == 0 or not flag:
+                if used[1] == len(self.hashes):
+                    raise BTClibValueError("not enough partial merkle tree hashes")
+                hash_ = self.hashes[used[1]]
+                used[1] += 1
+                if height == 0 and flag:
+                    matches.append((pos, hash_))
+                return hash_
+            left = traverse(height - 1, pos * 2)
+            right = left
+            if pos * 2 + 1 < _width(self.n_leaves, height - 1):
+                right = traverse(height - 1, pos * 2 + 1)
+                # CVE-2012-2459
+                if right == left:
+                    raise BTClibValueError("identical partial merkle tree nodes")
+            return _HF(left + right)
+
+        root = traverse(_tree_height(self.n_leaves), 0)
+        if used[1] != len(self.hashes):
+            raise BTClibValueError("unused partial merkle tree hashes")
+        # flags are serialized as bytes
+        if (used[0] + 7) // 8 != (len(self.flags) + 7) // 8:
+            raise BTClibValueError("unused partial merkle tree flags")
+        return root, matches
+
+    def assert_valid(self) -> None:
+        if not 0 < self.n_leaves <= 0xFFFFFFFF:
+            raise BTClibValueError(f"invalid number of leaves: {self.n_leaves}")
+        if len(self.hashes) > self.n_leaves:
+            err_msg = f"too many partial merkle tree hashes: {len(self.hashes)}"
+            raise BTClibValueError(err_msg)
+        if len(self.flags) < len(self.hashes):
+            err_msg = f"not enough partial merkle tree flags: {len(self.flags)}"
+            raise BTClibValueError(err_msg)
+        for hash_ in self.hashes:
+            if len(hash_) != 32:
+                raise BTClibValueError(f"invalid hash length: {len(hash_)}")
+
+    def serialize(self, check_validity: bool = True) -> bytes:
+        "Return the serialization, as in the merkleblock message."
+
+        if check_validity:
+            self.assert_valid()
+
+        out = self.n_leaves.to_bytes(4, byteorder="little", signed=False)
+        out += var_int.serialize(len(self.hashes))
+        out += b"".join(self.hashes)
+        # flag bits are packed least significant bit first
+        flags = bytearray((len(self.flags) + 7) // 8)
+        for i, flag in enumerate(self.flags):
+            flags[i // 8] |= flag << (i % 8)
+        return out + var_bytes.serialize(flags)
+
+    @classmethod
+    def parse(
+        cls: Type[_PartialMerkleTree], data: BinaryData, check_validity: bool = True
+    ) -> _PartialMerkleTree:
+        "Return a PartialMerkleTree by parsing binary data."
+
+        stream = bytesio_from_binarydata(data)
+        n_leaves = int.from_bytes(stream.read(4), byteorder="little", signed=False)
+        n_hashes = var_int.parse(stream)
+        hashes = [stream.read(32) for _ in range(n_hashes)]
+        flags = var_bytes.parse(stream)
+        bits = [bool(flags[i // 8] >> (i % 8) & 1) for i in range(len(flags) * 8)]
+        return cls(n_leaves, hashes, bits, check_validity)
+
+
+def witness_merkle_root(txs: Sequence[Tx]) -> bytes:
+    "Return the merkle root of the wtxids, the coinbase one being zero."
+
+    leaves = (tx.hash[::-1] for tx in txs[1:])
+    return merkle_root([b"\x00" * 32, *leaves])
+
+
+def witness_commitment(coinbase: Tx) -> Optional[bytes]:
+    "Return the witness commitment of the coinbase, if any."
+
+    # the last output matching the commitment pattern
+    for tx_out in reversed(coinbase.vout):
+        script = tx_out.script_pub_key.script
+        if len(script) >= 38 and script[:6] == WITNESS_COMMITMENT_HEADER:
+            return script[6:38]
+    return None
+
+
+def assert_valid_witness_commitment(txs: Sequence[Tx]) -> None:
+    """Assert that the coinbase commits to the witness data, if any.
+
+    Without witness data, as seen by legacy nodes, there is nothing to check.
+    """
+
+    if any(tx.is_segwit() for tx in txs):
+        _assert_valid_witness_commitment(txs[0], witness_merkle_root(txs))
+
+
+def _assert_valid_witness_commitment(coinbase: Tx, witness_root: bytes) -> None:
+
+    commitment = witness_commitment(coinbase)
+    if commitment is None:
+        raise BTClibValueError("unexpected witness data")
+
+    stack = coinbase.vin[0].script_witness.stack
+    if len(stack) != 1 or len(stack[0]) != 32:
+        raise BTClibValueError("invalid coinbase witness reserved value")
+    expected = _HF(witness_root + stack[0])
+    if commitment != expected:
+        err_msg = f"invalid witness commitment: {commitment.hex()}"
+        err_msg += f" instead of: {expected.hex()}"
+        raise BTClibValueError(err_msg)
@@ -19,14 +19,14 @@ from typing import Any, Dict, Mapping, Type, TypeVar, Union
 
 from btclib.alias import BinaryData, Octets
 from btclib.exceptions import BTClibValueError
-from btclib.utils import bytes_from_octets, bytesio_from_binarydata
+from btclib.utils import _Tracked, bytes_from_octets, bytesio_from_binarydata
 
 _OutPoint = TypeVar("_OutPoint", bound="OutPoint")
 
 
 # FIXME make it frozen
 @dataclass
-class OutPoint:
+class OutPoint(_Tracked):
     tx_id: bytes
     vout: int
 
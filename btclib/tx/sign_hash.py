@@ -15,12 +15,13 @@ https://raghavsood.com/blog/2018/06/10/bitcoin-signature-types-sighash
 https://wiki.bitcoinsv.io/index.php/SIGHASH_flags
 """
 
-from copy import deepcopy
-from typing import List
+import hashlib
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
 
-from btclib import var_bytes
+from btclib import var_bytes, var_int
 from btclib.alias import Octets
 from btclib.exceptions import BTClibValueError
+from btclib.hashes import tagged_hasher
 from btclib.script.script import Command, parse, serialize
 from btclib.script.script_pub_key import (
     ScriptPubKey,
@@ -31,8 +32,10 @@ from btclib.script.script_pub_key import (
 )
 from btclib.tx.tx import Tx
 from btclib.tx.tx_out import TxOut
-from btclib.utils import bytes_from_octets, hash256
+from btclib.utils import bytes_from_octets, hash256, sha256
 
+# BIP341 only: same as ALL, with no hash type byte in the signature
+DEFAULT = 0
 ALL = 1
 NONE = 2
 SINGLE = 3
@@ -48,6 +51,17 @@ SIG_HASH_TYPES = [
 ]
 
 
+TAPROOT_SIG_HASH_TYPES = [
+    DEFAULT,
+    ALL,
+    NONE,
+    SINGLE,
+    ANYONECANPAY | ALL,
+    ANYONECANPAY | NONE,
+    ANYONECANPAY | SINGLE,
+]
+
+
 def assert_valid_hash_type(hash_type: int) -> None:
     if hash_type not in SIG_HASH_TYPES:
         raise BTClibValueError(f"invalid sign_hash type: {hex(hash_type)}")
@@ -82,51 +96,221 @@ def witness_v0_script(script_pub_key: Octets) -> List[bytes]:
     return script_s[::-1]
 
 
-def legacy(script_: Octets, tx: Tx, vin_i: int, hash_type: int) -> bytes:
-    script_ = bytes_from_octets(script_)
+# serialized size of a TxIn with empty script_sig
+_BLANK_TX_IN_SIZE = 36 + 1 + 4
+# serialized TxOut with max value and empty script_pub_key
+_BLANK_TX_OUT = b"\xff" * 8 + b"\x00"
+
+
+class SighashCache:
+    """Per-transaction cache of the sign_hash invariant parts.
+
+    hash_prev_outs, hash_seqs, and hash_outputs (BIP143) are computed
+    lazily, at most once per transaction, and are shared by the
+    segwit_v0 sign_hash of all its inputs: this makes signing
+    or verifying all the inputs of a transaction linear in its size.
+
+    Similarly, the serialized outpoints, sequences, and outputs
+    are shared by the legacy sign_hash preimages of all the inputs,
+    and the sha_* aggregates (BIP341) by the taproot sign_hash;
+    sha_amounts and sha_script_pub_keys also require
+    the utxos spent by all the transaction inputs.
+
+    The transaction must not be modified while the cache is in use.
+    """
+
+    def __init__(self, tx: Tx, utxos: Optional[Sequence[TxOut]] = None) -> None:
+
+        self.tx = tx
+        self.utxos = utxos
+        self._sha: Dict[str, bytes] = {}
+        self._prev_outs: Optional[List[bytes]] = None
+        self._sequences: Optional[List[bytes]] = None
+        self._outputs: Optional[List[bytes]] = None
+        self._hash_prev_outs: Optional[bytes] = None
+        self._hash_seqs: Optional[bytes] = None
+        self._hash_outputs: Optional[bytes] = None
+        self._blank_tx_ins: Optional[bytes] = None
+        self._blank_tx_ins_no_seq: Optional[bytes] = None
+
+    @property
+    def prev_outs(self) -> List[bytes]:
+        if self._prev_outs is None:
+            self._prev_outs = [vin.prev_out.serialize() for vin in self.tx.vin]
+        return self._prev_outs
+
+    @property
+    def sequences(self) -> List[bytes]:
+        if self._sequences is None:
+            self._sequences = [
+                vin.sequence.to_bytes(4, byteorder="little", signed=False)
+                for vin in self.tx.vin
+            ]
+        return self._sequences
+
+    @property
+    def outputs(self) -> List[bytes]:
+        if self._outputs is None:
+            self._outputs = [vout.serialize(False) for vout in self.tx.vout]
+        return self._outputs
+
+    def _single_sha(self, name: str, parts: Callable[[], Iterable[bytes]]) -> bytes:
+        if name not in self._sha:
+            self._sha[name] = sha256(b"".join(parts()))
+        return self._sha[name]
+
+    @property
+    def sha_prev_outs(self) -> bytes:
+        return self._single_sha("prev_outs", lambda: self.prev_outs)
+
+    @property
+    def sha_sequences(self) -> bytes:
+        return self._single_sha("sequences", lambda: self.sequences)
+
+    @property
+    def sha_outputs(self) -> bytes:
+        return self._single_sha("outputs", lambda: self.outputs)
+
+    @property
+    def sha_amounts(self) -> bytes:
+        return self._single_sha(
+            "amounts",
+            lambda: (
+                utxo.value.to_bytes(8, byteorder="little", signed=False)
+                for utxo in self._utxos()
+            ),
+        )
 
-    new_tx = deepcopy(tx)
-    for txin in new_tx.vin:
-        txin.script_sig = b""
-    # TODO: delete sig from script_ (even if non standard)
-    new_tx.vin[vin_i].script_sig = script_
-    if hash_type & 0x1F == NONE:
-        new_tx.vout = []
-        for i, txin in enumerate(new_tx.vin):
-            if i != vin_i:
-                txin.sequence = 0
-
-    if hash_type & 0x1F == SINGLE:
-        # sign_hash single bug
-        if vin_i >= len(new_tx.vout):
-            return (256 ** 31).to_bytes(32, byteorder="big", signed=False)
-        new_tx.vout = new_tx.vout[: vin_i + 1]
-        for txout in new_tx.vout[:-1]:
-            txout.script_pub_key = ScriptPubKey(b"")
-            txout.value = 0xFFFFFFFFFFFFFFFF
-        for i, txin in enumerate(new_tx.vin):
-            if i != vin_i:
-                txin.sequence = 0
-
-    if hash_type & 0x80:
-        new_tx.vin = [new_tx.vin[vin_i]]
-
-    preimage = new_tx.serialize(include_witness=False, check_validity=False)
-    preimage += hash_type.to_bytes(4, byteorder="little", signed=False)
+    @property
+    def sha_script_pub_keys(self) -> bytes:
+        return self._single_sha(
+            "script_pub_keys",
+            lambda: (
+                var_bytes.serialize(utxo.script_pub_key.script)
+                for utxo in self._utxos()
+            ),
+        )
 
-    return hash256(preimage)
+    def _utxos(self) -> Sequence[TxOut]:
+        if self.utxos is None:
+            raise BTClibValueError("missing spent utxos")
+        return self.utxos
+
+    # BIP143 double sha256 aggregates, sha256 of the BIP341 ones
+
+    @property
+    def hash_prev_outs(self) -> bytes:
+        if self._hash_prev_outs is None:
+            self._hash_prev_outs = sha256(self.sha_prev_outs)
+        return self._hash_prev_outs
+
+    @property
+    def hash_seqs(self) -> bytes:
+        if self._hash_seqs is None:
+            self._hash_seqs = sha256(self.sha_sequences)
+        return self._hash_seqs
+
+    @property
+    def hash_outputs(self) -> bytes:
+        if self._hash_outputs is None:
+            self._hash_outputs = sha256(self.sha_outputs)
+        return self._hash_outputs
+
+    def blank_tx_ins(self, zero_sequences: bool) -> memoryview:
+        "Return the serialized tx inputs with empty script_sig."
+
+        if zero_sequences:
+            if self._blank_tx_ins_no_seq is None:
+                blank = b"\x00" * 5
+                self._blank_tx_ins_no_seq = blank.join(self.prev_outs) + blank
+            return memoryview(self._blank_tx_ins_no_seq)
+        if self._blank_tx_ins is None:
+            self._blank_tx_ins = b"".join(
+                prev_out + b"\x00" + sequence
+                for prev_out, sequence in zip(self.prev_outs, self.sequences)
+            )
+        return memoryview(self._blank_tx_ins)
+
+
+def _sighash_cache(tx: Tx, cache: Optional[SighashCache]) -> SighashCache:
+
+    if cache is None:
+        return SighashCache(tx)
+    if cache.tx is not tx:
+        raise BTClibValueError("sign_hash cache of a different transaction")
+    return cache
+
+
+def legacy(
+    script_: Octets,
+    tx: Tx,
+    vin_i: int,
+    hash_type: int,
+    cache: Optional[SighashCache] = None,
+) -> bytes:
+    """Return the legacy sign_hash of the tx input.
+
+    The preimage, i.e. the serialization of the tx modified
+    according to the hash_type, is streamed into the hash object
+    from the serialized parts of the (unmodified) tx,
+    that are shared among inputs by the optional SighashCache.
+    """
+
+    script_ = bytes_from_octets(script_)
+    # TODO: delete sig from script_ (even if non standard)
+    cache = _sighash_cache(tx, cache)
+
+    base_type = hash_type & 0x1F
+    # sign_hash single bug
+    if base_type == SINGLE and vin_i >= len(tx.vout):
+        return (256 ** 31).to_bytes(32, byteorder="big", signed=False)
+
+    preimage = hashlib.sha256(tx.version.to_bytes(4, byteorder="little", signed=True))
+
+    tx_in = cache.prev_outs[vin_i] + var_bytes.serialize(script_)
+    tx_in += cache.sequences[vin_i]
+    if hash_type & ANYONECANPAY:
+        preimage.update(b"\x01" + tx_in)
+    else:
+        preimage.update(var_int.serialize(len(tx.vin)))
+        blank_tx_ins = cache.blank_tx_ins(base_type in (NONE, SINGLE))
+        preimage.update(blank_tx_ins[: vin_i * _BLANK_TX_IN_SIZE])
+        preimage.update(tx_in)
+        preimage.update(blank_tx_ins[(vin_i + 1) * _BLANK_TX_IN_SIZE :])
+
+    if base_type == NONE:
+        preimage.update(b"\x00")
+    elif base_type == SINGLE:
+        preimage.update(var_int.serialize(vin_i + 1))
+        preimage.update(_BLANK_TX_OUT * vin_i)
+        preimage.update(cache.outputs[vin_i])
+    else:
+        preimage.update(var_int.serialize(len(tx.vout)))
+        for output in cache.outputs:
+            preimage.update(output)
+
+    preimage.update(tx.lock_time.to_bytes(4, byteorder="little", signed=False))
+    preimage.update(hash_type.to_bytes(4, byteorder="little", signed=False))
+
+    return hashlib.sha256(preimage.digest()).digest()
 
 
 # https://github.com/bitcoin/bitcoin/blob/4b30c41b4ebf2eb70d8a3cd99cf4d05d405eec81/test/functional/test_framework/script.py#L673
 def segwit_v0(
-    script_: Octets, tx: Tx, vin_i: int, hash_type: int, amount: int
+    script_: Octets,
+    tx: Tx,
+    vin_i: int,
+    hash_type: int,
+    amount: int,
+    cache: Optional[SighashCache] = None,
 ) -> bytes:
     script_ = bytes_from_octets(script_)
 
+    cache = _sighash_cache(tx, cache)
+
     hash_prev_outs = b"\x00" * 32
     if not hash_type & ANYONECANPAY:
-        hash_prev_outs = b"".join([vin.prev_out.serialize() for vin in tx.vin])
-        hash_prev_outs = hash256(hash_prev_outs)
+        hash_prev_outs = cache.hash_prev_outs
 
     hash_seqs = b"\x00" * 32
     if (
@@ -134,18 +318,11 @@ def segwit_v0(
         and (hash_type & 0x1F) != SINGLE
         and (hash_type & 0x1F) != NONE
     ):
-        hash_seqs = b"".join(
-            [
-                vin.sequence.to_bytes(4, byteorder="little", signed=False)
-                for vin in tx.vin
-            ]
-        )
-        hash_seqs = hash256(hash_seqs)
+        hash_seqs = cache.hash_seqs
 
     hash_outputs = b"\x00" * 32
     if hash_type & 0x1F not in (SINGLE, NONE):
-        hash_outputs = b"".join([vout.serialize() for vout in tx.vout])
-        hash_outputs = hash256(hash_outputs)
+        hash_outputs = cache.hash_outputs
     elif (hash_type & 0x1F) == SINGLE and vin_i < len(tx.vout):
         hash_outputs = hash256(tx.vout[vin_i].serialize())
 
@@ -166,22 +343,118 @@ def segwit_v0(
     return hash256(preimage)
 
 
-def from_utxo(utxo: TxOut, tx: Tx, vin_i: int, hash_type: int) -> bytes:
+def taproot(
+    tx: Tx,
+    vin_i: int,
+    utxos: Sequence[TxOut],
+    hash_type: int,
+    ext_flag: int = 0,
+    annex: Octets = b"",
+    tapleaf_hash: Octets = b"",
+    codesep_pos: int = 0xFFFFFFFF,
+    cache: Optional[SighashCache] = None,
+) -> bytes:
+    """Return the BIP341 taproot sign_hash of the tx input.
+
+    utxos are the outputs spent by all the tx inputs.
+    ext_flag is 0 for key path spending and 1 for BIP342 script path
+    spending, that also commits to the tapleaf_hash of the executed
+    leaf script and to the position of its last executed OP_CODESEPARATOR.
+
+    The message is streamed into the TapSighash tagged hash midstate;
+    the sha_* aggregates are shared among inputs by the optional
+    SighashCache, that must be built with the same utxos.
+
+    https://github.com/bitcoin/bips/blob/master/bip-0341.mediawiki
+    """
+
+    if hash_type not in TAPROOT_SIG_HASH_TYPES:
+        raise BTClibValueError(f"invalid taproot sign_hash type: {hex(hash_type)}")
+    if ext_flag not in (0, 1):
+        raise BTClibValueError(f"invalid extension flag: {ext_flag}")
+    if len(utxos) != len(tx.vin):
+        err_msg = "mismatched number of utxos and tx inputs: "
+        err_msg += f"{len(utxos)} vs {len(tx.vin)}"
+        raise BTClibValueError(err_msg)
+    base_type = hash_type & 0x03
+    if base_type == SINGLE and vin_i >= len(tx.vout):
+        raise BTClibValueError(f"missing output for sign_hash single: {vin_i}")
+    annex = bytes_from_octets(annex)
+    if annex and annex[0] != 0x50:
+        raise BTClibValueError(f"invalid annex prefix: {hex(annex[0])}")
+
+    cache = _sighash_cache(tx, cache)
+    if cache.utxos is None:
+        cache.utxos = utxos
+    elif cache.utxos is not utxos:
+        raise BTClibValueError("sign_hash cache of different utxos")
+
+    # epoch, hash_type, version, lock_time
+    msg = tagged_hasher(b"TapSighash")
+    msg.update(b"\x00" + hash_type.to_bytes(1, byteorder="little", signed=False))
+    msg.update(tx.version.to_bytes(4, byteorder="little", signed=True))
+    msg.update(tx.lock_time.to_bytes(4, byteorder="little", signed=False))
+    if not hash_type & ANYONECANPAY:
+        msg.update(cache.sha_prev_outs)
+        msg.update(cache.sha_amounts)
+        msg.update(cache.sha_script_pub_keys)
+        msg.update(cache.sha_sequences)
+    if base_type not in (NONE, SINGLE):
+        msg.update(cache.sha_outputs)
+
+    spend_type = ext_flag * 2 + (1 if annex else 0)
+    msg.update(spend_type.to_bytes(1, byteorder="little", signed=False))
+    if hash_type & ANYONECANPAY:
+        utxo = utxos[vin_i]
+        msg.update(cache.prev_outs[vin_i])
+        msg.update(utxo.value.to_bytes(8, byteorder="little", signed=False))
+        msg.update(var_bytes.serialize(utxo.script_pub_key.script))
+        msg.update(cache.sequences[vin_i])
+    else:
+        msg.update(vin_i.to_bytes(4, byteorder="little", signed=False))
+    if annex:
+        msg.update(sha256(var_bytes.serialize(annex)))
+    if base_type == SINGLE:
+        msg.update(sha256(cache.outputs[vin_i]))
+
+    if ext_flag == 1:
+        # tapleaf_hash, key_version, codesep_pos
+        msg.update(bytes_from_octets(tapleaf_hash, 32) + b"\x00")
+        msg.update(codesep_pos.to_bytes(4, byteorder="little", signed=False))
+
+    return msg.digest()
+
+
+def from_utxo(
+    utxo: TxOut,
+    tx: Tx,
+    vin_i: int,
+    hash_type: int,
+    cache: Optional[SighashCache] = None,
+) -> bytes:
+    """Return the sign_hash of the tx input spending utxo.
+
+    The optional SighashCache of tx is shared among its inputs.
+    """
 
     script = utxo.script_pub_key.script
 
+    # [OP_1, 32-bytes witness program]
+    if len(script) == 34 and script[:2] == b"\x51\x20":
+        raise BTClibValueError("taproot sign_hash requires all the spent utxos")
+
     # first off, handle all p2sh-wrapped scripts
     if is_p2sh(script):
         script = tx.vin[vin_i].script_sig
 
     if is_p2wpkh(script):
         script_ = witness_v0_script(script)[0]
-        return segwit_v0(script_, tx, vin_i, hash_type, utxo.value)
+        return segwit_v0(script_, tx, vin_i, hash_type, utxo.value, cache)
 
     if is_p2wsh(script):
         # the real script is contained in the witness
         script_ = witness_v0_script(tx.vin[vin_i].script_witness.stack[-1])[0]
-        return segwit_v0(script_, tx, vin_i, hash_type, utxo.value)
+        return segwit_v0(script_, tx, vin_i, hash_type, utxo.value, cache)
 
     script_ = legacy_script(script)[0]
-    return legacy(script_, tx, vin_i, hash_type)
+    return legacy(script_, tx, vin_i, hash_type, cache)
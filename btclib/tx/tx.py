@@ -24,12 +24,28 @@ https://medium.com/summa-technology/bitcoins-time-locks-27e0c362d7a1
 https://bitcoin.stackexchange.com/questions/40764/is-my-understanding-of-locktime-correct
 https://en.bitcoin.it/wiki/Timelock
 
+The serializations and their hash256 (i.e. id and hash) are cached:
+the cache is filled with the raw bytes read by Tx.parse
+and it is invalidated when the transaction, its inputs, outputs,
+or witness stacks are mutated, as they notify the transaction
+of any change (see utils._Tracked).
 """
 
 from dataclasses import dataclass
 from io import SEEK_CUR
 from math import ceil
-from typing import Any, Dict, List, Mapping, Optional, Sequence, Type, TypeVar, Union
+from typing import (
+    Any,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from btclib import var_int
 from btclib.alias import BinaryData
@@ -37,15 +53,50 @@ from btclib.exceptions import BTClibValueError
 from btclib.script.witness import Witness
 from btclib.tx.tx_in import TX_IN_COMPARES_WITNESS, TxIn
 from btclib.tx.tx_out import TxOut
-from btclib.utils import bytesio_from_binarydata, hash256
+from btclib.utils import _track, _Tracked, bytesio_from_binarydata, hash256
 
 _SEGWIT_MARKER = b"\x00\x01"
 
 _Tx = TypeVar("_Tx", bound="Tx")
 
 
+def _var_int_size(i: int) -> int:
+    if i < 0xFD:
+        return 1
+    if i <= 0xFFFF:
+        return 3
+    return 5 if i <= 0xFFFFFFFF else 9
+
+
+def _sizes(vin: Sequence[TxIn], vout: Sequence[TxOut]) -> Tuple[int, int]:
+    "Return the serialization sizes, without and with witness, of a Tx."
+
+    size = 8 + _var_int_size(len(vin)) + _var_int_size(len(vout))
+    # prev_out tx_id and vout, script_sig, sequence
+    size += sum(
+        40 + _var_int_size(len(tx_in.script_sig)) + len(tx_in.script_sig)
+        for tx_in in vin
+    )
+    # value, script_pub_key
+    size += sum(
+        8
+        + _var_int_size(len(tx_out.script_pub_key.script))
+        + len(tx_out.script_pub_key.script)
+        for tx_out in vout
+    )
+    stacks = [tx_in.script_witness.stack for tx_in in vin]
+    if not any(stacks):
+        return size, size
+    witness_size = len(_SEGWIT_MARKER) + sum(
+        _var_int_size(len(stack))
+        + sum(_var_int_size(len(element)) + len(element) for element in stack)
+        for stack in stacks
+    )
+    return size, size + witness_size
+
+
 @dataclass
-class Tx:
+class Tx(_Tracked):
     # 4 bytes, _signed_ little endian
     version: int
     # 0	Not locked
@@ -70,12 +121,23 @@ class Tx:
         "Return the nLockTime int for compatibility with CTransaction."
         return self.lock_time
 
+    def _changed(self) -> None:
+        "Invalidate the serialization cache, the transaction has changed."
+        # a new dict, as a shallow copy of the transaction shares the old one
+        self._cached: Dict[Tuple[str, bool], bytes] = {}
+        super()._changed()
+
+    def _hash256(self, include_witness: bool) -> bytes:
+        key = ("hash256", include_witness)
+        if key not in self._cached:
+            serialized = self.serialize(include_witness, check_validity=False)
+            self._cached[key] = hash256(serialized)
+        return self._cached[key]
+
     @property
     def id(self) -> bytes:
         "Return the transaction id."
-        serialized_ = self.serialize(include_witness=False, check_validity=False)
-        hash256_ = hash256(serialized_)
-        return hash256_[::-1]
+        return self._hash256(include_witness=False)[::-1]
 
     @property
     def hash(self) -> bytes:
@@ -83,9 +145,7 @@ class Tx:
 
         It differs from tx_id for witness transactions.
         """
-        serialized_ = self.serialize(include_witness=True, check_validity=False)
-        hash256_ = hash256(serialized_)
-        return hash256_[::-1]
+        return self._hash256(include_witness=True)[::-1]
 
     @property
     def size(self) -> int:
@@ -126,11 +186,14 @@ class Tx:
         check_validity: bool = True,
     ) -> None:
 
-        self.version = version
-        self.lock_time = lock_time
+        # serializations and their hash256, keyed by include_witness
+        self._cached = {}
+
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "lock_time", lock_time)
         # https://docs.python.org/3/tutorial/controlflow.html#default-argument-values
-        self.vin = list(vin) if vin else []
-        self.vout = list(vout) if vout else []
+        object.__setattr__(self, "vin", _track(list(vin) if vin else [], self))
+        object.__setattr__(self, "vout", _track(list(vout) if vout else [], self))
 
         if check_validity:
             self.assert_valid()
@@ -203,9 +266,13 @@ class Tx:
         if check_validity:
             self.assert_valid()
 
-        segwit = include_witness and self.is_segwit()
+        key = ("serialized", include_witness)
+        if key in self._cached:
+            return self._cached[key]
 
-        return b"".join(
+        is_segwit = self.is_segwit()
+        segwit = include_witness and is_segwit
+        serialized = b"".join(
             [
                 self.version.to_bytes(4, byteorder="little", signed=True),  # int32_t
                 _SEGWIT_MARKER if segwit else b"",
@@ -221,12 +288,18 @@ class Tx:
                 self.lock_time.to_bytes(4, byteorder="little", signed=False),
             ]
         )
+        self._cached[key] = serialized
+        if not is_segwit:
+            # the same serialization, with or without witness
+            self._cached[("serialized", not include_witness)] = serialized
+        return serialized
 
     @classmethod
     def parse(cls: Type[_Tx], data: BinaryData, check_validity: bool = True) -> _Tx:
         "Return a Tx by parsing binary data."
 
         stream = bytesio_from_binarydata(data)
+        start = stream.tell()
 
         # version is a signed int (int32_t, not uint32_t)
         version = int.from_bytes(stream.read(4), byteorder="little", signed=True)
@@ -237,10 +310,11 @@ class Tx:
             stream.seek(-2, SEEK_CUR)  # current position
 
         n = var_int.parse(stream)
-        vin = [TxIn.parse(stream) for _ in range(n)]
+        vin = [TxIn.parse(stream, check_validity) for _ in range(n)]
 
         n = var_int.parse(stream)
-        vout = [TxOut.parse(stream) for _ in range(n)]
+        vout = [TxOut.parse(stream, check_validity) for _ in range(n)]
+        witness_start = stream.tell()
 
         if segwit:
             for tx_in in vin:
@@ -248,4 +322,23 @@ class Tx:
 
         lock_time = int.from_bytes(stream.read(4), byteorder="little", signed=False)
 
-        return cls(version, lock_time, vin, vout, check_validity)
+        tx = cls(version, lock_time, vin, vout, check_validity)
+
+        # fill the cache with the raw bytes,
+        # unless they are not the canonical serialization
+        # (e.g. non-minimal var_int or superfluous witness)
+        end = stream.tell()
+        stream.seek(start)
+        serialized_ = stream.read(end - start)
+        no_witness = serialized_
+        if segwit:
+            no_witness = serialized_[:4] + serialized_[6 : witness_start - start]
+            no_witness += serialized_[-4:]
+        sizes = _sizes(tx.vin, tx.vout)
+        if len(no_witness) == sizes[0]:
+            tx._cached[("serialized", False)] = no_witness
+            if sizes[0] == sizes[1]:
+                tx._cached[("serialized", True)] = no_witness
+        if segwit and len(serialized_) == sizes[1] != sizes[0]:
+            tx._cached[("serialized", True)] = serialized_
+        return tx
@@ -14,14 +14,14 @@ Dataclass encapsulating prev_out, script_sig, sequence, and script_witness.
 """
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, Mapping, Type, TypeVar
+from typing import Any, Dict, Mapping, Optional, Type, TypeVar
 
 from btclib import var_bytes
 from btclib.alias import BinaryData, Octets
 from btclib.exceptions import BTClibValueError
 from btclib.script.witness import Witness
 from btclib.tx.out_point import OutPoint
-from btclib.utils import bytes_from_octets, bytesio_from_binarydata
+from btclib.utils import _track, _Tracked, bytes_from_octets, bytesio_from_binarydata
 
 _TxIn = TypeVar("_TxIn", bound="TxIn")
 
@@ -29,7 +29,7 @@ TX_IN_COMPARES_WITNESS = True
 
 
 @dataclass
-class TxIn:
+class TxIn(_Tracked):
     prev_out: OutPoint
     script_sig: bytes
     # If all TxIns have final (0xffffffff) sequence numbers
@@ -63,17 +63,20 @@ class TxIn:
 
     def __init__(
         self,
-        prev_out: OutPoint = OutPoint(),
+        prev_out: Optional[OutPoint] = None,
         script_sig: Octets = b"",
         sequence: int = 0,
-        script_witness: Witness = Witness(),
+        script_witness: Optional[Witness] = None,
         check_validity: bool = True,
     ) -> None:
 
-        self.prev_out = prev_out
-        self.script_sig = bytes_from_octets(script_sig)
-        self.sequence = sequence
-        self.script_witness = script_witness
+        # https://docs.python.org/3/tutorial/controlflow.html#default-argument-values
+        prev_out = OutPoint() if prev_out is None else prev_out
+        object.__setattr__(self, "prev_out", _track(prev_out, self))
+        object.__setattr__(self, "script_sig", bytes_from_octets(script_sig))
+        object.__setattr__(self, "sequence", sequence)
+        script_witness = Witness() if script_witness is None else script_witness
+        object.__setattr__(self, "script_witness", _track(script_witness, self))
 
         if check_validity:
             self.assert_valid()
@@ -21,14 +21,14 @@ from btclib import var_bytes
 from btclib.alias import BinaryData, Octets, String
 from btclib.amount import btc_from_sats, sats_from_btc
 from btclib.script.script_pub_key import ScriptPubKey, type_and_payload
-from btclib.utils import bytes_from_octets, bytesio_from_binarydata
+from btclib.utils import _track, _Tracked, bytes_from_octets, bytesio_from_binarydata
 
 _TxOut = TypeVar("_TxOut", bound="TxOut")
 
 
 # FIXME make it frozen
 @dataclass
-class TxOut:
+class TxOut(_Tracked):
     # 8 bytes, unsigned little endian
     value: int  # denominated in satoshi
     script_pub_key: ScriptPubKey
@@ -54,7 +54,7 @@ class TxOut:
         if not isinstance(script_pub_key, ScriptPubKey):
             script_bytes = bytes_from_octets(script_pub_key)
             script_pub_key = ScriptPubKey(script_bytes)
-        object.__setattr__(self, "script_pub_key", script_pub_key)
+        object.__setattr__(self, "script_pub_key", _track(script_pub_key, self))
 
         if check_validity:
             self.assert_valid()
@@ -108,7 +108,9 @@ class TxOut:
         stream = bytesio_from_binarydata(data)
         value = int.from_bytes(stream.read(8), byteorder="little", signed=False)
         script = var_bytes.parse(stream)
-        return cls(value, ScriptPubKey(script, "mainnet"), check_validity)
+        return cls(
+            value, ScriptPubKey(script, "mainnet", check_validity), check_validity
+        )
 
     @classmethod
     def from_address(cls: Type[_TxOut], value: int, address: String) -> _TxOut:
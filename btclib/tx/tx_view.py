@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2020-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Read-only transaction view (TxView) over raw bytes.
+
+TxView records the field offsets of a serialized transaction
+in a single pass over a memoryview, without copying any data:
+inputs and outputs are decoded only when accessed.
+
+It is meant for scanning large amounts of transactions (e.g. blocks)
+when only a few fields are needed, e.g. output values and scripts
+or input outpoints; to_tx returns the full Tx when needed.
+
+The hashes are computed from the raw bytes as they are:
+for non-canonical serializations (e.g. non-minimal var_int)
+they differ from those of the equivalent Tx.
+"""
+
+from array import array
+from hashlib import sha256
+from math import ceil
+from typing import Callable, Iterator, List, Sequence, Tuple, TypeVar, Union, overload
+
+from btclib.alias import Octets
+from btclib.exceptions import BTClibRuntimeError
+from btclib.script.witness import Witness
+from btclib.tx.out_point import OutPoint
+from btclib.tx.tx import Tx
+from btclib.tx.tx_in import TxIn
+from btclib.tx.tx_out import TxOut
+from btclib.utils import bytes_from_octets
+
+_T = TypeVar("_T")
+
+
+def _var_int(buf: memoryview, pos: int) -> Tuple[int, int]:
+    "Return the var_int at pos and the position after it."
+
+    i = buf[pos]
+    if i < 0xFD:
+        return i, pos + 1
+    size = 2 if i == 0xFD else 4 if i == 0xFE else 8
+    return int.from_bytes(buf[pos + 1 : pos + 1 + size], "little"), pos + 1 + size
+
+
+def _skip_var_bytes(buf: memoryview, pos: int) -> int:
+    "Return the position after the var_bytes at pos."
+
+    size, pos = _var_int(buf, pos)
+    return pos + size
+
+
+class _LazySequence(Sequence[_T]):
+    "Sequence whose items are decoded on demand."
+
+    def __init__(self, length: int, decode: Callable[[int], _T]) -> None:
+        self._length = length
+        self._decode = decode
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, i: int) -> _T:
+        ...
+
+    @overload
+    def __getitem__(self, i: slice) -> List[_T]:
+        ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[_T, List[_T]]:
+        if isinstance(i, slice):
+            return [self._decode(j) for j in range(*i.indices(self._length))]
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("index out of range")
+        return self._decode(i)
+
+    def __iter__(self) -> Iterator[_T]:
+        return (self._decode(i) for i in range(self._length))
+
+
+class TxView:
+    """Read-only view of the transaction serialized at offset of data.
+
+    The view holds a memoryview of data, i.e. data is not copied
+    and must not be modified while the view is in use.
+    end is the offset of the first byte after the transaction.
+    """
+
+    def __init__(
+        self, data: Union[Octets, bytearray, memoryview], offset: int = 0
+    ) -> None:
+
+        if isinstance(data, str):
+            data = bytes_from_octets(data)
+        buf = memoryview(data)
+        self._buf = buf
+        self.start = offset
+
+        try:
+            self.version = int.from_bytes(
+                buf[offset : offset + 4], "little", signed=True
+            )
+            pos = offset + 4
+            self._segwit = buf[pos : pos + 2] == b"\x00\x01"
+            if self._segwit:
+                pos += 2
+
+            self._body = pos
+            n, pos = _var_int(buf, pos)
+            # n + 1 offsets: the last one is the end of the last item
+            self._vin = array("L", [pos])
+            for _ in range(n):
+                # prev_out, script_sig, sequence
+                pos = _skip_var_bytes(buf, pos + 36) + 4
+                self._vin.append(pos)
+
+            n, pos = _var_int(buf, pos)
+            self._vout = array("L", [pos])
+            for _ in range(n):
+                # value, script_pub_key
+                pos = _skip_var_bytes(buf, pos + 8)
+                self._vout.append(pos)
+
+            self._witness = array("L", [pos])
+            self._has_witness = False
+            if self._segwit:
+                for _ in range(len(self._vin) - 1):
+                    n, pos = _var_int(buf, pos)
+                    self._has_witness |= n > 0
+                    for _ in range(n):
+                        pos = _skip_var_bytes(buf, pos)
+                    self._witness.append(pos)
+        except IndexError as e:
+            raise BTClibRuntimeError("not enough binary data") from e
+
+        self.end = pos + 4
+        if self.end > len(buf):
+            raise BTClibRuntimeError("not enough binary data")
+        self.lock_time = int.from_bytes(buf[pos : self.end], "little")
+
+    # vin and vout are not stored: the bound decode methods would make
+    # a reference cycle, keeping the memoryview alive until collected
+    @property
+    def vin(self) -> Sequence[TxIn]:
+        return _LazySequence(len(self._vin) - 1, self._tx_in)
+
+    @property
+    def vout(self) -> Sequence[TxOut]:
+        return _LazySequence(len(self._vout) - 1, self._tx_out)
+
+    def _parts(self, include_witness: bool) -> Tuple[memoryview, ...]:
+        "Return the memoryview slices of the serialization."
+
+        buf = self._buf
+        if include_witness and self._has_witness or not self._segwit:
+            return (buf[self.start : self.end],)
+        return (
+            buf[self.start : self.start + 4],
+            buf[self._body : self._witness[0]],
+            buf[self.end - 4 : self.end],
+        )
+
+    def _hash256(self, include_witness: bool) -> bytes:
+        hash_ = sha256()
+        for part in self._parts(include_witness):
+            hash_.update(part)
+        return sha256(hash_.digest()).digest()
+
+    @property
+    def id(self) -> bytes:
+        "Return the transaction id."
+        return self._hash256(include_witness=False)[::-1]
+
+    @property
+    def hash(self) -> bytes:
+        """Return the transaction hash.
+
+        It differs from tx_id for witness transactions.
+        """
+        return self._hash256(include_witness=True)[::-1]
+
+    @property
+    def size(self) -> int:
+        "Return the transaction size."
+        return sum(len(part) for part in self._parts(include_witness=True))
+
+    @property
+    def vsize(self) -> int:
+        """Return the virtual transaction size.
+
+        It differs from size for witness transactions.
+        """
+        return ceil(self.weight / 4)
+
+    @property
+    def weight(self) -> int:
+        no_wit = sum(len(part) for part in self._parts(include_witness=False)) * 3
+        return no_wit + self.size
+
+    def is_segwit(self) -> bool:
+        return self._has_witness
+
+    def is_coinbase(self) -> bool:
+        if len(self.vin) != 1:
+            return False
+        pos = self._vin[0]
+        return self._buf[pos : pos + 36] == b"\x00" * 32 + b"\xff" * 4
+
+    def serialize(self, include_witness: bool) -> bytes:
+        return b"".join(self._parts(include_witness))
+
+    def to_tx(self, check_validity: bool = True) -> Tx:
+        "Return the full Tx."
+        return Tx.parse(self.serialize(include_witness=True), check_validity)
+
+    def prev_out(self, i: int) -> OutPoint:
+        "Return the prev_out of the i-th input, without decoding the input."
+        pos = self._vin[range(len(self.vin))[i]]
+        tx_id = self._buf[pos : pos + 32].tobytes()[::-1]
+        vout = int.from_bytes(self._buf[pos + 32 : pos + 36], "little")
+        return OutPoint(tx_id, vout, check_validity=False)
+
+    def value(self, i: int) -> int:
+        "Return the value of the i-th output, without decoding the output."
+        pos = self._vout[range(len(self.vout))[i]]
+        return int.from_bytes(self._buf[pos : pos + 8], "little")
+
+    def script_pub_key(self, i: int) -> memoryview:
+        "Return the script_pub_key of the i-th output, without copying it."
+        i = range(len(self.vout))[i]
+        _, pos = _var_int(self._buf, self._vout[i] + 8)
+        return self._buf[pos : self._vout[i + 1]]
+
+    def _tx_in(self, i: int) -> TxIn:
+        tx_in = TxIn.parse(self._buf[self._vin[i] : self._vin[i + 1]].tobytes())
+        if self._segwit:
+            witness = self._buf[self._witness[i] : self._witness[i + 1]]
+            tx_in.script_witness = Witness.parse(witness.tobytes())
+        return tx_in
+
+    def _tx_out(self, i: int) -> TxOut:
+        return TxOut.parse(self._buf[self._vout[i] : self._vout[i + 1]].tobytes())
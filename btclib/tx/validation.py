@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2020-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Block-level signature validation.
+
+The input signatures of a Block are checked against the spent utxos,
+provided by a lookup callable (e.g. backed by a utxo set),
+for the following script types:
+
+- p2pkh
+- p2wpkh, also p2sh-wrapped
+- p2wsh m-of-n multisig, also p2sh-wrapped
+- p2tr key path
+
+All the sign_hashes are computed in the calling process,
+sharing a SighashCache among the inputs of each transaction.
+The elliptic curve verifications, by far the bottleneck,
+are then fanned out to a pool of worker processes,
+with BIP340 signatures batch verified.
+
+Only the signatures are checked, along with the hashes committing
+to public keys and scripts: scripts are not executed
+(e.g. timelocks are not enforced). Other inputs are reported
+as not verified, as those with a missing utxo.
+"""
+
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+from btclib.ecc import dsa, ssa
+from btclib.exceptions import BTClibValueError
+from btclib.script.script_pub_key import is_p2ms, type_and_payload
+from btclib.tx import sign_hash
+from btclib.tx.blocks import Block
+from btclib.tx.out_point import OutPoint
+from btclib.tx.tx import Tx
+from btclib.tx.tx_out import TxOut
+from btclib.utils import _map_chunks, hash160, sha256
+
+UtxoLookup = Callable[[OutPoint], Optional[TxOut]]
+
+# (msg_hashes, pub_keys, DER sigs), verified as OP_CHECKMULTISIG
+_EcdsaTask = Tuple[List[bytes], List[bytes], List[bytes]]
+# (msg_hash, x-only pub_key, sig)
+_Bip340Task = Tuple[bytes, bytes, bytes]
+
+
+@dataclass
+class InputResult:
+    tx_i: int
+    vin_i: int
+    script_type: str
+    # None if not verified, e.g. for unsupported scripts or missing utxos
+    valid: Optional[bool]
+    error: str = ""
+
+
+@dataclass
+class BlockValidation:
+    results: List[InputResult]
+    # wall-clock seconds
+    elapsed: float
+    processes: int
+
+    def is_valid(self) -> bool:
+        "Return True if all the (non-coinbase) inputs are verified as valid."
+        return all(result.valid for result in self.results)
+
+    @property
+    def n_verified(self) -> int:
+        return sum(result.valid is not None for result in self.results)
+
+    @property
+    def inputs_per_second(self) -> float:
+        return self.n_verified / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def inputs_per_second_per_core(self) -> float:
+        return self.inputs_per_second / self.processes
+
+
+def _pushes(script: bytes) -> List[bytes]:
+    "Return the data pushed by a push-only script."
+
+    pushes: List[bytes] = []
+    pos = 0
+    while pos < len(script):
+        op_code = script[pos]
+        pos += 1
+        if op_code < 0x4C:
+            size = op_code
+        elif op_code <= 0x4E:
+            n_bytes = 1 << (op_code - 0x4C)
+            size = int.from_bytes(script[pos : pos + n_bytes], "little")
+            pos += n_bytes
+        else:
+            raise BTClibValueError(f"non-push script_sig op code: {op_code}")
+        if pos + size > len(script):
+            raise BTClibValueError("invalid script_sig push")
+        pushes.append(script[pos : pos + size])
+        pos += size
+    return pushes
+
+
+def _multisig(script: bytes) -> Tuple[int, List[bytes]]:
+    "Return m and the public keys of a m-of-n multisig script."
+
+    if not is_p2ms(script):
+        raise BTClibValueError("unsupported witness script")
+    pub_keys = []
+    pos = 1
+    for _ in range(script[-2] - 0x50):
+        size = script[pos]
+        pub_keys.append(script[pos + 1 : pos + 1 + size])
+        pos += 1 + size
+    return script[0] - 0x50, pub_keys
+
+
+def _ecdsa_task(
+    sigs: Sequence[bytes],
+    pub_keys: List[bytes],
+    script_: bytes,
+    tx: Tx,
+    vin_i: int,
+    utxo: Optional[TxOut],
+    cache: sign_hash.SighashCache,
+) -> _EcdsaTask:
+    "Return the verification task, utxo is None for legacy sign_hashes."
+
+    msg_hashes = []
+    for sig in sigs:
+        if not sig:
+            raise BTClibValueError("empty signature")
+        # the last byte is the sign_hash type
+        if utxo is None:
+            msg_hash = sign_hash.legacy(script_, tx, vin_i, sig[-1], cache)
+        else:
+            msg_hash = sign_hash.segwit_v0(
+                script_, tx, vin_i, sig[-1], utxo.value, cache
+            )
+        msg_hashes.append(msg_hash)
+    return msg_hashes, pub_keys, [sig[:-1] for sig in sigs]
+
+
+def _witness_v0_task(
+    script_pub_key: bytes,
+    tx: Tx,
+    vin_i: int,
+    utxo: TxOut,
+    cache: sign_hash.SighashCache,
+) -> Tuple[str, _EcdsaTask]:
+
+    script_type, payload = type_and_payload(script_pub_key)
+    stack = tx.vin[vin_i].script_witness.stack
+    if script_type == "p2wpkh":
+        if len(stack) != 2:
+            raise BTClibValueError(f"invalid p2wpkh witness size: {len(stack)}")
+        if hash160(stack[1]) != payload:
+            raise BTClibValueError("public key hash mismatch")
+        script_ = sign_hash.witness_v0_script(script_pub_key)[0]
+        task = _ecdsa_task(stack[:1], stack[1:], script_, tx, vin_i, utxo, cache)
+        return script_type, task
+    if script_type == "p2wsh":
+        if not stack:
+            raise BTClibValueError("empty p2wsh witness")
+        if sha256(stack[-1]) != payload:
+            raise BTClibValueError("witness script hash mismatch")
+        m, pub_keys = _multisig(stack[-1])
+        # the extra element consumed by OP_CHECKMULTISIG
+        if len(stack) != m + 2 or stack[0]:
+            raise BTClibValueError(f"invalid p2wsh multisig witness: {m}-of-n")
+        task = _ecdsa_task(stack[1:-1], pub_keys, stack[-1], tx, vin_i, utxo, cache)
+        return script_type, task
+    raise BTClibValueError(f"unsupported p2sh redeem script: {script_type}")
+
+
+def _taproot_task(
+    x_Q: bytes,
+    tx: Tx,
+    vin_i: int,
+    utxos: Optional[List[TxOut]],
+    cache: sign_hash.SighashCache,
+) -> Union[_Bip340Task, str]:
+    "Return the verification task, or why the input cannot be verified."
+
+    stack = tx.vin[vin_i].script_witness.stack
+    annex = b""
+    if len(stack) > 1 and stack[-1][:1] == b"\x50":
+        annex = stack[-1]
+        stack = stack[:-1]
+    if len(stack) != 1:
+        return "unsupported taproot script path"
+    if utxos is None:
+        return "missing utxo of other input"
+    sig = stack[0]
+    if len(sig) == 64:
+        hash_type = sign_hash.DEFAULT
+    elif len(sig) == 65 and sig[64] != sign_hash.DEFAULT:
+        hash_type = sig[64]
+    else:
+        raise BTClibValueError(f"invalid taproot signature size: {len(sig)}")
+    msg_hash = sign_hash.taproot(tx, vin_i, utxos, hash_type, annex=annex, cache=cache)
+    return msg_hash, x_Q, sig[:64]
+
+
+def _input_result(
+    result: InputResult,
+    tx: Tx,
+    utxos: Sequence[Optional[TxOut]],
+    spent: Optional[List[TxOut]],
+    cache: sign_hash.SighashCache,
+) -> Union[_EcdsaTask, _Bip340Task, None]:
+    """Return the verification task of the input, if any.
+
+    Otherwise the result is updated with the reason:
+    valid is False for invalid inputs, None if the input cannot be verified.
+    """
+
+    vin_i = result.vin_i
+    tx_in = tx.vin[vin_i]
+    utxo = utxos[vin_i]
+    if utxo is None:
+        result.error = "missing utxo"
+        return None
+    script_pub_key = utxo.script_pub_key.script
+    result.script_type, payload = type_and_payload(script_pub_key)
+    try:
+        if result.script_type == "p2pkh":
+            pushes = _pushes(tx_in.script_sig)
+            if len(pushes) != 2:
+                raise BTClibValueError(f"invalid p2pkh script_sig: {len(pushes)}")
+            if hash160(pushes[1]) != payload:
+                raise BTClibValueError("public key hash mismatch")
+            script_ = script_pub_key
+            return _ecdsa_task(pushes[:1], pushes[1:], script_, tx, vin_i, None, cache)
+        if result.script_type == "p2sh":
+            pushes = _pushes(tx_in.script_sig)
+            if len(pushes) != 1 or hash160(pushes[0]) != payload:
+                raise BTClibValueError("redeem script hash mismatch")
+            script_type, task = _witness_v0_task(pushes[0], tx, vin_i, utxo, cache)
+            result.script_type = f"{script_type}_p2sh"
+            return task
+        if result.script_type in ("p2wpkh", "p2wsh"):
+            return _witness_v0_task(script_pub_key, tx, vin_i, utxo, cache)[1]
+        # [OP_1, 32-bytes witness program]
+        if len(script_pub_key) == 34 and script_pub_key[:2] == b"\x51\x20":
+            result.script_type = "p2tr"
+            x_Q = script_pub_key[2:]
+            bip340_task = _taproot_task(x_Q, tx, vin_i, spent, cache)
+            if isinstance(bip340_task, str):
+                result.error = bip340_task
+                return None
+            return bip340_task
+    except BTClibValueError as e:
+        result.valid = False
+        result.error = str(e)
+        return None
+    result.error = "unsupported script_pub_key"
+    return None
+
+
+def _verify_ecdsa(task: _EcdsaTask) -> bool:
+    "Verify the signatures against the public keys, as OP_CHECKMULTISIG."
+
+    msg_hashes, pub_keys, sigs = task
+    k = 0
+    for msg_hash, sig in zip(msg_hashes, sigs):
+        # consensus does not require low s
+        while k < len(pub_keys) and not dsa.verify_(
+            msg_hash, pub_keys[k], sig, lower_s=False
+        ):
+            k += 1
+        if k == len(pub_keys):
+            return False
+        k += 1
+    return True
+
+
+def _verify_bip340(batch: Sequence[_Bip340Task]) -> List[bool]:
+    "Batch verify the BIP340 signatures, one by one only if the batch fails."
+
+    try:
+        msg_hashes = [msg_hash for msg_hash, _, _ in batch]
+        x_Qs = [x_Q for _, x_Q, _ in batch]
+        sigs = [ssa.Sig.parse(sig) for _, _, sig in batch]
+        if ssa.batch_verify_(msg_hashes, x_Qs, sigs):
+            return [True] * len(batch)
+    except Exception:  # pylint: disable=broad-except
+        pass
+    return [ssa.verify_(msg_hash, x_Q, sig) for msg_hash, x_Q, sig in batch]
+
+
+def _verify_ecdsa_tasks(tasks: Sequence[_EcdsaTask]) -> List[bool]:
+    return [_verify_ecdsa(task) for task in tasks]
+
+
+def _verify_bip340_tasks(tasks: Sequence[_Bip340Task], batch_size: int) -> List[bool]:
+    return [
+        valid
+        for i in range(0, len(tasks), batch_size)
+        for valid in _verify_bip340(tasks[i : i + batch_size])
+    ]
+
+
+def validate_signatures(
+    block: Block,
+    utxo_lookup: UtxoLookup,
+    processes: Optional[int] = None,
+    batch_size: int = 64,
+) -> BlockValidation:
+    """Return the signature verification results of the block inputs.
+
+    utxo_lookup returns the TxOut spent by an OutPoint, or None if unknown.
+    If processes is larger than one, signatures are verified
+    in parallel by a pool of worker processes; BIP340 signatures
+    are batch verified in batches of batch_size.
+    """
+
+    if batch_size < 1:
+        raise BTClibValueError(f"invalid batch size: {batch_size}")
+    start = time.perf_counter()
+
+    results: List[InputResult] = []
+    ecdsa_tasks: List[_EcdsaTask] = []
+    ecdsa_results: List[InputResult] = []
+    bip340_tasks: List[_Bip340Task] = []
+    bip340_results: List[InputResult] = []
+    for tx_i, tx in enumerate(block.transactions):
+        if tx.is_coinbase():
+            continue
+        utxos = [utxo_lookup(tx_in.prev_out) for tx_in in tx.vin]
+        spent = [utxo for utxo in utxos if utxo is not None]
+        # all the spent utxos are needed by taproot sign_hashes
+        all_spent = spent if len(spent) == len(utxos) else None
+        cache = sign_hash.SighashCache(tx)
+        for vin_i in range(len(tx.vin)):
+            result = InputResult(tx_i, vin_i, "unknown", None)
+            results.append(result)
+            task = _input_result(result, tx, utxos, all_spent, cache)
+            if task is None:
+                continue
+            if result.script_type == "p2tr":
+                bip340_tasks.append(task)  # type: ignore
+                bip340_results.append(result)
+            else:
+                ecdsa_tasks.append(task)  # type: ignore
+                ecdsa_results.append(result)
+
+    processes = max(1, processes or 1)
+    ecdsa_valid = _map_chunks(_verify_ecdsa_tasks, ecdsa_tasks, processes)
+    func = partial(_verify_bip340_tasks, batch_size=batch_size)
+    bip340_valid = _map_chunks(func, bip340_tasks, processes)
+
+    for result, valid in zip(ecdsa_results, ecdsa_valid):
+        result.valid = valid
+    for result, valid in zip(bip340_results, bip340_valid):
+        result.valid = valid
+    for result in ecdsa_results + bip340_results:
+        if not result.valid:
+            result.error = "signature verification failed"
+
+    return BlockValidation(results, time.perf_counter() - start, processes)
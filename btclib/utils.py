@@ -17,8 +17,22 @@ https://www.secg.org/sec1-v2.pdf
 
 import hashlib
 from collections.abc import Iterable as IterableCollection
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
-from typing import Callable, Iterable, List, Optional, Union
+from math import ceil
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+from weakref import ref
 
 from btclib.alias import BinaryData, Integer, Octets
 from btclib.exceptions import BTClibValueError
@@ -59,15 +73,16 @@ def merkle_root(data: List[bytes], hf: Callable[[Union[bytes, str]], bytes]) ->
     until a single value (root) is obtained.
     """
 
-    data = [hf(item) for item in data]
+    return _merkle_root([hf(item) for item in data], hf)
+
+
+def _merkle_root(data: List[bytes], hf: Callable[[Union[bytes, str]], bytes]) -> bytes:
+    "Return the Merkel tree root of a list of already hashed leaves."
+
     while len(data) != 1:
-        parent_level = []
-        if len(data) % 2:
-            data.append(data[-1])
-        for i in range(0, len(data), 2):
-            parent = hf(data[i] + data[i + 1])
-            parent_level.append(parent)
-        data = parent_level[:]
+        # odd level: pair the last hash with itself
+        last = len(data) - 1
+        data = [hf(data[i] + data[min(i + 1, last)]) for i in range(0, len(data), 2)]
     return data[0]
 
 
@@ -188,3 +203,172 @@ def hex_string(i: Integer) -> str:
     lresult = [(a_str[max(0, i - 8) : i]) for i in indx]
     result = " ".join(lresult)
     return result.upper()
+
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
+def _map_chunks(
+    func: Callable[[Sequence[_T]], Iterable[_R]],
+    items: Sequence[_T],
+    processes: Optional[int] = None,
+) -> List[_R]:
+    """Return the concatenated results of func applied to chunks of items.
+
+    If processes is larger than one, items are split in (at most)
+    processes chunks processed in parallel by a pool of worker processes:
+    func must then be picklable, e.g. a module level function
+    or a functools.partial of it.
+    Otherwise func is applied to all the items at once.
+    """
+
+    if processes is None or processes < 2 or len(items) < 2:
+        return list(func(items))
+
+    n_chunks = min(processes, len(items))
+    size = ceil(len(items) / n_chunks)
+    chunks = [items[i : i + size] for i in range(0, len(items), size)]
+    with ProcessPoolExecutor(max_workers=n_chunks) as executor:
+        return [result for chunk in executor.map(func, chunks) for result in chunk]
+
+
+class _Tracked:
+    """Mixin notifying the owners of an object when it is mutated.
+
+    Replacing a public attribute, or mutating a list one,
+    calls _changed on the object and, recursively, on its owners:
+    e.g. a Tx is notified of any change to its inputs, outputs,
+    and witness stacks, without inspecting them.
+    List attributes are stored as (shallow copy) _TrackedList.
+    """
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name[0] != "_":
+            object.__setattr__(self, name, _track(value, self))
+            self._changed()
+        else:
+            object.__setattr__(self, name, value)
+
+    def _changed(self) -> None:
+        for owner_ref in self.__dict__.get("_owners", ()):
+            owner = owner_ref()
+            if owner is not None:
+                owner._changed()  # pylint: disable=protected-access
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # the owners are not copied, they register themselves again
+        state = self.__dict__.copy()
+        state.pop("_owners", None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+def _track(value: Any, owner: _Tracked) -> Any:
+    """Return the value to be stored as an attribute of owner.
+
+    Constructors, having no owners to notify yet, can skip __setattr__
+    with object.__setattr__(self, name, _track(value, self)).
+    """
+
+    if isinstance(value, list):
+        return _tracked_list(value, owner)
+    _add_owner(value, owner)
+    return value
+
+
+def _add_owner(item: Any, owner: _Tracked) -> None:
+
+    if not isinstance(item, _Tracked):
+        return
+    # weak references, as an owner does not need to be kept alive,
+    # in a tuple, as dataclasses are not hashable
+    owners = item.__dict__.get("_owners")
+    if owners is None:
+        item.__dict__["_owners"] = (ref(owner),)
+    elif not any(owner_ref() is owner for owner_ref in owners):
+        owners = tuple(owner_ref for owner_ref in owners if owner_ref() is not None)
+        item.__dict__["_owners"] = owners + (ref(owner),)
+
+
+def _tracked_list(items: Iterable[Any], owner: _Tracked) -> "_TrackedList":
+
+    tracked = _TrackedList(items)
+    tracked._owner = ref(owner)  # pylint: disable=protected-access
+    for item in tracked:
+        if isinstance(item, _Tracked):
+            _add_owner(item, owner)
+    return tracked
+
+
+class _TrackedList(list):  # type: ignore[type-arg]
+    "List notifying its owner, also made owner of the items, when mutated."
+
+    __slots__ = ("_owner",)
+    _owner: "ref[_Tracked]"
+
+    def _changed(self, items: Iterable[Any] = ()) -> None:
+        owner = self._owner()
+        if owner is not None:
+            for item in items:
+                _add_owner(item, owner)
+            owner._changed()  # pylint: disable=protected-access
+
+    def __reduce_ex__(self, protocol: Any) -> Tuple[Any, ...]:
+        # copied and pickled as a plain list, tracked again by the new owner
+        return list, (list(self),)
+
+    def __setitem__(self, i: Any, value: Any) -> None:
+        value = list(value) if isinstance(i, slice) else value
+        super().__setitem__(i, value)
+        self._changed(value if isinstance(i, slice) else [value])
+
+    def __delitem__(self, i: Any) -> None:
+        super().__delitem__(i)
+        self._changed()
+
+    def __iadd__(self, items: Iterable[Any]) -> "_TrackedList":  # type: ignore[misc]
+        self.extend(items)
+        return self
+
+    def __imul__(self, n: Any) -> "_TrackedList":  # type: ignore[misc]
+        super().__imul__(n)
+        self._changed()
+        return self
+
+    def append(self, item: Any) -> None:
+        super().append(item)
+        self._changed([item])
+
+    def extend(self, items: Iterable[Any]) -> None:
+        items = list(items)
+        super().extend(items)
+        self._changed(items)
+
+    def insert(self, i: Any, item: Any) -> None:
+        super().insert(i, item)
+        self._changed([item])
+
+    def pop(self, i: Any = -1) -> Any:
+        item = super().pop(i)
+        self._changed()
+        return item
+
+    def remove(self, item: Any) -> None:
+        super().remove(item)
+        self._changed()
+
+    def clear(self) -> None:
+        super().clear()
+        self._changed()
+
+    def sort(self, *args: Any, **kwargs: Any) -> None:
+        super().sort(*args, **kwargs)
+        self._changed()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._changed()
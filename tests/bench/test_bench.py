@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2020-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.bench` module."
+
+import json
+from os import path
+from pathlib import Path
+
+import pytest
+
+from btclib.bench import bench, ecc, keys
+from btclib.bench.__main__ import main
+from btclib.exceptions import BTClibValueError
+
+
+def test_run_cases() -> None:
+    cases = {"a": lambda: 1 + 1, "b": lambda: sum(range(100))}
+    results = bench.run_cases(cases, repeat=2, number=3)
+    assert set(results) == {"a", "b"}
+    for result in results.values():
+        assert result["number"] == 3
+        assert result["repeat"] == 2
+        assert 0 < result["min"] <= result["median"]
+
+    results = bench.run_cases(cases, repeat=1, pattern="^b")
+    assert list(results) == ["b"]
+    assert results["b"]["number"] > 1
+
+    with pytest.raises(BTClibValueError, match="invalid repeat: "):
+        bench.run_cases(cases, repeat=0)
+    with pytest.raises(BTClibValueError, match="invalid number: "):
+        bench.run_cases(cases, number=0)
+
+
+def test_compare() -> None:
+    old = {"results": {"a": {"min": 1.0}, "b": {"min": 1.0}, "c": {"min": 1.0}}}
+    new = {"results": {"a": {"min": 1.05}, "b": {"min": 2.0}, "d": {"min": 1.0}}}
+    comparisons, regressions = bench.compare(old, new)
+    assert [c[0] for c in comparisons] == ["a", "b"]
+    assert regressions == [("b", 1.0, 2.0, 2.0)]
+    _, regressions = bench.compare(old, new, 0.01)
+    assert [c[0] for c in regressions] == ["a", "b"]
+    with pytest.raises(BTClibValueError, match="negative threshold: "):
+        bench.compare(old, new, -0.1)
+
+    assert "ratio" in bench.format_comparisons(comparisons)
+
+
+def test_ecc_suite(tmp_path: Path) -> None:
+    cases = ecc.cases()
+    for alg in ecc.MULT_ALGORITHMS:
+        for ec_name in ecc.CURVE_NAMES:
+            assert f"{alg}[{ec_name}]" in cases
+    for name in ("dsa.verify", "ssa.verify", "bms.verify", "ssa.batch_verify[4]"):
+        assert name in cases
+    # all cases are valid computations
+    for name in ("dsa.verify", "ssa.verify", "bms.verify", "ssa.batch_verify[4]"):
+        cases[name]()
+
+    filename = path.join(tmp_path, "bench.json")
+    assert main(["ecc", "-r", "1", "-n", "1", "-k", "from_key", "-o", filename]) == 0
+    with open(filename, "r") as file_:
+        report = json.load(file_)
+    assert report["suite"] == "ecc"
+    assert "python" in report["metadata"]
+    assert report["results"]
+    assert all("from_key" in name for name in report["results"])
+
+    assert main(["compare", filename, filename]) == 0
+    report["results"] = {k: {"min": v["min"] / 2} for k, v in report["results"].items()}
+    old_filename = path.join(tmp_path, "old.json")
+    bench.save(report, old_filename)
+    assert main(["compare", old_filename, filename]) == 1
+
+
+def test_keys_suite() -> None:
+    cases = keys.cases()
+    for f_name in keys.PRV_FUNCTIONS:
+        for key_name in keys.prv_keys():
+            assert f"{f_name}[{key_name}]" in cases
+    for f_name in keys.PUB_FUNCTIONS:
+        for key_name in keys.pub_keys():
+            assert f"{f_name}[{key_name}]" in cases
+    # all cases are valid computations
+    for name, case in cases.items():
+        if not name.startswith("key_format"):
+            case()
+    assert main(["keys", "-r", "1", "-n", "1", "-k", "key_format"]) == 0
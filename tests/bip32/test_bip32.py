@@ -12,23 +12,32 @@
 
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
 from os import path
+from typing import Tuple
 
 import pytest
 
 from btclib import base58, hashes
 from btclib.b58 import p2pkh  # FIXME why it is needed here
+from btclib.bip32 import bip32
 from btclib.bip32.bip32 import (
+    BIP32Key,
     BIP32KeyData,
+    _DerivationCache,
     _derive,
+    clear_derivation_cache,
     crack_prv_key,
     derive,
+    derive_children,
     derive_from_account,
     rootxprv_from_seed,
+    set_derivation_cache_size,
     xpub_from_xprv,
 )
 from btclib.bip32.der_path import _indexes_from_bip32_path_str
 from btclib.exceptions import BTClibValueError
+from btclib.network import NETWORKS
 
 
 def test_exceptions() -> None:
@@ -161,6 +170,37 @@ def test_serialization() -> None:
     assert xpub == xpub2
 
 
+def test_decoding_cache_and_parse() -> None:
+    xkey = "xprv9s21ZrQH143K3QTDL4LXw2F7HEK3wJUD2nW2nRk4stbPy6cq3jPPqjiChkVvvNKmPGJxWUtg6LnF5kejMRNNU3TGtRBeJgk33yuGBxrMPHi"
+    decoded_key = base58.b58decode(xkey, 78)
+
+    bip32._b58decode_valid_xkey.cache_clear()
+    xkey_data = BIP32KeyData.b58decode(xkey)
+    xkey_data2 = BIP32KeyData.b58decode(xkey)
+    assert bip32._b58decode_valid_xkey.cache_info().hits == 1
+    assert xkey_data == xkey_data2
+    assert xkey_data is not xkey_data2
+    assert xkey_data == BIP32KeyData.b58decode(xkey, check_validity=False)
+    # a fresh instance is returned: mutations do not affect the cache
+    xkey_data.depth = 1
+    assert BIP32KeyData.b58decode(xkey).depth == 0
+    # invalid keys are not cached
+    err_msg = "zero depth with non-zero parent fingerprint: "
+    invalid_xkey = base58.b58encode(decoded_key[:5] + b"\x01" + decoded_key[6:])
+    for _ in range(2):
+        with pytest.raises(BTClibValueError, match=err_msg):
+            BIP32KeyData.b58decode(invalid_xkey)
+    assert bip32._b58decode_valid_xkey.cache_info().currsize == 1
+
+    xkey_data = BIP32KeyData.b58decode(xkey)
+    for data in (decoded_key, bytearray(decoded_key), memoryview(decoded_key)):
+        assert BIP32KeyData.parse(data) == xkey_data
+        # trailing data is ignored
+        assert BIP32KeyData.parse(bytes(data) + b"\x00") == xkey_data
+    with pytest.raises(BTClibValueError, match="invalid decoded length: "):
+        BIP32KeyData.parse(decoded_key[:-1])
+
+
 data_folder = path.join(path.dirname(__file__), "_data")
 
 
@@ -310,6 +350,110 @@ def test_derive_from_account() -> None:
         derive_from_account(mxpub, 0, 0)
 
 
+def test_derivation_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+
+    seed = "bfc4cbaad0ff131aa97fa30a48d09ae7df914bcc083af1e07793cd0a7c61a03f65d622848209ad3366a419f4718a80ec9037df107d8d12c19b83202de00a40ad"
+    rmxprv = rootxprv_from_seed(seed)
+    der_paths = [f"m/84h/0h/0h/{branch}/{i}" for branch in (0, 1) for i in range(3)]
+
+    monkeypatch.setattr(bip32, "_derivation_cache", _DerivationCache(0))
+    expected = [derive(rmxprv, der_path) for der_path in der_paths]
+    expected_xpubs = [xpub_from_xprv(xprv) for xprv in expected]
+    assert len(bip32._derivation_cache) == 0
+
+    cache = _DerivationCache()
+    monkeypatch.setattr(bip32, "_derivation_cache", cache)
+    assert [derive(rmxprv, der_path) for der_path in der_paths] == expected
+    # m, m/84h, m/84h/0h, m/84h/0h/0h, m/84h/0h/0h/0, m/84h/0h/0h/1
+    assert len(cache) == 6
+    # cached results
+    assert [derive(rmxprv, der_path) for der_path in der_paths] == expected
+    assert len(cache) == 6
+    version = NETWORKS["mainnet"].slip132_p2wpkh_prv
+    assert derive(rmxprv, der_paths[0], version) == derive(
+        derive(rmxprv, der_paths[0]), "m", version
+    )
+    acc_xpub = xpub_from_xprv(derive(rmxprv, "m/84h/0h/0h"))
+    for der_path, xpub in zip(der_paths, expected_xpubs):
+        assert derive(acc_xpub, der_path[11:]) == xpub
+        branch, index = (int(i) for i in der_path[12:].split("/"))
+        assert derive_from_account(acc_xpub, branch, index) == xpub
+
+    # bounded cache: only leaves are evicted
+    cache = _DerivationCache(4)
+    monkeypatch.setattr(bip32, "_derivation_cache", cache)
+    for _ in range(2):
+        assert [derive(rmxprv, der_path) for der_path in der_paths] == expected
+        assert len(cache) == 4
+    cache.clear()
+    assert len(cache) == 0
+    assert derive(rmxprv, der_paths[0]) == expected[0]
+
+    # the whole extended key identifies the root key
+    xkey = BIP32KeyData.b58decode(derive(rmxprv, "m/0"))
+    other = BIP32KeyData.b58decode(derive(rmxprv, "m/0"))
+    other.index = 1
+    other.parent_fingerprint = bytes(4)
+    derive(xkey, "m/0/0")
+    assert derive(xkey, "m") == xkey.b58encode()
+    assert derive(other, "m") == other.b58encode()
+
+    # concurrent derivations with frequent evictions
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = executor.map(
+            lambda der_path: derive(rmxprv, der_path), der_paths * 20
+        )
+        assert list(results) == expected * 20
+    assert len(cache) == 4
+
+    monkeypatch.setattr(bip32, "_derivation_cache", _DerivationCache())
+    assert derive(rmxprv, der_paths[0]) == expected[0]
+    assert len(bip32._derivation_cache) > 0
+    clear_derivation_cache()
+    assert len(bip32._derivation_cache) == 0
+    # disabled cache
+    set_derivation_cache_size(0)
+    assert derive(rmxprv, der_paths[0]) == expected[0]
+    assert len(bip32._derivation_cache) == 0
+    set_derivation_cache_size(2)
+    assert derive(rmxprv, der_paths[0]) == expected[0]
+    assert len(bip32._derivation_cache) == 2
+    with pytest.raises(BTClibValueError, match="invalid cache size: "):
+        set_derivation_cache_size(-1)
+
+
+def test_derive_children() -> None:
+
+    seed = "bfc4cbaad0ff131aa97fa30a48d09ae7df914bcc083af1e07793cd0a7c61a03f65d622848209ad3366a419f4718a80ec9037df107d8d12c19b83202de00a40ad"
+    rmxprv = rootxprv_from_seed(seed)
+    mxprv = derive(rmxprv, "m / 44 h / 0 h / 0 h")
+    mxpub = xpub_from_xprv(mxprv)
+
+    xkeys: Tuple[BIP32Key, ...] = (mxprv, mxpub, BIP32KeyData.b58decode(mxpub))
+    for xkey in xkeys:
+        for branch in (0, 1):
+            children = derive_children(xkey, 5, 20, f"m/{branch}")
+            assert len(children) == 20
+            for i, (pub_key, chain_code) in enumerate(children, 5):
+                child = _derive(mxpub, f"m/{branch}/{i}")
+                assert pub_key == child.key
+                assert chain_code == child.chain_code
+
+    assert derive_children(mxpub, 0x7FFFFFFF, 1)[0][0] == (
+        _derive(mxpub, 0x7FFFFFFF).key
+    )
+    assert not derive_children(mxpub, 0, 0)
+
+    with pytest.raises(BTClibValueError, match="negative count: "):
+        derive_children(mxpub, 0, -1)
+    err_msg = "invalid normal derivation index range: "
+    for start, count in ((-1, 1), (0x7FFFFFFF, 2), (0x80000000, 1)):
+        with pytest.raises(BTClibValueError, match=err_msg):
+            derive_children(mxpub, start, count)
+    with pytest.raises(BTClibValueError, match="final depth greater than 255: "):
+        derive_children(mxpub, 0, 1, "m" + 252 * "/0")
+
+
 def test_crack() -> None:
     parent_xpub = "xpub6BabMgRo8rKHfpAb8waRM5vj2AneD4kDMsJhm7jpBDHSJvrFAjHJHU5hM43YgsuJVUVHWacAcTsgnyRptfMdMP8b28LYfqGocGdKCFjhQMV"
     child_xprv = "xprv9xkG88dGyiurKbVbPH1kjdYrA8poBBBXa53RKuRGJXyruuoJUDd8e4m6poiz7rV8Z4NoM5AJNcPHN6aj8wRFt5CWvF8VPfQCrDUcLU5tcTm"
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.bip32.discovery` module."
+
+import pytest
+
+from btclib.bip32 import slip132
+from btclib.bip32.bip32 import BIP32KeyData, derive, rootxprv_from_seed, xpub_from_xprv
+from btclib.bip32.discovery import (
+    BloomFilter,
+    discover,
+    script_pub_key_from_pub_key,
+    script_type_from_xkey,
+)
+from btclib.exceptions import BTClibValueError
+from btclib.network import NETWORKS
+from btclib.script.script_pub_key import ScriptPubKey
+
+SEED = "bfc4cbaad0ff131aa97fa30a48d09ae7df914bcc083af1e07793cd0a7c61a03f65d622848209ad3366a419f4718a80ec9037df107d8d12c19b83202de00a40ad"
+
+
+def test_script_pub_key_from_pub_key() -> None:
+    for purpose, version, script_type in (
+        ("44h", NETWORKS["mainnet"].bip32_prv, "p2pkh"),
+        ("49h", NETWORKS["mainnet"].slip132_p2wpkh_p2sh_prv, "p2wpkh_p2sh"),
+        ("84h", NETWORKS["mainnet"].slip132_p2wpkh_prv, "p2wpkh"),
+        ("84h", NETWORKS["testnet"].slip132_p2wpkh_prv, "p2wpkh"),
+    ):
+        rootxprv = rootxprv_from_seed(SEED, version)
+        xprv = derive(rootxprv, f"m/{purpose}/0h/0h/0/0")
+        assert script_type_from_xkey(xprv) == script_type
+        xpub = xpub_from_xprv(xprv)
+        assert script_type_from_xkey(xpub) == script_type
+        pub_key = BIP32KeyData.b58decode(xpub).key
+        address = slip132.address_from_xpub(xpub)
+        script_pub_key = ScriptPubKey.from_address(address).script
+        assert script_pub_key_from_pub_key(pub_key, script_type) == script_pub_key
+
+    with pytest.raises(BTClibValueError, match="unknown script type: "):
+        script_pub_key_from_pub_key(pub_key, "p2tr")
+
+    version = NETWORKS["mainnet"].slip132_p2wsh_prv
+    rootxprv = rootxprv_from_seed(SEED, version)
+    with pytest.raises(BTClibValueError, match="no script type for xkey version: "):
+        script_type_from_xkey(rootxprv)
+
+
+def test_bloom_filter() -> None:
+    items = [i.to_bytes(4, byteorder="big", signed=False) for i in range(1000)]
+    bloom_filter = BloomFilter(items[:500], 500, 0.001)
+    assert all(item in bloom_filter for item in items[:500])
+    false_positives = sum(item in bloom_filter for item in items[500:])
+    assert false_positives < 10
+    assert "not bytes" not in bloom_filter
+
+    with pytest.raises(BTClibValueError, match="invalid number of items: "):
+        BloomFilter(items, 0)
+    for rate in (0, 1):
+        with pytest.raises(BTClibValueError, match="invalid false positive rate: "):
+            BloomFilter(items, 1000, rate)
+
+
+def test_discover() -> None:
+    version = NETWORKS["mainnet"].slip132_p2wpkh_prv
+    rootxprv = rootxprv_from_seed(SEED, version)
+    xprv = derive(rootxprv, "m/84h/0h/0h")
+    xpub = xpub_from_xprv(xprv)
+
+    def script_pub_key(branch: int, index: int) -> bytes:
+        address = slip132.address_from_xkey(derive(xprv, f"m/{branch}/{index}"))
+        return ScriptPubKey.from_address(address).script
+
+    # index 45 is beyond the gap limit after index 22
+    used = {0: [0, 3, 22, 45], 1: [1]}
+    script_pub_keys = {
+        script_pub_key(branch, index)
+        for branch, indexes in used.items()
+        for index in indexes
+    }
+    # not related script_pub_keys
+    script_pub_keys.add(b"\x00\x14" + 20 * b"\x00")
+    expected = {
+        0: [(i, script_pub_key(0, i)) for i in (0, 3, 22)],
+        1: [(1, script_pub_key(1, 1))],
+    }
+
+    assert discover(xpub, script_pub_keys) == expected
+    assert discover(xprv, script_pub_keys, chunk_size=7) == expected
+    assert discover(xpub, script_pub_keys, processes=2) == expected
+    bloom_filter = BloomFilter(script_pub_keys, 100, 0.000001)
+    assert discover(xpub, bloom_filter, chunk_size=50) == expected
+
+    assert discover(xpub, script_pub_keys, (1,)) == {1: expected[1]}
+    assert discover(xpub, script_pub_keys, gap_limit=18) == {
+        0: expected[0][:2],
+        1: expected[1],
+    }
+    assert discover(xpub, set(), (0, 1, 2)) == {0: [], 1: [], 2: []}
+    # explicit script type, e.g. for a BIP84 standard xpub
+    assert discover(xpub, script_pub_keys, script_type="p2pkh") == {0: [], 1: []}
+
+    with pytest.raises(BTClibValueError, match="invalid gap limit: "):
+        discover(xpub, script_pub_keys, gap_limit=0)
+    with pytest.raises(BTClibValueError, match="unknown script type: "):
+        discover(xpub, script_pub_keys, script_type="p2tr")
+    with pytest.raises(BTClibValueError, match="invalid chunk size: "):
+        discover(xpub, script_pub_keys, chunk_size=-1)
+    with pytest.raises(BTClibValueError, match="invalid branch: "):
+        discover(xpub, script_pub_keys, (0, 0x80000000))
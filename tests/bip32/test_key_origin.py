@@ -15,14 +15,18 @@ from os import path
 
 import pytest
 
+from btclib.bip32.bip32 import BIP32KeyData, derive, rootxprv_from_seed, xpub_from_xprv
 from btclib.bip32.der_path import _HARDENING
 from btclib.bip32.key_origin import (
     BIP32KeyOrigin,
+    KeyOriginIndex,
     assert_valid_hd_key_paths,
     decode_from_bip32_derivs,
     encode_to_bip32_derivs,
 )
+from btclib.ecc.sec_point import bytes_from_point
 from btclib.exceptions import BTClibValueError
+from btclib.to_pub_key import point_from_key, pub_keyinfo_from_key
 
 
 def test_bip32_key_origin() -> None:
@@ -130,3 +134,66 @@ def test_bip32_derivs() -> None:
     assert bip32_derivs == encode_to_bip32_derivs(hd_key_paths)
 
     assert_valid_hd_key_paths(hd_key_paths)
+
+
+def test_key_origin_index() -> None:
+
+    xprv1 = rootxprv_from_seed("01" * 32)
+    xprv2 = rootxprv_from_seed("02" * 32)
+    xpub2 = xpub_from_xprv(xprv2)
+    key_index = KeyOriginIndex([xprv1], maxsize=4)
+    fingerprint2 = key_index.add(xpub2)
+    fingerprint1 = BIP32KeyData.b58decode(derive(xprv1, 0)).parent_fingerprint
+    assert len(key_index) == 2
+    assert fingerprint1 in key_index
+    assert fingerprint2 in key_index
+    assert b"\x00" * 4 not in key_index
+
+    hd_key_paths = {}
+    for i in range(3):
+        xkey = derive(xprv1, f"m/84h/0h/0h/0/{i}")
+        pub_key = pub_keyinfo_from_key(xkey)[0]
+        hd_key_paths[pub_key] = BIP32KeyOrigin(fingerprint1, f"m/84h/0h/0h/0/{i}")
+    xkey = derive(xpub2, "m/0/1")
+    pub_key = pub_keyinfo_from_key(xkey)[0]
+    hd_key_paths[pub_key] = BIP32KeyOrigin(fingerprint2, "m/0/1")
+    # unknown fingerprint
+    hd_key_paths[b"\x02" * 33] = BIP32KeyOrigin("00" * 4, "m/0/1")
+    # wrong public key
+    hd_key_paths[b"\x03" * 33] = BIP32KeyOrigin(fingerprint1, "m/0/1")
+    # hardened derivation from public key
+    hd_key_paths[b"\x04" * 33] = BIP32KeyOrigin(fingerprint2, "m/0h")
+
+    keys = key_index.keys(hd_key_paths)
+    assert len(keys) == 4
+    for pub_key, xkey_data in keys.items():
+        der_path = hd_key_paths[pub_key].der_path
+        if hd_key_paths[pub_key].master_fingerprint == fingerprint1:
+            assert xkey_data.b58encode() == derive(xprv1, der_path)
+        else:
+            assert xkey_data.b58encode() == derive(xpub2, der_path)
+    # cached derivations
+    assert key_index.keys(hd_key_paths) == keys
+
+    # uncompressed public key
+    Q = point_from_key(derive(xprv1, "m/1"))
+    pub_key = bytes_from_point(Q, compressed=False)
+    key_origin = BIP32KeyOrigin(fingerprint1, "m/1")
+    key = key_index.key(pub_key, key_origin)
+    assert key is not None
+    assert key.b58encode() == derive(xprv1, "m/1")
+
+    # changes to the returned keys do not corrupt the index
+    key.index = 2
+    key.depth = 5
+    key = key_index.key(pub_key, key_origin)
+    assert key is not None
+    assert key.b58encode() == derive(xprv1, "m/1")
+    # nor do changes to the indexed master keys
+    xkey_data = BIP32KeyData.b58decode(xpub2)
+    key_index = KeyOriginIndex([xkey_data])
+    xkey_data.chain_code = b"\x00" * 32
+    pub_key = pub_keyinfo_from_key(derive(xpub2, "m/0/1"))[0]
+    key = key_index.key(pub_key, BIP32KeyOrigin(fingerprint2, "m/0/1"))
+    assert key is not None
+    assert key.b58encode() == derive(xpub2, "m/0/1")
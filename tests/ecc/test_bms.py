@@ -12,13 +12,14 @@
 
 import json
 from os import path
+from typing import Any, NoReturn
 
 import pytest
 
 from btclib import b32, b58
 from btclib.bip32 import bip32
 from btclib.ecc import bms, dsa
-from btclib.ecc.curve import CURVES, secp256k1
+from btclib.ecc.curve import CURVES, mult, secp256k1
 from btclib.exceptions import BTClibValueError
 from btclib.hashes import magic_message
 from btclib.mnemonic import bip39
@@ -648,3 +649,86 @@ def test_ledger() -> None:
     bms.assert_as_valid(msg_str, addr, bms_sig)
     assert bms.verify(msg_str, addr, bms_sig)
     assert not bms.verify(magic_msg, addr, bms_sig)
+
+
+def test_verify_many() -> None:
+
+    fname = "bms.json"
+    filename = path.join(path.dirname(__file__), "_data", fname)
+    with open(filename, "r") as file_:
+        test_vectors = json.load(file_)
+
+    msgs = [vector["address"].encode() for vector in test_vectors[:20]]
+    addrs = [vector["address"] for vector in test_vectors[:20]]
+    sigs = [vector["signature"] for vector in test_vectors[:20]]
+    # python-bitcoinlib does not respect low-s
+    results = [bms.verify(m, a, s, False) for m, a, s in zip(msgs, addrs, sigs)]
+    assert all(results)
+    assert bms.verify_many(msgs, addrs, sigs, lower_s=False) == results
+    results = [bms.verify(m, a, s) for m, a, s in zip(msgs, addrs, sigs)]
+    assert not all(results)
+    assert bms.verify_many(msgs, addrs, sigs) == results
+
+    msg = "test message".encode()
+    msgs, addrs, sigs = [], [], []
+    for compressed in (False, True):
+        wif, addr = bms.gen_keys(compressed=compressed)
+        msgs.append(msg)
+        addrs.append(addr)
+        sigs.append(bms.sign(msg, wif))
+    # identical messages for the same key, BIP137 and Electrum signatures
+    for addr in (b58.p2wpkh_p2sh(wif), b32.p2wpkh(wif)):
+        for sig_addr in (addr, None):
+            msgs.append(msg)
+            addrs.append(addr)
+            sigs.append(bms.sign(msg, wif, sig_addr))
+    # invalid items
+    msgs.append(msg)
+    addrs.append(b32.p2wpkh(wif))
+    sigs.append(bms.sign(msg, wif, b58.p2wpkh_p2sh(wif)))
+    msgs.append("another message".encode())
+    addrs.append(addrs[0])
+    sigs.append(sigs[0])
+    msgs.append(msg)
+    addrs.append(addrs[1])
+    sigs.append(sigs[0])
+    msgs.append(msg)
+    addrs.append("not an address")
+    sigs.append(sigs[0])
+    msgs.append(msg)
+    addrs.append(addrs[0])
+    sigs.append("not a signature")
+    msgs.append("not a hex message")
+    addrs.append(addrs[0])
+    sigs.append(sigs[0])
+
+    results = [bms.verify(m, a, s) for m, a, s in zip(msgs, addrs, sigs)]
+    assert results == [True] * 6 + [False] * 6
+    assert bms.verify_many(msgs, addrs, sigs) == results
+    sigs_b64 = [sig if isinstance(sig, str) else sig.b64encode() for sig in sigs]
+    assert bms.verify_many(msgs, addrs, sigs_b64) == results
+    assert bms.verify_many(msgs, addrs, sigs, processes=2) == results
+    assert bms.verify_many([], [], []) == []
+
+    err_msg = "mismatch between number of messages, addresses, and signatures: "
+    with pytest.raises(BTClibValueError, match=err_msg):
+        bms.verify_many(msgs, addrs, sigs[1:])
+
+
+def test_sign_key_id(monkeypatch: pytest.MonkeyPatch) -> None:
+
+    # the key_id is provided by the signing primitive
+    def recover_pub_keys(*_: Any) -> NoReturn:
+        raise AssertionError("unexpected public key recovery")  # pragma: no cover
+
+    monkeypatch.setattr(dsa, "recover_pub_keys", recover_pub_keys)
+
+    msg = "test message".encode()
+    for i in range(1, 9):
+        wif, addr = bms.gen_keys(i)
+        sig = bms.sign(msg, wif)
+        key_id = sig.rf - 27 & 0b11
+        assert dsa.recover_pub_key(key_id, magic_message(msg), sig.dsa_sig) == mult(i)
+        assert bms.verify(msg, addr, sig)
+        for addr in (b58.p2wpkh_p2sh(wif), b32.p2wpkh(wif)):
+            assert bms.verify(msg, addr, bms.sign(msg, wif, addr))
@@ -422,6 +422,16 @@ def test_jac_equality() -> None:
     assert not ec.jac_equality(QJ, ec.GJ)
 
 
+def test_batch_aff_from_jac() -> None:
+    for ec in low_card_curves.values():
+        QJs = [INFJ, ec.GJ]
+        for _ in range(ec.n + 1):
+            QJs.append(ec.add_jac(QJs[-1], ec.GJ))
+        assert ec.batch_aff_from_jac(QJs) == [ec.aff_from_jac(QJ) for QJ in QJs]
+        assert ec.batch_aff_from_jac([]) == []
+        assert ec.batch_aff_from_jac([INFJ, INFJ]) == [INF, INF]
+
+
 def test_INF() -> None:
 
     assert INF[1] == 0
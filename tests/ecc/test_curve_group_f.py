@@ -12,9 +12,21 @@
 
 import pytest
 
+from btclib.alias import INF
+from btclib.ecc.curve import CURVES
 from btclib.ecc.curve_group import CurveGroup, mult_aff
-from btclib.ecc.curve_group_f import find_all_points, find_subgroup_points
+from btclib.ecc.curve_group_f import (
+    find_all_points,
+    find_subgroup_points,
+    generate_curve,
+    group_order,
+    hasse_interval,
+    point_order,
+    subgroup_params,
+)
+from btclib.ecc.number_theory import is_probable_prime
 from btclib.exceptions import BTClibValueError
+from tests.ecc.test_curve import low_card_curves
 
 
 def test_ecf() -> None:
@@ -74,3 +86,56 @@ def test_ecf_exceptions() -> None:
         # p (10007) is too big to count all subgroup points
         G = (2, 3265)
         find_subgroup_points(ec, G)
+
+
+def test_group_order() -> None:
+    # enumeration (p < 1000) and baby-step/giant-step
+    for p, a, b in ((13, 7, 6), (9739, 497, 1768), (10007, 497, 1768)):
+        ec = CurveGroup(p, a, b)
+        lo, hi = hasse_interval(p)
+        N = group_order(ec)
+        assert lo <= N <= hi
+        if p < 10000:
+            assert N == len(find_all_points(ec))
+    for p in range(1000, 1500):
+        if not is_probable_prime(p):
+            continue
+        for a, b in ((0, 7), (1, 1), (p - 3, 5)):
+            ec = CurveGroup(p, a, b)
+            assert group_order(ec) == len(find_all_points(ec))
+
+    for ec in low_card_curves.values():
+        assert point_order(ec, ec.G) == ec.n
+        # Curve cofactor is an upper bound, e.g. ec17_13 has 13 points
+        n, cofactor = subgroup_params(ec, ec.G)
+        assert n == ec.n
+        assert cofactor <= ec.cofactor
+        assert point_order(ec, INF) == 1
+
+    # even order curve: (2, 0) is a 2-torsion point, not INF
+    p = 10007
+    ec = CurveGroup(p, 3, -(2 ** 3 + 3 * 2) % p)
+    assert point_order(ec, (2, 0)) == 2
+    N = group_order(ec)
+    assert N % 2 == 0
+    assert subgroup_params(ec, (2, 0)) == (2, N // 2)
+    assert point_order(ec, INF) == 1
+
+    ec = CURVES["secp112r1"]
+    err_msg = "p is too big for baby-step/giant-step: "
+    with pytest.raises(BTClibValueError, match=err_msg):
+        point_order(ec, ec.G)
+
+
+def test_generate_curve() -> None:
+    for bits, max_cofactor in ((8, 1), (16, 1), (24, 1), (24, 4)):
+        ec = generate_curve(bits, max_cofactor, seed=bits)
+        assert ec.p.bit_length() == bits
+        assert ec.cofactor <= max_cofactor
+        assert subgroup_params(ec, ec.G) == (ec.n, ec.cofactor)
+        assert repr(generate_curve(bits, max_cofactor, seed=bits)) == repr(ec)
+
+    with pytest.raises(BTClibValueError, match="invalid number of bits: "):
+        generate_curve(7)
+    with pytest.raises(BTClibValueError, match="invalid max cofactor: "):
+        generate_curve(16, 0)
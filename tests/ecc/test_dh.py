@@ -16,9 +16,10 @@ import pytest
 
 from btclib.ecc import dsa
 from btclib.ecc.curve import CURVES, mult
-from btclib.ecc.dh import ansi_x9_63_kdf, diffie_hellman
+from btclib.ecc.dh import ansi_x9_63_kdf, diffie_hellman, diffie_hellman_many
 from btclib.ecc.sec_point import bytes_from_point
 from btclib.exceptions import BTClibValueError
+from btclib.utils import int_from_bits
 
 
 def test_ecdh() -> None:
@@ -60,6 +61,40 @@ def test_ecdh() -> None:
         ansi_x9_63_kdf(z, size, hf, None)
 
 
+def test_ecdh_many() -> None:
+    ec = CURVES["secp256k1"]
+    a, _ = dsa.gen_keys()
+    peers = [mult(int_from_bits(bytes([i]) * 32, ec.nlen) % ec.n) for i in range(1, 9)]
+    peers.append(ec.G)
+    peers.append(ec.negate(ec.G))
+    shared_info = b"deadbeef"
+    for size in (16, 32, 33, 100):
+        expected = [diffie_hellman(a, Q, size, shared_info) for Q in peers]
+        assert diffie_hellman_many(a, peers, size, shared_info) == expected
+        assert diffie_hellman_many(a, peers, size, shared_info, processes=1) == expected
+    assert diffie_hellman_many(a, peers, 32, processes=3) == [
+        diffie_hellman(a, Q, 32) for Q in peers
+    ]
+    # private key not reduced mod n
+    assert diffie_hellman_many(a + ec.n, peers[:2], 32) == [
+        diffie_hellman(a, Q, 32) for Q in peers[:2]
+    ]
+
+    assert not diffie_hellman_many(a, [], 32)
+
+    ec = CURVES["secp160r1"]
+    b, B = dsa.gen_keys(ec=ec)
+    assert diffie_hellman_many(a, [B], 20, None, ec, sha1) == [
+        diffie_hellman(a, B, 20, None, ec, sha1)
+    ]
+
+    with pytest.raises(BTClibValueError, match="point not on curve"):
+        diffie_hellman_many(a, [B], 32)
+
+    with pytest.raises(BTClibValueError, match="cannot derive a key larger than "):
+        diffie_hellman_many(a, [B], 20 * 2 ** 32, None, ec, sha1)
+
+
 def test_gec_2() -> None:
     """GEC 2: Test Vectors for SEC 1, section 4.1
 
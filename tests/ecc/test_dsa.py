@@ -222,6 +222,14 @@ def test_low_cardinality() -> None:
                         assert ec.aff_from_jac(QJ) in Qs
                         assert len(jac_keys) in (2, 4)
 
+                        # the recovery id identifies the public key
+                        sig2, key_id = dsa._sign_recoverable_(e, q, k, lower_s, ec)
+                        assert sig2 == sig
+                        RJ = dsa._recover_pub_key_(key_id, e, r, s, lower_s, ec)
+                        assert ec.aff_from_jac(RJ) == ec.aff_from_jac(QJ)
+                        if len(jac_keys) == 4:
+                            assert Qs[key_id] == ec.aff_from_jac(QJ)
+
 
 def test_pub_key_recovery() -> None:
 
@@ -242,6 +250,22 @@ def test_pub_key_recovery() -> None:
         assert dsa.verify(msg, Q, sig)
 
 
+def test_sign_recoverable() -> None:
+
+    for ec in (CURVES["secp256k1"], CURVES["secp112r2"]):
+        q, Q = dsa.gen_keys(ec=ec)
+        for i in range(8):
+            msg = f"message #{i}".encode()
+            sig, key_id = dsa.sign_recoverable(msg, q, ec=ec)
+            assert sig == dsa.sign(msg, q, ec=ec)
+            assert dsa.recover_pub_key(key_id, msg, sig) == Q
+            assert Q in dsa.recover_pub_keys(msg, sig)
+
+            msg_hash = reduce_to_hlen(msg)
+            sig, key_id = dsa.sign_recoverable_(msg_hash, q, ec=ec, lower_s=False)
+            assert dsa.recover_pub_key_(key_id, msg_hash, sig, lower_s=False) == Q
+
+
 def test_crack_prv_key() -> None:
 
     ec = CURVES["secp256k1"]
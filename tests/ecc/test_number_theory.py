@@ -12,7 +12,14 @@
 
 import pytest
 
-from btclib.ecc.number_theory import mod_inv, mod_sqrt, tonelli
+from btclib.ecc.number_theory import (
+    batch_mod_inv,
+    factorize,
+    is_probable_prime,
+    mod_inv,
+    mod_sqrt,
+    tonelli,
+)
 from btclib.exceptions import BTClibValueError
 
 primes = [
@@ -86,6 +93,44 @@ def test_mod_inv() -> None:
                     mod_inv(a, m)
 
 
+def test_batch_mod_inv() -> None:
+    for p in primes:
+        values = [a + p for a in range(1, min(p, 50))]
+        inverses = batch_mod_inv(values, p)
+        assert inverses == [mod_inv(a, p) for a in values]
+        assert batch_mod_inv([], p) == []
+        with pytest.raises(BTClibValueError, match="No inverse for 0 mod"):
+            batch_mod_inv(values + [p], p)
+
+
+def test_is_probable_prime() -> None:
+    for p in primes:
+        assert is_probable_prime(p)
+        assert not is_probable_prime(p * 3)
+    small_primes = {p for p in primes if p < 114}
+    for n in range(-1, 114):
+        assert is_probable_prime(n) == (n in small_primes)
+    # Carmichael numbers and strong pseudoprimes to small bases
+    for n in (561, 1105, 1729, 2047, 3215031751, 3825123056546413051):
+        assert not is_probable_prime(n)
+
+
+def test_factorize() -> None:
+    assert factorize(1) == {}
+    assert factorize(2 ** 10 * 3 ** 2 * 113) == {2: 10, 3: 2, 113: 1}
+    p1, p2 = 1000000007, 2 ** 61 - 1
+    assert factorize(p1 * p1 * p2) == {p1: 2, p2: 1}
+    for n in range(1, 1000):
+        factors = factorize(n)
+        prod = 1
+        for q, e in factors.items():
+            assert is_probable_prime(q)
+            prod *= q ** e
+        assert prod == n
+    with pytest.raises(BTClibValueError, match="not a positive integer: "):
+        factorize(0)
+
+
 def test_mod_sqrt() -> None:
     for p in primes[:30]:  # exhaustable only for small p
         has_root = {0, 1}
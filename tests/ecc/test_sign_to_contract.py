@@ -16,8 +16,10 @@ from hashlib import sha1, sha256
 from btclib.ecc import dsa, ssa
 from btclib.ecc.curve import CURVES, secp256k1
 from btclib.ecc.sign_to_contract import (
+    dsa_batch_verify_commit,
     dsa_commit_sign,
     dsa_verify_commit,
+    ssa_batch_verify_commit,
     ssa_commit_sign,
     ssa_verify_commit,
 )
@@ -59,3 +61,80 @@ def test_sign_to_contract_ssa() -> None:
             ssa_sig, R = ssa_commit_sign(commit_msg, msg, prv_key, random_nonce, ec, hf)
             ssa.assert_as_valid(msg, pub_key, ssa_sig, hf)
             assert ssa_verify_commit(commit_msg, R, msg, pub_key, ssa_sig, hf)
+
+
+def test_batch_sign_to_contract_dsa() -> None:
+    for hf in (sha256, sha1):
+        for ec in (secp256k1, CURVES["secp160r1"]):
+            commits, receipts, msgs, pub_keys, sigs = [], [], [], [], []
+            for i in range(5):
+                prv_key, pub_key = dsa.gen_keys(ec=ec)
+                commit = f"to be committed {i}".encode()
+                msg = f"to be signed {i}".encode()
+                sig, receipt = dsa_commit_sign(commit, msg, prv_key, None, ec, hf)
+                assert dsa_verify_commit(commit, receipt, msg, pub_key, sig, True, hf)
+                commits.append(commit)
+                receipts.append(receipt)
+                msgs.append(msg)
+                pub_keys.append(pub_key)
+                sigs.append(sig)
+            args = commits, receipts, msgs, pub_keys, sigs
+            assert dsa_batch_verify_commit(*args, True, hf)
+            assert dsa_batch_verify_commit(*args, True, hf, processes=2)
+
+            # wrong commitment
+            wrong_commits = commits[:-1] + [b"not committed"]
+            args = wrong_commits, receipts, msgs, pub_keys, sigs
+            assert not dsa_batch_verify_commit(*args, True, hf)
+            assert not dsa_batch_verify_commit(*args, True, hf, processes=2)
+            # wrong signature
+            args = commits, receipts, msgs[::-1], pub_keys, sigs
+            assert not dsa_batch_verify_commit(*args, True, hf)
+            # mismatched batch sizes
+            args = commits, receipts, msgs, pub_keys[:-1], sigs
+            assert not dsa_batch_verify_commit(*args, True, hf)
+            assert not dsa_batch_verify_commit(*args, True, hf, processes=2)
+
+    assert not dsa_batch_verify_commit([], [], [], [], [])
+
+
+def test_batch_sign_to_contract_ssa() -> None:
+    for hf in (sha256, sha1):
+        for ec in (secp256k1, CURVES["secp160r1"]):
+            commits, receipts, msgs, pub_keys, sigs = [], [], [], [], []
+            for i in range(5):
+                prv_key, pub_key = ssa.gen_keys(ec=ec)
+                commit = f"to be committed {i}".encode()
+                msg = f"to be signed {i}".encode()
+                sig, receipt = ssa_commit_sign(commit, msg, prv_key, None, ec, hf)
+                assert ssa_verify_commit(commit, receipt, msg, pub_key, sig, hf)
+                commits.append(commit)
+                receipts.append(receipt)
+                msgs.append(msg)
+                pub_keys.append(pub_key)
+                sigs.append(sig)
+            assert ssa_batch_verify_commit(commits, receipts, msgs, pub_keys, sigs, hf)
+
+            # wrong commitment
+            wrong_commits = commits[:-1] + [b"not committed"]
+            args = wrong_commits, receipts, msgs, pub_keys, sigs
+            assert not ssa_batch_verify_commit(*args, hf)
+            # wrong receipt
+            args = commits, receipts[::-1], msgs, pub_keys, sigs
+            assert not ssa_batch_verify_commit(*args, hf)
+            # wrong signature
+            args = commits, receipts, msgs[::-1], pub_keys, sigs
+            assert not ssa_batch_verify_commit(*args, hf)
+            # mismatched batch sizes
+            args = commits, receipts[:-1], msgs, pub_keys, sigs
+            assert not ssa_batch_verify_commit(*args, hf)
+
+    # not the same curve for all signatures
+    ec = CURVES["secp160r1"]
+    _, pub_key_k1 = ssa.gen_keys(1)
+    _, pub_key_r1 = ssa.gen_keys(1, ec)
+    sig_k1, receipt_k1 = ssa_commit_sign(b"c", b"m", 1, None)
+    sig_r1, receipt_r1 = ssa_commit_sign(b"c", b"m", 1, None, ec)
+    pub_keys = [pub_key_k1, pub_key_r1]
+    args = [b"c"] * 2, [receipt_k1, receipt_r1], [b"m"] * 2, pub_keys, [sig_k1, sig_r1]
+    assert not ssa_batch_verify_commit(*args)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.ecc.stats` module."
+
+import json
+
+import pytest
+
+from btclib.ecc import bms, curve_group, number_theory
+from btclib.ecc.curve import mult, secp256k1
+from btclib.ecc.curve_group import CurveGroup, mult_recursive_jac
+from btclib.ecc.stats import TOP_LEVEL, ecc_stats
+from btclib.exceptions import BTClibRuntimeError
+
+
+def test_ecc_stats() -> None:
+    ec = secp256k1
+    original_add_jac = CurveGroup.add_jac
+    original_mod_inv = number_theory.mod_inv
+    original_mult = curve_group._mult
+
+    with ecc_stats() as s:
+        mult(1)
+    # one fixed-window multiplication, one affine conversion
+    assert s.ops()["mult_fixed_window"] == 1
+    assert s.total("mod_inv") == 2
+    by_alg = s.to_dict()["by_algorithm"]
+    assert by_alg[TOP_LEVEL]["mult_fixed_window"] == 1
+    assert by_alg[TOP_LEVEL]["mod_inv"] == 2
+    assert by_alg["mult_fixed_window"]["double_jac"] > 0
+    assert by_alg["mult_fixed_window"]["add_jac"] > 0
+    assert "mod_inv" not in by_alg["mult_fixed_window"]
+    assert s.total() == sum(s.ops().values())
+    # json-serializable
+    assert json.loads(json.dumps(s.to_dict())) == s.to_dict()
+
+    # originals are restored
+    assert CurveGroup.add_jac is original_add_jac
+    assert number_theory.mod_inv is original_mod_inv
+    assert curve_group.mod_inv is original_mod_inv
+    assert curve_group._mult is original_mult
+
+    # recursive algorithms are counted once
+    with ecc_stats() as s:
+        mult_recursive_jac(5, ec.GJ, ec)
+    assert s.ops()["mult_recursive_jac"] == 1
+    assert s.total("add_jac") == 2
+    assert s.total("double_jac") == 2
+    s.reset()
+    assert s.total() == 0
+
+    with ecc_stats() as s:
+        with pytest.raises(BTClibRuntimeError, match="ecc_stats is already active"):
+            with ecc_stats():
+                pass  # pragma: no cover
+
+
+def test_ecc_stats_high_level() -> None:
+    wif, address = bms.gen_keys(1)
+    msg = "test message".encode()
+    sig = bms.sign(msg, wif)
+    with ecc_stats() as s:
+        assert bms.verify(msg, address, sig)
+    assert s.ops()["_double_mult"] >= 1
+    assert s.total("mod_sqrt") >= 1
+    assert s.to_dict()["by_algorithm"]["_double_mult"]["add_jac"] > 0
@@ -15,6 +15,8 @@ from os import path
 
 import pytest
 
+from btclib.bip32.bip32 import derive, xpub_from_xprv
+from btclib.bip32.key_origin import KeyOriginIndex
 from btclib.ecc import der, dsa, sec_point
 from btclib.exceptions import BTClibValueError
 from btclib.psbt.psbt import (
@@ -24,6 +26,8 @@ from btclib.psbt.psbt import (
     combine_psbts,
     extract_tx,
     finalize_psbt,
+    owned_outputs,
+    signing_keys,
 )
 from btclib.script.script_pub_key import ScriptPubKey
 from btclib.script.witness import Witness
@@ -493,3 +497,37 @@ def test_exceptions() -> None:
     err_msg = "mismatched non-witness utxo / outpoint tx_id"
     with pytest.raises(BTClibValueError, match=err_msg):
         psbt.assert_valid()
+
+
+def test_signing_keys() -> None:
+    "Test the BIP174 signer with the key index of the test vector master key."
+
+    psbt_str = "cHNidP8BAJoCAAAAAljoeiG1ba8MI76OcHBFbDNvfLqlyHV5JPVFiHuyq911AAAAAAD/////g40EJ9DsZQpoqka7CwmK6kQiwHGyyng1Kgd5WdB86h0BAAAAAP////8CcKrwCAAAAAAWABTYXCtx0AYLCcmIauuBXlCZHdoSTQDh9QUAAAAAFgAUAK6pouXw+HaliN9VRuh0LR2HAI8AAAAAAAEAuwIAAAABqtc5MQGL0l+ErkALaISL4J23BurCrBgpi6vucatlb4sAAAAASEcwRAIgWPb8fGoz4bMVSNSByCbAFb0wE1qtQs1neQ2rZtKtJDsCIEoc7SYExnNbY5PltBaR3XiwDwxZQvufdRhW+qk4FX26Af7///8CgPD6AgAAAAAXqRQPuUY0IWlrgsgzryQceMF9295JNIfQ8gonAQAAABepFCnKdPigj4GZlCgYXJe12FLkBj9hh2UAAAAiAgKVg785rgpgl0etGZrd1jT6YQhVnWxc05tMIYPxq5bgf0cwRAIgdAGK1BgAl7hzMjwAFXILNoTMgSOJEEjn282bVa1nnJkCIHPTabdA4+tT3O+jOCPIBwUUylWn3ZVE8VfBZ5EyYRGMASICAtq2H/SaFNtqfQKwzR+7ePxLGDErW05U2uTbovv+9TbXSDBFAiEA9hA4swjcHahlo0hSdG8BV3KTQgjG0kRUOTzZm98iF3cCIAVuZ1pnWm0KArhbFOXikHTYolqbV2C+ooFvZhkQoAbqAQEDBAEAAAABBEdSIQKVg785rgpgl0etGZrd1jT6YQhVnWxc05tMIYPxq5bgfyEC2rYf9JoU22p9ArDNH7t4/EsYMStbTlTa5Nui+/71NtdSriIGApWDvzmuCmCXR60Zmt3WNPphCFWdbFzTm0whg/GrluB/ENkMak8AAACAAAAAgAAAAIAiBgLath/0mhTban0CsM0fu3j8SxgxK1tOVNrk26L7/vU21xDZDGpPAAAAgAAAAIABAACAAAEBIADC6wsAAAAAF6kUt/X69A49QKWkWbHbNTXyty+pIeiHIgIDCJ3BDHrG21T5EymvYXMz2ziM6tDCMfcjN50bmQMLAtxHMEQCIGLrelVhB6fHP0WsSrWh3d9vcHX7EnWWmn84Pv/3hLyyAiAMBdu3Rw2/LwhVfdNWxzJcHtMJE+mWzThAlF2xIijaXwEiAgI63ZBPPW3PWd25BrDe4jUpt/+57VDl6GFRkmhgIh8Oc0cwRAIgZfRbpZmLWaJ//hp77QFq8fH5DVSzqo90UKpfVqJRA70CIH9yRwOtHtuWaAsoS1bU/8uI9/t1nqu+CKow8puFE4PSAQEDBAEAAAABBCIAIIwjUxc3Q7WV37Sge3K6jkLjeX2nTof+fZ10l+OyAokDAQVHUiEDCJ3BDHrG21T5EymvYXMz2ziM6tDCMfcjN50bmQMLAtwhAjrdkE89bc9Z3bkGsN7iNSm3/7ntUOXoYVGSaGAiHw5zUq4iBgI63ZBPPW3PWd25BrDe4jUpt/+57VDl6GFRkmhgIh8OcxDZDGpPAAAAgAAAAIADAACAIgYDCJ3BDHrG21T5EymvYXMz2ziM6tDCMfcjN50bmQMLAtwQ2QxqTwAAAIAAAACAAgAAgAAiAgOppMN/WZbTqiXbrGtXCvBlA5RJKUJGCzVHU+2e7KWHcRDZDGpPAAAAgAAAAIAEAACAACICAn9jmXV9Lv9VoTatAsaEsYOLZVbl8bazQoKpS2tQBRCWENkMak8AAACAAAAAgAUAAIAA"
+    psbt = Psbt.b64decode(psbt_str)
+
+    tprv = "tprv8ZgxMBicQKsPd9TeAdPADNnSyH9SSUUbTVeFszDE23Ki6TBB5nCefAdHkK8Fm3qMQR6sHwA56zqRmKmxnHk37JkiFzvncDqoKmPWubu7hDF"
+    key_index = KeyOriginIndex([tprv])
+
+    # all the input keys already have a partial signature
+    assert signing_keys(psbt, key_index) == {}
+    for psbt_in in psbt.inputs:
+        psbt_in.partial_sigs = {}
+    keys = signing_keys(psbt, key_index)
+    assert sorted(keys) == [0, 1]
+    for i, psbt_in in enumerate(psbt.inputs):
+        assert keys[i].keys() == psbt_in.hd_key_paths.keys()
+        for pub_key, xkey in keys[i].items():
+            der_path = psbt_in.hd_key_paths[pub_key].der_path
+            assert xkey.b58encode() == derive(tprv, der_path)
+    assert sorted(owned_outputs(psbt, key_index)) == [0, 1]
+
+    # watch-only key index
+    key_index = KeyOriginIndex([xpub_from_xprv(tprv)])
+    assert signing_keys(psbt, key_index) == {}
+    assert owned_outputs(psbt, key_index) == {}
+
+    # finalized inputs
+    key_index = KeyOriginIndex([tprv])
+    psbt.inputs[0].final_script_sig = b"\x00"
+    psbt.inputs[1].final_script_witness = Witness([b""])
+    assert signing_keys(psbt, key_index) == {}
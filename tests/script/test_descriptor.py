@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.script.descriptor` module."
+
+from typing import Any, NoReturn
+
+import pytest
+
+from btclib import b32, b58
+from btclib.bip32 import bip32
+from btclib.bip32.key_origin import BIP32KeyOrigin
+from btclib.exceptions import BTClibValueError
+from btclib.script import descriptor
+from btclib.script.descriptor import Descriptor, checksum
+from btclib.script.script_pub_key import ScriptPubKey
+from btclib.to_pub_key import pub_keyinfo_from_key
+from btclib.utils import hash160
+
+XPRV = bip32.rootxprv_from_seed("00" * 32)
+ACCOUNT_XPRV = bip32.derive(XPRV, "m/84h/0h/0h")
+ACCOUNT_XPUB = bip32.xpub_from_xprv(ACCOUNT_XPRV)
+FINGERPRINT = "deadbeef"
+ORIGIN = f"[{FINGERPRINT}/84h/0h/0h]"
+
+
+def _pub_key(xkey: str, der_path: str) -> bytes:
+    return pub_keyinfo_from_key(bip32.derive(xkey, der_path))[0]
+
+
+def test_checksum() -> None:
+
+    # BIP380 test vectors
+    assert checksum("raw(deadbeef)") == "89f8spxm"
+    desc = "addr(mkmZxiEcEd8ZqjQWVZuC6so5dFMKEFpN2j)"
+    assert checksum(desc) == "02wpgw69"
+
+    assert Descriptor("raw(deadbeef)#89f8spxm").script_pub_key() == b"\xde\xad\xbe\xef"
+    assert str(Descriptor("raw(deadbeef)")) == "raw(deadbeef)#89f8spxm"
+    for desc in ("raw(deadbeef)#89f8spxn", "raw(deadbeef)#"):
+        with pytest.raises(BTClibValueError, match="invalid descriptor checksum: "):
+            Descriptor(desc)
+    with pytest.raises(BTClibValueError, match="invalid descriptor character: "):
+        checksum("raw(deadbeef)è")
+
+
+def test_ranged() -> None:
+
+    desc = Descriptor(f"wpkh({ORIGIN}{ACCOUNT_XPUB}/0/*)")
+    assert desc.is_ranged
+    script_pub_keys = desc.script_pub_keys(0, 8)
+    for i, script_pub_key in enumerate(script_pub_keys):
+        xpub = bip32.derive(ACCOUNT_XPUB, f"m/0/{i}")
+        assert script_pub_key == ScriptPubKey.p2wpkh(xpub).script
+        assert desc.script_pub_key(i) == script_pub_key
+        assert desc.address(i) == b32.p2wpkh(xpub)
+        pub_key = _pub_key(xpub, "m")
+        key_origin = BIP32KeyOrigin(FINGERPRINT, f"m/84h/0h/0h/0/{i}")
+        assert desc.hd_key_paths(i) == {pub_key: key_origin}
+    # overlapping ranges
+    assert desc.script_pub_keys(4, 8)[:4] == script_pub_keys[4:]
+
+    # xprv and hardened wildcard, no key origin
+    desc = Descriptor(f"pkh({XPRV}/84h/0h/0h/1/*h)")
+    for i in range(2):
+        xprv = bip32.derive(XPRV, f"m/84h/0h/0h/1/{i}h")
+        assert desc.script_pub_key(i) == ScriptPubKey.p2pkh(xprv).script
+        assert desc.address(i) == b58.p2pkh(xprv)
+        fingerprint = bip32.BIP32KeyData.b58decode(
+            bip32.derive(XPRV, "m/0")
+        ).parent_fingerprint
+        key_origin = BIP32KeyOrigin(fingerprint, f"m/84h/0h/0h/1/{i}h")
+        assert desc.hd_key_paths(i) == {_pub_key(xprv, "m"): key_origin}
+
+    # hardened wildcard with an xpub
+    desc = Descriptor(f"pkh({ACCOUNT_XPUB}/0/*')")
+    with pytest.raises(BTClibValueError, match="invalid hardened derivation"):
+        desc.script_pub_key(0)
+
+    for start, count in ((0, -1), (-1, 1), (0x80000000, 1), (0x7FFFFFFF, 2)):
+        with pytest.raises(BTClibValueError):
+            desc.script_pub_keys(start, count)
+
+
+def test_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+
+    desc = Descriptor(f"wpkh({ACCOUNT_XPUB}/1/*)")
+    script_pub_keys = desc.script_pub_keys(0, 10)
+
+    def _raise(*_: Any) -> NoReturn:
+        raise AssertionError("unexpected derivation")  # pragma: no cover
+
+    monkeypatch.setattr(descriptor, "derive_children", _raise)
+    assert desc.script_pub_keys(2, 5) == script_pub_keys[2:7]
+    monkeypatch.undo()
+
+    # the missing keys are derived in bulk
+    calls = []
+
+    def derive_children(*args: Any) -> Any:
+        calls.append(args[1:3])
+        return bip32.derive_children(*args)
+
+    monkeypatch.setattr(descriptor, "derive_children", derive_children)
+    assert desc.script_pub_keys(8, 6)[:2] == script_pub_keys[8:]
+    assert calls == [(10, 4)]
+
+    # bounded cache: the least recently used keys are evicted
+    desc = Descriptor(f"wpkh({ACCOUNT_XPUB}/1/*)", cache_size=4)
+    calls.clear()
+    assert desc.script_pub_keys(0, 10) == script_pub_keys
+    assert desc.script_pub_keys(6, 4) == script_pub_keys[6:]
+    assert desc.script_pub_keys(0, 2) == script_pub_keys[:2]
+    assert calls == [(0, 10), (0, 2)]
+    # 8 and 9 are the most recently used
+    assert desc.script_pub_keys(8, 2) == script_pub_keys[8:]
+    assert calls == [(0, 10), (0, 2)]
+    assert desc.script_pub_keys(6, 1) == script_pub_keys[6:7]
+    assert calls == [(0, 10), (0, 2), (6, 1)]
+
+    desc = Descriptor(f"wpkh({ACCOUNT_XPUB}/1/*)", cache_size=0)
+    calls.clear()
+    assert desc.script_pub_keys(0, 10) == script_pub_keys
+    assert desc.script_pub_keys(0, 10) == script_pub_keys
+    assert calls == [(0, 10), (0, 10)]
+
+    # the parent of the ranged keys is derived only once
+    expected = Descriptor(f"wpkh({ACCOUNT_XPUB}/1/*)").script_pub_keys(20, 2)
+    monkeypatch.setattr(descriptor, "_derive", _raise)
+    assert desc.script_pub_keys(20, 2) == expected
+    assert desc.script_pub_key(21) == expected[1]
+
+    with pytest.raises(BTClibValueError, match="invalid cache size: "):
+        Descriptor(f"wpkh({ACCOUNT_XPUB}/1/*)", cache_size=-1)
+
+
+def test_nested() -> None:
+
+    xpubs = [bip32.derive(ACCOUNT_XPUB, f"m/0/{i}") for i in range(3)]
+    keys = [_pub_key(xpub, "m") for xpub in xpubs]
+    hex_keys = [key.hex() for key in keys]
+
+    desc = Descriptor(f"sh(wpkh({hex_keys[0]}))")
+    assert not desc.is_ranged
+    assert desc.address() == b58.p2wpkh_p2sh(keys[0])
+    assert desc.hd_key_paths() == {}
+    with pytest.raises(BTClibValueError, match="index for non-ranged descriptor: "):
+        desc.script_pub_key(1)
+
+    redeem_script = ScriptPubKey.p2ms(2, keys, lexi_sort=False).script
+    desc = Descriptor(f"sh(multi(2,{','.join(hex_keys)}))")
+    assert desc.script_pub_key() == ScriptPubKey.p2sh(redeem_script).script
+    desc = Descriptor(f"wsh(multi(2,{','.join(hex_keys)}))")
+    assert desc.script_pub_key() == ScriptPubKey.p2wsh(redeem_script).script
+
+    redeem_script = ScriptPubKey.p2ms(2, keys).script
+    desc = Descriptor(f"sh(wsh(sortedmulti(2,{','.join(hex_keys)})))")
+    assert desc.address() == b58.p2wsh_p2sh(redeem_script)
+
+    # ranged multisig, with a fixed key
+    desc = Descriptor(f"wsh(sortedmulti(2,{ACCOUNT_XPUB}/0/*,{hex_keys[0]}))")
+    assert desc.is_ranged
+    for i in range(3):
+        redeem_script = ScriptPubKey.p2ms(2, [keys[0], keys[i]]).script
+        assert desc.script_pub_key(i) == ScriptPubKey.p2wsh(redeem_script).script
+    xpub = bip32.BIP32KeyData.b58decode(ACCOUNT_XPUB)
+    fingerprint = hash160(xpub.key)[:4]
+    assert desc.hd_key_paths(2) == {keys[2]: BIP32KeyOrigin(fingerprint, "m/0/2")}
+
+
+def test_keys() -> None:
+
+    wif = b58.wif_from_prv_key(1, compressed=False)
+    pub_key = pub_keyinfo_from_key(wif)[0]
+    desc = Descriptor(f"pk({wif})")
+    assert desc.script_pub_key() == ScriptPubKey.p2pk(pub_key).script
+    desc = Descriptor(f"pkh({pub_key.hex()})")
+    assert desc.script_pub_key() == ScriptPubKey.p2pkh(pub_key).script
+
+    # non-ranged xkey
+    desc = Descriptor(f"pkh({ORIGIN}{ACCOUNT_XPRV}/0/3)")
+    assert desc.address() == b58.p2pkh(bip32.derive(ACCOUNT_XPRV, "m/0/3"))
+
+    address = b32.p2wpkh(pub_keyinfo_from_key(1)[0])
+    desc = Descriptor(f"addr({address})")
+    assert desc.address() == address
+
+    for desc_str, err_msg in (
+        (f"wpkh({wif})", "uncompressed key in segwit context: "),
+        (f"wsh(pk({pub_key.hex()}))", "uncompressed key in segwit context: "),
+        (f"wpkh({pub_key.hex()}/0)", "invalid derivation of non-BIP32 key: "),
+        ("pkh(deadbeef)", "invalid key expression: "),
+        (f"pkh([deadbeef/0h{ACCOUNT_XPUB})", "invalid key origin: "),
+        (f"sh(sh(pkh({wif})))", "invalid script expression context: sh"),
+        (f"wsh(wpkh({wif}))", "invalid script expression context: wpkh"),
+        ("combo(0)", "invalid script expression context: combo"),
+        ("pkh", "invalid script expression: "),
+        ("raw(00", "invalid script expression: "),
+        (f"multi(0,{wif})", "invalid m in m-of-n: "),
+        (f"multi(2,{wif})", "invalid m in m-of-n: "),
+        (f"multi(x,{wif})", "invalid m in m-of-n: "),
+        (f"multi(1,{','.join([wif] * 17)})", "invalid n in m-of-n: "),
+    ):
+        with pytest.raises(BTClibValueError, match=err_msg):
+            Descriptor(desc_str)
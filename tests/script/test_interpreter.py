@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2020-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.script.interpreter` module."
+
+import json
+import re
+from os import path
+from typing import Any, List, Tuple
+
+import pytest
+
+from btclib import var_bytes
+from btclib.ecc import dsa, ssa
+from btclib.ecc.curve import mult, secp256k1
+from btclib.ecc.der import Sig as DerSig
+from btclib.ecc.sec_point import bytes_from_point
+from btclib.exceptions import BTClibValueError
+from btclib.hashes import tagged_hash
+from btclib.script.interpreter import (
+    TAPSCRIPT,
+    SigCache,
+    TxChecker,
+    eval_script,
+    is_push_only,
+    verify_input,
+)
+from btclib.script.op_codes import OP_CODES, encode_num, op_pushdata
+from btclib.script.script import Command, serialize
+from btclib.script.script_pub_key import ScriptPubKey
+from btclib.script.witness import Witness
+from btclib.tx import sign_hash
+from btclib.tx.out_point import OutPoint
+from btclib.tx.tx import Tx
+from btclib.tx.tx_in import TxIn
+from btclib.tx.tx_out import TxOut
+from btclib.utils import sha256
+
+PRV_KEYS = [1 + i * 0x1F1F1F for i in range(1, 4)]
+PUB_KEYS = [bytes_from_point(mult(q)) for q in PRV_KEYS]
+X_ONLY_KEYS = [mult(q)[0].to_bytes(32, "big") for q in PRV_KEYS]
+MULTISIG = ScriptPubKey.p2ms(2, PUB_KEYS, lexi_sort=False).script
+
+
+def _eval(script: List[Command], stack: List[bytes]) -> List[bytes]:
+    eval_script(serialize(script), stack)
+    return stack
+
+
+def test_eval_script() -> None:
+
+    assert _eval(["OP_2", "OP_3", "OP_ADD", "OP_5", "OP_EQUAL"], []) == [b"\x01"]
+    assert _eval([26, "OP_1NEGATE", "OP_ADD"], []) == [b"\x19"]
+    assert _eval([0x7FFFFFFF, "OP_1ADD"], []) == [b"\x00\x00\x00\x80\x00"]
+    assert _eval(["OP_3", "OP_2", "OP_1", "OP_WITHIN"], []) == [b""]
+    assert _eval(["OP_0", "OP_NOT", "OP_5", "OP_MAX", "OP_NEGATE"], []) == [b"\x85"]
+    assert _eval(["OP_1", "OP_2", "OP_3", "OP_ROT", "OP_SWAP"], []) == [
+        b"\x02",
+        b"\x01",
+        b"\x03",
+    ]
+    stack = _eval(["OP_1", "OP_2", "OP_3", "OP_4", "OP_2SWAP", "OP_2OVER"], [])
+    assert stack == [b"\x03", b"\x04", b"\x01", b"\x02", b"\x03", b"\x04"]
+    stack = _eval(["OP_2", "OP_ROLL", "OP_TOALTSTACK", "OP_DEPTH"], [b"a", b"b", b"c"])
+    assert stack == [b"b", b"c", b"\x02"]
+    assert _eval(["OP_SIZE", "OP_SHA256"], [b"abc"]) == [b"abc", sha256(b"\x03")]
+
+    # conditionals, also nested and not executed
+    script: List[Command] = ["OP_IF", "OP_IF", "OP_2", "OP_ELSE", "OP_3"]
+    script += ["OP_ENDIF", "OP_ELSE", "OP_4", "OP_ENDIF"]
+    assert _eval(script, [b"", b"\x01"]) == [b"\x03"]
+    assert _eval(script, [b"\x01", b"\x01"]) == [b"\x02"]
+    assert _eval(script, [b"\x01", b"\x80"]) == [b"\x01", b"\x04"]
+    assert _eval(["OP_0", "OP_IF", "OP_RETURN", "OP_ENDIF"], []) == []
+
+    cases: List[Tuple[List[Command], str]] = [
+        (["OP_1", "OP_IF"], "unbalanced conditional"),
+        (["OP_ELSE"], "unbalanced conditional"),
+        (["OP_RETURN"], "OP_RETURN executed"),
+        (["OP_0", "OP_IF", "OP_VERIF", "OP_ENDIF"], "disabled op code: "),
+        (["OP_RESERVED"], "invalid op code: OP_RESERVED"),
+        (["OP_CHECKSIGADD"], "invalid op code: OP_CHECKSIGADD"),
+        (["OP_1", "OP_2", "OP_EQUALVERIFY"], "OP_EQUALVERIFY failed"),
+        (["OP_DROP"], "not enough stack elements: 0"),
+        (["OP_FROMALTSTACK"], "empty alt-stack"),
+        (["OP_1", "OP_1", "OP_PICK"], "invalid stack index: 1"),
+        (["0102030405", "OP_1ADD"], "script number overflow: 5 bytes"),
+        (["OP_NOP"] * 202, "op count limit exceeded"),
+        (["OP_1"] * 1_001, "stack size limit exceeded"),
+        (["OP_1", "OP_CHECKLOCKTIMEVERIFY"], "missing transaction context"),
+    ]
+    for script, err_msg in cases:
+        with pytest.raises(BTClibValueError, match=err_msg):
+            _eval(script, [])
+
+    with pytest.raises(BTClibValueError, match="invalid push"):
+        eval_script(b"\x4c\x02\x01", [])
+    with pytest.raises(BTClibValueError, match="script size limit exceeded"):
+        eval_script(b"\x61" * 10_001, [])
+    # pushes are bound by the stack size limit too
+    eval_script(b"\x00" * 1_000, [])
+    with pytest.raises(BTClibValueError, match="stack size limit exceeded"):
+        eval_script(b"\x00" * 1_001, [])
+    with pytest.raises(BTClibValueError, match="stack size limit exceeded"):
+        script = ["OP_1", "OP_TOALTSTACK"]
+        _eval(script + ["OP_1"] * 1_000, [])
+    with pytest.raises(BTClibValueError, match="non-minimal conditional argument"):
+        eval_script(serialize(["OP_IF", "OP_ENDIF"]), [b"\x02"], None, TAPSCRIPT)
+
+    assert is_push_only(serialize(["OP_0", "OP_16", "abcd"]))
+    assert not is_push_only(serialize(["OP_1", "OP_DUP"]))
+
+
+def _utxos(leaf_script: bytes) -> Tuple[List[TxOut], bytes]:
+    "Return the utxos of all the supported types and the control block."
+
+    # taproot output key committing to leaf_script
+    internal_key = X_ONLY_KEYS[1]
+    preimage = b"\xc0" + var_bytes.serialize(leaf_script)
+    tweak = tagged_hash(b"TapTweak", internal_key + tagged_hash(b"TapLeaf", preimage))
+    Q = secp256k1.add(mult(PRV_KEYS[1]), mult(int.from_bytes(tweak, "big")))
+    return [
+        TxOut(10_000, ScriptPubKey.p2pkh(PUB_KEYS[0])),
+        TxOut(20_000, ScriptPubKey.p2wpkh(PUB_KEYS[1])),
+        TxOut(30_000, ScriptPubKey.p2sh(ScriptPubKey.p2wpkh(PUB_KEYS[2]).script)),
+        TxOut(40_000, ScriptPubKey.p2wsh(MULTISIG)),
+        TxOut(50_000, ScriptPubKey.p2sh(ScriptPubKey.p2wsh(MULTISIG).script)),
+        TxOut(60_000, b"\x51\x20" + X_ONLY_KEYS[0]),
+        TxOut(70_000, b"\x51\x20" + Q[0].to_bytes(32, "big")),
+        TxOut(80_000, ScriptPubKey.p2sh(MULTISIG)),
+    ], bytes([0xC0 | Q[1] % 2]) + internal_key
+
+
+def _ecdsa_sig(msg_hash: bytes, prv_key: int, hash_type: int = sign_hash.ALL) -> bytes:
+    return dsa.sign_(msg_hash, prv_key).serialize() + bytes([hash_type])
+
+
+def _signed_tx() -> Tuple[Tx, List[TxOut]]:
+
+    leaf_script = serialize([X_ONLY_KEYS[2], "OP_CHECKSIG", X_ONLY_KEYS[1]])
+    leaf_script += serialize(["OP_CHECKSIGADD", "OP_2", "OP_EQUAL"])
+    utxos, control = _utxos(leaf_script)
+    vin = [TxIn(OutPoint(sha256(bytes([i])), i)) for i in range(len(utxos))]
+    tx = Tx(2, 0, vin, [TxOut(1_000, ScriptPubKey.p2wpkh(PUB_KEYS[0]))])
+    all_ = sign_hash.ALL
+
+    msg_hash = sign_hash.legacy(utxos[0].script_pub_key.script, tx, 0, all_)
+    script_sig = [_ecdsa_sig(msg_hash, PRV_KEYS[0]), PUB_KEYS[0]]
+    tx.vin[0].script_sig = serialize(script_sig)
+
+    script_ = ScriptPubKey.p2pkh(PUB_KEYS[1]).script
+    msg_hash = sign_hash.segwit_v0(script_, tx, 1, all_, utxos[1].value)
+    witness = [_ecdsa_sig(msg_hash, PRV_KEYS[1]), PUB_KEYS[1]]
+    tx.vin[1].script_witness = Witness(witness)
+
+    script_ = ScriptPubKey.p2pkh(PUB_KEYS[2]).script
+    msg_hash = sign_hash.segwit_v0(script_, tx, 2, all_, utxos[2].value)
+    witness = [_ecdsa_sig(msg_hash, PRV_KEYS[2]), PUB_KEYS[2]]
+    tx.vin[2].script_witness = Witness(witness)
+    tx.vin[2].script_sig = serialize([ScriptPubKey.p2wpkh(PUB_KEYS[2]).script])
+
+    for i in (3, 4):
+        msg_hash = sign_hash.segwit_v0(MULTISIG, tx, i, all_, utxos[i].value)
+        sigs = [_ecdsa_sig(msg_hash, q) for q in PRV_KEYS[1:]]
+        tx.vin[i].script_witness = Witness([b""] + sigs + [MULTISIG])
+    tx.vin[4].script_sig = serialize([ScriptPubKey.p2wsh(MULTISIG).script])
+
+    msg_hash = sign_hash.taproot(tx, 5, utxos, sign_hash.DEFAULT)
+    tx.vin[5].script_witness = Witness([ssa.sign_(msg_hash, PRV_KEYS[0]).serialize()])
+
+    tapleaf_hash = tagged_hash(b"TapLeaf", b"\xc0" + var_bytes.serialize(leaf_script))
+    msg_hash = sign_hash.taproot(
+        tx, 6, utxos, all_, ext_flag=1, tapleaf_hash=tapleaf_hash
+    )
+    sigs = [ssa.sign_(msg_hash, q).serialize() + b"\x01" for q in PRV_KEYS[1:]]
+    tx.vin[6].script_witness = Witness(sigs + [leaf_script, control])
+
+    msg_hash = sign_hash.legacy(MULTISIG, tx, 7, all_)
+    sigs = [_ecdsa_sig(msg_hash, q) for q in PRV_KEYS[:2]]
+    tx.vin[7].script_sig = serialize([b""] + sigs + [MULTISIG])
+
+    return tx, utxos
+
+
+def test_verify_input() -> None:
+
+    tx, utxos = _signed_tx()
+    cache = sign_hash.SighashCache(tx)
+    for vin_i in range(len(tx.vin)):
+        verify_input(tx, vin_i, utxos, cache=cache)
+
+    # all signatures are invalidated
+    wrong_tx = Tx.parse(tx.serialize(include_witness=True))
+    wrong_tx.lock_time = 1
+    for vin_i in range(len(tx.vin)):
+        err_msg = "script evaluated to false"
+        if vin_i == 5:
+            err_msg = "invalid taproot key path signature"
+        elif vin_i == 6:
+            err_msg = "invalid schnorr signature"
+        with pytest.raises(BTClibValueError, match=err_msg):
+            verify_input(wrong_tx, vin_i, utxos)
+
+    # multisig signatures must be in the same order as the keys
+    wrong_tx = Tx.parse(tx.serialize(include_witness=True))
+    stack = wrong_tx.vin[3].script_witness.stack
+    stack[1], stack[2] = stack[2], stack[1]
+    with pytest.raises(BTClibValueError, match="script evaluated to false"):
+        verify_input(wrong_tx, 3, utxos)
+
+    wrong_tx.vin[0].script_witness = Witness([b"\x01"])
+    with pytest.raises(BTClibValueError, match="unexpected witness"):
+        verify_input(wrong_tx, 0, utxos)
+
+    # a non-null dummy
+    wrong_tx = Tx.parse(tx.serialize(include_witness=True))
+    wrong_tx.vin[3].script_witness.stack[0] = b"\x01"
+    with pytest.raises(BTClibValueError, match="non-null dummy element"):
+        verify_input(wrong_tx, 3, utxos)
+
+    # a witness script not matching the program
+    wrong_tx.vin[3].script_witness.stack[-1] = MULTISIG[:-1] + b"\xac"
+    with pytest.raises(BTClibValueError, match="witness script hash mismatch"):
+        verify_input(wrong_tx, 3, utxos)
+
+    # a non canonical DER signature
+    wrong_tx.vin[4].script_witness.stack[1] = b"\x30\x00\x01"
+    with pytest.raises(BTClibValueError, match="invalid DER signature"):
+        verify_input(wrong_tx, 4, utxos)
+
+    # out of range r or s: strict DER, just an invalid signature
+    checker = TxChecker(tx, 0, utxos)
+    for r, s in ((secp256k1.n + 1, 1), (0, 1), (1, secp256k1.n)):
+        sig = DerSig(r, s, check_validity=False).serialize(check_validity=False)
+        script = serialize([sig + b"\x01", PUB_KEYS[0], "OP_CHECKSIG", "OP_NOT"])
+        for sig_cache in (None, SigCache()):
+            checker.sig_cache = sig_cache
+            stack = []
+            eval_script(script, stack, checker)
+            assert stack == [b"\x01"]
+
+    # native witness programs require an empty script_sig
+    wrong_tx.vin[1].script_sig = b"\x51"
+    with pytest.raises(BTClibValueError, match="non-empty script_sig"):
+        verify_input(wrong_tx, 1, utxos)
+
+    with pytest.raises(BTClibValueError, match="mismatched number of utxos"):
+        verify_input(tx, 0, utxos[1:])
+
+
+def test_sig_cache() -> None:
+
+    tx, utxos = _signed_tx()
+    sig_cache = SigCache()
+    for vin_i in range(len(tx.vin)):
+        verify_input(tx, vin_i, utxos, sig_cache)
+    assert sig_cache.hits == 0
+    # p2pkh, p2wpkh, p2wpkh_p2sh, p2wsh and p2wsh_p2sh 2-of-3 multisig,
+    # key path, script path, p2sh 2-of-3 multisig with one pub_key miss
+    n_checks = 3 + 2 * 2 + 1 + 2 + 3
+    assert len(sig_cache) == sig_cache.misses == n_checks
+
+    # no elliptic curve work when re-validating
+    for vin_i in range(len(tx.vin)):
+        verify_input(tx, vin_i, utxos, sig_cache)
+    assert sig_cache.hits == n_checks
+    assert len(sig_cache) == n_checks
+
+    # bounded, least recently used first out
+    sig_cache = SigCache(3)
+    for vin_i in range(len(tx.vin)):
+        verify_input(tx, vin_i, utxos, sig_cache)
+    assert len(sig_cache) == 3
+    verify_input(tx, 7, utxos, sig_cache)
+    assert sig_cache.hits == 3
+    verify_input(tx, 6, utxos, sig_cache)
+    assert sig_cache.hits == 3
+    assert len(sig_cache) == 3
+    sig_cache.clear()
+    assert len(sig_cache) == sig_cache.hits == sig_cache.misses == 0
+
+    with pytest.raises(BTClibValueError, match="invalid signature cache size: "):
+        SigCache(0)
+
+
+def test_timelocks() -> None:
+
+    tx = Tx(1, 500_000, [TxIn(OutPoint(sha256(b""), 0), sequence=10)], [])
+    checker = TxChecker(tx, 0, [TxOut(0, b"")])
+
+    def _check(script: List[Command]) -> None:
+        eval_script(serialize(script), [], checker)
+
+    _check([499_999, "OP_CHECKLOCKTIMEVERIFY"])
+    # disable flag
+    _check([1 << 31, "OP_CHECKSEQUENCEVERIFY"])
+    cases: List[Tuple[List[Command], str]] = [
+        ([500_001, "OP_CHECKLOCKTIMEVERIFY"], "unsatisfied lock time: 500001"),
+        ([500_000_000, "OP_CHECKLOCKTIMEVERIFY"], "lock time type mismatch"),
+        (["OP_1NEGATE", "OP_CHECKLOCKTIMEVERIFY"], "negative lock time: -1"),
+        (["OP_CHECKSEQUENCEVERIFY"], "empty stack"),
+        (["OP_1NEGATE", "OP_CHECKSEQUENCEVERIFY"], "negative sequence: -1"),
+        ([10, "OP_CHECKSEQUENCEVERIFY"], "invalid tx version: 1"),
+    ]
+    for script, err_msg in cases:
+        with pytest.raises(BTClibValueError, match=err_msg):
+            _check(script)
+
+    tx.version = 2
+    _check([10, "OP_CHECKSEQUENCEVERIFY"])
+    cases = [
+        ([11, "OP_CHECKSEQUENCEVERIFY"], "unsatisfied relative lock time: 11"),
+        ([1 << 22, "OP_CHECKSEQUENCEVERIFY"], "relative lock time type mismatch"),
+    ]
+    for script, err_msg in cases:
+        with pytest.raises(BTClibValueError, match=err_msg):
+            _check(script)
+
+    tx.vin[0].sequence = 0xFFFFFFFF
+    with pytest.raises(BTClibValueError, match="final input sequence"):
+        _check([499_999, "OP_CHECKLOCKTIMEVERIFY"])
+    with pytest.raises(BTClibValueError, match="disabled input relative lock time"):
+        _check([10, "OP_CHECKSEQUENCEVERIFY"])
+
+
+# Bitcoin Core script_tests.json:
+# [[witness items..., amount]?, script_sig, script_pub_key, flags, error, comment?]
+# btclib enforces all the consensus rules, i.e. all these flags
+_CORE_FLAGS = {
+    "P2SH",
+    "WITNESS",
+    "DERSIG",
+    "NULLDUMMY",
+    "CHECKLOCKTIMEVERIFY",
+    "CHECKSEQUENCEVERIFY",
+    "TAPROOT",
+}
+_CORE_ERRORS = {
+    "EVAL_FALSE": "script evaluated to false",
+    "BAD_OPCODE": "invalid op code|invalid push|disabled op code: 0x6[56]",
+    "DISABLED_OPCODE": "disabled op code",
+    "OP_RETURN": "OP_RETURN executed",
+    "OP_COUNT": "op count limit exceeded",
+    "UNBALANCED_CONDITIONAL": "unbalanced conditional",
+    "INVALID_STACK_OPERATION": "empty stack|not enough stack elements",
+    "VERIFY": "OP_VERIFY failed",
+    "EQUALVERIFY": "OP_EQUALVERIFY failed",
+    "SIG_DER": "invalid DER signature",
+    "SIG_NULLDUMMY": "non-null dummy element",
+    "SIG_PUSHONLY": "non-push-only p2sh script_sig",
+    "NEGATIVE_LOCKTIME": "negative (lock time|sequence)",
+    "UNSATISFIED_LOCKTIME": "final input sequence|invalid tx version",
+    "CLEANSTACK": "unclean stack",
+    "WITNESS_PROGRAM_MISMATCH": "witness script hash mismatch",
+    "WITNESS_PROGRAM_WITNESS_EMPTY": "empty p2wsh witness",
+    "WITNESS_MALLEATED": "non-empty script_sig for native witness",
+    "WITNESS_MALLEATED_P2SH": "malleated p2sh-wrapped witness script_sig",
+    "WITNESS_UNEXPECTED": "unexpected witness",
+    "SCHNORR_SIG": "invalid taproot key path signature",
+    "SCHNORR_SIG_HASHTYPE": "invalid schnorr signature size",
+    "TAPSCRIPT_MINIMALIF": "non-minimal conditional argument",
+    "TAPSCRIPT_CHECKMULTISIG": "OP_CHECKMULTISIG disabled in tapscript",
+}
+
+
+def _core_script(asm: str) -> bytes:
+    "Parse the Bitcoin Core test script notation."
+
+    script = b""
+    for token in asm.split():
+        if re.fullmatch(r"-?[0-9]+", token):
+            n = int(token)
+            if n == -1:
+                script += OP_CODES["OP_1NEGATE"]
+            elif 1 <= n <= 16:
+                script += OP_CODES[f"OP_{n}"]
+            else:
+                script += op_pushdata(encode_num(n))
+        elif token.startswith("0x"):
+            # raw bytes, not a push
+            script += bytes.fromhex(token[2:])
+        elif len(token) > 1 and token[0] == token[-1] == "'":
+            script += op_pushdata(token[1:-1].encode())
+        else:
+            script += OP_CODES[token if token.startswith("OP_") else f"OP_{token}"]
+    return script
+
+
+def _core_tx(
+    witness_data: List[Any], script_sig: str, script_pub_key: str
+) -> Tuple[Tx, List[TxOut]]:
+    "Return the Bitcoin Core test spending transaction and its utxos."
+
+    *items, amount = witness_data
+    witness: List[bytes] = []
+    for item in items:
+        if item.startswith("#SCRIPT#"):
+            leaf_script = _core_script(item[len("#SCRIPT#") :])
+            witness.append(leaf_script)
+        elif item == "#CONTROLBLOCK#":
+            # script path spending of the only leaf of the taproot tree
+            preimage = b"\xc0" + var_bytes.serialize(leaf_script)
+            k = tagged_hash(b"TapLeaf", preimage)
+            t = tagged_hash(b"TapTweak", X_ONLY_KEYS[0] + k)
+            P = ssa.point_from_bip340pub_key(X_ONLY_KEYS[0])
+            Q = secp256k1.add(P, mult(int.from_bytes(t, "big")))
+            output_key = Q[0].to_bytes(32, "big")
+            script_pub_key = script_pub_key.replace(
+                "#TAPROOTOUTPUT#", f"0x{output_key.hex()}"
+            )
+            witness.append(bytes([0xC0 | Q[1] % 2]) + X_ONLY_KEYS[0])
+        else:
+            witness.append(bytes.fromhex(item))
+
+    value = round(amount * 100_000_000)
+    script_ = ScriptPubKey(_core_script(script_pub_key), check_validity=False)
+    utxo = TxOut(value, script_, check_validity=False)
+    coinbase = TxIn(OutPoint(), b"\x00\x00", 0xFFFFFFFF, check_validity=False)
+    credit = Tx(1, 0, [coinbase], [utxo], check_validity=False)
+    vin = TxIn(
+        OutPoint(credit.id, 0),
+        _core_script(script_sig),
+        0xFFFFFFFF,
+        Witness(witness),
+        check_validity=False,
+    )
+    spend = Tx(1, 0, [vin], [TxOut(value, b"")], check_validity=False)
+    return spend, [utxo]
+
+
+def test_core_script_tests() -> None:
+    "Test cases in the Bitcoin Core script_tests.json format, consensus flags only."
+
+    fname = "script_tests.json"
+    filename = path.join(path.dirname(__file__), "_data", fname)
+    with open(filename, "r") as file_:
+        data = json.load(file_)
+    n_tests = 0
+    for test in data:
+        if len(test) == 1:  # comment
+            continue
+        witness_data: List[Any] = [0]
+        if isinstance(test[0], list):
+            witness_data, *test = test
+        script_sig, script_pub_key, flags, error = test[:4]
+        assert set(flags.split(",")) <= _CORE_FLAGS, test
+        tx, utxos = _core_tx(witness_data, script_sig, script_pub_key)
+        if error == "OK":
+            verify_input(tx, 0, utxos)
+        else:
+            with pytest.raises(BTClibValueError, match=_CORE_ERRORS[error]):
+                verify_input(tx, 0, utxos)
+        n_tests += 1
+    assert n_tests
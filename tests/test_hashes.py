@@ -10,8 +10,10 @@
 
 "Tests for the `btclib.hashes` module."
 
+import hashlib
+
 from btclib.bip32.bip32 import BIP32KeyData, derive, rootxprv_from_seed
-from btclib.hashes import fingerprint
+from btclib.hashes import fingerprint, tagged_hash, tagged_hasher
 
 
 def test_fingerprint() -> None:
@@ -22,3 +24,16 @@ def test_fingerprint() -> None:
     child_key = derive(xprv, 0x80000000)
     pf2 = BIP32KeyData.b58decode(child_key).parent_fingerprint
     assert pf == pf2
+
+
+def test_tagged_hash() -> None:
+
+    tag = b"TapSighash"
+    tag_hash = hashlib.sha256(tag).digest()
+    for msg in (b"", b"\x00" * 100):
+        expected = hashlib.sha256(tag_hash + tag_hash + msg).digest()
+        assert tagged_hash(tag, msg) == expected
+    # independent copies of the cached midstate
+    h1 = tagged_hasher(tag)
+    h1.update(b"\x00")
+    assert tagged_hasher(tag).digest() == tagged_hash(tag, b"")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.key_format` module."
+
+from typing import Any, NoReturn, Tuple
+
+import pytest
+
+from btclib import to_prv_key, to_pub_key
+from btclib.alias import Octets
+from btclib.ecc.curve import CURVES
+from btclib.key_format import INT, POINT, PRV_OCTETS, SEC, WIF, XPRV, XPUB, key_format
+from btclib.to_prv_key import int_from_prv_key, prv_keyinfo_from_prv_key
+from btclib.to_pub_key import point_from_key, pub_keyinfo_from_key
+from tests.test_to_key import (
+    Q,
+    Q_compressed,
+    Q_compressed_hexstring,
+    Q_compressed_hexstring2,
+    Q_compressed_hexstring3,
+    Q_uncompressed,
+    Q_uncompressed_hexstring2,
+    q,
+    q_bytes,
+    q_hexstring,
+    q_hexstring2,
+    wif_compressed,
+    wif_compressed_string2,
+    wif_uncompressed_string,
+    xprv_data,
+    xprv_string,
+    xprv_string2,
+    xpub_data,
+    xpub_string,
+    xpub_string2,
+)
+
+
+def test_key_format() -> None:
+
+    assert key_format(q) == INT
+    assert key_format(Q) == POINT
+    assert key_format(xprv_data) == XPRV
+    assert key_format(xpub_data) == XPUB
+    for prv_key in (q_bytes, bytearray(q_bytes), q_hexstring, q_hexstring2):
+        assert key_format(prv_key) == PRV_OCTETS
+    for pub_key in (
+        Q_compressed,
+        Q_uncompressed,
+        memoryview(Q_compressed),
+        Q_compressed_hexstring,
+        Q_compressed_hexstring2,
+        Q_uncompressed_hexstring2,
+    ):
+        assert key_format(pub_key) == SEC
+    for wif in (wif_compressed, wif_compressed_string2, wif_uncompressed_string):
+        assert key_format(wif) == WIF
+    for xprv in (xprv_string, xprv_string2, xprv_string.encode("ascii")):
+        assert key_format(xprv) == XPRV
+    for xpub in (xpub_string, xpub_string2, xpub_string.encode("ascii")):
+        assert key_format(xpub) == XPUB
+
+    # sizes depend on the curve
+    secp384r1 = CURVES["secp384r1"]
+    assert key_format(q_bytes, secp384r1) is None
+    assert key_format(q.to_bytes(48, "big"), secp384r1) == PRV_OCTETS
+    assert key_format(Q_compressed, secp384r1) is None
+
+    # not recognized
+    for key in (
+        "",
+        b"",
+        "not a key",
+        b"\x05" + Q_compressed[1:],
+        Q_compressed_hexstring[:-4],
+        # inner spaces are not sniffed
+        Q_compressed_hexstring3,
+        1.0,
+        None,
+    ):
+        assert key_format(key) is None
+
+
+def _raise(*_: Any) -> NoReturn:
+    raise AssertionError("unexpected tentative parsing")  # pragma: no cover
+
+
+def test_dispatch(monkeypatch: pytest.MonkeyPatch) -> None:
+
+    # octets are never tentatively decoded as WIF/BIP32 keys
+    monkeypatch.setattr(to_prv_key, "_prv_keyinfo_from_xprvwif", _raise)
+    monkeypatch.setattr(to_pub_key, "_point_from_xpub", _raise)
+    monkeypatch.setattr(to_pub_key, "_pub_keyinfo_from_xpub", _raise)
+    octets_prv_keys: Tuple[Octets, ...] = (q_bytes, q_hexstring)
+    for prv_key in octets_prv_keys:
+        assert int_from_prv_key(prv_key) == q
+        assert prv_keyinfo_from_prv_key(prv_key) == (q, "mainnet", True)
+        assert point_from_key(prv_key) == Q
+        assert pub_keyinfo_from_key(prv_key) == (Q_compressed, "mainnet")
+    octets_pub_keys: Tuple[Octets, ...] = (Q_compressed, Q_compressed_hexstring)
+    for pub_key in octets_pub_keys:
+        assert point_from_key(pub_key) == Q
+        assert pub_keyinfo_from_key(pub_key) == (Q_compressed, "mainnet")
+    monkeypatch.undo()
+
+    # public keys are never tentatively parsed as private keys
+    monkeypatch.setattr(to_pub_key, "prv_keyinfo_from_prv_key", _raise)
+    monkeypatch.setattr(to_pub_key, "pub_keyinfo_from_prv_key", _raise)
+    pub_keys: Tuple[Octets, ...] = (Q_compressed, xpub_string)
+    for pub_key in pub_keys:
+        assert point_from_key(pub_key) == Q
+        assert pub_keyinfo_from_key(pub_key) == (Q_compressed, "mainnet")
+    monkeypatch.undo()
+
+    # private keys are never tentatively parsed as public keys
+    monkeypatch.setattr(to_pub_key, "pub_keyinfo_from_pub_key", _raise)
+    prv_keys: Tuple[Octets, ...] = (q_hexstring, wif_compressed, xprv_string)
+    for prv_key in prv_keys:
+        assert pub_keyinfo_from_key(prv_key) == (Q_compressed, "mainnet")
+    monkeypatch.undo()
+
+    # WIF and BIP32 keys are parsed straight away
+    monkeypatch.setattr(to_prv_key, "_prv_keyinfo_from_wif", _raise)
+    assert int_from_prv_key(xprv_string) == q
+    monkeypatch.undo()
+    monkeypatch.setattr(to_prv_key, "_prv_keyinfo_from_xprv", _raise)
+    assert int_from_prv_key(wif_compressed) == q
@@ -10,6 +10,7 @@
 
 "Tests for the `btclib.network` module."
 
+import dataclasses
 import json
 from os import path
 
@@ -19,8 +20,13 @@ from btclib.ecc.curve import CURVES
 from btclib.exceptions import BTClibValueError
 from btclib.network import (
     NETWORKS,
+    PREFIXES,
+    XPRV_VERSIONS_ALL,
+    XPUB_VERSIONS_ALL,
     Network,
+    _prefixes,
     curve_from_xkeyversion,
+    network_from_key_value,
     network_from_xkeyversion,
     xprvversions_from_network,
     xpubversions_from_network,
@@ -61,6 +67,61 @@ def test_curve_from_xkeyversion() -> None:
             assert NETWORKS[net].curve == curve_from_xkeyversion(version)
 
 
+def test_prefixes() -> None:
+    # no prefix is shared between different kinds or script types
+    for net in NETWORKS:
+        for key in ("wif", "p2pkh", "p2sh", "hrp"):
+            value = getattr(NETWORKS[net], key)
+            assert PREFIXES[value][0] == network_from_key_value(key, value)
+        for version in xpubversions_from_network(net):
+            assert PREFIXES[version][1] == "xpub"
+        for version in xprvversions_from_network(net):
+            assert PREFIXES[version][1] == "xprv"
+    assert PREFIXES[NETWORKS["mainnet"].wif] == ("mainnet", "wif", None)
+    assert PREFIXES[NETWORKS["mainnet"].p2sh] == ("mainnet", "address", "p2sh")
+    assert PREFIXES["bcrt"] == ("regtest", "address", None)
+    version = NETWORKS["regtest"].slip132_p2wpkh_p2sh_pub
+    assert PREFIXES[version] == ("testnet", "xpub", "p2wpkh_p2sh")
+
+    assert network_from_key_value("hrp", "bc") == "mainnet"
+    assert network_from_key_value("curve", CURVES["secp256k1"]) == "mainnet"
+    assert network_from_key_value("hrp", "xyz") is None
+    with pytest.raises(BTClibValueError, match="unknown network key: "):
+        network_from_key_value("bip32", b"\x04\x88\xad\xe4")
+
+    for version in (b"\x00\x00\x00\x00", NETWORKS["mainnet"].wif):
+        err_msg = "unknown extended key version: "
+        with pytest.raises(BTClibValueError, match=err_msg):
+            network_from_xkeyversion(version)
+
+    # bytes-like prefixes
+    wif = bytearray(NETWORKS["mainnet"].wif)
+    assert network_from_key_value("wif", wif) == "mainnet"
+    version = bytearray(NETWORKS["testnet"].bip32_pub)
+    assert network_from_xkeyversion(version) == "testnet"
+
+    # lists, as they always have been
+    for versions in (XPRV_VERSIONS_ALL, XPUB_VERSIONS_ALL):
+        assert isinstance(versions, list)
+        assert len(versions) == 3 * 5
+    assert isinstance(xprvversions_from_network(), list)
+    assert isinstance(xpubversions_from_network(), list)
+
+    assert _prefixes(NETWORKS) == PREFIXES
+    networks = dict(NETWORKS)
+    networks["regtest"] = dataclasses.replace(
+        NETWORKS["regtest"], p2sh=NETWORKS["testnet"].wif
+    )
+    with pytest.raises(BTClibValueError, match="colliding regtest p2sh prefix: "):
+        _prefixes(networks)
+    networks["regtest"] = NETWORKS["regtest"]
+    networks["testnet"] = dataclasses.replace(
+        NETWORKS["testnet"], hrp=NETWORKS["mainnet"].hrp
+    )
+    with pytest.raises(BTClibValueError, match="colliding testnet hrp prefix: "):
+        _prefixes(networks)
+
+
 def test_space_and_caps() -> None:
     net = " MainNet "
     assert xpubversions_from_network(net), f"unknown network: {net}"
@@ -18,7 +18,7 @@ import pytest
 
 # Library imports
 from btclib.exceptions import BTClibValueError
-from btclib.utils import hash160, hash256, hex_string, int_from_integer
+from btclib.utils import _map_chunks, hash160, hash256, hex_string, int_from_integer
 from tests.test_to_key import (
     net_unaware_compressed_pub_keys,
     net_unaware_uncompressed_pub_keys,
@@ -67,3 +67,15 @@ def test_hex_string() -> None:
     int_ = -1
     with pytest.raises(BTClibValueError, match="negative integer: "):
         hex_string(int_)
+
+
+def test_map_chunks() -> None:
+
+    items = list(range(5))
+    assert _map_chunks(reversed, items) == [4, 3, 2, 1, 0]
+    assert _map_chunks(reversed, items, processes=1) == [4, 3, 2, 1, 0]
+    # two chunks of three and two items
+    assert _map_chunks(reversed, items, processes=2) == [2, 1, 0, 4, 3]
+    # no more chunks than items
+    assert _map_chunks(reversed, items, processes=8) == items
+    assert _map_chunks(reversed, [], processes=2) == []
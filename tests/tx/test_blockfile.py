@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2020-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.tx.blockfile` module."
+
+import json
+import os
+from os import path
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from btclib.exceptions import BTClibValueError
+from btclib.network import NETWORKS
+from btclib.tx.blockfile import (
+    BlockFile,
+    _block_hashes,
+    _xor,
+    block_files,
+    build_index,
+    map_block_files,
+    read_xor_key,
+)
+from btclib.tx.blocks import Block
+
+MAGIC = NETWORKS["mainnet"].magic_bytes[::-1]
+
+
+def _blocks() -> List[bytes]:
+    blocks = []
+    for fname in ("block_1.bin", "block_170.bin", "block_200000.bin"):
+        filename = path.join(path.dirname(__file__), "_data", fname)
+        with open(filename, "rb") as file_:
+            blocks.append(file_.read())
+    return blocks
+
+
+def _write_blk(
+    filename: str, blocks: List[bytes], xor_key: bytes = b"", padding: int = 100
+) -> None:
+    data = b"".join(MAGIC + len(b).to_bytes(4, "little") + b for b in blocks)
+    if xor_key:
+        data = _xor(data, xor_key, 0)
+    # preallocated file: the padding is not obfuscated
+    data += b"\x00" * padding
+    with open(filename, "wb") as file_:
+        file_.write(data)
+
+
+def test_block_file(tmp_path: Path) -> None:
+
+    blocks = _blocks()
+    filename = path.join(tmp_path, "blk00000.dat")
+    _write_blk(filename, blocks)
+
+    with BlockFile(filename) as block_file:
+        assert len(block_file) == len(blocks)
+        offsets = block_file.offsets
+        assert offsets[0] == 8
+        for offset, block_bytes in zip(offsets, blocks):
+            block = Block.parse(block_bytes)
+            assert block_file.block_data(offset) == block_bytes
+            assert block_file.block_hash(offset) == block.header.hash
+            assert block_file.header(offset) == block.header
+            assert block_file.block(offset) == block
+            tx_ids = [tx_view.id for tx_view in block_file.tx_views(offset)]
+            assert tx_ids == [tx.id for tx in block.transactions]
+        assert list(block_file.blocks()) == [Block.parse(b) for b in blocks]
+
+        with pytest.raises(BTClibValueError, match="invalid block offset: "):
+            block_file.block_data(offsets[1] + 1)
+
+    with pytest.raises(BTClibValueError, match="closed or empty block file: "):
+        block_file.block_data(offsets[0])
+
+    # testnet magic bytes
+    with BlockFile(filename, "testnet") as block_file:
+        with pytest.raises(BTClibValueError, match="invalid magic bytes at offset 0"):
+            block_file.offsets  # pylint: disable=pointless-statement
+
+    with open(filename, "r+b") as file_:
+        file_.truncate(len(blocks[0]) + 8 + 8 + 100)
+    with BlockFile(filename) as block_file:
+        with pytest.raises(BTClibValueError, match="truncated block at offset "):
+            block_file.offsets  # pylint: disable=pointless-statement
+
+    open(filename, "wb").close()
+    with BlockFile(filename) as block_file:
+        assert len(block_file) == 0
+
+
+def test_obfuscation(tmp_path: Path) -> None:
+
+    blocks = _blocks()
+    xor_key = bytes.fromhex("0123456789abcdef")
+    filename = path.join(tmp_path, "blk00000.dat")
+    _write_blk(filename, blocks, xor_key)
+
+    assert read_xor_key(str(tmp_path)) == b""
+    with open(path.join(tmp_path, "xor.dat"), "wb") as file_:
+        file_.write(xor_key)
+    assert read_xor_key(str(tmp_path)) == xor_key
+
+    with BlockFile(filename, xor_key=xor_key) as block_file:
+        offsets = block_file.offsets
+        assert len(offsets) == len(blocks)
+        for offset, block_bytes in zip(offsets, blocks):
+            assert block_file.block_data(offset) == block_bytes
+            block = Block.parse(block_bytes)
+            assert block_file.block(offset) == block
+            tx_ids = [tx_view.id for tx_view in block_file.tx_views(offset)]
+            assert tx_ids == [tx.id for tx in block.transactions]
+
+    # an all zero key is no obfuscation
+    _write_blk(filename, blocks)
+    with BlockFile(filename, xor_key=b"\x00" * 8) as block_file:
+        assert block_file.block_data(block_file.offsets[2]) == blocks[2]
+
+
+def test_index(tmp_path: Path) -> None:
+
+    blocks = _blocks()
+    blocks_dir = str(tmp_path)
+    _write_blk(path.join(blocks_dir, "blk00000.dat"), blocks[:2])
+    _write_blk(path.join(blocks_dir, "blk00001.dat"), blocks[2:], padding=300)
+    filenames = block_files(blocks_dir)
+    assert [path.basename(f) for f in filenames] == ["blk00000.dat", "blk00001.dat"]
+
+    results = map_block_files(_block_hashes, filenames)
+    assert map_block_files(_block_hashes, filenames, processes=2) == results
+
+    index_filename = path.join(blocks_dir, "index.json")
+    index = build_index(blocks_dir, index_filename=index_filename)
+    assert index == build_index(blocks_dir)
+    assert len(index) == 3
+    for block_bytes in blocks:
+        block = Block.parse(block_bytes)
+        name, offset = index[block.header.hash]
+        with BlockFile(path.join(blocks_dir, name)) as block_file:
+            assert block_file.block(offset) == block
+
+    # unchanged files are not scanned again
+    with open(index_filename, "r") as file_:
+        dict_ = json.load(file_)
+    dict_["blocks"]["ff" * 32] = ["blk00000.dat", 8]
+    with open(index_filename, "w") as file_:
+        json.dump(dict_, file_)
+    assert len(build_index(blocks_dir, index_filename=index_filename)) == 4
+
+    # modified files are, even if their size has not changed
+    filename = path.join(blocks_dir, "blk00001.dat")
+    size = path.getsize(filename)
+    with open(filename, "r+b") as file_:
+        file_.seek(8 + len(blocks[2]))
+        file_.write(MAGIC + len(blocks[0]).to_bytes(4, "little") + blocks[0])
+    assert path.getsize(filename) == size
+    os.utime(filename, ns=(0, 0))
+    index = build_index(blocks_dir, index_filename=index_filename)
+    offset = 8 + len(blocks[2]) + 8
+    assert index[Block.parse(blocks[0]).header.hash] == ("blk00001.dat", offset)
+
+    # deleted (pruned) files are dropped
+    os.remove(path.join(blocks_dir, "blk00000.dat"))
+    index = build_index(blocks_dir, index_filename=index_filename)
+    assert all(name == "blk00001.dat" for name, _ in index.values())
+    assert index == build_index(blocks_dir, index_filename=index_filename)
+    with open(index_filename, "r") as file_:
+        assert list(json.load(file_)["files"]) == ["blk00001.dat"]
@@ -16,6 +16,7 @@ from os import path
 
 import pytest
 
+from btclib import var_int
 from btclib.exceptions import BTClibValueError
 from btclib.network import NETWORKS
 from btclib.tx.blocks import Block, BlockHeader
@@ -189,6 +190,17 @@ def test_block_200000() -> None:
     assert header == BlockHeader.parse(header.serialize())
     assert header == BlockHeader.from_dict(header.to_dict())
 
+    # the coinbase is validated too
+    coinbase_version = block.transactions[0].version
+    block.transactions[0].version = 0
+    with pytest.raises(BTClibValueError, match="invalid version: 0"):
+        block.assert_valid()
+    block.transactions[0].version = coinbase_version
+    offset = 80 + len(var_int.serialize(len(block.transactions)))
+    invalid_bytes = block_bytes[:offset] + b"\x00" * 4 + block_bytes[offset + 4 :]
+    with pytest.raises(BTClibValueError, match="invalid version: 0"):
+        Block.parse(invalid_bytes)
+
     block.transactions.pop()
     err_msg = "invalid merkle root: "
     with pytest.raises(BTClibValueError, match=err_msg):
@@ -246,6 +258,58 @@ def test_block_481824() -> None:
             assert block.vsize == 988_436
 
 
+def test_iter_parse() -> None:
+
+    filename = path.join(path.dirname(__file__), "_data", "block_481824.bin")
+    with open(filename, "rb") as file_:
+        block = Block.parse(file_.read())
+
+    with open(filename, "rb") as file_:
+        items = Block.iter_parse(file_)
+        assert next(items) == block.header
+        # nothing but the header has been read so far
+        assert file_.tell() == 80
+        for tx, block_tx in zip(items, block.transactions):
+            assert tx == block_tx
+        assert next(items, None) is None
+        assert file_.read() == b""
+
+    block_bytes = Block(block.header, block.transactions[:5], False).serialize(
+        check_validity=False
+    )
+    items = Block.iter_parse(block_bytes)
+    assert next(items) == block.header
+    transactions = [next(items) for _ in range(5)]
+    assert transactions == block.transactions[:5]
+    # the merkle root is checked after the last transaction
+    with pytest.raises(BTClibValueError, match="invalid merkle root: "):
+        next(items)
+    items = Block.iter_parse(block_bytes, check_merkle_root=False)
+    assert list(items)[1:] == block.transactions[:5]
+
+    block_bytes = Block(block.header, block.transactions[1:5], False).serialize(
+        check_validity=False
+    )
+    items = Block.iter_parse(block_bytes)
+    next(items)
+    with pytest.raises(BTClibValueError, match="first transaction is not a coinbase"):
+        next(items)
+
+    # the witness commitment is checked after the last transaction
+    filename = path.join(path.dirname(__file__), "_data", "block_481824_complete.bin")
+    with open(filename, "rb") as file_:
+        block_bytes = file_.read()
+    assert len(list(Block.iter_parse(block_bytes))) == 1 + 1866
+    block = Block.parse(block_bytes)
+    block.transactions[0].vin[0].script_witness.stack[0] = b"\x01" * 32
+    block_bytes = block.serialize(check_validity=False)
+    with pytest.raises(BTClibValueError, match="invalid witness commitment: "):
+        Block.parse(block_bytes)
+    with pytest.raises(BTClibValueError, match="invalid witness commitment: "):
+        list(Block.iter_parse(block_bytes))
+    assert len(list(Block.iter_parse(block_bytes, check_merkle_root=False))) == 1867
+
+
 def test_dataclasses_json_dict() -> None:
 
     fname = "block_481824.bin"
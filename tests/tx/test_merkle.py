@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2020-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.tx.merkle` module."
+
+from os import path
+
+import pytest
+
+from btclib.exceptions import BTClibValueError
+from btclib.tx.blocks import Block
+from btclib.tx.merkle import (
+    MerkleTree,
+    PartialMerkleTree,
+    _MerkleRoot,
+    assert_valid_witness_commitment,
+    merkle_root,
+    root_from_proof,
+    verify_proof,
+    witness_commitment,
+)
+from btclib.tx.tx_out import TxOut
+from btclib.utils import hash256
+from btclib.utils import merkle_root as utils_merkle_root
+
+
+def _block(fname: str) -> Block:
+    filename = path.join(path.dirname(__file__), "_data", fname)
+    with open(filename, "rb") as binfile_:
+        return Block.parse(binfile_.read(), check_validity=False)
+
+
+def test_merkle_root() -> None:
+
+    for n in range(1, 34):
+        data = [bytes([i]) for i in range(n)]
+        leaves = [hash256(item) for item in data]
+        expected = utils_merkle_root(data, hash256)
+        merkle_root_ = _MerkleRoot()
+        for leaf in leaves:
+            merkle_root_.add(leaf)
+        assert merkle_root_.count == n
+        assert merkle_root_.root() == expected
+        assert merkle_root(leaves) == expected
+        assert MerkleTree(leaves).root == expected
+        # the input list is not modified
+        assert data == [bytes([i]) for i in range(n)]
+
+    with pytest.raises(BTClibValueError, match="no merkle tree leaves"):
+        _MerkleRoot().root()
+    with pytest.raises(BTClibValueError, match="no merkle tree leaves"):
+        MerkleTree().root  # pylint: disable=expression-not-assigned
+    with pytest.raises(BTClibValueError, match="no merkle tree leaves"):
+        merkle_root([])
+
+
+def test_merkle_tree() -> None:
+
+    leaves = [hash256(bytes([i])) for i in range(20)]
+    tree = MerkleTree()
+    for n, leaf in enumerate(leaves, 1):
+        tree.append(leaf)
+        assert len(tree) == n
+        assert tree.levels == MerkleTree(leaves[:n]).levels
+
+    leaves[5] = leaves[-1] = hash256(b"")
+    tree.replace(5, leaves[5])
+    tree.replace(-1, leaves[-1])
+    assert tree.levels == MerkleTree(leaves).levels
+    assert tree.leaves == leaves
+
+    for i, leaf in enumerate(leaves):
+        proof = tree.proof(i)
+        assert len(proof) == len(tree.levels) - 1
+        assert root_from_proof(leaf, i, proof) == tree.root
+        assert verify_proof(leaf, i, proof, tree.root)
+        assert not verify_proof(leaf, i ^ 1, proof, tree.root)
+        assert not verify_proof(leaves[i - 1], i, proof, tree.root)
+    assert tree.proof(-1) == tree.proof(len(leaves) - 1)
+    assert not verify_proof(leaves[0], 1 << 5, tree.proof(0), tree.root)
+    with pytest.raises(BTClibValueError, match="invalid leaf index: "):
+        root_from_proof(leaves[0], -1, tree.proof(0))
+    with pytest.raises(IndexError):
+        tree.proof(len(leaves))
+    with pytest.raises(IndexError):
+        tree.replace(len(leaves), leaves[0])
+
+    block = _block("block_481824.bin")
+    tree = MerkleTree.from_txs(block.transactions)
+    assert tree.root == block.header.merkle_root[::-1]
+    tx = block.transactions[1000]
+    assert verify_proof(tx.id[::-1], 1000, tree.proof(1000), tree.root)
+
+
+def test_partial_merkle_tree() -> None:
+
+    for n in (1, 2, 3, 7, 8, 9, 33):
+        tree = MerkleTree(hash256(bytes([i])) for i in range(n))
+        for matches in (
+            [False] * n,
+            [True] * n,
+            [i % 3 == 1 for i in range(n)],
+            [i == n - 1 for i in range(n)],
+        ):
+            partial_tree = PartialMerkleTree.from_tree(tree, matches)
+            if not any(matches):
+                assert partial_tree.hashes == [tree.root]
+            serialized = partial_tree.serialize()
+            partial_tree = PartialMerkleTree.parse(serialized)
+            assert partial_tree.serialize() == serialized
+            root, matched = partial_tree.extract()
+            assert root == tree.root
+            assert matched == [(i, tree.leaves[i]) for i in range(n) if matches[i]]
+
+    with pytest.raises(BTClibValueError, match="mismatched number of matches"):
+        PartialMerkleTree.from_tree(tree, [True])
+
+    leaf = hash256(b"")
+    for partial_tree, err_msg in (
+        # CVE-2012-2459
+        (PartialMerkleTree(2, [leaf, leaf], [True, False, False]), "identical "),
+        (PartialMerkleTree(2, [leaf], [True, False, False]), "not enough "),
+        (PartialMerkleTree(2, [leaf, leaf], [False, True]), "unused "),
+        (PartialMerkleTree(2, [leaf], [True] * 9), "not enough "),
+        (PartialMerkleTree(1, [leaf], [False] * 9), "unused "),
+    ):
+        with pytest.raises(BTClibValueError, match=err_msg):
+            partial_tree.extract()
+
+    with pytest.raises(BTClibValueError, match="invalid number of leaves: 0"):
+        PartialMerkleTree()
+    with pytest.raises(BTClibValueError, match="too many partial merkle tree "):
+        PartialMerkleTree(2, [leaf, leaf, leaf], [True] * 3)
+    with pytest.raises(BTClibValueError, match="invalid hash length: 31"):
+        PartialMerkleTree(1, [leaf[1:]], [False])
+
+
+def test_witness_commitment() -> None:
+
+    block = _block("block_481824_complete.bin")
+    txs = block.transactions
+    assert witness_commitment(txs[0]) is not None
+    assert_valid_witness_commitment(txs)
+    # legacy nodes see no witness data
+    assert_valid_witness_commitment(_block("block_481824.bin").transactions)
+
+    stack = txs[0].vin[0].script_witness.stack
+    stack[0] = b"\x01" * 32
+    with pytest.raises(BTClibValueError, match="invalid witness commitment: "):
+        assert_valid_witness_commitment(txs)
+    stack[0] = b"\x00" * 31
+    with pytest.raises(BTClibValueError, match="invalid coinbase witness reserved"):
+        assert_valid_witness_commitment(txs)
+
+    # no commitment
+    txs[0].vout = [TxOut(tx_out.value, b"\x51") for tx_out in txs[0].vout]
+    assert witness_commitment(txs[0]) is None
+    with pytest.raises(BTClibValueError, match="unexpected witness data"):
+        block.assert_valid_witness_commitment()
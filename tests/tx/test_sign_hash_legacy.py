@@ -196,3 +196,28 @@ def test_test_vectors():
             hash_type += 0xFFFFFFFF + 1
         actual_hash = sign_hash.legacy(script_, tx, input_index, hash_type)
         assert actual_hash == bytes.fromhex(exp_hash)[::-1]
+
+
+def test_sighash_cache():
+    fname = "sign_hash_legacy_test_vectors.json"
+    filename = path.join(path.dirname(__file__), "_data", fname)
+    with open(filename, "r") as file_:
+        data = json.load(file_)
+    data = data[1:]  # skip column headers
+    hash_types = [
+        sign_hash.ALL,
+        sign_hash.NONE,
+        sign_hash.SINGLE,
+        sign_hash.ANYONECANPAY | sign_hash.ALL,
+        sign_hash.ANYONECANPAY | sign_hash.NONE,
+        sign_hash.ANYONECANPAY | sign_hash.SINGLE,
+    ]
+    for raw_tx, raw_script, _, _, _ in data[:50]:
+        script_ = sign_hash.legacy_script(raw_script)[0]
+        tx = Tx.parse(raw_tx, check_validity=False)
+        # a cache shared among all inputs and hash types
+        cache = sign_hash.SighashCache(tx)
+        for hash_type in hash_types:
+            for i in range(len(tx.vin)):
+                hash_ = sign_hash.legacy(script_, tx, i, hash_type)
+                assert sign_hash.legacy(script_, tx, i, hash_type, cache) == hash_
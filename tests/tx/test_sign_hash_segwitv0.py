@@ -13,9 +13,16 @@
 test vector at https://github.com/bitcoin/bips/blob/master/bip-0143.mediawiki
 """
 
+from typing import Any
+
+import pytest
+
+from btclib.exceptions import BTClibValueError
 from btclib.script.witness import Witness
 from btclib.tx import sign_hash
+from btclib.tx.out_point import OutPoint
 from btclib.tx.tx import Tx
+from btclib.tx.tx_in import TxIn
 from btclib.tx.tx_out import TxOut
 
 
@@ -172,3 +179,53 @@ def test_wrapped_p2wsh():
     assert hash_ == bytes.fromhex(
         "511e8e52ed574121fc1b654970395502128263f62662e076dc6baf05c2e6a99b"
     )
+
+
+def test_sighash_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    tx_bytes = "0100000002fff7f7881a8099afa6940d42d1e7f6362bec38171ea3edf433541db4e4ad969f0000000000eeffffffef51e1b804cc89d182d279655c3aa89e815b1b309fe287d9b2b55d57b90ec68a0100000000ffffffff02202cb206000000001976a9148280b37df378db99f66f85c95a783a76ac7a6d5988ac9093510d000000001976a9143bde42dbee7e4dbe6a21b2d50ce2f0167faa815988ac11000000"
+    tx = Tx.parse(tx_bytes)
+    utxo = TxOut(
+        value=600000000,
+        script_pub_key=bytes.fromhex("00141d0f172a0ecb48aee1be1f2687d2963ae33f71a1"),
+    )
+
+    # BIP143 test vector
+    cache = sign_hash.SighashCache(tx)
+    hash_ = sign_hash.from_utxo(utxo, tx, 1, sign_hash.ALL, cache)
+    assert hash_ == bytes.fromhex(
+        "c37af31116d1b27caf68aae9e3ac82f1477929014d5b917657d0eb49478cb670"
+    )
+
+    # a consolidation transaction
+    tx.vin += [TxIn(OutPoint(i.to_bytes(32, "big"), i), b"") for i in range(1, 50)]
+    n_vin = len(tx.vin)
+    hash_types = [
+        sign_hash.ALL,
+        sign_hash.NONE,
+        sign_hash.SINGLE,
+        sign_hash.ANYONECANPAY | sign_hash.ALL,
+    ]
+    expected = [
+        [sign_hash.from_utxo(utxo, tx, i, hash_type) for i in range(n_vin)]
+        for hash_type in hash_types
+    ]
+
+    calls = []
+    serialize = OutPoint.serialize
+
+    def counting_serialize(self: OutPoint, *args: Any) -> bytes:
+        calls.append(self)
+        return serialize(self, *args)
+
+    monkeypatch.setattr(OutPoint, "serialize", counting_serialize)
+    cache = sign_hash.SighashCache(tx)
+    for hash_type, hashes in zip(hash_types, expected):
+        for i in range(n_vin):
+            assert sign_hash.from_utxo(utxo, tx, i, hash_type, cache) == hashes[i]
+    # the prev_outs are serialized once for hash_prev_outs,
+    # then once for each sign_hash preimage
+    assert len(calls) == n_vin + len(hash_types) * n_vin
+
+    err_msg = "sign_hash cache of a different transaction"
+    with pytest.raises(BTClibValueError, match=err_msg):
+        sign_hash.from_utxo(utxo, Tx.parse(tx_bytes), 0, sign_hash.ALL, cache)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2020-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Tests for the BIP341 taproot `btclib.sign_hash` functions.
+
+The reference sig_msg follows the BIP341 specification step by step,
+with no caching.
+"""
+
+import json
+from hashlib import sha256
+from os import path
+from typing import List, Sequence, Tuple
+
+import pytest
+
+from btclib import var_bytes
+from btclib.ecc import ssa
+from btclib.ecc.curve import mult, secp256k1
+from btclib.exceptions import BTClibValueError
+from btclib.hashes import tagged_hash
+from btclib.script.script_pub_key import ScriptPubKey
+from btclib.tx import sign_hash
+from btclib.tx.out_point import OutPoint
+from btclib.tx.tx import Tx
+from btclib.tx.tx_in import TxIn
+from btclib.tx.tx_out import TxOut
+
+
+def _sig_msg(
+    tx: Tx,
+    vin_i: int,
+    utxos: Sequence[TxOut],
+    hash_type: int,
+    ext_flag: int,
+    annex: bytes,
+    tapleaf_hash: bytes,
+    codesep_pos: int,
+) -> bytes:
+
+    msg = bytes([hash_type])
+    msg += tx.version.to_bytes(4, "little")
+    msg += tx.lock_time.to_bytes(4, "little")
+    if not hash_type & 0x80:
+        msg += sha256(b"".join(vin.prev_out.serialize() for vin in tx.vin)).digest()
+        msg += sha256(b"".join(u.value.to_bytes(8, "little") for u in utxos)).digest()
+        msg += sha256(
+            b"".join(var_bytes.serialize(u.script_pub_key.script) for u in utxos)
+        ).digest()
+        msg += sha256(
+            b"".join(vin.sequence.to_bytes(4, "little") for vin in tx.vin)
+        ).digest()
+    if hash_type & 3 not in (2, 3):
+        msg += sha256(b"".join(vout.serialize() for vout in tx.vout)).digest()
+    msg += bytes([ext_flag * 2 + (1 if annex else 0)])
+    if hash_type & 0x80:
+        msg += tx.vin[vin_i].prev_out.serialize()
+        msg += utxos[vin_i].value.to_bytes(8, "little")
+        msg += var_bytes.serialize(utxos[vin_i].script_pub_key.script)
+        msg += tx.vin[vin_i].sequence.to_bytes(4, "little")
+    else:
+        msg += vin_i.to_bytes(4, "little")
+    if annex:
+        msg += sha256(var_bytes.serialize(annex)).digest()
+    if hash_type & 3 == 3:
+        msg += sha256(tx.vout[vin_i].serialize()).digest()
+    if ext_flag == 1:
+        msg += tapleaf_hash + b"\x00" + codesep_pos.to_bytes(4, "little")
+    return msg
+
+
+def _tx_and_utxos(n_vin: int, n_vout: int) -> Tuple[Tx, List[TxOut]]:
+
+    vin = [
+        TxIn(OutPoint(sha256(bytes([i])).digest(), i), b"", 0xFFFFFFFF - i)
+        for i in range(n_vin)
+    ]
+    vout = [
+        TxOut(1000 * (i + 1), ScriptPubKey(b"\x51\x20" + sha256(bytes([i])).digest()))
+        for i in range(n_vout)
+    ]
+    utxos = [
+        TxOut(
+            5000 * (i + 1),
+            ScriptPubKey(b"\x51\x20" + sha256(bytes([i + 100])).digest()),
+        )
+        for i in range(n_vin)
+    ]
+    return Tx(2, 500000, vin, vout), utxos
+
+
+def test_taproot() -> None:
+
+    tx, utxos = _tx_and_utxos(5, 3)
+    cache = sign_hash.SighashCache(tx, utxos)
+    tapleaf_hash = sha256(b"leaf").digest()
+    for hash_type in sign_hash.TAPROOT_SIG_HASH_TYPES:
+        for vin_i in range(len(tx.vin)):
+            if hash_type & 3 == sign_hash.SINGLE and vin_i >= len(tx.vout):
+                continue
+            for ext_flag, annex, codesep_pos in (
+                (0, b"", 0xFFFFFFFF),
+                (0, b"\x50\x01\x02", 0xFFFFFFFF),
+                (1, b"", 0xFFFFFFFF),
+                (1, b"\x50", 7),
+            ):
+                args = (ext_flag, annex, tapleaf_hash, codesep_pos)
+                sig_msg = _sig_msg(tx, vin_i, utxos, hash_type, *args)
+                expected = tagged_hash(b"TapSighash", b"\x00" + sig_msg)
+                assert sign_hash.taproot(tx, vin_i, utxos, hash_type, *args) == expected
+                sighash = sign_hash.taproot(
+                    tx, vin_i, utxos, hash_type, *args, cache=cache
+                )
+                assert sighash == expected
+
+    # BIP340 signature of the key path sign_hash
+    q, x_Q = ssa.gen_keys(1)
+    sighash = sign_hash.taproot(tx, 0, utxos, sign_hash.DEFAULT, cache=cache)
+    sig = ssa.sign_(sighash, q)
+    assert ssa.verify_(sighash, x_Q, sig)
+    sighash = sign_hash.taproot(tx, 1, utxos, sign_hash.DEFAULT, cache=cache)
+    assert not ssa.verify_(sighash, x_Q, sig)
+
+
+def test_bip341_key_path_spending() -> None:
+    "BIP341 keyPathSpending test vectors (wallet-test-vectors.json)."
+
+    fname = "sign_hash_taproot_test_vectors.json"
+    filename = path.join(path.dirname(__file__), "_data", fname)
+    with open(filename, "r") as file_:
+        data = json.load(file_)
+    for test in data["keyPathSpending"]:
+        # the second output has an unknown opcode, i.e. an invalid asm script
+        tx = Tx.parse(test["given"]["rawUnsignedTx"], check_validity=False)
+        utxos = [
+            TxOut(utxo["amountSats"], utxo["scriptPubKey"])
+            for utxo in test["given"]["utxosSpent"]
+        ]
+        cache = sign_hash.SighashCache(tx, utxos)
+        intermediary = test["intermediary"]
+        assert cache.sha_amounts.hex() == intermediary["hashAmounts"]
+        assert cache.sha_outputs.hex() == intermediary["hashOutputs"]
+        assert cache.sha_prev_outs.hex() == intermediary["hashPrevouts"]
+        assert cache.sha_script_pub_keys.hex() == intermediary["hashScriptPubkeys"]
+        assert cache.sha_sequences.hex() == intermediary["hashSequences"]
+
+        for input_spending in test["inputSpending"]:
+            given = input_spending["given"]
+            vin_i = given["txinIndex"]
+            hash_type = given["hashType"]
+            exp_sighash = bytes.fromhex(input_spending["intermediary"]["sigHash"])
+            assert sign_hash.taproot(tx, vin_i, utxos, hash_type) == exp_sighash
+            sighash = sign_hash.taproot(tx, vin_i, utxos, hash_type, cache=cache)
+            assert sighash == exp_sighash
+
+            # the output key commits to the internal key and merkle root
+            x_Q = utxos[vin_i].script_pub_key.script[2:]
+            P = mult(int(given["internalPrivkey"], 16))
+            merkle_root = bytes.fromhex(given["merkleRoot"] or "")
+            t = tagged_hash(b"TapTweak", P[0].to_bytes(32, "big") + merkle_root)
+            P = P if P[1] % 2 == 0 else secp256k1.negate(P)
+            Q = secp256k1.add(P, mult(int.from_bytes(t, "big")))
+            assert Q[0].to_bytes(32, "big") == x_Q
+
+            # the key path witness signature of the sign_hash
+            (witness,) = input_spending["expected"]["witness"]
+            sig = bytes.fromhex(witness)
+            assert sig[64:] == (bytes([hash_type]) if hash_type else b"")
+            assert ssa.verify_(sighash, x_Q, sig[:64])
+
+
+def test_taproot_exceptions() -> None:
+
+    tx, utxos = _tx_and_utxos(3, 1)
+
+    with pytest.raises(BTClibValueError, match="invalid taproot sign_hash type: "):
+        sign_hash.taproot(tx, 0, utxos, 0x04)
+    with pytest.raises(BTClibValueError, match="invalid extension flag: "):
+        sign_hash.taproot(tx, 0, utxos, sign_hash.ALL, 2)
+    err_msg = "mismatched number of utxos and tx inputs: "
+    with pytest.raises(BTClibValueError, match=err_msg):
+        sign_hash.taproot(tx, 0, utxos[1:], sign_hash.ALL)
+    with pytest.raises(BTClibValueError, match="missing output for sign_hash single: "):
+        sign_hash.taproot(tx, 1, utxos, sign_hash.SINGLE)
+    with pytest.raises(BTClibValueError, match="invalid annex prefix: "):
+        sign_hash.taproot(tx, 0, utxos, sign_hash.ALL, annex=b"\x51")
+
+    cache = sign_hash.SighashCache(tx, list(utxos))
+    with pytest.raises(BTClibValueError, match="sign_hash cache of different utxos"):
+        sign_hash.taproot(tx, 0, utxos, sign_hash.ALL, cache=cache)
+    cache = sign_hash.SighashCache(tx)
+    with pytest.raises(BTClibValueError, match="missing spent utxos"):
+        cache.sha_amounts  # pylint: disable=pointless-statement
+    # the utxos are set at the first use of the cache
+    sign_hash.taproot(tx, 0, utxos, sign_hash.ALL, cache=cache)
+    assert cache.utxos is utxos
+
+    with pytest.raises(BTClibValueError, match="requires all the spent utxos"):
+        sign_hash.from_utxo(utxos[0], tx, 0, sign_hash.ALL)
@@ -11,7 +11,10 @@
 "Tests for the `btclib.tx` module."
 
 import json
+import pickle
+from copy import copy, deepcopy
 from os import path
+from typing import Any, NoReturn
 
 import pytest
 
@@ -20,6 +23,7 @@ from btclib.script.witness import Witness
 from btclib.tx.tx import Tx
 from btclib.tx.tx_in import OutPoint, TxIn
 from btclib.tx.tx_out import TxOut
+from btclib.utils import _TrackedList
 
 
 def test_tx() -> None:
@@ -154,6 +158,108 @@ def test_exceptions() -> None:
         tx.assert_valid()
 
 
+def test_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    tx_bytes = "010000000001019bdea7abb2fa14dead47dd14d03cf82212a25b6096a8da6b14feec3658dbcf9d0100000000ffffffff02a02526000000000017a914f987c321394968be164053d352fc49763b2be55c874361610000000000220020701a8d401c84fb13e6baf169d59684e17abd9fa216c8cc5b9fc63d622ff8c58d04004730440220421fbbedf2ee096d6289b99973509809d5e09589040d5e0d453133dd11b2f78a02205686dbdb57e0c44e49421e9400dd4e931f1655332e8d078260c9295ba959e05d014730440220398f141917e4525d3e9e0d1c6482cb19ca3188dc5516a3a5ac29a0f4017212d902204ea405fae3a58b1fc30c5ad8ac70a76ab4f4d876e8af706a6a7b4cd6fa100f44016952210375e00eb72e29da82b89367947f29ef34afb75e8654f6ea368e0acdfd92976b7c2103a1b26313f430c4b15bb1fdce663207659d8cac749a0e53d70eff01874496feff2103c96d495bfdd5ba4145e3e046fee45e84a8a48ad05bd8dbb395c011a32cf9f88053ae00000000"
+
+    tx = Tx.parse(tx_bytes)
+    tx_dict = Tx.parse(tx_bytes).to_dict()
+
+    # the cache is filled by parse: no serialization at all
+    def _raise(*_: Any) -> NoReturn:
+        raise AssertionError("unexpected serialization")  # pragma: no cover
+
+    monkeypatch.setattr(TxIn, "serialize", _raise)
+    assert tx.serialize(include_witness=True).hex() == tx_bytes
+    assert tx.to_dict() == tx_dict
+    assert tx.serialize(include_witness=False) is tx.serialize(False)
+    monkeypatch.undo()
+
+    # any mutation invalidates the cache
+    tx_id = tx.id
+    tx.vin[0].sequence -= 1
+    assert tx.id != tx_id
+    assert tx.id == Tx.parse(tx.serialize(False)).id
+    tx.vin[0].sequence += 1
+    assert tx.id == tx_id
+
+    hash_ = tx.hash
+    tx.vin[0].script_witness.stack.append(b"\x01")
+    assert tx.id == tx_id
+    assert tx.hash != hash_
+    tx.vin[0].script_witness.stack.pop()
+    assert tx.hash == hash_
+
+    tx.vout.append(TxOut(1, "00"))
+    assert tx.id != tx_id
+    tx.vout.pop()
+    tx.vout[0].script_pub_key.script = b"\x00"
+    assert tx.id != tx_id
+
+    # the cache is invalidated explicitly, never checked against the inputs
+    tx = Tx.parse(tx_bytes)
+    tx_id, hash_ = tx.id, tx.hash
+    for name in ("__iter__", "__len__", "__getitem__"):
+        monkeypatch.setattr(_TrackedList, name, _raise)
+    for _ in range(3):
+        assert (tx.id, tx.hash) == (tx_id, hash_)
+        assert (
+            tx.serialize(include_witness=True, check_validity=False).hex() == tx_bytes
+        )
+        assert tx.size + tx.weight > 0
+    monkeypatch.undo()
+
+    tx_in = tx.vin[0]
+    tx_in.prev_out.vout += 1
+    assert tx.id != tx_id
+    tx_in.prev_out.vout -= 1
+    stack = tx_in.script_witness.stack
+    assert tx.hash == hash_
+    stack[1:3] = [b"\x01"]
+    assert tx.hash != hash_
+    tx_in.script_witness = Witness(Tx.parse(tx_bytes).vin[0].script_witness.stack)
+    assert tx.hash == hash_
+    # the replaced stack is no longer part of the transaction
+    stack.clear()
+    assert tx.hash == hash_
+    tx.vin = [tx_in, TxIn(OutPoint(tx_id[::-1], 0))]
+    assert tx.id != tx_id
+    tx.vin.remove(tx.vin[1])
+    assert tx.id == tx_id
+
+    # inputs and outputs shared among transactions
+    tx_2 = Tx(tx.version, tx.lock_time, tx.vin, tx.vout)
+    assert tx_2.hash == hash_
+    tx.vout[0].value += 1
+    assert tx.id == tx_2.id != tx_id
+    tx.vout[0].value -= 1
+
+    # copies are tracked too
+    tx_2 = copy(tx)
+    assert tx_2.vin is not tx.vin
+    tx_2.vin.pop()
+    assert tx.id == tx_id
+    assert tx_2.id != tx_id
+    for tx_2 in (deepcopy(tx), pickle.loads(pickle.dumps(tx))):
+        assert (tx_2.id, tx_2.hash) == (tx_id, hash_)
+        tx_2.vin[0].sequence -= 1
+        tx_2.vin[0].script_witness.stack.append(b"\x01")
+        assert tx_2.id != tx_id
+        assert tx_2.hash != hash_
+        assert (tx.id, tx.hash) == (tx_id, hash_)
+
+    # non-canonical serializations are not cached
+    tx = Tx.parse(tx_bytes)
+    tx_bytes = tx.serialize(include_witness=False).hex()
+    # non-minimal var_int for the number of inputs
+    tx_2 = Tx.parse(tx_bytes[:8] + "fd0100" + tx_bytes[10:])
+    assert tx_2.serialize(include_witness=False).hex() == tx_bytes
+    assert tx_2.id == tx.id
+    # superfluous witness
+    tx_2 = Tx.parse(tx_bytes[:8] + "0001" + tx_bytes[8:-8] + "00" + tx_bytes[-8:])
+    assert tx_2.serialize(include_witness=True).hex() == tx_bytes
+    assert tx_2.hash == tx_2.id == tx.id
+
+
 def test_genesis_block() -> None:
 
     coinbase = "01000000010000000000000000000000000000000000000000000000000000000000000000ffffffff0704ffff001d0104ffffffff0100f2052a0100000043410496b538e853519c726a2c91e61ec11600ae1390813a627c66fb8be7947be63c52da7589379515d4e0a604f8141781e62294721166bf621e73a82cbf2342c858eeac00000000"
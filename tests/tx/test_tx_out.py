@@ -59,6 +59,13 @@ def test_invalid_tx_out() -> None:
     with pytest.raises(BTClibValueError, match="unknown network: "):
         TxOut(1, ScriptPubKey(script, "no_network"))
 
+    # unknown opcode: valid for consensus, but not as asm script
+    tx_out = "00ca9a3b0000000003ac9af5"
+    with pytest.raises(KeyError):
+        TxOut.parse(tx_out)
+    tx_out_ = TxOut.parse(tx_out, check_validity=False)
+    assert tx_out_.serialize(check_validity=False).hex() == tx_out
+
 
 def test_tx_out_from_address() -> None:
     address = "bc1qwqdg6squsna38e46795at95yu9atm8azzmyvckulcc7kytlcckxswvvzej"
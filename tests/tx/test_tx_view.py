@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2020-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.tx.tx_view` module."
+
+from os import path
+
+import pytest
+
+from btclib.exceptions import BTClibRuntimeError
+from btclib.tx.blocks import Block
+from btclib.tx.tx import Tx
+from btclib.tx.tx_view import TxView
+
+TX_BYTES = "010000000001019bdea7abb2fa14dead47dd14d03cf82212a25b6096a8da6b14feec3658dbcf9d0100000000ffffffff02a02526000000000017a914f987c321394968be164053d352fc49763b2be55c874361610000000000220020701a8d401c84fb13e6baf169d59684e17abd9fa216c8cc5b9fc63d622ff8c58d04004730440220421fbbedf2ee096d6289b99973509809d5e09589040d5e0d453133dd11b2f78a02205686dbdb57e0c44e49421e9400dd4e931f1655332e8d078260c9295ba959e05d014730440220398f141917e4525d3e9e0d1c6482cb19ca3188dc5516a3a5ac29a0f4017212d902204ea405fae3a58b1fc30c5ad8ac70a76ab4f4d876e8af706a6a7b4cd6fa100f44016952210375e00eb72e29da82b89367947f29ef34afb75e8654f6ea368e0acdfd92976b7c2103a1b26313f430c4b15bb1fdce663207659d8cac749a0e53d70eff01874496feff2103c96d495bfdd5ba4145e3e046fee45e84a8a48ad05bd8dbb395c011a32cf9f88053ae00000000"
+
+
+def _assert_same(view: TxView, tx: Tx) -> None:
+
+    assert view.version == tx.version
+    assert view.lock_time == tx.lock_time
+    assert view.id == tx.id
+    assert view.hash == tx.hash
+    assert view.size == tx.size
+    assert view.vsize == tx.vsize
+    assert view.weight == tx.weight
+    assert view.is_segwit() == tx.is_segwit()
+    assert view.is_coinbase() == tx.is_coinbase()
+    for include_witness in (False, True):
+        serialized = view.serialize(include_witness)
+        assert serialized == tx.serialize(include_witness, check_validity=False)
+    assert list(view.vin) == tx.vin
+    assert list(view.vout) == tx.vout
+    assert [w.script_witness for w in view.vin] == tx.vwitness
+    for i, tx_in in enumerate(tx.vin):
+        assert view.prev_out(i) == tx_in.prev_out
+    for i, tx_out in enumerate(tx.vout):
+        assert view.value(i) == tx_out.value
+        assert view.script_pub_key(i) == tx_out.script_pub_key.script
+    assert view.to_tx() == tx
+
+
+def test_tx_view() -> None:
+
+    tx = Tx.parse(TX_BYTES)
+    view = TxView(TX_BYTES)
+    _assert_same(view, tx)
+    assert view.start == 0
+    assert view.end == len(TX_BYTES) // 2
+
+    no_witness = tx.serialize(include_witness=False)
+    _assert_same(TxView(no_witness), Tx.parse(no_witness))
+
+    # lazy sequences
+    assert len(view.vout) == 2
+    assert view.vout[-1] == view.vout[1] == tx.vout[-1]
+    assert view.vout[::-1] == tx.vout[::-1]
+    for i in (2, -3):
+        with pytest.raises(IndexError):
+            view.vout[i]  # pylint: disable=pointless-statement
+        with pytest.raises(IndexError):
+            view.value(i)
+    assert view.script_pub_key(-1) == tx.vout[-1].script_pub_key.script
+    assert view.prev_out(-1) == tx.vin[0].prev_out
+
+    # no copy of the underlying data
+    buffer = bytearray(no_witness)
+    script_pub_key = TxView(buffer).script_pub_key(0)
+    assert script_pub_key.obj is buffer
+    # no reference cycle keeps the data exported after the view is dropped
+    view_ = TxView(buffer)
+    assert view_.vin[0].prev_out == tx.vin[0].prev_out
+    del script_pub_key, view_
+    buffer.extend(b"\x00")
+
+    # superfluous witness
+    data = no_witness[:4] + b"\x00\x01" + no_witness[4:-4] + b"\x00" + no_witness[-4:]
+    view = TxView(data)
+    assert not view.is_segwit()
+    assert view.hash == view.id == tx.id
+    assert view.serialize(include_witness=True) == no_witness
+
+    for data in (no_witness[:-1], no_witness[:50], bytes.fromhex(TX_BYTES)[:-6]):
+        with pytest.raises(BTClibRuntimeError, match="not enough binary data"):
+            TxView(data)
+
+
+def test_block_481824() -> None:
+
+    datadir = path.join(path.dirname(__file__), "_data")
+    filename = path.join(datadir, "block_481824.bin")
+    with open(filename, "rb") as binfile_:
+        data = binfile_.read()
+    block = Block.parse(data, check_validity=False)
+
+    # header and 3 bytes var_int number of transactions
+    offset = 83
+    for i, tx in enumerate(block.transactions):
+        view = TxView(data, offset)
+        assert view.start == offset
+        if i % 50 == 0:
+            _assert_same(view, tx)
+        else:
+            assert view.id == tx.id
+        offset = view.end
+    assert offset == len(data)
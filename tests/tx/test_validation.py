@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2020-2021 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.tx.validation` module."
+
+from os import path
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+from btclib.ecc import dsa, ssa
+from btclib.ecc.curve import mult
+from btclib.ecc.sec_point import bytes_from_point
+from btclib.exceptions import BTClibValueError
+from btclib.script.script_pub_key import ScriptPubKey
+from btclib.script.witness import Witness
+from btclib.tx import sign_hash
+from btclib.tx.blocks import Block
+from btclib.tx.out_point import OutPoint
+from btclib.tx.tx import Tx
+from btclib.tx.tx_in import TxIn
+from btclib.tx.tx_out import TxOut
+from btclib.tx.validation import UtxoLookup, validate_signatures
+from btclib.utils import sha256
+
+PRV_KEYS = [1 + i * 0x1F1F1F for i in range(1, 4)]
+PUB_KEYS = [bytes_from_point(mult(q)) for q in PRV_KEYS]
+MULTISIG = ScriptPubKey.p2ms(2, PUB_KEYS, lexi_sort=False).script
+
+UTXOS = [
+    TxOut(10_000, ScriptPubKey.p2pkh(PUB_KEYS[0])),
+    TxOut(20_000, ScriptPubKey.p2wpkh(PUB_KEYS[1])),
+    TxOut(30_000, ScriptPubKey.p2sh(ScriptPubKey.p2wpkh(PUB_KEYS[2]).script)),
+    TxOut(40_000, ScriptPubKey.p2wsh(MULTISIG)),
+    TxOut(50_000, ScriptPubKey.p2sh(ScriptPubKey.p2wsh(MULTISIG).script)),
+    TxOut(60_000, b"\x51\x20" + mult(PRV_KEYS[0])[0].to_bytes(32, "big")),
+]
+
+
+# OutPoint is not hashable
+UtxoSet = Dict[Tuple[bytes, int], TxOut]
+
+
+def _lookup(utxos: UtxoSet) -> UtxoLookup:
+    def lookup(prev_out: OutPoint) -> Optional[TxOut]:
+        return utxos.get((prev_out.tx_id, prev_out.vout))
+
+    return lookup
+
+
+def _push(data: bytes) -> bytes:
+    return bytes([len(data)]) + data
+
+
+def _ecdsa_sig(msg_hash: bytes, prv_key: int, hash_type: int) -> bytes:
+    return dsa.sign_(msg_hash, prv_key).serialize() + bytes([hash_type])
+
+
+def _signed_tx(seed: int) -> Tuple[Tx, UtxoSet]:
+    "Return a transaction spending all the UTXOS types, with its utxos."
+
+    prev_outs = [OutPoint(sha256(bytes([seed, i])), i) for i in range(len(UTXOS))]
+    vin = [TxIn(prev_out) for prev_out in prev_outs]
+    tx = Tx(2, 0, vin, [TxOut(1_000, ScriptPubKey.p2wpkh(PUB_KEYS[0]))])
+    all_ = sign_hash.ALL
+
+    msg_hash = sign_hash.legacy(UTXOS[0].script_pub_key.script, tx, 0, all_)
+    script_sig = _push(_ecdsa_sig(msg_hash, PRV_KEYS[0], all_)) + _push(PUB_KEYS[0])
+
+    witnesses: List[List[bytes]] = []
+    for i, q in ((1, 1), (2, 2)):
+        script_ = ScriptPubKey.p2pkh(PUB_KEYS[q]).script
+        msg_hash = sign_hash.segwit_v0(script_, tx, i, all_, UTXOS[i].value)
+        witnesses.append([_ecdsa_sig(msg_hash, PRV_KEYS[q], all_), PUB_KEYS[q]])
+    for i in (3, 4):
+        msg_hash = sign_hash.segwit_v0(MULTISIG, tx, i, all_, UTXOS[i].value)
+        sigs = [_ecdsa_sig(msg_hash, q, all_) for q in PRV_KEYS[::2]]
+        witnesses.append([b""] + sigs + [MULTISIG])
+    msg_hash = sign_hash.taproot(tx, 5, UTXOS, sign_hash.DEFAULT)
+    witnesses.append([ssa.sign_(msg_hash, PRV_KEYS[0]).serialize()])
+
+    tx.vin[0].script_sig = script_sig
+    tx.vin[2].script_sig = _push(ScriptPubKey.p2wpkh(PUB_KEYS[2]).script)
+    tx.vin[4].script_sig = _push(ScriptPubKey.p2wsh(MULTISIG).script)
+    for tx_in, stack in zip(tx.vin[1:], witnesses):
+        tx_in.script_witness = Witness(stack)
+    return tx, {(p.tx_id, p.vout): u for p, u in zip(prev_outs, UTXOS)}
+
+
+def _block(txs: List[Tx]) -> Block:
+    filename = path.join(path.dirname(__file__), "_data", "block_1.bin")
+    with open(filename, "rb") as binfile_:
+        coinbase_block = Block.parse(binfile_.read())
+    transactions = coinbase_block.transactions + txs
+    return Block(coinbase_block.header, transactions, check_validity=False)
+
+
+def test_validate_signatures() -> None:
+
+    tx, utxos = _signed_tx(0)
+    block = _block([tx])
+    validation = validate_signatures(block, _lookup(utxos))
+    assert validation.is_valid()
+    assert validation.n_verified == len(UTXOS)
+    assert validation.processes == 1
+    assert validation.inputs_per_second > 0
+    script_types = [result.script_type for result in validation.results]
+    assert script_types == [
+        "p2pkh",
+        "p2wpkh",
+        "p2wpkh_p2sh",
+        "p2wsh",
+        "p2wsh_p2sh",
+        "p2tr",
+    ]
+    # the coinbase is skipped
+    assert all(result.tx_i == 1 for result in validation.results)
+
+    # invalid signatures
+    tx.vin[1].script_witness.stack[0] = tx.vin[2].script_witness.stack[0]
+    sig = tx.vin[5].script_witness.stack[0]
+    tx.vin[5].script_witness.stack[0] = sig[:32] + sig[32:][::-1]
+    validation = validate_signatures(block, _lookup(utxos))
+    assert not validation.is_valid()
+    invalid = [r.vin_i for r in validation.results if r.valid is False]
+    assert invalid == [1, 5]
+    assert validation.results[1].error == "signature verification failed"
+
+    # invalid commitments
+    tx, utxos = _signed_tx(1)
+    tx.vin[0].script_sig = tx.vin[0].script_sig[:-1] + b"\x00"
+    tx.vin[2].script_sig = b"\x6a"
+    tx.vin[3].script_witness.stack[-1] = MULTISIG[:-1] + b"\xac"
+    tx.vin[4].script_witness.stack[0] = b"\x01"
+    tx.vin[5].script_witness.stack[0] += b"\x00"
+    validation = validate_signatures(_block([tx]), _lookup(utxos))
+    errors = [r.error for r in validation.results if r.valid is False]
+    assert errors == [
+        "public key hash mismatch",
+        "non-push script_sig op code: 106",
+        "witness script hash mismatch",
+        "invalid p2wsh multisig witness: 2-of-n",
+        "invalid taproot signature size: 65",
+    ]
+
+    # inputs that cannot be verified
+    tx, utxos = _signed_tx(2)
+    utxos.pop((tx.vin[0].prev_out.tx_id, 0))
+    validation = validate_signatures(_block([tx]), _lookup(utxos))
+    assert validation.results[0].valid is None
+    assert validation.results[0].error == "missing utxo"
+    assert validation.results[5].error == "missing utxo of other input"
+    assert validation.n_verified == len(UTXOS) - 2
+    assert validation.results[1].valid
+
+    tx, utxos = _signed_tx(3)
+    tx.vin[5].script_witness.stack.append(b"\x00" * 33)
+    utxos[(tx.vin[1].prev_out.tx_id, 1)] = TxOut(1, ScriptPubKey.p2pk(PUB_KEYS[0]))
+    validation = validate_signatures(_block([tx]), _lookup(utxos))
+    assert validation.results[1].error == "unsupported script_pub_key"
+    assert validation.results[5].error == "unsupported taproot script path"
+
+    with pytest.raises(BTClibValueError, match="invalid batch size: "):
+        validate_signatures(block, _lookup(utxos), batch_size=0)
+
+
+def test_parallel_validation() -> None:
+
+    txs = []
+    utxos: UtxoSet = {}
+    for seed in range(4):
+        tx, tx_utxos = _signed_tx(seed)
+        txs.append(tx)
+        utxos.update(tx_utxos)
+    # an invalid taproot signature in the second batch
+    sig = txs[-1].vin[5].script_witness.stack[0]
+    txs[-1].vin[5].script_witness.stack[0] = sig[:-1] + bytes([sig[-1] ^ 1])
+    block = _block(txs)
+
+    serial = validate_signatures(block, _lookup(utxos), batch_size=2)
+    parallel = validate_signatures(block, _lookup(utxos), processes=2, batch_size=2)
+    assert parallel.processes == 2
+    assert parallel.results == serial.results
+    assert parallel.n_verified == len(txs) * len(UTXOS)
+    invalid = [(r.tx_i, r.vin_i) for r in parallel.results if not r.valid]
+    assert invalid == [(len(txs), 5)]
+    per_core = parallel.inputs_per_second_per_core
+    assert per_core == pytest.approx(parallel.inputs_per_second / 2)